@@ -0,0 +1,4 @@
+"""Benchmarks of pydlt on synthetic DLT files.
+
+Run all benchmarks on a generated corpus by "python -m benchmarks".
+"""
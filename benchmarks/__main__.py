@@ -0,0 +1,175 @@
+"""Run benchmarks by "python -m benchmarks".
+
+Each benchmark is run in a new process to measure its peak RSS. Results can
+be saved for the current commit and compared with the results of a baseline
+commit measured on the same machine, and the exit status is 1 if a benchmark
+is regressed.
+
+Examples::
+    python -m benchmarks --size 64M --mix strings decode str
+
+    # on the baseline commit
+    python -m benchmarks --save
+    # on a new commit
+    python -m benchmarks --save --baseline <baseline commit>
+"""
+import argparse
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Optional
+
+from benchmarks.corpus import MIXES, generate_corpus
+from benchmarks.regression import (
+    DEFAULT_ALPHA,
+    DEFAULT_THRESHOLD,
+    compare,
+    create_record,
+    current_commit,
+    load_record,
+    save_record,
+)
+from benchmarks.suite import BENCHMARKS, Corpus, run_benchmark
+from pydlt.cli import parse_size
+
+
+def _create_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks", description="Run benchmarks of pydlt."
+    )
+    parser.add_argument(
+        "benchmarks",
+        nargs="*",
+        help="benchmarks to run (all if not given): "
+        f"{', '.join([benchmark.name for benchmark in BENCHMARKS])}",
+    )
+    parser.add_argument(
+        "--size", type=parse_size, default="16M", help="size of the corpus"
+    )
+    parser.add_argument(
+        "--mix", choices=sorted(MIXES), default="default", help="mix of messages"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="seed of the corpus")
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="number of runs of a benchmark"
+    )
+    parser.add_argument(
+        "--corpus-dir",
+        type=Path,
+        default=Path(tempfile.gettempdir()) / "pydlt-benchmarks",
+        help="directory to keep generated corpora",
+    )
+    parser.add_argument(
+        "--save", action="store_true", help="save the results of the current commit"
+    )
+    parser.add_argument(
+        "--baseline", metavar="COMMIT", help="compare with the results of a commit"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="minimum relative slowdown regarded as a regression "
+        f"(default: {DEFAULT_THRESHOLD})",
+    )
+    parser.add_argument(
+        "--alpha",
+        type=float,
+        default=DEFAULT_ALPHA,
+        help="significance level of the test of a slowdown "
+        f"(default: {DEFAULT_ALPHA})",
+    )
+    parser.add_argument(
+        "--results-dir",
+        type=Path,
+        default=Path(__file__).parent.parent / ".benchmarks",
+        help="directory to store the results",
+    )
+    return parser
+
+
+def prepare_corpus(corpus_dir: Path, size: int, mix: str, seed: int) -> Corpus:
+    """Generate a corpus unless the same one is generated before.
+
+    Args:
+        corpus_dir (Path): A directory to keep corpora
+        size (int): Approximate size of the corpus
+        mix (str): Name of the mix of messages
+        seed (int): Seed of the corpus
+
+    Returns:
+        Corpus: The corpus
+    """
+    corpus_dir.mkdir(parents=True, exist_ok=True)
+    path = corpus_dir / f"{mix}-{size}-{seed}.dlt"
+    if not path.exists():
+        temp_path = path.with_suffix(".tmp")
+        generate_corpus(temp_path, size, MIXES[mix], seed)
+        temp_path.replace(path)
+    return Corpus(path)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = _create_parser()
+    args = parser.parse_args(argv)
+    names = [benchmark.name for benchmark in BENCHMARKS]
+    unknown = [name for name in args.benchmarks if name not in names]
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(unknown)}")
+    baseline = None
+    if args.baseline is not None:
+        try:
+            baseline = load_record(args.results_dir, args.baseline)
+        except ValueError as e:
+            print(e, file=sys.stderr)
+            return 2
+    corpus = prepare_corpus(args.corpus_dir, args.size, args.mix, args.seed)
+    print(f"corpus: {corpus.path} ({corpus.size:,} bytes)")
+    print(
+        f"{'benchmark':<10} {'median [s]':>12} {'IQR [s]':>10} "
+        f"{'messages/s':>14} {'MB/s':>10} {'peak RSS [MB]':>14}"
+    )
+    measurements = []
+    for benchmark in BENCHMARKS:
+        if args.benchmarks and benchmark.name not in args.benchmarks:
+            continue
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            result = executor.submit(
+                run_benchmark, benchmark.name, corpus.path, args.repeat
+            ).result()
+        measurements.append(result)
+        peak_rss = "-" if result.peak_rss is None else f"{result.peak_rss / 1e6:.1f}"
+        print(
+            f"{result.name:<10} {result.median:>12.4f} {result.iqr:>10.4f} "
+            f"{result.messages_per_second:>14,.0f} "
+            f"{result.megabytes_per_second:>10.2f} {peak_rss:>14}"
+        )
+
+    record = create_record(
+        current_commit(),
+        {"mix": args.mix, "size": args.size, "seed": args.seed},
+        measurements,
+    )
+    if args.save:
+        print(f"saved: {save_record(args.results_dir, record)}")
+    if baseline is None:
+        return 0
+    try:
+        comparisons = compare(baseline, record, args.threshold, args.alpha)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+    print(f"baseline: {baseline['commit']}")
+    print(f"{'benchmark':<10} {'change':>8} {'p-value':>8}")
+    for comparison in comparisons:
+        print(
+            f"{comparison.name:<10} {comparison.change:>+8.1%} "
+            f"{comparison.p_value:>8.4f}"
+            f"{'  REGRESSED' if comparison.regressed else ''}"
+        )
+    return 1 if any([comparison.regressed for comparison in comparisons]) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,195 @@
+"""Provide a seeded generator of synthetic DLT files."""
+import random
+import string
+import struct
+from pathlib import Path
+from typing import List, NamedTuple, Tuple, Type, Union
+
+from pydlt import (
+    Argument,
+    ArgumentBool,
+    ArgumentFloat64,
+    ArgumentRaw,
+    ArgumentSInt64,
+    ArgumentString,
+    ArgumentUInt8,
+    ArgumentUInt32,
+    DltMessage,
+    MessageLogInfo,
+    MessageType,
+    StorageHeader,
+)
+
+# offsets of fields which are updated for each message
+_STORAGE_SECONDS_OFFSET = 4
+_MESSAGE_COUNTER_OFFSET = StorageHeader.DATA_LENGTH + 1
+
+_CHARACTERS = string.ascii_letters + string.digits + " "
+
+
+class CorpusConfig(NamedTuple):
+    """A mix of messages in a corpus.
+
+    Ratios are probabilities of each message, and lengths are inclusive ranges.
+    """
+
+    verbose_ratio: float = 0.8
+    argument_types: Tuple[Type[Argument], ...] = (
+        ArgumentString,
+        ArgumentString,
+        ArgumentUInt32,
+        ArgumentSInt64,
+        ArgumentFloat64,
+        ArgumentBool,
+        ArgumentUInt8,
+        ArgumentRaw,
+    )
+    arguments: Tuple[int, int] = (1, 4)
+    string_length: Tuple[int, int] = (4, 80)
+    raw_length: Tuple[int, int] = (1, 32)
+    utf8_ratio: float = 0.5
+    ecu_id_ratio: float = 0.5
+    session_id_ratio: float = 0.5
+    timestamp_ratio: float = 0.9
+    msb_first_ratio: float = 0.1
+    variants: int = 4096  # number of distinct messages repeated in the corpus
+
+
+# mixes of messages which can be selected by name
+MIXES = {
+    "default": CorpusConfig(),
+    "verbose": CorpusConfig(verbose_ratio=1.0),
+    "non-verbose": CorpusConfig(verbose_ratio=0.0),
+    "strings": CorpusConfig(
+        verbose_ratio=1.0, argument_types=(ArgumentString,), string_length=(16, 256)
+    ),
+    "numbers": CorpusConfig(
+        verbose_ratio=1.0,
+        argument_types=(ArgumentUInt32, ArgumentSInt64, ArgumentFloat64),
+    ),
+}
+
+
+def generate_messages(config: CorpusConfig, seed: int = 0) -> List[bytes]:
+    """Generate data bytes of distinct messages with Storage Header.
+
+    Args:
+        config (CorpusConfig): A mix of messages
+        seed (int, optional): Seed of the random numbers. Defaults to 0.
+
+    Returns:
+        List[bytes]: Data bytes of config.variants messages
+    """
+    rand = random.Random(seed)
+    messages = []
+    for _ in range(config.variants):
+        ecu_id = "Ecu1" if rand.random() < config.ecu_id_ratio else None
+        session_id = (
+            rand.randrange(1 << 16) if rand.random() < config.session_id_ratio else None
+        )
+        timestamp = (
+            rand.randrange(1 << 32) if rand.random() < config.timestamp_ratio else None
+        )
+        msb_first = rand.random() < config.msb_first_ratio
+        str_header = StorageHeader(0, 0, "Ecu1")
+        if rand.random() < config.verbose_ratio:
+            message = DltMessage.create_verbose_message(
+                [
+                    _random_argument(rand, config)
+                    for _ in range(rand.randint(*config.arguments))
+                ],
+                MessageType.DLT_TYPE_LOG,
+                rand.choice(list(MessageLogInfo)),
+                rand.choice(["App", "Nav", "Hmi", "Diag"]),
+                rand.choice(["Ctx", "Main", "Net", "Io"]),
+                timestamp,
+                session_id,
+                ecu_id,
+                msb_first=msb_first,
+                str_header=str_header,
+            )
+        else:
+            message = DltMessage.create_non_verbose_message(
+                rand.randrange(1 << 32),
+                bytes(rand.getrandbits(8) for _ in range(rand.randint(0, 32))),
+                timestamp=timestamp,
+                session_id=session_id,
+                ecu_id=ecu_id,
+                msb_first=msb_first,
+                str_header=str_header,
+            )
+        messages.append(message.to_bytes())
+    return messages
+
+
+def generate_corpus(
+    path: Union[str, Path], size: int, config: CorpusConfig, seed: int = 0
+) -> int:
+    """Generate a DLT file by repeating distinct messages in a random order.
+
+    Time in Storage Header increases by 1 millisecond and Message Counter is
+    incremented for each message. The same file is generated by the same
+    arguments.
+
+    Args:
+        path (Union[str, Path]): A path to DLT file to write
+        size (int): Approximate size of the file in bytes
+        config (CorpusConfig): A mix of messages
+        seed (int, optional): Seed of the random numbers. Defaults to 0.
+
+    Returns:
+        int: Number of the messages in the file
+    """
+    variants = generate_messages(config, seed)
+    rand = random.Random(seed + 1)
+    pack_time = struct.Struct("<Ii").pack_into
+    data = bytearray()
+    count = 0
+    while len(data) < size:
+        for message in rand.choices(variants, k=1024):
+            offset = len(data)
+            data += message
+            milliseconds = 1600000000000 + count
+            pack_time(
+                data,
+                offset + _STORAGE_SECONDS_OFFSET,
+                milliseconds // 1000,
+                milliseconds % 1000 * 1000,
+            )
+            data[offset + _MESSAGE_COUNTER_OFFSET] = count & 0xFF
+            count += 1
+            if len(data) >= size:
+                break
+    Path(path).write_bytes(data)
+    return count
+
+
+def _random_argument(rand: random.Random, config: CorpusConfig) -> Argument:
+    """Create an argument of a random type and value.
+
+    Args:
+        rand (random.Random): Random numbers
+        config (CorpusConfig): A mix of messages
+
+    Returns:
+        Argument: The argument
+    """
+    arg_type = rand.choice(config.argument_types)
+    if arg_type is ArgumentString:
+        text = "".join(rand.choices(_CHARACTERS, k=rand.randint(*config.string_length)))
+        if rand.random() < config.utf8_ratio:
+            return ArgumentString(text + "äöü", is_utf8=True)
+        return ArgumentString(text)
+    if arg_type is ArgumentRaw:
+        return ArgumentRaw(
+            bytes(rand.getrandbits(8) for _ in range(rand.randint(*config.raw_length)))
+        )
+    fmt = arg_type._struct_format()
+    if fmt == "?":
+        return arg_type(rand.random() < 0.5)
+    if fmt in ("f", "d"):
+        return arg_type(rand.uniform(-1e6, 1e6))
+    bits = struct.calcsize(fmt) * 8
+    if fmt.islower():  # signed integer
+        return arg_type(rand.randrange(-(1 << (bits - 1)), 1 << (bits - 1)))
+    return arg_type(rand.randrange(1 << bits))
@@ -0,0 +1,296 @@
+"""Store results of the benchmarks and detect regressions against a baseline.
+
+Results are stored as JSON files "<results dir>/<machine id>/<commit>.json",
+since times are comparable only if they are measured on the same machine.
+"""
+import hashlib
+import itertools
+import json
+import math
+import os
+import platform
+import subprocess
+import time
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Union
+
+from benchmarks.suite import Measurement
+
+# default minimum slowdown regarded as a regression (5%)
+DEFAULT_THRESHOLD = 0.05
+
+# default significance level of the test of a slowdown
+DEFAULT_ALPHA = 0.05
+
+# maximum number of splits of the times to compute the exact p-value,
+# which is approximated by the normal distribution for more times
+_MAX_EXACT_SPLITS = 100000
+
+# the root directory of the repository
+_ROOT_DIR_PATH = Path(__file__).parent.parent
+
+
+class Comparison(NamedTuple):
+    """Result of a benchmark compared with the baseline."""
+
+    name: str
+    baseline_median: float
+    median: float
+    change: float  # relative change of the median (positive if slower)
+    p_value: float  # one-sided p-value of the Mann-Whitney U test of a slowdown
+    regressed: bool
+
+
+def machine_fingerprint() -> Dict[str, Any]:
+    """Get information of the machine and its short hash as "id".
+
+    Returns:
+        Dict[str, Any]: Information of the machine
+    """
+    info = {
+        "system": platform.system(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "python": f"{platform.python_implementation()} {platform.python_version()}",
+    }  # type: Dict[str, Any]
+    digest = hashlib.sha1(json.dumps(info, sort_keys=True).encode("utf-8"))
+    info["id"] = digest.hexdigest()[:12]
+    return info
+
+
+def current_commit(path: Union[str, Path] = _ROOT_DIR_PATH) -> str:
+    """Get the commit checked out in a git repository.
+
+    Args:
+        path (Union[str, Path], optional): A path in the repository.
+                                           Defaults to the root of pydlt.
+
+    Returns:
+        str: Hash of the commit with "-dirty" if there are uncommitted changes,
+             or "unknown" if it is not a git repository
+    """
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=str(path),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            universal_newlines=True,
+            check=True,
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "diff", "--quiet", "HEAD"],
+            cwd=str(path),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        ).returncode
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return f"{commit}-dirty" if dirty else commit
+
+
+def create_record(
+    commit: str,
+    corpus: Dict[str, Any],
+    measurements: Sequence[Measurement],
+    machine: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """Create a record of results of the benchmarks.
+
+    Args:
+        commit (str): Hash of the measured commit
+        corpus (Dict[str, Any]): Parameters of the corpus (mix, size and seed)
+        measurements (Sequence[Measurement]): Results of the benchmarks
+        machine (Optional[Dict[str, Any]], optional): Information of the
+                                                      machine. Defaults to None
+                                                      (machine_fingerprint()).
+
+    Returns:
+        Dict[str, Any]: The record, which can be converted to JSON
+    """
+    return {
+        "commit": commit,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "machine": machine_fingerprint() if machine is None else machine,
+        "corpus": corpus,
+        "results": {
+            measurement.name: {
+                "messages": measurement.messages,
+                "size": measurement.size,
+                "times": measurement.times,
+                "median": measurement.median,
+                "iqr": measurement.iqr,
+                "peak_rss": measurement.peak_rss,
+            }
+            for measurement in measurements
+        },
+    }
+
+
+def save_record(results_dir: Union[str, Path], record: Dict[str, Any]) -> Path:
+    """Save a record as JSON file.
+
+    If a record of the same commit and machine is saved before, its results are
+    updated by the new record, so benchmarks can be run separately.
+
+    Args:
+        results_dir (Union[str, Path]): A directory to store the records
+        record (Dict[str, Any]): A record created by create_record
+
+    Returns:
+        Path: A path to the saved file
+    """
+    path = Path(results_dir) / record["machine"]["id"] / f"{record['commit']}.json"
+    if path.exists():
+        saved = json.loads(path.read_text(encoding="utf-8"))
+        if saved["corpus"] == record["corpus"]:
+            saved["results"].update(record["results"])
+            record = dict(record, results=saved["results"])
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(record, indent=2, sort_keys=True), encoding="utf-8")
+    return path
+
+
+def load_record(
+    results_dir: Union[str, Path],
+    commit: str,
+    machine: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """Load a record saved by save_record.
+
+    Args:
+        results_dir (Union[str, Path]): A directory where the records are stored
+        commit (str): Hash of the commit or its prefix
+        machine (Optional[Dict[str, Any]], optional): Information of the
+                                                      machine. Defaults to None
+                                                      (machine_fingerprint()).
+
+    Raises:
+        ValueError: The results are not found, or the prefix is ambiguous.
+
+    Returns:
+        Dict[str, Any]: The record
+    """
+    if machine is None:
+        machine = machine_fingerprint()
+    machine_dir = Path(results_dir) / machine["id"]
+    paths = sorted(machine_dir.glob(f"{commit}*.json"))
+    exact = machine_dir / f"{commit}.json"
+    if exact in paths:
+        paths = [exact]
+    if not paths:
+        raise ValueError(
+            f"No results of commit {commit} on this machine: {machine_dir}"
+        )
+    if len(paths) > 1:
+        raise ValueError(
+            f"Ambiguous commit {commit}: " f"{', '.join([path.stem for path in paths])}"
+        )
+    return json.loads(paths[0].read_text(encoding="utf-8"))
+
+
+def compare(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    threshold: float = DEFAULT_THRESHOLD,
+    alpha: float = DEFAULT_ALPHA,
+) -> List[Comparison]:
+    """Compare results of the benchmarks with the baseline.
+
+    Times of the runs of a benchmark are compared with the baseline by the
+    one-sided Mann-Whitney U test. A benchmark is regressed if the times are
+    significantly slower than the baseline (the p-value is less than alpha) and
+    its median is slower by more than the threshold. A regression cannot be
+    detected by few runs, e.g. the least p-value of 3 runs of each is 0.05.
+    Benchmarks which are not in both results are ignored.
+
+    Args:
+        baseline (Dict[str, Any]): A record of the baseline
+        current (Dict[str, Any]): A record of the new run
+        threshold (float, optional): Minimum relative slowdown regarded as
+                                     a regression. Defaults to DEFAULT_THRESHOLD.
+        alpha (float, optional): Significance level of the test.
+                                 Defaults to DEFAULT_ALPHA.
+
+    Raises:
+        ValueError: The results are measured on different corpora.
+
+    Returns:
+        List[Comparison]: Comparisons of the benchmarks
+    """
+    if baseline["corpus"] != current["corpus"]:
+        raise ValueError(
+            f"Corpus of the baseline {baseline['corpus']} is different from "
+            f"{current['corpus']}"
+        )
+    comparisons = []
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+        change = result["median"] / base["median"] - 1.0
+        p_value = mann_whitney_u(base["times"], result["times"])
+        comparisons.append(
+            Comparison(
+                name,
+                base["median"],
+                result["median"],
+                change,
+                p_value,
+                p_value < alpha and change > threshold,
+            )
+        )
+    return comparisons
+
+
+def mann_whitney_u(baseline: Sequence[float], current: Sequence[float]) -> float:
+    """Test whether times are larger than the baseline by Mann-Whitney U test.
+
+    The p-value is exact for few times, or approximated by the normal
+    distribution with the correction of ties for many times.
+
+    Args:
+        baseline (Sequence[float]): Times of the baseline
+        current (Sequence[float]): Times of the new run
+
+    Returns:
+        float: One-sided p-value that the times are not larger than the baseline
+    """
+    pooled = sorted(list(baseline) + list(current))
+    # the average rank of each time for ties
+    ranks = {}  # type: Dict[float, float]
+    for value, group in itertools.groupby(enumerate(pooled, 1), lambda x: x[1]):
+        indexes = [index for index, _ in group]
+        ranks[value] = (indexes[0] + indexes[-1]) / 2
+    all_ranks = [ranks[value] for value in pooled]
+    count = len(current)
+    total = len(pooled)
+    rank_sum = sum([ranks[value] for value in current])
+    splits = math.factorial(total) // (
+        math.factorial(count) * math.factorial(total - count)
+    )
+    if splits <= _MAX_EXACT_SPLITS:
+        # probability of the rank sums of all splits which are the observed or more
+        larger = sum(
+            [
+                1
+                for ranks_of_split in itertools.combinations(all_ranks, count)
+                if sum(ranks_of_split) >= rank_sum - 1e-9
+            ]
+        )
+        return larger / splits
+    u = rank_sum - count * (count + 1) / 2
+    mean = count * (total - count) / 2
+    ties = sum([len(list(group)) ** 3 for _, group in itertools.groupby(pooled)])
+    variance = (
+        count
+        * (total - count)
+        / 12
+        * ((total + 1) - (ties - total) / (total * (total - 1)))
+    )
+    if variance <= 0:
+        return 1.0
+    # with the continuity correction
+    z = (u - mean - 0.5) / math.sqrt(variance)
+    return 0.5 * math.erfc(z / math.sqrt(2))
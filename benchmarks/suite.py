@@ -0,0 +1,216 @@
+"""Provide benchmarks of reading, decoding, converting, encoding and writing."""
+import io
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List, NamedTuple, Optional
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+from pydlt import DltFileReader, DltFileWriter, DltMessage, StorageHeader, TextExporter
+from pydlt.scan import LENGTH_OFFSET
+
+
+class Corpus:
+    """Data of a DLT file shared by the benchmarks.
+
+    Data bytes and decoded messages are prepared when they are used first,
+    so the preparation is not measured by the benchmarks.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.size = path.stat().st_size
+        self._message_bytes = None  # type: Optional[List[bytes]]
+        self._messages = None  # type: Optional[List[DltMessage]]
+        self._messages_without_raw = None  # type: Optional[List[DltMessage]]
+
+    @property
+    def message_bytes(self) -> List[bytes]:
+        """Get data bytes of each message with Storage Header."""
+        if self._message_bytes is None:
+            data = self.path.read_bytes()
+            self._message_bytes = []
+            offset = 0
+            while offset < len(data):
+                length_offset = offset + LENGTH_OFFSET
+                length = int.from_bytes(data[length_offset : length_offset + 2], "big")
+                end = offset + StorageHeader.DATA_LENGTH + length
+                self._message_bytes.append(data[offset:end])
+                offset = end
+        return self._message_bytes
+
+    @property
+    def messages(self) -> List[DltMessage]:
+        """Get the decoded messages."""
+        if self._messages is None:
+            self._messages = [
+                DltMessage.create_from_bytes(data, True) for data in self.message_bytes
+            ]
+        return self._messages
+
+    @property
+    def messages_without_raw(self) -> List[DltMessage]:
+        """Get decoded messages which do not reuse the data bytes to encode.
+
+        They are decoded apart from messages, which write the data bytes as is.
+        """
+        if self._messages_without_raw is None:
+            self._messages_without_raw = []
+            for data in self.message_bytes:
+                message = DltMessage.create_from_bytes(data, True)
+                message._raw = None
+                self._messages_without_raw.append(message)
+        return self._messages_without_raw
+
+
+class Benchmark(NamedTuple):
+    """A benchmark which processes all messages in a corpus."""
+
+    name: str
+    description: str
+    function: Callable[[Corpus], int]  # returns number of the processed messages
+
+
+class Measurement(NamedTuple):
+    """Times to run a benchmark repeatedly."""
+
+    name: str
+    messages: int  # number of messages processed in a run
+    size: int  # size of data bytes processed in a run
+    times: List[float]  # seconds of each run
+    peak_rss: Optional[int] = None  # peak resident set size of the process in bytes
+
+    @property
+    def median(self) -> float:
+        return statistics.median(self.times)
+
+    @property
+    def iqr(self) -> float:
+        """Get the interquartile range of the times."""
+        return _quantile(self.times, 0.75) - _quantile(self.times, 0.25)
+
+    @property
+    def messages_per_second(self) -> float:
+        return self.messages / self.median
+
+    @property
+    def megabytes_per_second(self) -> float:
+        return self.size / self.median / 1e6
+
+
+def bench_read(corpus: Corpus) -> int:
+    count = 0
+    with DltFileReader(corpus.path) as reader:
+        for _ in reader:
+            count += 1
+    return count
+
+
+def bench_decode(corpus: Corpus) -> int:
+    create_from_bytes = DltMessage.create_from_bytes
+    for data in corpus.message_bytes:
+        create_from_bytes(data, True)
+    return len(corpus.message_bytes)
+
+
+def bench_str(corpus: Corpus) -> int:
+    for message in corpus.messages:
+        str(message)
+    return len(corpus.messages)
+
+
+def bench_text(corpus: Corpus) -> int:
+    TextExporter(io.StringIO()).write_messages(corpus.messages)
+    return len(corpus.messages)
+
+
+def bench_encode(corpus: Corpus) -> int:
+    for message in corpus.messages_without_raw:
+        message.to_bytes()
+    return len(corpus.messages_without_raw)
+
+
+def bench_write(corpus: Corpus) -> int:
+    with DltFileWriter(corpus.path.with_suffix(".out")) as writer:
+        writer.write_messages(corpus.messages)
+    return len(corpus.messages)
+
+
+BENCHMARKS = [
+    Benchmark("read", "read and decode messages by DltFileReader", bench_read),
+    Benchmark("decode", "decode messages from data bytes", bench_decode),
+    Benchmark("str", "convert decoded messages to string", bench_str),
+    Benchmark("text", "convert decoded messages to text by TextExporter", bench_text),
+    Benchmark("encode", "convert decoded messages to data bytes", bench_encode),
+    Benchmark("write", "write decoded messages by DltFileWriter", bench_write),
+]
+
+
+def measure(benchmark: Benchmark, corpus: Corpus, repeat: int) -> Measurement:
+    """Run a benchmark repeatedly after a warm-up run.
+
+    Args:
+        benchmark (Benchmark): A benchmark
+        corpus (Corpus): A corpus to process
+        repeat (int): Number of the measured runs
+
+    Returns:
+        Measurement: Times of the runs
+    """
+    messages = benchmark.function(corpus)
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        benchmark.function(corpus)
+        times.append(time.perf_counter() - start)
+    return Measurement(benchmark.name, messages, corpus.size, times, peak_rss())
+
+
+def run_benchmark(name: str, path: Path, repeat: int) -> Measurement:
+    """Run a benchmark by name on a corpus file.
+
+    Peak RSS of the result is of the whole process, so this is run in a new
+    process for each benchmark to measure the memory of the benchmark.
+
+    Args:
+        name (str): Name of the benchmark
+        path (Path): A path to the corpus
+        repeat (int): Number of the measured runs
+
+    Raises:
+        ValueError: The benchmark is not found.
+
+    Returns:
+        Measurement: Times of the runs
+    """
+    for benchmark in BENCHMARKS:
+        if benchmark.name == name:
+            return measure(benchmark, Corpus(path), repeat)
+    raise ValueError(f"Unknown benchmark: {name}")
+
+
+def peak_rss() -> Optional[int]:
+    """Get peak resident set size of the current process.
+
+    Returns:
+        Optional[int]: Peak RSS in bytes, or None if it is not available
+    """
+    if resource is None:
+        return None
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+def _quantile(values: List[float], fraction: float) -> float:
+    """Get a quantile of values by linear interpolation."""
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
@@ -1,6 +1,12 @@
 # Import all classes in the sub modules of pydlt
 # F401 is ignored because they will be used from not here but a user of the library
+from pydlt.batch import MessageBatch  # noqa: F401
+from pydlt.cache import ParseCache  # noqa: F401
+from pydlt.extract import extract_messages, make_raw_predicate  # noqa: F401
 from pydlt.file import DltFileReader, DltFileWriter  # noqa: F401
+from pydlt.filter import compile_filter  # noqa: F401
+from pydlt.grep import GrepMatch, grep_file  # noqa: F401
+from pydlt.handler import DltLoggingHandler  # noqa: F401
 from pydlt.header import (  # noqa: F401
     ExtendedHeader,
     MessageBusInfo,
@@ -12,7 +18,11 @@ from pydlt.header import (  # noqa: F401
     StandardHeader,
     StorageHeader,
 )
+from pydlt.instrument import ReaderStats, WriterStats  # noqa: F401
+from pydlt.loss import LossReport, LossWindow, detect_message_loss  # noqa: F401
 from pydlt.message import DltMessage  # noqa: F401
+from pydlt.metrics import MessageMetrics, MetricsRegistry  # noqa: F401
+from pydlt.parallel import iter_messages_parallel  # noqa: F401
 from pydlt.payload import (  # noqa: F401
     Argument,
     ArgumentBool,
@@ -32,3 +42,12 @@ from pydlt.payload import (  # noqa: F401
     Payload,
     VerbosePayload,
 )
+from pydlt.relay import DltRelay  # noqa: F401
+from pydlt.scan import HeaderTable, scan_headers  # noqa: F401
+from pydlt.sort import default_sort_key, sort_file  # noqa: F401
+from pydlt.sqlite import export_sqlite, query_sqlite  # noqa: F401
+from pydlt.summary import FileSummary, Volume, summarize_file  # noqa: F401
+from pydlt.template import MessageTemplate  # noqa: F401
+from pydlt.text import TextExporter, export_text  # noqa: F401
+from pydlt.textindex import IndexHit, TextIndex  # noqa: F401
+from pydlt.timesync import ClockSegment, TimeCorrelator  # noqa: F401
@@ -0,0 +1,6 @@
+"""Run command line interface of pydlt by "python -m pydlt"."""
+import sys
+
+from pydlt.cli import main
+
+sys.exit(main())
@@ -0,0 +1,264 @@
+"""Provide batch of DLT messages held in a buffer of data bytes."""
+import struct
+from typing import Iterator, List, Optional
+
+from pydlt.header import MessageType, _ascii_decode
+from pydlt.message import DltMessage
+from pydlt.scan import (
+    APPLICATION_ID_OFFSET,
+    CONTEXT_ID_OFFSET,
+    EXTENDED_HEADER_OFFSETS,
+    HEADER_TYPE_OFFSET,
+    MESSAGE_COUNTER_OFFSET,
+    MESSAGE_ECU_ID_OFFSETS,
+    MESSAGE_INFO_OFFSET,
+    STORAGE_SECONDS_OFFSET,
+    TIMESTAMP_OFFSETS,
+    Chunk,
+    HeaderTable,
+)
+
+_unpack_storage_time = struct.Struct("<Ii").unpack_from
+_unpack_timestamp = struct.Struct(">I").unpack_from
+
+# Message Info of log messages masked by _LOG_TYPE_MASK
+_LOG_TYPE_MASK = 0b00001110
+_LOG_TYPE = MessageType.DLT_TYPE_LOG << 1
+
+
+class MessageBatch:
+    """A batch of DLT messages held in a buffer of data bytes.
+
+    Columns of header fields are read from the buffer when they are accessed
+    first, and a message is decoded when it is accessed first,
+    so the cost of Python is paid only for data which is used.
+
+    Examples::
+        with DltFileReader("path/to/file.dlt") as reader:
+            for batch in reader.iter_batches(10000):
+                for index, level in enumerate(batch.level):
+                    if level is not None and level <= MessageLogInfo.DLT_LOG_WARN:
+                        print(batch[index])
+    """
+
+    def __init__(
+        self,
+        data: bytes,
+        offsets: List[int],
+        positions: Optional[List[int]] = None,
+        encoding: Optional[str] = None,
+    ) -> None:
+        """Create MessageBatch object.
+
+        Args:
+            data (bytes): Data bytes which contain the messages with Storage Header
+            offsets (List[int]): Offsets of the messages in the data.
+                                 The message i is data[offsets[i] : offsets[i + 1]].
+            positions (Optional[List[int]], optional): Positions of the messages
+                                                       in the file.
+                                                       Defaults to None (offsets).
+            encoding (Optional[str], optional): Encoding to decode non-UTF-8
+                                                strings. Defaults to None.
+        """
+        self.data = data
+        self.offsets = offsets
+        self.positions = offsets[:-1] if positions is None else positions
+        self.encoding = encoding
+        self._messages = [None] * (len(offsets) - 1)
+        self._columns = {}
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> DltMessage:
+        """Get a message decoded from the buffer.
+
+        Args:
+            index (int): Index of the message
+
+        Raises:
+            IndexError: The index is out of range.
+            ValueError: It can be caused by invalid data format.
+
+        Returns:
+            DltMessage: The message
+        """
+        message = self._messages[index]
+        if message is None:
+            if index < 0:
+                index += len(self)
+            message = self._messages[index] = DltMessage.create_from_bytes(
+                self.data[self.offsets[index] : self.offsets[index + 1]],
+                True,
+                self.encoding,
+            )
+        return message
+
+    def __iter__(self) -> Iterator[DltMessage]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def message_bytes(self, index: int) -> bytes:
+        """Get data bytes of a message without decoding it.
+
+        Args:
+            index (int): Index of the message
+
+        Returns:
+            bytes: Data bytes of the message including Storage Header
+        """
+        if index < 0:
+            index += len(self)
+        return self.data[self.offsets[index] : self.offsets[index + 1]]
+
+    @property
+    def time(self) -> List[float]:
+        """Get time in Storage Header of the messages.
+
+        Returns:
+            List[float]: Seconds since epoch
+        """
+        column = self._columns.get("time")
+        if column is None:
+            data = self.data
+            column = self._columns["time"] = [
+                seconds + microseconds * 1e-6
+                for seconds, microseconds in [
+                    _unpack_storage_time(data, offset + STORAGE_SECONDS_OFFSET)
+                    for offset in self.offsets[:-1]
+                ]
+            ]
+        return column
+
+    @property
+    def timestamp(self) -> List[Optional[int]]:
+        """Get Timestamp in Standard Header of the messages.
+
+        Returns:
+            List[Optional[int]]: Timestamp, or None if not exists
+        """
+        column = self._columns.get("timestamp")
+        if column is None:
+            data = self.data
+            column = []
+            for offset in self.offsets[:-1]:
+                timestamp_offset = TIMESTAMP_OFFSETS[data[offset + HEADER_TYPE_OFFSET]]
+                column.append(
+                    None
+                    if timestamp_offset < 0
+                    else _unpack_timestamp(data, offset + timestamp_offset)[0]
+                )
+            self._columns["timestamp"] = column
+        return column
+
+    @property
+    def message_counter(self) -> List[int]:
+        """Get Message Counter in Standard Header of the messages.
+
+        Returns:
+            List[int]: Message Counter
+        """
+        column = self._columns.get("message_counter")
+        if column is None:
+            data = self.data
+            column = self._columns["message_counter"] = [
+                data[offset + MESSAGE_COUNTER_OFFSET] for offset in self.offsets[:-1]
+            ]
+        return column
+
+    @property
+    def ecu_id(self) -> List[str]:
+        """Get ECU ID of the messages.
+
+        Returns:
+            List[str]: ECU ID in Standard Header if exists,
+                       or ECU ID in Storage Header
+        """
+        column = self._columns.get("ecu_id")
+        if column is None:
+            data = self.data
+            column = []
+            for offset in self.offsets[:-1]:
+                start = (
+                    offset + MESSAGE_ECU_ID_OFFSETS[data[offset + HEADER_TYPE_OFFSET]]
+                )
+                column.append(_ascii_decode(data[start : start + 4]))
+            self._columns["ecu_id"] = column
+        return column
+
+    @property
+    def application_id(self) -> List[Optional[str]]:
+        """Get Application ID in Extended Header of the messages.
+
+        Returns:
+            List[Optional[str]]: Application ID, or None if not exists
+        """
+        return self._extended_header_id("application_id", APPLICATION_ID_OFFSET)
+
+    @property
+    def context_id(self) -> List[Optional[str]]:
+        """Get Context ID in Extended Header of the messages.
+
+        Returns:
+            List[Optional[str]]: Context ID, or None if not exists
+        """
+        return self._extended_header_id("context_id", CONTEXT_ID_OFFSET)
+
+    @property
+    def level(self) -> List[Optional[int]]:
+        """Get log level of the messages.
+
+        Returns:
+            List[Optional[int]]: Log level (MessageLogInfo) of log messages,
+                                 or None for the other messages
+        """
+        column = self._columns.get("level")
+        if column is None:
+            data = self.data
+            column = []
+            for offset in self.offsets[:-1]:
+                ext_offset = EXTENDED_HEADER_OFFSETS[data[offset + HEADER_TYPE_OFFSET]]
+                if ext_offset < 0:
+                    column.append(None)
+                    continue
+                msin = data[offset + ext_offset + MESSAGE_INFO_OFFSET]
+                column.append(msin >> 4 if msin & _LOG_TYPE_MASK == _LOG_TYPE else None)
+            self._columns["level"] = column
+        return column
+
+    def to_header_table(self) -> HeaderTable:
+        """Get header fields of the messages as NumPy arrays.
+
+        Raises:
+            ImportError: NumPy is not installed.
+
+        Returns:
+            HeaderTable: Header fields of the messages
+        """
+        table = HeaderTable.create_from_chunk(Chunk(0, self.data, self.offsets))
+        table.position[:] = self.positions
+        return table
+
+    def _extended_header_id(self, name: str, id_offset: int) -> List[Optional[str]]:
+        """Get a column of ID in Extended Header.
+
+        Args:
+            name (str): Name of the column
+            id_offset (int): Offset of the ID in Extended Header
+
+        Returns:
+            List[Optional[str]]: ID, or None if not exists
+        """
+        column = self._columns.get(name)
+        if column is None:
+            data = self.data
+            column = []
+            for offset in self.offsets[:-1]:
+                ext_offset = EXTENDED_HEADER_OFFSETS[data[offset + HEADER_TYPE_OFFSET]]
+                if ext_offset < 0:
+                    column.append(None)
+                else:
+                    start = offset + ext_offset + id_offset
+                    column.append(_ascii_decode(data[start : start + 4]))
+            self._columns[name] = column
+        return column
@@ -0,0 +1,236 @@
+"""Provide persistent cache of decoded DLT messages.
+
+A cache entry holds snapshots of the decoded messages in a file (values of all
+fields in the headers and the payload, see DltMessage._snapshot), so messages
+can be created again from the entry without parsing the data bytes.
+"""
+import hashlib
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import List, Optional, Union
+
+from pydlt.header import ExtendedHeader, StandardHeader, StorageHeader
+from pydlt.message import DltMessage
+from pydlt.payload import (
+    ArgumentNumBase,
+    ArgumentRaw,
+    ArgumentString,
+    NonVerbosePayload,
+    VerbosePayload,
+)
+
+# default upper limit of total size of cache entries
+DEFAULT_MAX_SIZE = 1024 * 1024 * 1024
+
+# version of the format of cache entries, which is a part of the key
+_FORMAT_VERSION = 2
+
+# suffix of file names of cache entries
+_ENTRY_SUFFIX = ".pydltcache"
+
+# size and number of blocks sampled from a file to calculate the key
+_SAMPLE_SIZE = 64 * 1024
+_SAMPLE_COUNT = 8
+
+# argument classes which are created by the value and msb_first
+_VALUE_ARGUMENT_CLASSES = frozenset(ArgumentNumBase.__subclasses__() + [ArgumentRaw])
+
+
+class ParseCache:
+    """A class to store decoded messages of DLT files in a directory.
+
+    A cache entry is keyed by the path, the size, the modification time of a file,
+    the encoding to decode it and a hash of sampled blocks of the content.
+    Entries are written atomically, so the cache can be shared by
+    concurrent readers and processes. The least recently used entries are
+    removed when the total size exceeds max_size.
+    Entries are serialized by pickle, so the directory must not be writable
+    by untrusted users.
+
+    Examples::
+        cache = ParseCache("path/to/cache_dir")
+
+        # the first read parses the file and stores the messages to the cache
+        with DltFileReader("path/to/file.dlt", cache=cache) as reader:
+            messages = reader.read_messages()
+
+        # later reads create the messages from the cache
+        with DltFileReader("path/to/file.dlt", cache=cache) as reader:
+            messages = reader.read_messages()
+    """
+
+    def __init__(
+        self, directory: Union[str, Path], max_size: int = DEFAULT_MAX_SIZE
+    ) -> None:
+        """Create ParseCache object.
+
+        The directory is created if it does not exist.
+
+        Args:
+            directory (Union[str, Path]): A directory to store cache entries
+            max_size (int, optional): Upper limit of total size of the entries.
+                                      Defaults to DEFAULT_MAX_SIZE.
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_size = max_size
+
+    def key(self, path: Union[str, Path], encoding: Optional[str] = None) -> str:
+        """Get a key of a cache entry of a file.
+
+        Args:
+            path (Union[str, Path]): A path to DLT file
+            encoding (Optional[str], optional): Encoding to decode the file.
+                                                Defaults to None.
+
+        Returns:
+            str: Key of the cache entry
+        """
+        with open(str(path), "rb") as file:
+            stat = os.fstat(file.fileno())
+            digest = hashlib.sha256(
+                repr(
+                    (
+                        _FORMAT_VERSION,
+                        str(Path(path).resolve()),
+                        stat.st_size,
+                        stat.st_mtime_ns,
+                        encoding,
+                    )
+                ).encode()
+            )
+            for position in _sample_positions(stat.st_size):
+                file.seek(position)
+                digest.update(file.read(_SAMPLE_SIZE))
+        return digest.hexdigest()
+
+    def load(self, key: str) -> Optional[List[tuple]]:
+        """Load snapshots of messages from a cache entry.
+
+        A broken or incompatible entry is regarded as not existing.
+
+        Args:
+            key (str): Key of the cache entry
+
+        Returns:
+            Optional[List[tuple]]: Snapshots of the messages or None if not exists
+        """
+        path = self._entry_path(key)
+        try:
+            with open(str(path), "rb") as file:
+                snapshots = pickle.load(file)
+            # update the modification time as the last use for the eviction
+            os.utime(str(path))
+        except Exception:
+            return None
+        return snapshots
+
+    def store(self, key: str, snapshots: List[tuple]) -> None:
+        """Store snapshots of messages to a cache entry atomically.
+
+        Args:
+            key (str): Key of the cache entry
+            snapshots (List[tuple]): Snapshots of the messages
+        """
+        fd, temp_path = tempfile.mkstemp(suffix=".tmp", dir=str(self.directory))
+        try:
+            with os.fdopen(fd, "wb") as file:
+                pickle.dump(snapshots, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, str(self._entry_path(key)))
+        except BaseException:
+            os.remove(temp_path)
+            raise
+        self.evict()
+
+    def evict(self) -> None:
+        """Remove the least recently used entries until the total size is in limit."""
+        entries = []
+        for entry in os.scandir(str(self.directory)):
+            if not entry.name.endswith(_ENTRY_SUFFIX):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:  # removed by another process
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        entries.sort()
+        total_size = sum([size for _, size, _ in entries])
+        for _, size, path in entries:
+            if total_size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:  # removed by another process
+                pass
+            total_size -= size
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        for path in self.directory.glob(f"*{_ENTRY_SUFFIX}"):
+            try:
+                path.unlink()
+            except FileNotFoundError:  # removed by another process
+                pass
+
+    def _entry_path(self, key: str) -> Path:
+        return self.directory / f"{key}{_ENTRY_SUFFIX}"
+
+
+def create_message_from_snapshot(snapshot: tuple, data: bytes) -> DltMessage:
+    """Create DltMessage object from a snapshot of a decoded message.
+
+    Args:
+        snapshot (tuple): A snapshot given by DltMessage._snapshot()
+        data (bytes): Data bytes which the message is decoded from
+
+    Returns:
+        DltMessage: New DltMessage object
+    """
+    str_snapshot, std_snapshot, ext_snapshot, payload_snapshot = snapshot
+    std_header = StandardHeader(*std_snapshot)
+    ext_header = None if ext_snapshot is None else ExtendedHeader(*ext_snapshot)
+    payload = None
+    if payload_snapshot is not None:
+        msb_first = std_header.msb_first
+        if ext_header is not None and ext_header.verbose is True:
+            arguments = []
+            for arg_snapshot in payload_snapshot:
+                arg_class = arg_snapshot[0]
+                if arg_class is ArgumentString:
+                    arguments.append(
+                        ArgumentString._create_from_encoded(
+                            arg_snapshot[1], arg_snapshot[2], msb_first, arg_snapshot[3]
+                        )
+                    )
+                elif arg_class in _VALUE_ARGUMENT_CLASSES:
+                    arguments.append(arg_class(arg_snapshot[1], msb_first))
+                else:
+                    raise ValueError(f"Unexpected argument in snapshot: {arg_class}")
+            payload = VerbosePayload(arguments)
+        else:
+            payload = NonVerbosePayload(*payload_snapshot)
+    message = DltMessage(
+        None if str_snapshot is None else StorageHeader(*str_snapshot),
+        std_header,
+        ext_header,
+        payload,
+    )
+    message._raw = data
+    return message
+
+
+def _sample_positions(size: int) -> List[int]:
+    """Get positions of blocks sampled from a file to calculate the key.
+
+    Args:
+        size (int): Size of the file
+
+    Returns:
+        List[int]: Positions of the blocks
+    """
+    if size <= _SAMPLE_SIZE * _SAMPLE_COUNT:
+        return list(range(0, size, _SAMPLE_SIZE))
+    last = size - _SAMPLE_SIZE
+    return [last * index // (_SAMPLE_COUNT - 1) for index in range(_SAMPLE_COUNT)]
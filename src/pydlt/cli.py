@@ -0,0 +1,540 @@
+"""Provide command line interface of pydlt.
+
+Examples::
+    pydlt extract in.dlt out.dlt --apid App --level warn
+    pydlt sort in.dlt out.dlt --memory-limit 256M
+    pydlt relay --record record.dlt --metrics-port 9464
+    pydlt convert in.dlt --to jsonl -j 8 -o out.jsonl
+    pydlt stats in.dlt --top 20
+    pydlt grep -i -A 2 "timeout" in.dlt
+    pydlt index session.index in1.dlt in2.dlt
+    pydlt search session.index "connection timeout"
+"""
+import argparse
+import asyncio
+import json
+import sys
+from typing import List, Optional
+
+from pydlt.convert import FORMATS, convert_file
+from pydlt.extract import RawPredicate, extract_messages, make_raw_predicate
+from pydlt.filter import compile_filter, parse_time
+from pydlt.grep import grep_file
+from pydlt.header import MessageLogInfo
+from pydlt.metrics import MetricsRegistry
+from pydlt.relay import (
+    DEFAULT_CLIENT_PORT,
+    DEFAULT_PRODUCER_PORT,
+    DEFAULT_QUEUE_SIZE,
+    DEFAULT_RECORD_BACKUPS,
+    DEFAULT_RECORD_MAX_SIZE,
+    DltRelay,
+)
+from pydlt.sort import DEFAULT_MEMORY_LIMIT, sort_file
+from pydlt.summary import DEFAULT_TOP, summarize_file
+from pydlt.textindex import TextIndex
+
+_LOG_LEVELS = {
+    "fatal": MessageLogInfo.DLT_LOG_FATAL,
+    "error": MessageLogInfo.DLT_LOG_ERROR,
+    "warn": MessageLogInfo.DLT_LOG_WARN,
+    "info": MessageLogInfo.DLT_LOG_INFO,
+    "debug": MessageLogInfo.DLT_LOG_DEBUG,
+    "verbose": MessageLogInfo.DLT_LOG_VERBOSE,
+}
+
+
+def _parse_level(value: str) -> int:
+    """Parse log level given by name (e.g. "warn") or number.
+
+    Args:
+        value (str): A value of the argument
+
+    Raises:
+        argparse.ArgumentTypeError: The value is not a log level.
+
+    Returns:
+        int: Log level
+    """
+    if value.lower() in _LOG_LEVELS:
+        return _LOG_LEVELS[value.lower()]
+    try:
+        return MessageLogInfo(int(value))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid log level: {value}")
+
+
+def _parse_time(value: str) -> float:
+    """Parse time given by seconds since epoch or date and time in UTC.
+
+    Args:
+        value (str): A value of the argument (e.g. "2022/10/09 02:01:47.000000")
+
+    Raises:
+        argparse.ArgumentTypeError: The value is not a time.
+
+    Returns:
+        float: Seconds since epoch
+    """
+    try:
+        return parse_time(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid time: {value}")
+
+
+_SIZE_UNITS = {"K": 1024, "M": 1024**2, "G": 1024**3}
+
+
+def parse_size(value: str) -> int:
+    """Parse size in bytes with an optional unit (K, M or G).
+
+    Args:
+        value (str): A value of the argument (e.g. "64M")
+
+    Raises:
+        argparse.ArgumentTypeError: The value is not a size.
+
+    Returns:
+        int: Size in bytes
+    """
+    unit = _SIZE_UNITS.get(value[-1:].upper(), 1)
+    number = value[:-1] if unit > 1 else value
+    try:
+        size = int(float(number) * unit)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid size: {value}")
+    if size <= 0:
+        raise argparse.ArgumentTypeError(f"invalid size: {value}")
+    return size
+
+
+def _add_message_filter_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--apid", action="append", help="application ID (can be repeated)"
+    )
+    parser.add_argument("--ctid", action="append", help="context ID (can be repeated)")
+    parser.add_argument("--ecu", action="append", help="ECU ID (can be repeated)")
+    parser.add_argument(
+        "--level",
+        type=_parse_level,
+        help="log level (fatal, error, warn, info, debug, verbose); "
+        "log messages of the level or more severe are matched",
+    )
+    parser.add_argument(
+        "--from",
+        dest="time_from",
+        type=_parse_time,
+        help="start time (inclusive) as seconds since epoch "
+        'or date and time in UTC (e.g. "2022/10/09 02:01:47.000000")',
+    )
+    parser.add_argument(
+        "--to",
+        dest="time_to",
+        type=_parse_time,
+        help="end time (exclusive) in the same format as --from",
+    )
+    parser.add_argument(
+        "--filter",
+        dest="expression",
+        help="filter expression combined with the other conditions "
+        '(e.g. \'apid in ("NAV", "HMI") and level <= warn\')',
+    )
+
+
+def _make_predicate(args: argparse.Namespace) -> RawPredicate:
+    """Make a predicate from the arguments added by _add_message_filter_arguments.
+
+    Args:
+        args (argparse.Namespace): Parsed arguments
+
+    Raises:
+        ValueError: The filter expression is invalid.
+
+    Returns:
+        RawPredicate: A predicate which matches messages satisfying all conditions
+    """
+    predicate = make_raw_predicate(
+        application_ids=args.apid,
+        context_ids=args.ctid,
+        ecu_ids=args.ecu,
+        level=args.level,
+        time_from=args.time_from,
+        time_to=args.time_to,
+    )
+    if args.expression is None:
+        return predicate
+    expression_predicate = compile_filter(args.expression)
+
+    def combined_predicate(data: bytes, offset: int) -> bool:
+        return predicate(data, offset) and expression_predicate(data, offset)
+
+    return combined_predicate
+
+
+def _run_extract(args: argparse.Namespace) -> int:
+    predicate = _make_predicate(args)
+    count = extract_messages(args.input, args.output, predicate, append=args.append)
+    print(f"{count} messages are extracted", file=sys.stderr)
+    return 0
+
+
+def _run_sort(args: argparse.Namespace) -> int:
+    count = sort_file(
+        args.input,
+        args.output,
+        memory_limit=args.memory_limit,
+        temp_dir=args.temp_dir,
+    )
+    print(f"{count} messages are sorted", file=sys.stderr)
+    return 0
+
+
+def _run_relay(args: argparse.Namespace) -> int:
+    registry = None if args.metrics_port is None else MetricsRegistry()
+    relay = DltRelay(
+        queue_size=args.queue_size,
+        ecu_id=args.ecu_id,
+        client_storage_header=args.storage_header,
+        record_path=args.record,
+        record_max_size=args.record_max_size,
+        record_backups=args.record_backups,
+        registry=registry,
+    )
+    server = None
+    if registry is not None:
+        server = registry.serve(args.host, args.metrics_port)
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(
+            relay.start(args.host, args.producer_port, args.client_port)
+        )
+        if args.connect is None:
+            loop.run_forever()
+        else:
+            # relay until the connection to the producer is closed
+            host, _, port = args.connect.rpartition(":")
+            loop.run_until_complete(relay.connect(host, int(port)))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        loop.run_until_complete(relay.close())
+        loop.close()
+        if server is not None:
+            server.close()
+    print(
+        f"{relay.received} messages are relayed, {relay.dropped} are dropped",
+        file=sys.stderr,
+    )
+    return 0
+
+
+def _run_convert(args: argparse.Namespace) -> int:
+    output = sys.stdout.buffer if args.output in (None, "-") else args.output
+    count = convert_file(
+        args.input,
+        output,
+        args.to,
+        workers=args.jobs,
+        template=args.format,
+        expression=args.expression,
+        encoding=args.encoding,
+    )
+    print(f"{count} messages are converted", file=sys.stderr)
+    return 0
+
+
+def _run_stats(args: argparse.Namespace) -> int:
+    summary = summarize_file(args.input)
+    if args.json:
+        print(json.dumps(summary.to_dict(args.top)))
+    else:
+        print(summary.to_text(args.top))
+    return 0
+
+
+def _run_grep(args: argparse.Namespace) -> int:
+    context = args.context or 0
+    matches = grep_file(
+        args.input,
+        args.pattern,
+        ignore_case=args.ignore_case,
+        fixed_string=args.fixed_strings,
+        before=context if args.before_context is None else args.before_context,
+        after=context if args.after_context is None else args.after_context,
+        encoding=args.encoding,
+    )
+    with_context = args.context or args.before_context or args.after_context
+    count = 0
+    last_index = None
+    for match in matches:
+        if args.count:
+            count += match.matched
+            continue
+        # groups of messages which are not consecutive are separated like grep
+        if with_context and last_index is not None and match.index != last_index + 1:
+            print("--")
+        print(match.message)
+        last_index = match.index
+        count += match.matched
+    if args.count:
+        print(count)
+    # the exit status is 1 if no message matches, like grep
+    return 0 if count else 1
+
+
+def _run_index(args: argparse.Namespace) -> int:
+    count = 0
+    with TextIndex(args.index) as index:
+        for other in args.merge:
+            index.merge(other)
+        for path in args.input:
+            count += index.update(path, args.encoding)
+    print(f"{count} messages are indexed", file=sys.stderr)
+    return 0
+
+
+def _run_search(args: argparse.Namespace) -> int:
+    with TextIndex(args.index, read_only=True) as index:
+        if args.message_id:
+            hits = index.search_message_id(int(args.query, 0))
+        else:
+            hits = index.search(args.query)
+        for message in index.read_messages(hits, args.encoding):
+            print(message)
+    # the exit status is 1 if no message is found, like grep
+    return 0 if hits else 1
+
+
+def _create_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="pydlt", description="Handle DLT files.")
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.required = True
+
+    extract = subparsers.add_parser(
+        "extract",
+        help="copy matched messages to another file without decoding",
+    )
+    extract.add_argument("input", help="DLT file to read")
+    extract.add_argument("output", help="DLT file to write")
+    _add_message_filter_arguments(extract)
+    extract.add_argument(
+        "--append", action="store_true", help="append messages to the output"
+    )
+    extract.set_defaults(func=_run_extract)
+
+    sort = subparsers.add_parser(
+        "sort",
+        help="sort messages by time in Storage Header, Timestamp and Message Counter",
+    )
+    sort.add_argument("input", help="DLT file to read")
+    sort.add_argument("output", help="DLT file to write")
+    sort.add_argument(
+        "--memory-limit",
+        type=parse_size,
+        default=DEFAULT_MEMORY_LIMIT,
+        help="approximate upper limit of memory to hold messages (e.g. 256M)",
+    )
+    sort.add_argument("--temp-dir", help="directory to create temporary files")
+    sort.set_defaults(func=_run_sort)
+
+    relay = subparsers.add_parser(
+        "relay",
+        help="relay messages from producers to clients (stop by Ctrl+C)",
+    )
+    relay.add_argument("--host", default="127.0.0.1", help="host to listen")
+    relay.add_argument(
+        "--producer-port",
+        type=int,
+        default=DEFAULT_PRODUCER_PORT,
+        help="port to accept producers",
+    )
+    relay.add_argument(
+        "--client-port",
+        type=int,
+        default=DEFAULT_CLIENT_PORT,
+        help="port to accept clients",
+    )
+    relay.add_argument(
+        "--connect",
+        help="HOST:PORT of a producer to connect to (e.g. dlt-daemon); "
+        "the relay stops when the connection is closed",
+    )
+    relay.add_argument(
+        "--ecu-id", default="", help="ECU ID of messages which do not have it"
+    )
+    relay.add_argument(
+        "--storage-header",
+        action="store_true",
+        help="send messages to clients with Storage Header",
+    )
+    relay.add_argument(
+        "--queue-size",
+        type=int,
+        default=DEFAULT_QUEUE_SIZE,
+        help="maximum number of messages waiting to be sent to a client",
+    )
+    relay.add_argument("--record", help="DLT file to record all messages")
+    relay.add_argument(
+        "--record-max-size",
+        type=parse_size,
+        default=DEFAULT_RECORD_MAX_SIZE,
+        help="maximum size of the recording file, which is rotated (e.g. 64M)",
+    )
+    relay.add_argument(
+        "--record-backups",
+        type=int,
+        default=DEFAULT_RECORD_BACKUPS,
+        help="number of the rotated recording files to keep",
+    )
+    relay.add_argument(
+        "--metrics-port",
+        type=int,
+        help="port to serve metrics in Prometheus text format on /metrics",
+    )
+    relay.set_defaults(func=_run_relay)
+
+    convert = subparsers.add_parser(
+        "convert",
+        help="convert messages to text, JSON lines or CSV on worker processes",
+    )
+    convert.add_argument("input", help="DLT file to read")
+    convert.add_argument(
+        "-o", "--output", help="file to write (standard output if not given)"
+    )
+    convert.add_argument("--to", choices=FORMATS, default="text", help="output format")
+    convert.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        help="number of worker processes (default: number of CPUs)",
+    )
+    convert.add_argument(
+        "--format",
+        help="format template of text "
+        '(e.g. "{time} {ecu} {apid}:{ctid} [{level}] {payload}")',
+    )
+    convert.add_argument(
+        "--filter",
+        dest="expression",
+        help="filter expression (e.g. 'apid == \"NAV\" and level <= warn')",
+    )
+    convert.add_argument(
+        "--encoding", help="encoding of non-UTF-8 strings (e.g. latin-1)"
+    )
+    convert.set_defaults(func=_run_convert)
+
+    stats = subparsers.add_parser(
+        "stats",
+        help="show statistics of messages by scanning only the headers",
+    )
+    stats.add_argument("input", help="DLT file to read")
+    stats.add_argument(
+        "--top",
+        type=int,
+        default=DEFAULT_TOP,
+        help="number of the most frequent Message IDs to show",
+    )
+    stats.add_argument("--json", action="store_true", help="print as JSON")
+    stats.set_defaults(func=_run_stats)
+
+    grep = subparsers.add_parser(
+        "grep",
+        help="print messages whose string arguments match a pattern "
+        "(exit status is 1 if no message matches, or 2 if an error occurs)",
+    )
+    grep.add_argument("pattern", help="regular expression to search")
+    grep.add_argument("input", help="DLT file to read")
+    grep.add_argument(
+        "-i", "--ignore-case", action="store_true", help="ignore case of ASCII letters"
+    )
+    grep.add_argument(
+        "-F",
+        "--fixed-strings",
+        action="store_true",
+        help="search the pattern as a string, not a regular expression",
+    )
+    grep.add_argument(
+        "-A",
+        "--after-context",
+        type=int,
+        metavar="NUM",
+        help="print NUM messages after matched messages",
+    )
+    grep.add_argument(
+        "-B",
+        "--before-context",
+        type=int,
+        metavar="NUM",
+        help="print NUM messages before matched messages",
+    )
+    grep.add_argument(
+        "-C",
+        "--context",
+        type=int,
+        metavar="NUM",
+        help="print NUM messages before and after matched messages",
+    )
+    grep.add_argument(
+        "-c", "--count", action="store_true", help="print only number of matches"
+    )
+    grep.add_argument("--encoding", help="encoding of non-UTF-8 strings (e.g. latin-1)")
+    # errors are told from no match by the exit status like grep
+    grep.set_defaults(func=_run_grep, error_status=2)
+
+    index = subparsers.add_parser(
+        "index",
+        help="add messages to a full-text index of strings "
+        "(only messages appended since the last run are indexed)",
+    )
+    index.add_argument("index", help="index file to create or update")
+    index.add_argument("input", nargs="*", help="DLT files to index")
+    index.add_argument(
+        "--merge",
+        action="append",
+        default=[],
+        metavar="INDEX",
+        help="merge another index file",
+    )
+    index.add_argument(
+        "--encoding", help="encoding of non-UTF-8 strings (e.g. latin-1)"
+    )
+    index.set_defaults(func=_run_index)
+
+    search = subparsers.add_parser(
+        "search",
+        help="print messages which have all words of a query in the strings "
+        "(exit status is 1 if no message is found)",
+    )
+    search.add_argument("index", help="index file created by the index command")
+    search.add_argument("query", help="words to search")
+    search.add_argument(
+        "--message-id",
+        action="store_true",
+        help="search non-verbose messages by the query as Message ID",
+    )
+    search.add_argument(
+        "--encoding", help="encoding of non-UTF-8 strings (e.g. latin-1)"
+    )
+    search.set_defaults(func=_run_search)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run command line interface.
+
+    Args:
+        argv (Optional[List[str]]): Command line arguments.
+                                    sys.argv[1:] is used if None.
+
+    Returns:
+        int: Exit status
+    """
+    parser = _create_parser()
+    args = parser.parse_args(argv)
+    try:
+        return args.func(args)
+    # ImportError is raised by commands which need NumPy if it is not installed
+    except (ImportError, OSError, ValueError) as e:
+        print(f"pydlt: error: {e}", file=sys.stderr)
+        return getattr(args, "error_status", 1)
@@ -0,0 +1,541 @@
+"""Provide conversion of DLT files to text, JSON lines or CSV on worker processes.
+
+A file is split into ranges of bytes, and each worker process reads, decodes and
+formats the messages which begin in a range. A worker finds the first message
+in its range by DLT-Pattern, which can also appear in a payload by chance, so
+the position is checked with the end of the previous range and the range is
+converted again from the right position if they differ. The formatted ranges
+are written in the order of the file, so the output is the same as the one of
+a single process.
+
+Fields of CSV and JSON lines:
+    time: time in Storage Header (text in CSV, seconds since epoch in JSON)
+    timestamp: Timestamp in Standard Header (seconds in CSV, ticks in JSON)
+    counter, ecu, session, apid, ctid: header fields
+    type, subtype, mode: message type, Message Type Info and verbose mode
+    args: number of arguments (CSV), or values of the arguments (JSON)
+    payload: string of the payload (CSV), or in JSON, Message ID and hex of the
+             data of non-verbose messages as message_id and data
+"""
+import csv
+import functools
+import io
+import json
+import math
+import os
+import struct
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, BinaryIO, Iterator, List, Optional, Tuple, Union
+
+from pydlt.filter import compile_filter
+from pydlt.header import StandardHeader, StorageHeader
+from pydlt.message import _MESSAGE_TYPE_STR, DltMessage
+from pydlt.payload import ArgumentRaw, NonVerbosePayload, VerbosePayload
+from pydlt.scan import _MESSAGE_MIN_LENGTH, LENGTH_OFFSET
+from pydlt.text import (
+    TextExporter,
+    _storage_time,
+    _subtype,
+    _timestamp,
+    compile_format,
+)
+
+# output formats
+FORMATS = ("text", "jsonl", "csv")
+
+# default size of a range of the file formatted by a worker
+DEFAULT_CHUNK_SIZE = 4 * 1024 * 1024
+
+# default size of the buffer of the output file
+DEFAULT_BUFFER_SIZE = 4 * 1024 * 1024
+
+# columns of CSV
+CSV_COLUMNS = (
+    "time",
+    "timestamp",
+    "counter",
+    "ecu",
+    "session",
+    "apid",
+    "ctid",
+    "type",
+    "subtype",
+    "mode",
+    "args",
+    "payload",
+)
+
+
+def convert_file(
+    input_path: Union[str, Path],
+    output: Union[str, Path, BinaryIO],
+    output_format: str = "text",
+    workers: Optional[int] = None,
+    template: Optional[str] = None,
+    expression: Optional[str] = None,
+    encoding: Optional[str] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> int:
+    """Convert messages of DLT file to text, JSON lines or CSV.
+
+    Examples::
+        convert_file("path/to/file.dlt", "path/to/file.jsonl", "jsonl", workers=8)
+
+    Args:
+        input_path (Union[str, Path]): A path to DLT file
+        output (Union[str, Path, BinaryIO]): A path to the output file, or
+                                             a binary stream which is not closed
+        output_format (str, optional): "text", "jsonl" or "csv".
+                                       Defaults to "text".
+        workers (Optional[int], optional): Number of worker processes.
+                                           Messages are converted in the calling
+                                           process if it is 1.
+                                           Defaults to None (number of CPUs).
+        template (Optional[str], optional): A format template of text
+                                            (see compile_format).
+                                            Defaults to None (str(message)).
+        expression (Optional[str], optional): A filter expression to select
+                                              messages (see compile_filter).
+                                              Defaults to None.
+        encoding (Optional[str], optional): Encoding to decode non-UTF-8
+                                            strings. Defaults to None.
+        chunk_size (int, optional): Size of a range of the file formatted by
+                                    a worker. Defaults to DEFAULT_CHUNK_SIZE.
+
+    Raises:
+        ValueError: The format, template or expression is invalid,
+                    or it can be caused by invalid data format.
+
+    Returns:
+        int: Number of the converted messages
+    """
+    if output_format not in FORMATS:
+        raise ValueError(
+            f"Unknown output format: {output_format} / it must be in {FORMATS}"
+        )
+    # errors of the template and the expression are raised before the workers
+    if template is not None:
+        compile_format(template)
+    if expression is not None:
+        compile_filter(expression)
+    if workers is None:
+        workers = _default_workers()
+    options = (str(input_path), output_format, template, expression, encoding)
+
+    if isinstance(output, (str, Path)):
+        with open(str(output), "wb", buffering=DEFAULT_BUFFER_SIZE) as file:
+            return _convert(options, file, workers, chunk_size)
+    count = _convert(options, output, workers, chunk_size)
+    output.flush()
+    return count
+
+
+def format_json(message: DltMessage) -> str:
+    """Convert a message to a JSON object with typed values of the arguments.
+
+    Args:
+        message (DltMessage): A message
+
+    Returns:
+        str: JSON text of the message (without a newline)
+    """
+    str_header = message.str_header
+    std_header = message.std_header
+    ext_header = message.ext_header
+    ecu_id = std_header.ecu_id
+    if ecu_id is None and str_header is not None:
+        ecu_id = str_header.ecu_id
+    record = {
+        "time": None
+        if str_header is None
+        else str_header.seconds + str_header.microseconds * 1e-6,
+        "timestamp": std_header.timestamp,
+        "counter": std_header.message_counter,
+        "ecu": ecu_id,
+        "session": std_header.session_id,
+    }
+    if ext_header is not None:
+        record["apid"] = ext_header.application_id
+        record["ctid"] = ext_header.context_id
+        record["type"] = _MESSAGE_TYPE_STR.get(ext_header.message_type, "unknown")
+        record["subtype"] = _subtype(ext_header) or None
+    verbose = ext_header is not None and ext_header.verbose
+    record["mode"] = "verbose" if verbose else "non-verbose"
+    payload = message.payload
+    if isinstance(payload, VerbosePayload):
+        record["args"] = [_json_value(arg) for arg in payload.arguments]
+    elif isinstance(payload, NonVerbosePayload):
+        record["message_id"] = payload.message_id
+        record["data"] = payload.non_static_data.hex()
+    return json.dumps(record, ensure_ascii=False, allow_nan=False)
+
+
+def format_csv_row(message: DltMessage) -> Tuple[Any, ...]:
+    """Get a row of CSV of a message.
+
+    Args:
+        message (DltMessage): A message
+
+    Returns:
+        Tuple[Any, ...]: Values of CSV_COLUMNS
+    """
+    str_header = message.str_header
+    std_header = message.std_header
+    ext_header = message.ext_header
+    ecu_id = std_header.ecu_id
+    if ecu_id is None:
+        ecu_id = "" if str_header is None else str_header.ecu_id
+    application_id = context_id = message_type = number_of_arguments = ""
+    if ext_header is not None:
+        application_id = ext_header.application_id
+        context_id = ext_header.context_id
+        message_type = _MESSAGE_TYPE_STR.get(ext_header.message_type, "unknown")
+        number_of_arguments = ext_header.number_of_arguments
+    return (
+        _storage_time(str_header),
+        _timestamp(std_header.timestamp),
+        std_header.message_counter,
+        ecu_id,
+        "" if std_header.session_id is None else std_header.session_id,
+        application_id,
+        context_id,
+        message_type,
+        _subtype(ext_header),
+        "verbose" if ext_header is not None and ext_header.verbose else "non-verbose",
+        number_of_arguments,
+        "" if message.payload is None else str(message.payload),
+    )
+
+
+def csv_header() -> bytes:
+    """Get the header line of CSV.
+
+    Returns:
+        bytes: The header line encoded in UTF-8
+    """
+    stream = io.StringIO()
+    csv.writer(stream, lineterminator="\n").writerow(CSV_COLUMNS)
+    return stream.getvalue().encode("utf-8")
+
+
+def _convert(
+    options: Tuple[str, str, Optional[str], Optional[str], Optional[str]],
+    file: BinaryIO,
+    workers: int,
+    chunk_size: int,
+) -> int:
+    """Convert ranges of the input and write them in the order of the file.
+
+    Args:
+        options (Tuple): Path, format, template, expression and encoding
+        file (BinaryIO): A stream to write
+        workers (int): Number of worker processes
+        chunk_size (int): Size of a range
+
+    Returns:
+        int: Number of the converted messages
+    """
+    if options[1] == "csv":
+        file.write(csv_header())
+    count = 0
+    # position of the first message at or after the beginning of the next range
+    position = 0
+    ranges = _iter_ranges(options[0], chunk_size)
+    if workers <= 1:
+        for start, end in ranges:
+            data, converted, position = _convert_range(options, start, end, position)
+            file.write(data)
+            count += converted
+        return count
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # convert ranges ahead of the writer by twice the number of workers
+        pending = deque()
+        try:
+            for start, end in ranges:
+                pending.append(
+                    (
+                        start,
+                        end,
+                        executor.submit(
+                            _convert_chunk,
+                            options,
+                            start,
+                            end,
+                            0 if start == 0 else None,
+                        ),
+                    )
+                )
+                if len(pending) < workers * 2:
+                    continue
+                start, end, future = pending.popleft()
+                data, converted, position = _convert_range(
+                    options, start, end, position, future.result()
+                )
+                file.write(data)
+                count += converted
+            while pending:
+                start, end, future = pending.popleft()
+                data, converted, position = _convert_range(
+                    options, start, end, position, future.result()
+                )
+                file.write(data)
+                count += converted
+        finally:
+            for _, _, future in pending:
+                future.cancel()
+    return count
+
+
+def _iter_ranges(path: str, chunk_size: int) -> Iterator[Tuple[int, int]]:
+    """Split a file into ranges of bytes.
+
+    Args:
+        path (str): A path to DLT file
+        chunk_size (int): Size of a range
+
+    Yields:
+        Iterator[Tuple[int, int]]: Start and end position of each range
+    """
+    size = os.path.getsize(path)
+    for start in range(0, size, chunk_size):
+        yield start, min(start + chunk_size, size)
+
+
+def _convert_range(
+    options: Tuple[str, str, Optional[str], Optional[str], Optional[str]],
+    start: int,
+    end: int,
+    position: int,
+    result: Optional[Tuple[bytes, int, Optional[int], int]] = None,
+) -> Tuple[bytes, int, int]:
+    """Get the converted messages which begin in a range of the file.
+
+    Args:
+        options (Tuple): Path, format, template, expression and encoding
+        start (int): Start position of the range
+        end (int): End position of the range
+        position (int): Position of the first message at or after the start,
+                        which is known from the previous range
+        result (Optional[Tuple[bytes, int, Optional[int], int]], optional):
+            A result of _convert_chunk which found the first message by itself.
+            Defaults to None (the range is converted from the position).
+
+    Raises:
+        ValueError: It can be caused by invalid data format.
+
+    Returns:
+        Tuple[bytes, int, int]: Formatted text encoded in UTF-8, number of messages
+                                and position of the first message after the range
+    """
+    if not start <= position < end:
+        # the range is in a message which begins in a previous range,
+        # or in an incomplete message at the end of the file
+        return b"", 0, position
+    if result is None or result[2] != position:
+        result = _convert_chunk(options, start, end, position)
+    return result[0], result[1], result[3]
+
+
+def _convert_chunk(
+    options: Tuple[str, str, Optional[str], Optional[str], Optional[str]],
+    start: int,
+    end: int,
+    position: Optional[int],
+) -> Tuple[bytes, int, Optional[int], int]:
+    """Read, decode and format messages which begin in a range of the file.
+
+    It runs in a worker process.
+
+    Args:
+        options (Tuple): Path, format, template, expression and encoding
+        start (int): Start position of the range
+        end (int): End position of the range
+        position (Optional[int]): Position of the first message in the range,
+                                  or None to find it by DLT-Pattern
+
+    Raises:
+        ValueError: It can be caused by invalid data format
+                    if the position is given.
+
+    Returns:
+        Tuple[bytes, int, Optional[int], int]: Formatted text encoded in UTF-8,
+                                               number of messages, position of
+                                               the first message (None if it is
+                                               not found) and position of the
+                                               first message after the range
+    """
+    path, output_format, template, expression, encoding = options
+    with open(path, "rb") as file:
+        file.seek(start)
+        # bytes after the range to check a message found at the end of the range
+        data = file.read(end - start + _MESSAGE_MIN_LENGTH)
+        offset = position - start if position is not None else _find_message(data)
+        if offset is None or offset >= end - start:
+            return b"", 0, None, end
+        try:
+            offsets, data = _frame_messages(file, data, offset, end - start, start)
+            messages = _decode_messages(data, offsets, expression, encoding)
+        except (ValueError, struct.error):
+            if position is None:
+                # DLT-Pattern can be in a payload, so the range is converted again
+                # from the position checked by the caller
+                return b"", 0, None, end
+            raise
+
+    if output_format == "jsonl":
+        text = "".join([format_json(message) + "\n" for message in messages])
+    elif output_format == "csv":
+        stream = io.StringIO()
+        csv.writer(stream, lineterminator="\n").writerows(
+            [format_csv_row(message) for message in messages]
+        )
+        text = stream.getvalue()
+    else:
+        exporter = TextExporter(io.StringIO(), template=template)
+        text = exporter.format_messages(messages)
+    return (
+        text.encode("utf-8", "replace"),
+        len(messages),
+        start + offsets[0],
+        start + offsets[-1],
+    )
+
+
+def _decode_messages(
+    data: bytes, offsets: List[int], expression: Optional[str], encoding: Optional[str]
+) -> List[DltMessage]:
+    """Decode the messages which match a filter expression.
+
+    Args:
+        data (bytes): Data bytes of the messages
+        offsets (List[int]): Offsets of the messages followed by the end of the last
+        expression (Optional[str]): A filter expression, or None for all messages
+        encoding (Optional[str]): Encoding to decode non-UTF-8 strings
+
+    Raises:
+        ValueError: It can be caused by invalid data format.
+
+    Returns:
+        List[DltMessage]: The decoded messages
+    """
+    predicate = None if expression is None else _compile_filter(expression)
+    create_from_bytes = DltMessage.create_from_bytes
+    messages = []
+    for index in range(len(offsets) - 1):
+        offset = offsets[index]
+        if predicate is not None and not predicate(data, offset):
+            continue
+        messages.append(
+            create_from_bytes(data[offset : offsets[index + 1]], True, encoding)
+        )
+    return messages
+
+
+def _find_message(data: bytes) -> Optional[int]:
+    """Find the first message in data bytes by DLT-Pattern.
+
+    A candidate is skipped if its length is invalid or the next message does not
+    begin with DLT-Pattern, but the pattern can still be in a payload by chance.
+
+    Args:
+        data (bytes): Data bytes which begin at an unknown position in a message
+
+    Returns:
+        Optional[int]: Offset of the message, or None if it is not found
+    """
+    dlt_pattern = StorageHeader.DLT_PATTERN
+    offset = data.find(dlt_pattern)
+    while offset >= 0:
+        if offset + _MESSAGE_MIN_LENGTH > len(data):
+            return offset
+        length = struct.unpack_from(">H", data, offset + LENGTH_OFFSET)[0]
+        end = offset + StorageHeader.DATA_LENGTH + length
+        if length >= StandardHeader.DATA_MIN_LENGTH and (
+            end + len(dlt_pattern) > len(data) or data.startswith(dlt_pattern, end)
+        ):
+            return offset
+        offset = data.find(dlt_pattern, offset + 1)
+    return None
+
+
+def _frame_messages(
+    file: BinaryIO, data: bytes, offset: int, end: int, position: int
+) -> Tuple[List[int], bytes]:
+    """Get offsets of the messages which begin before the end of a range.
+
+    Incomplete message at the end of the file is ignored.
+
+    Args:
+        file (BinaryIO): A stream to read the rest of the last message
+        data (bytes): Data bytes read from the beginning of the range
+        offset (int): Offset of the first message in the data
+        end (int): Offset of the end of the range in the data
+        position (int): Position of the data in the file
+
+    Raises:
+        ValueError: It can be caused by invalid data format.
+
+    Returns:
+        Tuple[List[int], bytes]: Offsets of the messages followed by the offset of
+                                 the next message, and the data bytes which
+                                 contain the last message
+    """
+    unpack_length = struct.Struct(">H").unpack_from
+    dlt_pattern = StorageHeader.DLT_PATTERN
+    offsets = []
+    while offset < end:
+        if offset + _MESSAGE_MIN_LENGTH > len(data):
+            data += file.read(offset + _MESSAGE_MIN_LENGTH - len(data))
+            if offset + _MESSAGE_MIN_LENGTH > len(data):
+                break
+        if not data.startswith(dlt_pattern, offset):
+            raise ValueError(
+                f"DLT-Pattern is not found at position {position + offset} / "
+                f"Beginning of Storage Header must be {dlt_pattern}"
+            )
+        length = unpack_length(data, offset + LENGTH_OFFSET)[0]
+        if length < StandardHeader.DATA_MIN_LENGTH:
+            raise ValueError(
+                f"Unexpected length of the message: {length} at position "
+                f"{position + offset} / "
+                f"it must be {StandardHeader.DATA_MIN_LENGTH} or more"
+            )
+        message_end = offset + StorageHeader.DATA_LENGTH + length
+        if message_end > len(data):
+            data += file.read(message_end - len(data))
+            if message_end > len(data):
+                break
+        offsets.append(offset)
+        offset = message_end
+    offsets.append(offset)
+    return offsets, data
+
+
+@functools.lru_cache(maxsize=16)
+def _compile_filter(expression: str) -> Any:
+    # a predicate is compiled once in each worker process
+    return compile_filter(expression)
+
+
+def _json_value(arg: Any) -> Any:
+    """Get a value of an argument which can be converted to JSON.
+
+    Args:
+        arg (Argument): An argument
+
+    Returns:
+        Any: The value, hex of raw data, or None for NaN and infinity
+    """
+    if isinstance(arg, ArgumentRaw):
+        return arg.data.hex()
+    value = arg.data
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def _default_workers() -> int:
+    return os.cpu_count() or 1
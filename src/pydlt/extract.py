@@ -0,0 +1,163 @@
+"""Provide function to extract a subset of DLT messages from DLT file."""
+import struct
+from pathlib import Path
+from typing import Callable, Iterable, Optional, Union
+
+from pydlt.header import MessageType
+from pydlt.scan import (
+    APPLICATION_ID_OFFSET,
+    CONTEXT_ID_OFFSET,
+    DEFAULT_BUFFER_SIZE,
+    EXTENDED_HEADER_OFFSETS,
+    HEADER_TYPE_OFFSET,
+    MESSAGE_ECU_ID_OFFSETS,
+    MESSAGE_INFO_OFFSET,
+    STORAGE_SECONDS_OFFSET,
+    encode_id,
+    iter_chunks,
+)
+
+# a predicate to check the message at the offset in the data bytes
+RawPredicate = Callable[[bytes, int], bool]
+
+
+def make_raw_predicate(
+    application_ids: Optional[Iterable[str]] = None,
+    context_ids: Optional[Iterable[str]] = None,
+    ecu_ids: Optional[Iterable[str]] = None,
+    level: Optional[int] = None,
+    time_from: Optional[float] = None,
+    time_to: Optional[float] = None,
+) -> RawPredicate:
+    """Make a predicate to check data bytes of a DLT message with conditions.
+
+    A message matches if it satisfies all the given conditions.
+    A message without Extended Header does not match
+    if any of application_ids, context_ids and level is given.
+
+    Args:
+        application_ids (Optional[Iterable[str]]): Application IDs to match
+        context_ids (Optional[Iterable[str]]): Context IDs to match
+        ecu_ids (Optional[Iterable[str]]): ECU IDs to match.
+            ECU ID in Standard Header is used if exists, or one in Storage Header.
+        level (Optional[int]): Log messages whose log level is this value or
+            more severe match (e.g. MessageLogInfo.DLT_LOG_WARN matches
+            fatal, error and warn). Messages other than log messages do not match.
+        time_from (Optional[float]): Messages whose time in Storage Header
+            is this value (seconds since epoch) or later match.
+        time_to (Optional[float]): Messages whose time in Storage Header
+            is earlier than this value (seconds since epoch) match.
+
+    Returns:
+        RawPredicate: A predicate which gets data bytes and offset of a message
+                      (from the beginning of Storage Header)
+    """
+    apids = None if application_ids is None else {encode_id(i) for i in application_ids}
+    ctids = None if context_ids is None else {encode_id(i) for i in context_ids}
+    ecus = None if ecu_ids is None else {encode_id(i) for i in ecu_ids}
+    # Message Info of log messages with the level or more severe
+    msins = None
+    if level is not None:
+        msins = {
+            (log_level << 4) | (MessageType.DLT_TYPE_LOG << 1) | verbose
+            for log_level in range(1, level + 1)
+            for verbose in (0, 1)
+        }
+    us_from = None if time_from is None else round(time_from * 1000000)
+    us_to = None if time_to is None else round(time_to * 1000000)
+    use_ext_header = apids is not None or ctids is not None or msins is not None
+    unpack_time = struct.Struct("<Ii").unpack_from
+
+    def predicate(data: bytes, offset: int) -> bool:
+        htyp = data[offset + HEADER_TYPE_OFFSET]
+        if ecus is not None:
+            ecu_offset = offset + MESSAGE_ECU_ID_OFFSETS[htyp]
+            if data[ecu_offset : ecu_offset + 4] not in ecus:
+                return False
+        if us_from is not None or us_to is not None:
+            seconds, microseconds = unpack_time(data, offset + STORAGE_SECONDS_OFFSET)
+            us = seconds * 1000000 + microseconds
+            if us_from is not None and us < us_from:
+                return False
+            if us_to is not None and us >= us_to:
+                return False
+        if use_ext_header:
+            ext_offset = EXTENDED_HEADER_OFFSETS[htyp]
+            if ext_offset < 0:
+                return False
+            ext_offset += offset
+            if (
+                msins is not None
+                and data[ext_offset + MESSAGE_INFO_OFFSET] not in msins
+            ):
+                return False
+            if apids is not None:
+                apid_offset = ext_offset + APPLICATION_ID_OFFSET
+                if data[apid_offset : apid_offset + 4] not in apids:
+                    return False
+            if ctids is not None:
+                ctid_offset = ext_offset + CONTEXT_ID_OFFSET
+                if data[ctid_offset : ctid_offset + 4] not in ctids:
+                    return False
+        return True
+
+    return predicate
+
+
+def extract_messages(
+    src_path: Union[str, Path],
+    dst_path: Union[str, Path],
+    predicate: RawPredicate,
+    append: bool = False,
+    buffer_size: int = DEFAULT_BUFFER_SIZE,
+) -> int:
+    """Copy DLT messages which match a predicate from a file to another file.
+
+    The messages are not decoded; the predicate checks data bytes of each message
+    and data bytes of matched messages are copied to the destination as is.
+
+    Examples::
+        # extract warn or more severe messages of "App" to a file
+        predicate = make_raw_predicate(
+            application_ids=["App"], level=MessageLogInfo.DLT_LOG_WARN
+        )
+        extract_messages("in.dlt", "out.dlt", predicate)
+
+    Args:
+        src_path (Union[str, Path]): A path to DLT file to read
+        dst_path (Union[str, Path]): A path to DLT file to write
+        predicate (RawPredicate): A predicate to check messages.
+                                  make_raw_predicate() can be used to make it.
+        append (bool, optional): Set True if append mode. Defaults to False.
+        buffer_size (int, optional): Size of buffers to read/write files.
+                                     Defaults to DEFAULT_BUFFER_SIZE.
+
+    Raises:
+        ValueError: It can be caused by invalid data format.
+
+    Returns:
+        int: Number of the extracted messages
+    """
+    count = 0
+    mode = "ab" if append else "wb"
+    with open(str(src_path), "rb", buffering=0) as src, open(
+        str(dst_path), mode, buffering=buffer_size
+    ) as dst:
+        for chunk in iter_chunks(src, buffer_size):
+            data = chunk.data
+            view = memoryview(data)
+            offsets = chunk.offsets
+            # copy contiguous matched messages at once
+            span_start = -1
+            for index in range(len(offsets) - 1):
+                offset = offsets[index]
+                if predicate(data, offset):
+                    count += 1
+                    if span_start < 0:
+                        span_start = offset
+                elif span_start >= 0:
+                    dst.write(view[span_start:offset])
+                    span_start = -1
+            if span_start >= 0:
+                dst.write(view[span_start : offsets[-1]])
+    return count
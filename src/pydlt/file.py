@@ -1,10 +1,19 @@
 """ Provide class to handle DLT file. """
 import struct
+import time
 from pathlib import Path
-from typing import Iterator, List, Optional, Union
+from typing import Iterator, List, Optional, Union, cast
 
+from pydlt.batch import MessageBatch
+from pydlt.cache import ParseCache, create_message_from_snapshot
+from pydlt.extract import RawPredicate
 from pydlt.header import StandardHeader, StorageHeader
+from pydlt.instrument import ReaderStats, WriterStats, create_message_with_stats
 from pydlt.message import DltMessage
+from pydlt.scan import LENGTH_OFFSET
+
+# size of data bytes to read at once for a batch of messages
+_BATCH_READ_SIZE = 256 * 1024
 
 
 class DltFileReader:
@@ -22,9 +31,36 @@ class DltFileReader:
         # create reader as iterator
         for message in DltFileReader("filepath"):  # read all messages
             # handle each message
+
+        # cache decoded messages to read the file faster next time
+        with DltFileReader("filepath", cache=ParseCache("cache_dir")) as reader:
+            messages = reader.read_messages()
+
+        # read messages matched with a filter expression without decoding others
+        predicate = compile_filter('apid == "App" and level <= warn')
+        with DltFileReader("filepath", predicate=predicate) as reader:
+            messages = reader.read_messages()
+
+        # read messages in batches, which are decoded when they are accessed
+        with DltFileReader("filepath") as reader:
+            for batch in reader.iter_batches(10000):
+                # handle columns of header fields or each message in the batch
+
+        # count bytes, messages and time of each stage
+        stats = ReaderStats()
+        with DltFileReader("filepath", stats=stats) as reader:
+            messages = reader.read_messages()
+        print(stats.io_time, stats.decode_time)
     """
 
-    def __init__(self, path: Union[str, Path], encoding: Optional[str] = None) -> None:
+    def __init__(
+        self,
+        path: Union[str, Path],
+        encoding: Optional[str] = None,
+        cache: Optional[ParseCache] = None,
+        predicate: Optional[RawPredicate] = None,
+        stats: Optional[ReaderStats] = None,
+    ) -> None:
         """Create DltFileReader object.
 
         Open a file of the path in the constructor.
@@ -40,9 +76,42 @@ class DltFileReader:
                       The dlt specification only supports ascii and utf-8 explicitly.
                       However, some implementations store dlt strings in a local 8-bit
                       format (e.g. latin-1) instead of plain ascii.
+            cache (Optional[ParseCache]): A cache of decoded messages.
+                                          If the file is in the cache, messages are
+                                          created from the cache without parsing,
+                                          else messages are stored to the cache
+                                          when all of them are read.
+            predicate (Optional[RawPredicate]): A predicate to check data bytes of
+                                                a message (e.g. by compile_filter).
+                                                Messages which do not match are
+                                                skipped without decoding.
+                                                Messages are not stored to the cache
+                                                if it is given.
+            stats (Optional[ReaderStats]): Counters of bytes, messages and time
+                                           of each stage to update.
+                                           Messages are read by an instrumented
+                                           path if it is given.
         """
+        self._path = Path(path)
         self._file = open(str(path), "rb")
         self._encoding = encoding
+        self._predicate = predicate
+        self._stats = stats
+        self._cache = cache
+        # position of the message read last, which differs from tell() before
+        # reading it if messages are skipped by the predicate
+        self._last_position = None  # type: Optional[int]
+        self._cache_key = None  # type: Optional[str]
+        # snapshots of messages loaded from the cache
+        self._cached_snapshots = None  # type: Optional[List[tuple]]
+        self._cached_index = 0
+        # snapshots of parsed messages to store to the cache
+        self._snapshots = None  # type: Optional[List[tuple]]
+        if cache is not None:
+            self._cache_key = cache.key(path, encoding)
+            self._cached_snapshots = cache.load(self._cache_key)
+            if self._cached_snapshots is None and predicate is None:
+                self._snapshots = []
 
     def __enter__(self) -> "DltFileReader":
         return self
@@ -51,7 +120,12 @@ class DltFileReader:
         self.close()
 
     def close(self) -> None:
-        """Close a file opened by the class."""
+        """Close a file opened by the class.
+
+        The callback of the stats is called if it is given.
+        """
+        if self._stats is not None and not self._file.closed:
+            self._stats.notify()
         self._file.close()
 
     @property
@@ -63,6 +137,55 @@ class DltFileReader:
         """
         return self._file.closed
 
+    @property
+    def stats(self) -> Optional[ReaderStats]:
+        """Get the counters given to the constructor.
+
+        Returns:
+            Optional[ReaderStats]: The counters, or None if not given
+        """
+        return self._stats
+
+    @property
+    def path(self) -> Path:
+        """Get a path to the file opened by the class.
+
+        Returns:
+            Path: A path to the file
+        """
+        return self._path
+
+    def tell(self) -> int:
+        """Get the position in the file of the message to read next.
+
+        Returns:
+            int: Position from the beginning of the file
+        """
+        return self._file.tell()
+
+    @property
+    def last_position(self) -> Optional[int]:
+        """Get the position in the file of the message read last by read_message().
+
+        Returns:
+            Optional[int]: Position from the beginning of the file,
+                           or None if no message is read
+        """
+        return self._last_position
+
+    def seek(self, position: int) -> None:
+        """Move to the position in the file to read a message from.
+
+        The position should be one given by tell().
+        Messages are parsed without the cache after calling the method.
+
+        Args:
+            position (int): Position from the beginning of the file
+        """
+        self._file.seek(position)
+        self._cached_snapshots = None
+        self._snapshots = None
+
     def __iter__(self) -> Iterator[DltMessage]:
         return self
 
@@ -78,19 +201,37 @@ class DltFileReader:
         Returns:
             Optional[DltMessage]: DLT message or None if not enough data to read
         """
+        if self._stats is not None:
+            return self._read_message_with_stats(self._stats)
+        if self._cached_snapshots is not None:
+            return self._read_cached_message()
         min_length = StorageHeader.DATA_LENGTH + StandardHeader.DATA_MIN_LENGTH
-        msg_data = self._file.read(min_length)
-
-        if len(msg_data) < min_length:
-            return None
-        length = struct.unpack_from(
-            StandardHeader.STRUCT_MIN_FORMAT, msg_data, StorageHeader.DATA_LENGTH
-        )[2]
-        msg_length = StorageHeader.DATA_LENGTH + length
-        msg_data += self._file.read(msg_length - min_length)
-        if len(msg_data) < msg_length:
-            return None
-        return DltMessage.create_from_bytes(msg_data, True, self._encoding)
+        while True:
+            msg_data = self._file.read(min_length)
+
+            if len(msg_data) < min_length:
+                self._store_cache()
+                return None
+            length = struct.unpack_from(
+                StandardHeader.STRUCT_MIN_FORMAT, msg_data, StorageHeader.DATA_LENGTH
+            )[2]
+            msg_length = StorageHeader.DATA_LENGTH + length
+            msg_data += self._file.read(msg_length - min_length)
+            if len(msg_data) < msg_length:
+                self._store_cache()
+                return None
+            if self._predicate is None or self._predicate(msg_data, 0):
+                break
+        self._last_position = self._file.tell() - len(msg_data)
+        try:
+            message = DltMessage.create_from_bytes(msg_data, True, self._encoding)
+        except ValueError:
+            # the file cannot be stored to the cache without all messages
+            self._snapshots = None
+            raise
+        if self._snapshots is not None:
+            self._snapshots.append(message._snapshot())
+        return message
 
     def read_messages(self) -> List[DltMessage]:
         """Read all DLT messages from file.
@@ -100,6 +241,197 @@ class DltFileReader:
         """
         return [message for message in self.__iter__()]
 
+    def read_batch(self, size: int) -> Optional[MessageBatch]:
+        """Read a batch of DLT messages from file without decoding them.
+
+        The messages are decoded when they are accessed in the batch.
+        Messages are neither created from nor stored to the cache
+        after calling the method.
+
+        Args:
+            size (int): Maximum number of messages in the batch
+
+        Raises:
+            ValueError: It can be caused by invalid data format.
+
+        Returns:
+            Optional[MessageBatch]: A batch of messages or None if no message to read
+        """
+        self._cached_snapshots = None
+        self._snapshots = None
+        unpack_length = struct.Struct(">H").unpack_from
+        min_length = StorageHeader.DATA_LENGTH + StandardHeader.DATA_MIN_LENGTH
+        position = self._file.tell()
+        read_size = max(_BATCH_READ_SIZE, min_length)
+        # data bytes of the matched messages
+        pieces = []  # type: List[memoryview]
+        offsets = [0]
+        positions = []  # type: List[int]
+        data = b""
+        offset = 0
+        # skipped messages and their bytes which do not match the predicate
+        skipped_messages = 0
+        skipped_bytes = 0
+        stats = self._stats
+        while len(positions) < size:
+            if offset + min_length <= len(data):
+                if not data.startswith(StorageHeader.DLT_PATTERN, offset):
+                    raise ValueError(
+                        f"DLT-Pattern is not found at position {position + offset} / "
+                        f"Beginning of Storage Header must be "
+                        f"{StorageHeader.DLT_PATTERN}"
+                    )
+                length = unpack_length(data, offset + LENGTH_OFFSET)[0]
+                if length < StandardHeader.DATA_MIN_LENGTH:
+                    raise ValueError(
+                        f"Unexpected length of the message: {length} at position "
+                        f"{position + offset} / "
+                        f"it must be {StandardHeader.DATA_MIN_LENGTH} or more"
+                    )
+                end = offset + StorageHeader.DATA_LENGTH + length
+                if end <= len(data):
+                    if self._predicate is None or self._predicate(data, offset):
+                        pieces.append(memoryview(data)[offset:end])
+                        offsets.append(offsets[-1] + end - offset)
+                        positions.append(position + offset)
+                    else:
+                        skipped_messages += 1
+                        skipped_bytes += end - offset
+                    offset = end
+                    continue
+            if stats is None:
+                block = self._file.read(read_size)
+            else:
+                start = time.perf_counter()
+                block = self._file.read(read_size)
+                stats.io_time += time.perf_counter() - start
+                stats.bytes_read += len(block)
+            if not block:
+                break
+            data = data[offset:] + block
+            position += offset
+            offset = 0
+        # move back to the first message which is not read
+        self._file.seek(offset - len(data), 1)
+        if stats is not None:
+            stats.bytes_read -= len(data) - offset
+            stats.skipped_messages += skipped_messages
+            stats.skipped_bytes += skipped_bytes
+        if not positions:
+            return None
+        batch = MessageBatch(b"".join(pieces), offsets, positions, self._encoding)
+        if stats is not None:
+            for offset in offsets[:-1]:
+                stats._count_message(batch.data, offset)
+        return batch
+
+    def iter_batches(self, size: int) -> Iterator[MessageBatch]:
+        """Read batches of DLT messages from file until the end of it.
+
+        Args:
+            size (int): Maximum number of messages in a batch
+
+        Raises:
+            ValueError: It can be caused by invalid data format.
+
+        Yields:
+            Iterator[MessageBatch]: Batches of messages
+        """
+        while True:
+            batch = self.read_batch(size)
+            if batch is None:
+                return
+            yield batch
+
+    def _read_message_with_stats(self, stats: ReaderStats) -> Optional[DltMessage]:
+        """Read 1 DLT message from file and update the counters.
+
+        Args:
+            stats (ReaderStats): Counters to update
+
+        Returns:
+            Optional[DltMessage]: DLT message or None if not enough data to read
+        """
+        clock = time.perf_counter
+        if self._cached_snapshots is not None:
+            position = self._file.tell()
+            start = clock()
+            message = self._read_cached_message()
+            stats.cache_time += clock() - start
+            stats.bytes_read += self._file.tell() - position
+            if message is not None:
+                stats._count_message(message._raw)
+            return message
+        min_length = StorageHeader.DATA_LENGTH + StandardHeader.DATA_MIN_LENGTH
+        while True:
+            start = clock()
+            msg_data = self._file.read(min_length)
+            if len(msg_data) == min_length:
+                length = struct.unpack_from(
+                    StandardHeader.STRUCT_MIN_FORMAT,
+                    msg_data,
+                    StorageHeader.DATA_LENGTH,
+                )[2]
+                msg_length = StorageHeader.DATA_LENGTH + length
+                msg_data += self._file.read(msg_length - min_length)
+            stats.io_time += clock() - start
+            stats.bytes_read += len(msg_data)
+            if len(msg_data) < min_length or len(msg_data) < msg_length:
+                # truncated data at the end of the file
+                stats.skipped_bytes += len(msg_data)
+                self._store_cache()
+                return None
+            if self._predicate is None:
+                break
+            start = clock()
+            matched = self._predicate(msg_data, 0)
+            stats.filter_time += clock() - start
+            if matched:
+                break
+            stats.skipped_messages += 1
+            stats.skipped_bytes += len(msg_data)
+        self._last_position = self._file.tell() - len(msg_data)
+        try:
+            message = create_message_with_stats(msg_data, True, self._encoding, stats)
+        except ValueError:
+            stats._count_error()
+            # the file cannot be stored to the cache without all messages
+            self._snapshots = None
+            raise
+        if self._snapshots is not None:
+            self._snapshots.append(message._snapshot())
+        stats._count_message(msg_data)
+        return message
+
+    def _read_cached_message(self) -> Optional[DltMessage]:
+        """Read 1 DLT message from file and create it from the cache.
+
+        Returns:
+            Optional[DltMessage]: DLT message or None if not enough data to read
+        """
+        snapshots = cast(List[tuple], self._cached_snapshots)
+        while True:
+            if self._cached_index >= len(snapshots):
+                return None
+            snapshot = snapshots[self._cached_index]
+            # length in Standard Header
+            msg_length = StorageHeader.DATA_LENGTH + snapshot[1][4]
+            msg_data = self._file.read(msg_length)
+            if len(msg_data) < msg_length:
+                return None
+            self._cached_index += 1
+            if self._predicate is None or self._predicate(msg_data, 0):
+                self._last_position = self._file.tell() - len(msg_data)
+                return create_message_from_snapshot(snapshot, msg_data)
+
+    def _store_cache(self) -> None:
+        """Store snapshots of all messages in the file to the cache."""
+        if self._snapshots is not None:
+            cast(ParseCache, self._cache).store(
+                cast(str, self._cache_key), self._snapshots
+            )
+            self._snapshots = None
+
 
 class DltFileWriter:
     """A class to write DLT message to DLT file.
@@ -112,9 +444,20 @@ class DltFileWriter:
 
             # write messages to file
             writer.write_messages(messages)
+
+        # count bytes, messages and time to encode and write them
+        stats = WriterStats()
+        with DltFileWriter("filepath", stats=stats) as writer:
+            writer.write_messages(messages)
+        print(stats.encode_time, stats.io_time)
     """
 
-    def __init__(self, path: Union[str, Path], append: bool = False) -> None:
+    def __init__(
+        self,
+        path: Union[str, Path],
+        append: bool = False,
+        stats: Optional[WriterStats] = None,
+    ) -> None:
         """Create DltFileWriter object.
 
         Open a file of the path in the constructor.
@@ -127,9 +470,13 @@ class DltFileWriter:
         Args:
             path (Union[str, Path]): A path to file.
             append (bool, optional): Set True if append mode. Defaults to False.
+            stats (Optional[WriterStats], optional): Counters of bytes, messages
+                                                     and time to update.
+                                                     Defaults to None.
         """
         mode = "ab" if append else "wb"
         self._file = open(path, mode)
+        self._stats = stats
 
     def __enter__(self) -> "DltFileWriter":
         return self
@@ -138,9 +485,23 @@ class DltFileWriter:
         self.close()
 
     def close(self) -> None:
-        """Close a file opened by the class."""
+        """Close a file opened by the class.
+
+        The callback of the stats is called if it is given.
+        """
+        if self._stats is not None and not self._file.closed:
+            self._stats.notify()
         self._file.close()
 
+    @property
+    def stats(self) -> Optional[WriterStats]:
+        """Get the counters given to the constructor.
+
+        Returns:
+            Optional[WriterStats]: The counters, or None if not given
+        """
+        return self._stats
+
     @property
     def closed(self) -> bool:
         """Check a file opened by the class is closed.
@@ -156,6 +517,9 @@ class DltFileWriter:
         Args:
             message (DltMessage): DLT message
         """
+        if self._stats is not None:
+            self._write_message_with_stats(message, self._stats)
+            return
         self._file.write(message.to_bytes())
 
     def write_messages(self, messages: List[DltMessage]) -> None:
@@ -165,3 +529,44 @@ class DltFileWriter:
             messages (List[DltMessage]): DLT messages
         """
         [self.write_message(message) for message in messages]
+
+    def write_bytes(self, data: bytes) -> None:
+        """Write data bytes of DLT messages to file.
+
+        Args:
+            data (bytes): Data bytes of DLT messages with Storage Header
+        """
+        if self._stats is not None:
+            start = time.perf_counter()
+            self._file.write(data)
+            self._stats.io_time += time.perf_counter() - start
+            self._stats.bytes_written += len(data)
+            return
+        self._file.write(data)
+
+    def flush(self) -> None:
+        """Flush data bytes written to file."""
+        self._file.flush()
+
+    def _write_message_with_stats(
+        self, message: DltMessage, stats: WriterStats
+    ) -> None:
+        """Write 1 DLT message to file and update the counters.
+
+        Args:
+            message (DltMessage): DLT message
+            stats (WriterStats): Counters to update
+        """
+        clock = time.perf_counter
+        start = clock()
+        try:
+            data = message.to_bytes()
+            now = clock()
+            stats.encode_time += now - start
+            self._file.write(data)
+        except Exception:
+            stats.errors += 1
+            raise
+        stats.io_time += clock() - now
+        stats.bytes_written += len(data)
+        stats._count_message(None if message.str_header is None else data)
@@ -0,0 +1,369 @@
+"""Provide filter expressions of DLT messages compiled to raw predicates.
+
+A filter expression is compiled once into a Python function which reads
+header fields from data bytes of a message by the offsets in pydlt.scan,
+so messages can be filtered without decoding them.
+
+Grammar of the expression::
+    expression := term ("or" term)*
+    term       := factor ("and" factor)*
+    factor     := "not" factor | "(" expression ")" | condition
+    condition  := field operator value | field ["not"] "in" "(" value ("," value)* ")"
+    operator   := "==" | "!=" | "<" | "<=" | ">" | ">="
+
+Fields:
+    apid, ctid: Application ID and Context ID (string)
+    ecu: ECU ID in Standard Header, or one in Storage Header (string)
+    level: log level of log messages (fatal, error, warn, info, debug, verbose
+           or number); a smaller level is more severe
+    type: message type (log, app_trace, nw_trace, control or number)
+    verbose: verbose mode (true or false)
+    time: time in Storage Header (seconds since epoch or date and time in UTC
+          as string, e.g. "2022/10/09 02:01:47.000000")
+    timestamp: Timestamp in Standard Header (ticks of 0.1 milliseconds)
+    session: Session ID
+    counter: Message Counter
+
+A condition on a field which the message does not have (e.g. apid of a message
+without Extended Header, level of a message other than log) is false.
+"""
+import re
+import struct
+from datetime import datetime, timezone
+from typing import Any, Iterator, NamedTuple, Tuple
+
+from pydlt.extract import RawPredicate
+from pydlt.header import MessageType
+from pydlt.message import _MESSAGE_LOG_INFO_STR, _MESSAGE_TYPE_STR
+from pydlt.scan import (
+    APPLICATION_ID_OFFSET,
+    CONTEXT_ID_OFFSET,
+    EXTENDED_HEADER_OFFSETS,
+    HEADER_TYPE_OFFSET,
+    MESSAGE_COUNTER_OFFSET,
+    MESSAGE_ECU_ID_OFFSETS,
+    MESSAGE_INFO_OFFSET,
+    SESSION_ID_OFFSETS,
+    STORAGE_SECONDS_OFFSET,
+    TIMESTAMP_OFFSETS,
+    encode_id,
+)
+
+# formats of date and time in UTC
+TIME_FORMATS = (
+    "%Y/%m/%d %H:%M:%S.%f",
+    "%Y/%m/%d %H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S.%f",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%d %H:%M:%S.%f",
+    "%Y-%m-%d %H:%M:%S",
+)
+
+_LOG_LEVELS = {name: int(level) for level, name in _MESSAGE_LOG_INFO_STR.items()}
+_MESSAGE_TYPES = {name: int(mstp) for mstp, name in _MESSAGE_TYPE_STR.items()}
+_BOOLEANS = {"false": 0, "true": 1}
+
+_ID_FIELDS = ("apid", "ctid", "ecu")
+_NAMED_FIELDS = {"level": _LOG_LEVELS, "type": _MESSAGE_TYPES, "verbose": _BOOLEANS}
+_NUMBER_FIELDS = ("time", "timestamp", "session", "counter")
+FIELDS = _ID_FIELDS + tuple(_NAMED_FIELDS) + _NUMBER_FIELDS
+
+_OPERATORS = ("==", "!=", "<", "<=", ">", ">=")
+
+_TOKEN_PATTERN = re.compile(
+    r"""\s*(?:
+    (?P<number>-?\d+(?:\.\d*)?)
+    |(?P<string>"[^"]*"|'[^']*')
+    |(?P<name>[A-Za-z_][A-Za-z0-9_]*)
+    |(?P<symbol>==|!=|<=|>=|<|>|\(|\)|,)
+    )""",
+    re.VERBOSE,
+)
+
+_unpack_uint32 = struct.Struct(">I").unpack_from
+_unpack_storage_time = struct.Struct("<Ii").unpack_from
+
+
+class _Token(NamedTuple):
+    kind: str  # number, string, name, symbol or end
+    text: str  # text of the token
+    position: int  # position in the expression
+
+
+def parse_time(value: str) -> float:
+    """Parse time given by seconds since epoch or date and time in UTC.
+
+    Args:
+        value (str): Seconds or date and time (e.g. "2022/10/09 02:01:47.000000")
+
+    Raises:
+        ValueError: The value is not a time.
+
+    Returns:
+        float: Seconds since epoch
+    """
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    for time_format in TIME_FORMATS:
+        try:
+            time = datetime.strptime(value, time_format)
+        except ValueError:
+            continue
+        return time.replace(tzinfo=timezone.utc).timestamp()
+    raise ValueError(f"Invalid time: {value}")
+
+
+def compile_filter(expression: str) -> RawPredicate:
+    """Compile a filter expression into a predicate on data bytes of messages.
+
+    The predicate can be used where RawPredicate is accepted,
+    e.g. extract_messages() and DltFileReader.
+
+    Examples::
+        predicate = compile_filter(
+            'apid in ("NAV", "HMI") and level <= warn and ecu == "ECU1"'
+        )
+        extract_messages("in.dlt", "out.dlt", predicate)
+
+    Args:
+        expression (str): A filter expression
+
+    Raises:
+        ValueError: The expression is invalid.
+
+    Returns:
+        RawPredicate: A predicate which gets data bytes and offset of a message
+                      (from the beginning of Storage Header)
+    """
+    compiler = _Compiler(expression)
+    condition = compiler.compile()
+    lines = [
+        "def predicate(data, offset):",
+        f"    htyp = data[offset + {HEADER_TYPE_OFFSET}]",
+    ]
+    if compiler.use_ext_header:
+        lines.append("    ext = offset + EXTENDED_HEADER_OFFSETS[htyp]")
+    lines.append(f"    return bool({condition})")
+    source = "\n".join(lines) + "\n"
+
+    namespace = dict(compiler.constants)
+    namespace.update(
+        EXTENDED_HEADER_OFFSETS=EXTENDED_HEADER_OFFSETS,
+        MESSAGE_ECU_ID_OFFSETS=MESSAGE_ECU_ID_OFFSETS,
+        SESSION_ID_OFFSETS=SESSION_ID_OFFSETS,
+        TIMESTAMP_OFFSETS=TIMESTAMP_OFFSETS,
+        _unpack_uint32=_unpack_uint32,
+        _time_us=_time_us,
+    )
+    exec(compile(source, "<pydlt filter>", "exec"), namespace)
+    predicate = namespace["predicate"]
+    predicate.__doc__ = f"Filter: {expression}\n\n{source}"
+    return predicate
+
+
+def _time_us(data: bytes, offset: int) -> int:
+    """Get time in Storage Header as microseconds since epoch.
+
+    Args:
+        data (bytes): Data bytes which contain the message
+        offset (int): Offset of the message (from the beginning of Storage Header)
+
+    Returns:
+        int: Microseconds since epoch
+    """
+    seconds, microseconds = _unpack_storage_time(data, offset + STORAGE_SECONDS_OFFSET)
+    return seconds * 1000000 + microseconds
+
+
+class _Compiler:
+    """A recursive descent parser to compile a filter expression to Python code."""
+
+    def __init__(self, expression: str) -> None:
+        self.expression = expression
+        self.tokens = list(self._tokenize(expression))
+        self.index = 0
+        # constants referred by the code
+        self.constants = {}
+        self.use_ext_header = False
+
+    def compile(self) -> str:
+        """Compile the expression.
+
+        Raises:
+            ValueError: The expression is invalid.
+
+        Returns:
+            str: Python expression of the condition
+        """
+        code = self._expression()
+        if self._peek().kind != "end":
+            self._error("Unexpected token")
+        return code
+
+    def _tokenize(self, expression: str) -> Iterator[_Token]:
+        position = 0
+        expression = expression.rstrip()
+        while position < len(expression):
+            match = _TOKEN_PATTERN.match(expression, position)
+            if match is None:
+                raise ValueError(
+                    f"Invalid filter expression: {expression!r} / "
+                    f"unexpected character at {position}"
+                )
+            kind = match.lastgroup
+            yield _Token(kind, match.group(kind), match.start(kind))
+            position = match.end()
+        yield _Token("end", "", len(expression))
+
+    def _peek(self) -> _Token:
+        return self.tokens[self.index]
+
+    def _next(self) -> _Token:
+        token = self.tokens[self.index]
+        if token.kind != "end":
+            self.index += 1
+        return token
+
+    def _accept(self, text: str) -> bool:
+        token = self._peek()
+        if token.kind in ("name", "symbol") and token.text.lower() == text:
+            self.index += 1
+            return True
+        return False
+
+    def _expect(self, text: str) -> None:
+        if not self._accept(text):
+            self._error(f"'{text}' is expected")
+
+    def _error(self, message: str, token: Any = None) -> None:
+        token = self._peek() if token is None else token
+        raise ValueError(
+            f"Invalid filter expression: {self.expression!r} / "
+            f"{message} at {token.position}: {token.text!r}"
+        )
+
+    def _expression(self) -> str:
+        terms = [self._term()]
+        while self._accept("or"):
+            terms.append(self._term())
+        return terms[0] if len(terms) == 1 else "(" + " or ".join(terms) + ")"
+
+    def _term(self) -> str:
+        factors = [self._factor()]
+        while self._accept("and"):
+            factors.append(self._factor())
+        return factors[0] if len(factors) == 1 else "(" + " and ".join(factors) + ")"
+
+    def _factor(self) -> str:
+        if self._accept("not"):
+            return f"(not {self._factor()})"
+        if self._accept("("):
+            code = self._expression()
+            self._expect(")")
+            return code
+        return self._condition()
+
+    def _condition(self) -> str:
+        token = self._next()
+        field = token.text.lower()
+        if token.kind != "name" or field not in FIELDS:
+            self._error(f"A field in {FIELDS} is expected", token)
+        negative = self._accept("not")
+        if negative or self._peek().text.lower() == "in":
+            self._expect("in")
+            self._expect("(")
+            values = [self._value(field)]
+            while self._accept(","):
+                values.append(self._value(field))
+            self._expect(")")
+            operator = "not in" if negative else "in"
+            operand = self._constant(frozenset(values))
+        else:
+            operator = self._next().text
+            if operator not in _OPERATORS:
+                self._error(f"An operator in {_OPERATORS} is expected")
+            operand = self._constant(self._value(field))
+        value, presence = self._field_code(field)
+        comparison = f"{value} {operator} {operand}"
+        return comparison if presence is None else f"({presence} and {comparison})"
+
+    def _value(self, field: str) -> Any:
+        token = self._next()
+        if token.kind == "string":
+            text = token.text[1:-1]
+        elif token.kind in ("number", "name"):
+            text = token.text
+        else:
+            self._error("A value is expected", token)
+        if field in _ID_FIELDS:
+            if token.kind != "string":
+                self._error("A string value is expected", token)
+            return encode_id(text)
+        if field in _NAMED_FIELDS:
+            names = _NAMED_FIELDS[field]
+            if text.lower() in names:
+                return names[text.lower()]
+        if field == "time":
+            try:
+                return round(parse_time(text) * 1000000)
+            except ValueError:
+                self._error("A time value is expected", token)
+        if token.kind != "number" or "." in text:
+            self._error(f"An integer value of {field} is expected", token)
+        return int(text)
+
+    def _constant(self, value: Any) -> str:
+        name = f"_c{len(self.constants)}"
+        self.constants[name] = value
+        return name
+
+    def _field_code(self, field: str) -> Tuple[str, Any]:
+        """Get Python code to read a field of a message.
+
+        Args:
+            field (str): A name of the field
+
+        Returns:
+            Tuple[str, Any]: Code of the value and code of a condition whether
+                             the message has the field (or None if always has)
+        """
+        if field == "ecu":
+            return (
+                "data[offset + MESSAGE_ECU_ID_OFFSETS[htyp] : "
+                "offset + MESSAGE_ECU_ID_OFFSETS[htyp] + 4]",
+                None,
+            )
+        if field == "time":
+            return "_time_us(data, offset)", None
+        if field == "counter":
+            return f"data[offset + {MESSAGE_COUNTER_OFFSET}]", None
+        if field == "timestamp":
+            return (
+                "_unpack_uint32(data, offset + TIMESTAMP_OFFSETS[htyp])[0]",
+                "TIMESTAMP_OFFSETS[htyp] >= 0",
+            )
+        if field == "session":
+            return (
+                "_unpack_uint32(data, offset + SESSION_ID_OFFSETS[htyp])[0]",
+                "SESSION_ID_OFFSETS[htyp] >= 0",
+            )
+
+        # fields in Extended Header
+        self.use_ext_header = True
+        presence = "ext >= offset"
+        msin = f"data[ext + {MESSAGE_INFO_OFFSET}]"
+        if field == "apid":
+            start = f"ext + {APPLICATION_ID_OFFSET}"
+            return f"data[{start} : {start} + 4]", presence
+        if field == "ctid":
+            start = f"ext + {CONTEXT_ID_OFFSET}"
+            return f"data[{start} : {start} + 4]", presence
+        if field == "type":
+            return f"(({msin} >> 1) & 0x7)", presence
+        if field == "verbose":
+            return f"({msin} & 0x1)", presence
+        # level of log messages
+        log_type = MessageType.DLT_TYPE_LOG << 1
+        return f"({msin} >> 4)", f"{presence} and {msin} & 0xE == {log_type}"
@@ -0,0 +1,331 @@
+"""Provide search of strings in verbose DLT messages without decoding every message.
+
+A pattern is searched in data bytes of whole chunks of DLT file first,
+and only the messages which contain a hit are decoded to confirm that
+the pattern matches one of their string arguments.
+Patterns are matched to encoded bytes of the strings like grep in the C locale,
+so case is ignored only for ASCII letters.
+"""
+import re
+from bisect import bisect_right
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Union
+
+from pydlt.message import DltMessage
+from pydlt.payload import ArgumentString, VerbosePayload
+from pydlt.scan import (
+    DEFAULT_BUFFER_SIZE,
+    Chunk,
+    is_verbose,
+    iter_chunks,
+)
+
+# zero-width assertions which depend on bytes around a match, which are removed
+# from a pattern to search data bytes of a chunk
+_ANCHORS = ("^", "$")
+_ESCAPED_ANCHORS = ("\\A", "\\Z", "\\b", "\\B")
+_LOOKAROUNDS = ("(?=", "(?!", "(?<=", "(?<!")
+
+
+class GrepMatch(NamedTuple):
+    """A message found by grep_file()."""
+
+    index: int  # index of the message in the file
+    position: int  # position of the message in the file
+    message: DltMessage  # the message
+    matched: bool  # True if the pattern matches, or False for a context message
+
+
+class _Pattern(NamedTuple):
+    """A pattern compiled for an encoding of strings."""
+
+    encoding: str  # encoding of strings which the pattern is matched to
+    encoded: bytes  # the pattern encoded by the encoding
+    # a function to search the pattern in data[start:end],
+    # which returns the position of a hit or -1
+    search: Callable[[bytes, int, int], int]
+    # a function to search data bytes of a chunk, which finds all the messages
+    # the pattern matches, or None if it cannot be made
+    prefilter: Optional[Callable[[bytes, int, int], int]]
+
+
+def grep_file(
+    path: Union[str, Path],
+    pattern: str,
+    ignore_case: bool = False,
+    fixed_string: bool = False,
+    before: int = 0,
+    after: int = 0,
+    encoding: Optional[str] = None,
+    buffer_size: int = DEFAULT_BUFFER_SIZE,
+) -> Iterator[GrepMatch]:
+    """Find verbose messages which have a string argument matching a pattern.
+
+    Examples::
+        for match in grep_file("path/to/file.dlt", r"timeout \\d+ ms", after=2):
+            print(match.message)
+
+    Args:
+        path (Union[str, Path]): A path to DLT file
+        pattern (str): A regular expression, or a string if fixed_string is True
+        ignore_case (bool, optional): Case of ASCII letters is ignored if True.
+                                      Defaults to False.
+        fixed_string (bool, optional): The pattern is a string, not a regular
+                                       expression if True. Defaults to False.
+        before (int, optional): Number of messages before a matched message
+                                to find as context. Defaults to 0.
+        after (int, optional): Number of messages after a matched message
+                               to find as context. Defaults to 0.
+        encoding (Optional[str], optional): Encoding of non-UTF-8 strings.
+                                            Defaults to None (ASCII).
+        buffer_size (int, optional): Size of data bytes to read at once.
+                                     Defaults to DEFAULT_BUFFER_SIZE.
+
+    Raises:
+        ValueError: The pattern or the number of context messages is invalid,
+                    or it can be caused by invalid data format.
+
+    Yields:
+        Iterator[GrepMatch]: Matched messages and the context messages in order
+                             of the file
+    """
+    if before < 0 or after < 0:
+        raise ValueError(
+            f"Invalid number of context messages: {before}, {after} / "
+            "it must be 0 or more"
+        )
+    patterns = _compile_patterns(pattern, ignore_case, fixed_string, encoding)
+    by_encoding = {pattern.encoding: pattern for pattern in patterns}
+
+    # the last messages of the previous chunks as (index, position, data bytes)
+    history = deque(maxlen=before)  # type: deque
+    base = 0  # index of the first message of a chunk
+    next_index = 0  # the least index of a message which can be found next
+    after_end = 0  # end of indexes of the context messages after a match
+    with open(str(path), "rb", buffering=0) as stream:
+        for chunk in iter_chunks(stream, buffer_size):
+            data = chunk.data
+            offsets = chunk.offsets
+            end = base + len(offsets) - 1
+            matched = {}  # type: Dict[int, DltMessage]
+            for local in _find_candidates(chunk, patterns):
+                message = DltMessage.create_from_bytes(
+                    data[offsets[local] : offsets[local + 1]], True, encoding
+                )
+                if _match_message(message, by_encoding):
+                    matched[base + local] = message
+
+            # indexes of the matched messages and the context messages
+            indexes = set(range(next_index, min(after_end, end)))
+            for index in matched:
+                indexes.update(
+                    range(max(index - before, next_index), min(index + after + 1, end))
+                )
+                after_end = index + after + 1
+            for index in sorted(indexes):
+                if index in matched:
+                    position = chunk.position + offsets[index - base]
+                    yield GrepMatch(index, position, matched[index], True)
+                    continue
+                if index < base:
+                    _, position, message_bytes = history[index - base + len(history)]
+                else:
+                    local = index - base
+                    position = chunk.position + offsets[local]
+                    message_bytes = data[offsets[local] : offsets[local + 1]]
+                message = DltMessage.create_from_bytes(message_bytes, True, encoding)
+                yield GrepMatch(index, position, message, False)
+            if indexes:
+                next_index = max(indexes) + 1
+
+            for local in range(max(len(offsets) - 1 - before, 0), len(offsets) - 1):
+                history.append(
+                    (
+                        base + local,
+                        chunk.position + offsets[local],
+                        data[offsets[local] : offsets[local + 1]],
+                    )
+                )
+            base = end
+
+
+def _compile_patterns(
+    pattern: str, ignore_case: bool, fixed_string: bool, encoding: Optional[str]
+) -> List[_Pattern]:
+    """Compile a pattern for each encoding of strings.
+
+    Args:
+        pattern (str): A regular expression or a string
+        ignore_case (bool): Case of ASCII letters is ignored if True
+        fixed_string (bool): The pattern is a string if True
+        encoding (Optional[str]): Encoding of non-UTF-8 strings
+
+    Raises:
+        ValueError: The pattern is invalid.
+
+    Returns:
+        List[_Pattern]: The compiled patterns (strings in an encoding which
+                        cannot encode the pattern never match)
+    """
+    flags = re.IGNORECASE if ignore_case else 0
+    prefilter_pattern = None if fixed_string else _remove_assertions(pattern)
+    patterns = []
+    for string_encoding in ("utf-8", ArgumentString._encoding_format(False, encoding)):
+        try:
+            encoded = pattern.encode(string_encoding)
+        except UnicodeEncodeError:
+            continue
+        if fixed_string and not ignore_case:
+            search = _find_search(encoded)
+            patterns.append(_Pattern(string_encoding, encoded, search, search))
+            continue
+        try:
+            regex = re.compile(re.escape(encoded) if fixed_string else encoded, flags)
+        except re.error as e:
+            raise ValueError(f"Invalid pattern: {pattern} / {e}")
+        search = _regex_search(regex)
+        prefilter = search if fixed_string else None
+        if prefilter_pattern is not None:
+            prefilter = _regex_search(
+                re.compile(prefilter_pattern.encode(string_encoding), flags)
+            )
+        patterns.append(_Pattern(string_encoding, encoded, search, prefilter))
+    return patterns
+
+
+def _remove_assertions(pattern: str) -> Optional[str]:
+    """Remove zero-width assertions which depend on bytes around a match.
+
+    A match of the pattern in a string is also a match of the returned pattern
+    in data bytes which contain the string, since the conditions are only removed.
+
+    Args:
+        pattern (str): A regular expression
+
+    Returns:
+        Optional[str]: The pattern without anchors and word boundaries,
+                       or None if it has lookarounds
+    """
+    result = []
+    index = 0
+    in_class = False
+    while index < len(pattern):
+        char = pattern[index]
+        if char == "\\":
+            escape = pattern[index : index + 2]
+            if in_class or escape not in _ESCAPED_ANCHORS:
+                result.append(escape)
+            index += 2
+            continue
+        if in_class:
+            in_class = char != "]"
+        elif char == "[":
+            in_class = True
+            # "]" just after "[" or "[^" is a character of the class
+            start = index
+            index += 2 if pattern.startswith("[^", index) else 1
+            if pattern.startswith("]", index):
+                index += 1
+            result.append(pattern[start:index])
+            continue
+        elif char in _ANCHORS:
+            index += 1
+            continue
+        elif pattern.startswith(_LOOKAROUNDS, index):
+            return None
+        result.append(char)
+        index += 1
+    return "".join(result)
+
+
+def _find_search(needle: bytes) -> Callable[[bytes, int, int], int]:
+    """Make a function to search a string.
+
+    Args:
+        needle (bytes): Encoded bytes of the string
+
+    Returns:
+        Callable[[bytes, int, int], int]: A function which returns the position
+                                          of a hit in data[start:end] or -1
+    """
+
+    def search_position(data: bytes, start: int, end: int) -> int:
+        return data.find(needle, start, end)
+
+    return search_position
+
+
+def _regex_search(regex: Any) -> Callable[[bytes, int, int], int]:
+    """Make a function to search a compiled regular expression.
+
+    Args:
+        regex (Any): A compiled regular expression of bytes
+
+    Returns:
+        Callable[[bytes, int, int], int]: A function which returns the position
+                                          of a hit in data[start:end] or -1
+    """
+    search = regex.search
+
+    def search_position(data: bytes, start: int, end: int) -> int:
+        match = search(data, start, end)
+        return -1 if match is None else match.start()
+
+    return search_position
+
+
+def _find_candidates(chunk: Chunk, patterns: List[_Pattern]) -> List[int]:
+    """Get verbose messages in a chunk which can match the patterns.
+
+    Args:
+        chunk (Chunk): A chunk of DLT messages
+        patterns (List[_Pattern]): Patterns to search in the data bytes
+
+    Returns:
+        List[int]: Indexes of the messages in the chunk in ascending order
+    """
+    data = chunk.data
+    offsets = chunk.offsets
+    if any([pattern.prefilter is None for pattern in patterns]):
+        candidates = range(len(offsets) - 1)
+    else:
+        found = set()
+        end = offsets[-1]
+        # the same bytes are searched once for encodings compatible with ASCII
+        for search in {p.encoded: p.prefilter for p in patterns}.values():
+            start = offsets[0]
+            while start < end:
+                hit = search(data, start, end)
+                if hit < 0:
+                    break
+                local = bisect_right(offsets, hit) - 1
+                found.add(local)
+                # the rest of the message does not have to be searched
+                start = offsets[local + 1]
+        candidates = sorted(found)
+    return [local for local in candidates if is_verbose(data, offsets[local])]
+
+
+def _match_message(message: DltMessage, patterns: Dict[str, _Pattern]) -> bool:
+    """Check whether a pattern matches a string argument of a message.
+
+    Args:
+        message (DltMessage): A decoded message
+        patterns (Dict[str, _Pattern]): Patterns by the encodings of strings
+
+    Returns:
+        bool: True if the pattern matches
+    """
+    if not isinstance(message.payload, VerbosePayload):
+        return False
+    for arg in message.payload.arguments:
+        if not isinstance(arg, ArgumentString):
+            continue
+        pattern = patterns.get(arg._encoding)
+        if pattern is None:
+            continue
+        data = arg._encoded()
+        if pattern.search(data, 0, len(data)) >= 0:
+            return True
+    return False
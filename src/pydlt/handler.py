@@ -0,0 +1,254 @@
+"""Provide a handler of the logging module which emits DLT messages.
+
+Records are formatted in the logging thread, and converted to verbose DLT
+messages and written in batches on a background thread.
+"""
+import logging
+import queue
+import socket
+import threading
+from typing import List, Mapping, Optional, Tuple, Union
+
+from pydlt.file import DltFileWriter
+from pydlt.header import MessageLogInfo, MessageType
+from pydlt.metrics import MetricsRegistry
+from pydlt.payload import ArgumentString
+from pydlt.template import MessageTemplate
+
+# default maximum number of records waiting to be written
+DEFAULT_QUEUE_SIZE = 10000
+
+# default maximum number of records written at once
+DEFAULT_BATCH_SIZE = 256
+
+# log levels of the logging module and the DLT log levels, in descending order
+_LOG_LEVELS = (
+    (logging.CRITICAL, MessageLogInfo.DLT_LOG_FATAL),
+    (logging.ERROR, MessageLogInfo.DLT_LOG_ERROR),
+    (logging.WARNING, MessageLogInfo.DLT_LOG_WARN),
+    (logging.INFO, MessageLogInfo.DLT_LOG_INFO),
+    (logging.DEBUG, MessageLogInfo.DLT_LOG_DEBUG),
+)
+
+# maximum length of a message in Standard Header
+_MAX_LENGTH = 0xFFFF
+
+# number of ticks of Timestamp in a millisecond
+_TICKS_PER_MILLISECOND = 10
+
+
+def log_info_from_level(level: int) -> MessageLogInfo:
+    """Get a DLT log level from a log level of the logging module.
+
+    Levels between the standard levels are regarded as the lower one.
+
+    Args:
+        level (int): A log level of the logging module
+
+    Returns:
+        MessageLogInfo: The DLT log level (DLT_LOG_VERBOSE if lower than DEBUG)
+    """
+    for logging_level, log_info in _LOG_LEVELS:
+        if level >= logging_level:
+            return log_info
+    return MessageLogInfo.DLT_LOG_VERBOSE
+
+
+class DltLoggingHandler(logging.Handler):
+    """A handler which emits records of the logging module as DLT messages.
+
+    A record is emitted as a verbose log message which has the formatted
+    message as an UTF-8 string argument. The Context ID is given by context_ids,
+    or the last component of the logger name truncated to 4 characters.
+    Records are dropped and counted by dropped if the queue is full.
+
+    Examples::
+        writer = DltFileWriter("path/to/file.dlt")
+        handler = DltLoggingHandler(writer, "PyAp", ecu_id="Ecu")
+        logging.getLogger().addHandler(handler)
+
+        logging.getLogger("app.db").warning("slow query")  # CTID "db"
+
+        # write the remaining records before closing the writer
+        handler.close()
+        writer.close()
+    """
+
+    def __init__(
+        self,
+        target: Union[DltFileWriter, socket.socket],
+        application_id: str,
+        ecu_id: Optional[str] = None,
+        context_ids: Optional[Mapping[str, str]] = None,
+        level: int = logging.NOTSET,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        registry: Optional[MetricsRegistry] = None,
+    ) -> None:
+        """Create DltLoggingHandler object and start the background thread.
+
+        The target is not closed by the handler.
+
+        Args:
+            target (Union[DltFileWriter, socket.socket]): A writer to write
+                                                          messages with Storage
+                                                          Header, or a connected
+                                                          socket to send messages
+                                                          without Storage Header
+            application_id (str): Application ID of the messages
+            ecu_id (Optional[str], optional): ECU ID of the messages.
+                                              Defaults to None.
+            context_ids (Optional[Mapping[str, str]], optional): Context IDs by
+                                                                 logger names.
+                                                                 Defaults to None.
+            level (int, optional): Level of the handler. Defaults to logging.NOTSET.
+            queue_size (int, optional): Maximum number of records waiting to be
+                                        written. Defaults to DEFAULT_QUEUE_SIZE.
+            batch_size (int, optional): Maximum number of records written at once.
+                                        Defaults to DEFAULT_BATCH_SIZE.
+            registry (Optional[MetricsRegistry], optional): A registry to add
+                                                            metrics of the queue.
+                                                            Defaults to None.
+        """
+        super().__init__(level)
+        self.target = target
+        self.application_id = application_id
+        self.ecu_id = ecu_id
+        self.context_ids = {} if context_ids is None else dict(context_ids)
+        self.batch_size = batch_size
+        self.dropped = 0
+        self._with_storage_header = not isinstance(target, socket.socket)
+        self._message_counter = 0
+        # templates by Context ID and log level, used only on the thread
+        self._templates = {}
+        self._queue = queue.Queue(queue_size)  # type: queue.Queue
+        self._thread = threading.Thread(
+            target=self._run, name="DltLoggingHandler", daemon=True
+        )
+        self._thread.start()
+        if registry is not None:
+            registry.gauge(
+                "pydlt_handler_queue_depth", "Number of records waiting to be written"
+            ).set_function(lambda: {(): self._queue.qsize()})
+            registry.counter(
+                "pydlt_handler_dropped_total",
+                "Number of records dropped because the queue is full",
+            ).set_function(lambda: {(): self.dropped})
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """Format a record and put it to the queue.
+
+        Args:
+            record (logging.LogRecord): A record
+        """
+        try:
+            message = self.format(record)
+        except Exception:
+            self.handleError(record)
+            return
+        try:
+            self._queue.put_nowait((record, message))
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self) -> None:
+        """Wait until all records in the queue are written."""
+        if self._thread.is_alive():
+            self._queue.join()
+
+    def close(self) -> None:
+        """Write the remaining records and stop the background thread."""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        super().close()
+
+    def context_id(self, name: str) -> str:
+        """Get Context ID of a logger.
+
+        Args:
+            name (str): Name of the logger
+
+        Returns:
+            str: Context ID
+        """
+        context_id = self.context_ids.get(name)
+        if context_id is None:
+            context_id = name.rsplit(".", 1)[-1][:4]
+        return context_id
+
+    def _run(self) -> None:
+        """Write records in the queue in batches until None is put."""
+        while True:
+            items = [self._queue.get()]
+            while len(items) < self.batch_size:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = None in items
+            records = [item for item in items if item is not None]
+            if records:
+                self._write(records)
+            for _ in items:
+                self._queue.task_done()
+            if stop:
+                return
+
+    def _write(self, records: List[Tuple[logging.LogRecord, str]]) -> None:
+        """Convert records to DLT messages and write them at once.
+
+        Args:
+            records (List[Tuple[logging.LogRecord, str]]): Records and the
+                                                           formatted messages
+        """
+        try:
+            data = b"".join(
+                [self._pack(record, message) for record, message in records]
+            )
+            if isinstance(self.target, socket.socket):
+                self.target.sendall(data)
+            else:
+                self.target.write_bytes(data)
+                self.target.flush()
+        except Exception:
+            self.handleError(records[0][0])
+
+    def _pack(self, record: logging.LogRecord, message: str) -> bytes:
+        """Convert a record to data bytes of a DLT message.
+
+        Args:
+            record (logging.LogRecord): A record
+            message (str): The formatted message
+
+        Returns:
+            bytes: Data bytes of the message
+        """
+        context_id = self.context_id(record.name)
+        log_info = log_info_from_level(record.levelno)
+        template = self._templates.get((context_id, log_info))
+        if template is None:
+            template = self._templates[(context_id, log_info)] = MessageTemplate(
+                self.application_id,
+                context_id,
+                MessageType.DLT_TYPE_LOG,
+                log_info,
+                [ArgumentString],
+                ecu_id=self.ecu_id,
+                with_storage_header=self._with_storage_header,
+                is_utf8=True,
+            )
+        # the message is truncated to fit in Length of Standard Header
+        data = message.encode("utf-8")
+        max_length = _MAX_LENGTH - template.fixed_length - 1
+        if len(data) > max_length:
+            # drop a character whose bytes are cut at the end
+            data = data[:max_length].decode("utf-8", "ignore").encode("utf-8")
+        message_counter = self._message_counter
+        self._message_counter = (message_counter + 1) & 0xFF
+        return template.pack(
+            [data],
+            message_counter,
+            int(record.relativeCreated * _TICKS_PER_MILLISECOND) & 0xFFFFFFFF,
+            record.created,
+        )
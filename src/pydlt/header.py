@@ -249,6 +249,23 @@ class StandardHeader:
         """
         return self.timestamp is not None
 
+    def _snapshot(self) -> tuple:
+        """Get values of all fields to detect a modification of the header.
+
+        Returns:
+            tuple: Values of all fields
+        """
+        return (
+            self.use_extended_header,
+            self.msb_first,
+            self.version_number,
+            self.message_counter,
+            self.length,
+            self.ecu_id,
+            self.session_id,
+            self.timestamp,
+        )
+
 
 ###############################################################################
 # Extended Header of the DLT protocol
@@ -484,6 +501,21 @@ class ExtendedHeader:
         """
         return cast(MessageControlInfo, self.message_type_info)
 
+    def _snapshot(self) -> tuple:
+        """Get values of all fields to detect a modification of the header.
+
+        Returns:
+            tuple: Values of all fields
+        """
+        return (
+            self.verbose,
+            self.message_type,
+            self.message_type_info,
+            self.number_of_arguments,
+            self.application_id,
+            self.context_id,
+        )
+
 
 ###############################################################################
 # Storage Header of the DLT protocol
@@ -589,6 +621,14 @@ class StorageHeader:
         """
         return self.DATA_LENGTH
 
+    def _snapshot(self) -> tuple:
+        """Get values of all fields to detect a modification of the header.
+
+        Returns:
+            tuple: Values of all fields
+        """
+        return (self.seconds, self.microseconds, self.ecu_id)
+
 
 def _ascii_decode(ascii: bytes) -> str:
     """Decode bytes of ASCII charactors to string.
@@ -0,0 +1,266 @@
+"""Provide counters of bytes, messages and time of the stages to read and write.
+
+The counters are updated only by DltFileReader and DltFileWriter given a stats
+object, which run an instrumented path instead of the usual one, so reading and
+writing without it costs nothing. The messages can also be counted by
+MessageMetrics given to the stats, to export them as metrics of Prometheus.
+"""
+import time
+from typing import Callable, Dict, Optional
+
+from pydlt.header import ExtendedHeader, StandardHeader, StorageHeader
+from pydlt.message import DltMessage
+from pydlt.metrics import MessageMetrics
+from pydlt.payload import ArgumentString, VerbosePayload
+
+# default number of messages between calls of the callback
+DEFAULT_CALLBACK_INTERVAL = 10000
+
+_clock = time.perf_counter
+
+
+class _Stats:
+    """A base class of the counters with a callback hook."""
+
+    # names of the counters and their initial values
+    _COUNTERS = {}  # type: Dict[str, float]
+
+    def __init__(
+        self,
+        callback: Optional[Callable[["_Stats"], None]] = None,
+        interval: int = DEFAULT_CALLBACK_INTERVAL,
+        metrics: Optional[MessageMetrics] = None,
+    ) -> None:
+        self.callback = callback
+        self.interval = interval
+        self.metrics = metrics
+        self._pending = 0
+        self.reset()
+
+    def reset(self) -> None:
+        """Reset all counters to 0."""
+        for name, value in self._COUNTERS.items():
+            setattr(self, name, value)
+
+    def as_dict(self) -> Dict[str, float]:
+        """Get values of the counters.
+
+        Returns:
+            Dict[str, float]: Values by names of the counters
+        """
+        return {name: getattr(self, name) for name in self._COUNTERS}
+
+    def notify(self) -> None:
+        """Flush the metrics and call the callback with the stats if they are given."""
+        self._pending = 0
+        if self.metrics is not None:
+            self.metrics.flush()
+        if self.callback is not None:
+            self.callback(self)
+
+    def _count_message(self, data: Optional[bytes], offset: int = 0) -> None:
+        """Count a message and call the callback at the interval.
+
+        Args:
+            data (Optional[bytes]): Data bytes which contain the message with
+                                    Storage Header, or None if it does not have
+                                    Storage Header and the metrics do not count it
+            offset (int, optional): Offset of the message in the data.
+                                    Defaults to 0.
+        """
+        self.messages += 1
+        if self.metrics is not None and data is not None:
+            self.metrics.observe(data, offset)
+        self._pending += 1
+        if self._pending >= self.interval:
+            self.notify()
+
+    def __repr__(self) -> str:
+        values = ", ".join(
+            [f"{name}={value!r}" for name, value in self.as_dict().items()]
+        )
+        return f"{type(self).__name__}({values})"
+
+
+class ReaderStats(_Stats):
+    """Counters of DltFileReader.
+
+    Times are in seconds. Strings are decoded when messages are read to measure
+    string_time, while they are decoded when they are accessed first without
+    the stats. Messages in a batch (read_batch) are counted, but they are
+    decoded later by MessageBatch, so the time to decode them is not counted.
+    The read messages and errors are also counted by the metrics if given.
+
+    Examples::
+        def report(stats):
+            print(stats.messages, stats.io_time, stats.payload_time)
+
+        stats = ReaderStats(report, interval=100000)
+        with DltFileReader("path/to/file.dlt", stats=stats) as reader:
+            for message in reader:
+                # handle the message
+        print(stats)
+
+        # count the messages as metrics of Prometheus
+        stats = ReaderStats(metrics=MessageMetrics(registry))
+    """
+
+    _COUNTERS = {
+        "bytes_read": 0,  # bytes read from the file
+        "messages": 0,  # messages read (except skipped ones)
+        "skipped_messages": 0,  # messages which do not match the predicate
+        "skipped_bytes": 0,  # bytes of skipped messages and truncated data
+        "errors": 0,  # messages which cannot be decoded
+        "io_time": 0.0,  # time to read the file
+        "filter_time": 0.0,  # time of the predicate
+        "cache_time": 0.0,  # time to create messages from the cache
+        "storage_header_time": 0.0,
+        "standard_header_time": 0.0,
+        "extended_header_time": 0.0,
+        "payload_time": 0.0,  # time to decode payload except strings
+        "string_time": 0.0,  # time to decode strings in verbose payload
+    }
+
+    def __init__(
+        self,
+        callback: Optional[Callable[["ReaderStats"], None]] = None,
+        interval: int = DEFAULT_CALLBACK_INTERVAL,
+        metrics: Optional[MessageMetrics] = None,
+    ) -> None:
+        """Create ReaderStats object.
+
+        Args:
+            callback (Optional[Callable[[ReaderStats], None]], optional):
+                A function called with the stats every interval messages
+                and when the reader is closed. Defaults to None.
+            interval (int, optional): Number of messages between calls of
+                                      the callback.
+                                      Defaults to DEFAULT_CALLBACK_INTERVAL.
+            metrics (Optional[MessageMetrics], optional): Metrics to count
+                                                          the read messages and
+                                                          errors, which are
+                                                          flushed with the callback.
+                                                          Defaults to None.
+        """
+        super().__init__(callback, interval, metrics)
+
+    def _count_error(self) -> None:
+        """Count a message which cannot be decoded."""
+        self.errors += 1
+        if self.metrics is not None:
+            self.metrics.observe_error()
+
+    @property
+    def decode_time(self) -> float:
+        """Get total time to decode messages.
+
+        Returns:
+            float: Sum of the time of headers, payload and strings
+        """
+        return (
+            self.storage_header_time
+            + self.standard_header_time
+            + self.extended_header_time
+            + self.payload_time
+            + self.string_time
+        )
+
+
+class WriterStats(_Stats):
+    """Counters of DltFileWriter.
+
+    Times are in seconds. Data bytes written by write_bytes are counted by
+    bytes_written and io_time, but not by messages. The written messages with
+    Storage Header are also counted by the metrics if given.
+    """
+
+    _COUNTERS = {
+        "bytes_written": 0,  # bytes written to the file
+        "messages": 0,  # messages written
+        "errors": 0,  # messages which cannot be encoded or written
+        "encode_time": 0.0,  # time to convert messages to data bytes
+        "io_time": 0.0,  # time to write the file
+    }
+
+    def __init__(
+        self,
+        callback: Optional[Callable[["WriterStats"], None]] = None,
+        interval: int = DEFAULT_CALLBACK_INTERVAL,
+        metrics: Optional[MessageMetrics] = None,
+    ) -> None:
+        """Create WriterStats object.
+
+        Args:
+            callback (Optional[Callable[[WriterStats], None]], optional):
+                A function called with the stats every interval messages
+                and when the writer is closed. Defaults to None.
+            interval (int, optional): Number of messages between calls of
+                                      the callback.
+                                      Defaults to DEFAULT_CALLBACK_INTERVAL.
+            metrics (Optional[MessageMetrics], optional): Metrics to count
+                                                          the written messages,
+                                                          which are flushed with
+                                                          the callback.
+                                                          Defaults to None.
+        """
+        super().__init__(callback, interval, metrics)
+
+
+def create_message_with_stats(
+    data: bytes,
+    with_storage_header: bool,
+    encoding: Optional[str],
+    stats: ReaderStats,
+) -> DltMessage:
+    """Create DltMessage object from data bytes and count time of each stage.
+
+    It creates the same message by the same stages as DltMessage.create_from_bytes,
+    and the time of each stage is counted.
+
+    Args:
+        data (bytes): Data bytes
+        with_storage_header (bool): The data has storage header or not
+        encoding (Optional[str]): Encoding to decode non-UTF-8 strings
+        stats (ReaderStats): Counters to update
+
+    Raises:
+        ValueError: It can be caused by invalid data format.
+
+    Returns:
+        DltMessage: New DltMessage object
+    """
+    start = _clock()
+    seek_pos = 0
+    str_header = None
+    if with_storage_header:
+        str_header = StorageHeader.create_from_bytes(data)
+        seek_pos += str_header.bytes_length
+        now = _clock()
+        stats.storage_header_time += now - start
+        start = now
+    std_header = StandardHeader.create_from_bytes(data[seek_pos:])
+    seek_pos += std_header.bytes_length
+    now = _clock()
+    stats.standard_header_time += now - start
+    start = now
+    ext_header = None
+    if std_header.use_extended_header:
+        ext_header = ExtendedHeader.create_from_bytes(data[seek_pos:])
+        seek_pos += ext_header.bytes_length
+        now = _clock()
+        stats.extended_header_time += now - start
+        start = now
+    payload = DltMessage._decode_payload(
+        data, seek_pos, str_header, std_header, ext_header, encoding
+    )
+    now = _clock()
+    stats.payload_time += now - start
+    if isinstance(payload, VerbosePayload):
+        start = now
+        for arg in payload.arguments:
+            if isinstance(arg, ArgumentString):
+                # strings are decoded lazily, so they are decoded here to count
+                # the time, which is spent when they are accessed first otherwise
+                arg._decode()
+        stats.string_time += _clock() - start
+    return DltMessage._create_decoded(data, str_header, std_header, ext_header, payload)
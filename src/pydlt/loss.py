@@ -0,0 +1,179 @@
+"""Provide detection of message loss by Message Counter of DLT messages.
+
+Message Counter in Standard Header is an 8-bit counter which is incremented
+for each message sent by a sender, so a gap of the counter between consecutive
+messages of a sender shows the number of lost messages.
+"""
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from pydlt.scan import HeaderTable, _import_numpy
+
+# columns of HeaderTable which can be used to group messages by a sender
+GROUP_COLUMNS = ("ecu_id", "session_id", "application_id", "context_id")
+
+# a gap of Message Counter which means the counter does not change
+REPEATED_GAP = 255
+
+
+class LossWindow(NamedTuple):
+    """A window where messages of a group are lost."""
+
+    group: Tuple[Any, ...]  # values of the group columns
+    lost: int  # number of lost messages
+    counter_before: int  # Message Counter of the message before the loss
+    counter_after: int  # Message Counter of the message after the loss
+    time_before: float  # time in Storage Header of the message before the loss
+    time_after: float  # time in Storage Header of the message after the loss
+    position_after: int  # position in the file of the message after the loss
+
+
+class LossReport:
+    """A result of detection of message loss."""
+
+    def __init__(
+        self,
+        group_by: Sequence[str],
+        windows: List[LossWindow],
+        received: Dict[Tuple[Any, ...], int],
+        lost: Dict[Tuple[Any, ...], int],
+    ) -> None:
+        """Create LossReport object.
+
+        Args:
+            group_by (Sequence[str]): Names of the group columns
+            windows (List[LossWindow]): Windows of loss ordered by the position
+            received (Dict[Tuple[Any, ...], int]): Number of received messages
+                                                   of each group
+            lost (Dict[Tuple[Any, ...], int]): Number of lost messages of each group
+        """
+        self.group_by = tuple(group_by)
+        self.windows = windows
+        self.received = received
+        self.lost = lost
+
+    def __repr__(self):
+        return (
+            f"LossReport(group_by={self.group_by}, "
+            f"total_received={self.total_received}, total_lost={self.total_lost}, "
+            f"windows={len(self.windows)})"
+        )
+
+    @property
+    def total_received(self) -> int:
+        """Get number of received messages of all groups.
+
+        Returns:
+            int: Number of received messages
+        """
+        return sum(self.received.values())
+
+    @property
+    def total_lost(self) -> int:
+        """Get number of lost messages of all groups.
+
+        Returns:
+            int: Number of lost messages
+        """
+        return sum(self.lost.values())
+
+
+def detect_message_loss(
+    headers: HeaderTable, group_by: Sequence[str] = ("ecu_id", "session_id")
+) -> LossReport:
+    """Detect message loss from gaps of Message Counter in each group of messages.
+
+    Messages are grouped by the group columns and the gap of Message Counter
+    between consecutive messages in a group is calculated in modulo 256.
+    A counter equal to the previous one is regarded as a duplicated message,
+    not as a loss of 255 messages.
+    NumPy is required for the function.
+
+    Examples::
+        report = detect_message_loss(scan_headers("path/to/file.dlt"))
+        for window in report.windows:
+            print(window.group, window.lost, window.time_before, window.time_after)
+
+    Args:
+        headers (HeaderTable): Header fields of messages given by scan_headers()
+        group_by (Sequence[str], optional): Columns to group messages by a sender.
+                                            Items must be in GROUP_COLUMNS.
+                                            Defaults to ("ecu_id", "session_id").
+
+    Raises:
+        ImportError: NumPy is not installed.
+        ValueError: Unknown group column is given.
+
+    Returns:
+        LossReport: A result of the detection
+    """
+    np = _import_numpy()
+    for name in group_by:
+        if name not in GROUP_COLUMNS:
+            raise ValueError(
+                f"Unknown group column: {name} / it must be in {GROUP_COLUMNS}"
+            )
+    if len(headers) == 0:
+        return LossReport(group_by, [], {}, {})
+
+    # combine the group columns into a group number of each message
+    groups = np.zeros(len(headers), dtype="int64")
+    for name in group_by:
+        uniques, inverse = np.unique(getattr(headers, name), return_inverse=True)
+        groups = groups * len(uniques) + inverse.reshape(-1)
+    _, first_indexes, groups = np.unique(groups, return_index=True, return_inverse=True)
+    groups = groups.reshape(-1)
+    group_values = [
+        tuple(_to_python_value(getattr(headers, name)[index]) for name in group_by)
+        for index in first_indexes
+    ]
+
+    # calculate gaps of consecutive messages in each group
+    order = np.argsort(groups, kind="stable")
+    sorted_groups = groups[order]
+    counters = headers.message_counter[order].astype("int64")
+    gaps = (counters[1:] - counters[:-1] - 1) % 256
+    gaps[sorted_groups[1:] != sorted_groups[:-1]] = 0
+    gaps[gaps == REPEATED_GAP] = 0
+
+    received = np.bincount(groups, minlength=len(group_values))
+    lost = np.bincount(sorted_groups[1:], weights=gaps, minlength=len(group_values))
+
+    times = headers.time
+    windows = []
+    for index in np.nonzero(gaps)[0]:
+        before = order[index]
+        after = order[index + 1]
+        windows.append(
+            LossWindow(
+                group_values[sorted_groups[index]],
+                int(gaps[index]),
+                int(headers.message_counter[before]),
+                int(headers.message_counter[after]),
+                float(times[before]),
+                float(times[after]),
+                int(headers.position[after]),
+            )
+        )
+    windows.sort(key=lambda window: window.position_after)
+
+    return LossReport(
+        group_by,
+        windows,
+        {group: int(count) for group, count in zip(group_values, received)},
+        {group: int(count) for group, count in zip(group_values, lost)},
+    )
+
+
+def _to_python_value(value: Any) -> Optional[Any]:
+    """Convert a value of a group column to a Python object.
+
+    Args:
+        value (Any): A value of NumPy array
+
+    Returns:
+        Optional[Any]: str for IDs, int for Session ID or None if not exists
+    """
+    if isinstance(value, bytes):
+        return value.decode("ascii", "replace")
+    value = int(value)
+    return None if value < 0 else value
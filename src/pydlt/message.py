@@ -86,18 +86,86 @@ class DltMessage:
             ext_header (Optional[ExtendedHeader]): Extended Header of the message
             payload (Optional[Payload]): Payload of the message
         """
-        self.str_header = str_header
-        self.std_header = std_header
-        self.ext_header = ext_header
-        self.payload = payload
+        self._str_header = str_header
+        self._std_header = std_header
+        self._ext_header = ext_header
+        self._payload = payload
+        # data bytes which the message is created from (see create_from_bytes)
+        self._raw = None  # type: Optional[bytes]
+        # snapshots of the headers and the payload taken on the first access
+        self._raw_snapshots = {}  # type: dict
+
+    @property
+    def str_header(self) -> Optional[StorageHeader]:
+        """Get Storage Header of the message.
+
+        Returns:
+            Optional[StorageHeader]: Storage Header of the message
+        """
+        if self._raw is not None and "_str_header" not in self._raw_snapshots:
+            self._take_raw_snapshot("_str_header")
+        return self._str_header
+
+    @str_header.setter
+    def str_header(self, str_header: Optional[StorageHeader]) -> None:
+        self._str_header = str_header
+        self._raw = None
+
+    @property
+    def std_header(self) -> StandardHeader:
+        """Get Standard Header of the message.
+
+        Returns:
+            StandardHeader: Standard Header of the message
+        """
+        if self._raw is not None and "_std_header" not in self._raw_snapshots:
+            self._take_raw_snapshot("_std_header")
+        return self._std_header
+
+    @std_header.setter
+    def std_header(self, std_header: StandardHeader) -> None:
+        self._std_header = std_header
+        self._raw = None
+
+    @property
+    def ext_header(self) -> Optional[ExtendedHeader]:
+        """Get Extended Header of the message.
+
+        Returns:
+            Optional[ExtendedHeader]: Extended Header of the message
+        """
+        if self._raw is not None and "_ext_header" not in self._raw_snapshots:
+            self._take_raw_snapshot("_ext_header")
+        return self._ext_header
+
+    @ext_header.setter
+    def ext_header(self, ext_header: Optional[ExtendedHeader]) -> None:
+        self._ext_header = ext_header
+        self._raw = None
+
+    @property
+    def payload(self) -> Optional[Payload]:
+        """Get Payload of the message.
+
+        Returns:
+            Optional[Payload]: Payload of the message
+        """
+        if self._raw is not None and "_payload" not in self._raw_snapshots:
+            self._take_raw_snapshot("_payload")
+        return self._payload
+
+    @payload.setter
+    def payload(self, payload: Optional[Payload]) -> None:
+        self._payload = payload
+        self._raw = None
 
     def __eq__(self, other):
         if isinstance(other, self.__class__):
             return (
-                self.str_header == other.str_header
-                and self.std_header == other.std_header
-                and self.ext_header == other.ext_header
-                and self.payload == other.payload
+                self._str_header == other._str_header
+                and self._std_header == other._std_header
+                and self._ext_header == other._ext_header
+                and self._payload == other._payload
             )
         return False
 
@@ -112,64 +180,64 @@ class DltMessage:
             str: Overview of the message
         """
         ret = []
-        if self.str_header is not None:
+        if self._str_header is not None:
             ret.append(
-                datetime.fromtimestamp(self.str_header.seconds, timezone.utc).strftime(
+                datetime.fromtimestamp(self._str_header.seconds, timezone.utc).strftime(
                     "%Y/%m/%d %H:%M:%S"
                 )
                 + "."
-                + str(self.str_header.microseconds).zfill(6)
+                + str(self._str_header.microseconds).zfill(6)
             )
-        if self.std_header.timestamp is not None:
+        if self._std_header.timestamp is not None:
             ret.append(
-                str(int(self.std_header.timestamp / 10000))
+                str(int(self._std_header.timestamp / 10000))
                 + "."
-                + str(int(self.std_header.timestamp % 10000)).zfill(4)
+                + str(int(self._std_header.timestamp % 10000)).zfill(4)
             )
-        ret.append(str(self.std_header.message_counter))
-        if self.std_header.ecu_id is not None:
-            ret.append(self.std_header.ecu_id)
-        elif self.str_header is not None:
-            ret.append(self.str_header.ecu_id)
-        if self.ext_header is not None:
-            ret.append(self.ext_header.application_id)
-            ret.append(self.ext_header.context_id)
-        if self.std_header.session_id is not None:
-            ret.append(str(self.std_header.session_id))
-        if self.ext_header is not None:
-            ret.append(_MESSAGE_TYPE_STR.get(self.ext_header.message_type, "unknown"))
-            if self.ext_header.message_type == MessageType.DLT_TYPE_LOG:
+        ret.append(str(self._std_header.message_counter))
+        if self._std_header.ecu_id is not None:
+            ret.append(self._std_header.ecu_id)
+        elif self._str_header is not None:
+            ret.append(self._str_header.ecu_id)
+        if self._ext_header is not None:
+            ret.append(self._ext_header.application_id)
+            ret.append(self._ext_header.context_id)
+        if self._std_header.session_id is not None:
+            ret.append(str(self._std_header.session_id))
+        if self._ext_header is not None:
+            ret.append(_MESSAGE_TYPE_STR.get(self._ext_header.message_type, "unknown"))
+            if self._ext_header.message_type == MessageType.DLT_TYPE_LOG:
                 ret.append(
                     _MESSAGE_LOG_INFO_STR.get(
-                        self.ext_header.message_log_info, "unknown"
+                        self._ext_header.message_log_info, "unknown"
                     )
                 )
-            if self.ext_header.message_type == MessageType.DLT_TYPE_APP_TRACE:
+            if self._ext_header.message_type == MessageType.DLT_TYPE_APP_TRACE:
                 ret.append(
                     _MESSAGE_TRACE_INFO_STR.get(
-                        self.ext_header.message_trace_info, "unknown"
+                        self._ext_header.message_trace_info, "unknown"
                     )
                 )
-            if self.ext_header.message_type == MessageType.DLT_TYPE_NW_TRACE:
+            if self._ext_header.message_type == MessageType.DLT_TYPE_NW_TRACE:
                 ret.append(
                     _MESSAGE_BUS_INFO_STR.get(
-                        self.ext_header.message_bus_info, "unknown"
+                        self._ext_header.message_bus_info, "unknown"
                     )
                 )
-            if self.ext_header.message_type == MessageType.DLT_TYPE_CONTROL:
+            if self._ext_header.message_type == MessageType.DLT_TYPE_CONTROL:
                 ret.append(
                     _MESSAGE_CONTROL_INFO_STR.get(
-                        self.ext_header.message_control_info, "unknown"
+                        self._ext_header.message_control_info, "unknown"
                     )
                 )
-        if self.ext_header is not None and self.ext_header.verbose:
+        if self._ext_header is not None and self._ext_header.verbose:
             ret.append("verbose")
         else:
             ret.append("non-verbose")
-        if self.ext_header is not None:
-            ret.append(str(self.ext_header.number_of_arguments))
-        if self.payload is not None:
-            ret.append(str(self.payload))
+        if self._ext_header is not None:
+            ret.append(str(self._ext_header.number_of_arguments))
+        if self._payload is not None:
+            ret.append(str(self._payload))
         return " ".join(ret)
 
     @classmethod
@@ -282,6 +350,9 @@ class DltMessage:
     ) -> "DltMessage":
         """Create DltMessage object from data bytes.
 
+        The data bytes of the message are kept in the created object,
+        and to_bytes() returns them as is while the message is not modified.
+
         Args:
             data (bytes): Data bytes
             with_storage_header (bool): The data has storage header or not
@@ -294,52 +365,139 @@ class DltMessage:
         """
         seek_pos = 0
         str_header = None
-        str_header_length = 0
         if with_storage_header:
             str_header = StorageHeader.create_from_bytes(data)
             seek_pos += str_header.bytes_length
-            str_header_length = str_header.bytes_length
         std_header = StandardHeader.create_from_bytes(data[seek_pos:])
         seek_pos += std_header.bytes_length
         ext_header = None
-        ext_header_length = 0
         if std_header.use_extended_header:
             ext_header = ExtendedHeader.create_from_bytes(data[seek_pos:])
-            ext_header_length = ext_header.bytes_length
             seek_pos += ext_header.bytes_length
-        payload = None
-        if std_header.length > std_header.bytes_length + ext_header_length:
-            is_verbose = ext_header is not None and ext_header.verbose is True
-            if is_verbose:
-                payload = VerbosePayload.create_from_bytes(
-                    data[seek_pos : std_header.length + str_header_length],
-                    std_header.msb_first,
-                    ext_header.number_of_arguments,
-                    encoding,
-                )
-            else:
-                payload = NonVerbosePayload.create_from_bytes(
-                    data[seek_pos : std_header.length + str_header_length],
-                    std_header.msb_first,
-                )
-        return cls(str_header, std_header, ext_header, payload)
+        payload = cls._decode_payload(
+            data, seek_pos, str_header, std_header, ext_header, encoding
+        )
+        return cls._create_decoded(data, str_header, std_header, ext_header, payload)
+
+    @staticmethod
+    def _decode_payload(
+        data: bytes,
+        offset: int,
+        str_header: Optional[StorageHeader],
+        std_header: StandardHeader,
+        ext_header: Optional[ExtendedHeader],
+        encoding: Optional[str],
+    ) -> Optional[Payload]:
+        """Decode payload of a message from data bytes, a stage of create_from_bytes.
+
+        Args:
+            data (bytes): Data bytes of the message
+            offset (int): Offset of the payload in the data bytes
+            str_header (Optional[StorageHeader]): Storage Header of the message
+            std_header (StandardHeader): Standard Header of the message
+            ext_header (Optional[ExtendedHeader]): Extended Header of the message
+            encoding (Optional[str]): Encoding to decode non-UTF-8 strings
+
+        Raises:
+            ValueError: It can be caused by invalid data format.
+
+        Returns:
+            Optional[Payload]: The payload, or None if the message has no payload
+        """
+        ext_header_length = 0 if ext_header is None else ext_header.bytes_length
+        if std_header.length <= std_header.bytes_length + ext_header_length:
+            return None
+        str_header_length = 0 if str_header is None else str_header.bytes_length
+        payload_data = data[offset : std_header.length + str_header_length]
+        if ext_header is not None and ext_header.verbose is True:
+            return VerbosePayload.create_from_bytes(
+                payload_data,
+                std_header.msb_first,
+                ext_header.number_of_arguments,
+                encoding,
+            )
+        return NonVerbosePayload.create_from_bytes(payload_data, std_header.msb_first)
+
+    @classmethod
+    def _create_decoded(
+        cls,
+        data: bytes,
+        str_header: Optional[StorageHeader],
+        std_header: StandardHeader,
+        ext_header: Optional[ExtendedHeader],
+        payload: Optional[Payload],
+    ) -> "DltMessage":
+        """Create DltMessage object which keeps the data bytes it is decoded from.
+
+        Args:
+            data (bytes): Data bytes of the message
+            str_header (Optional[StorageHeader]): Storage Header of the message
+            std_header (StandardHeader): Standard Header of the message
+            ext_header (Optional[ExtendedHeader]): Extended Header of the message
+            payload (Optional[Payload]): Payload of the message
+
+        Returns:
+            DltMessage: New DltMessage object
+        """
+        message = cls(str_header, std_header, ext_header, payload)
+        message_length = std_header.length
+        if str_header is not None:
+            message_length += str_header.bytes_length
+        if type(data) is bytes and len(data) == message_length:
+            message._raw = data
+        else:
+            message._raw = bytes(data[:message_length])
+        return message
 
     def to_bytes(self) -> bytes:
         """Convert to data bytes.
 
+        If the message is created by create_from_bytes and it is not modified,
+        the original data bytes are returned without conversion.
+
         Returns:
             bytes: Converted data bytes
         """
+        if self._raw is not None and all(
+            _snapshot_of(getattr(self, name)) == snapshot
+            for name, snapshot in self._raw_snapshots.items()
+        ):
+            return self._raw
         data = b""
-        if self.str_header is not None:
-            data += self.str_header.to_bytes()
-        data += self.std_header.to_bytes()
-        if self.ext_header is not None:
-            data += self.ext_header.to_bytes()
-        if self.payload is not None:
-            data += self.payload.to_bytes(self.std_header.msb_first)
+        if self._str_header is not None:
+            data += self._str_header.to_bytes()
+        data += self._std_header.to_bytes()
+        if self._ext_header is not None:
+            data += self._ext_header.to_bytes()
+        if self._payload is not None:
+            data += self._payload.to_bytes(self._std_header.msb_first)
         return data
 
+    def _take_raw_snapshot(self, name: str) -> None:
+        """Take a snapshot of a header or the payload to detect its modification.
+
+        The snapshot is taken on the first access to the header or the payload,
+        since it cannot be modified without the access. It lets to_bytes return
+        the raw data bytes without a snapshot of unused parts of the message.
+
+        Args:
+            name (str): Name of the attribute which holds the header or the payload
+        """
+        self._raw_snapshots[name] = _snapshot_of(getattr(self, name))
+
+    def _snapshot(self) -> tuple:
+        """Get values of all fields to detect a modification of the message.
+
+        Returns:
+            tuple: Values of all fields in the headers and the payload
+        """
+        return (
+            _snapshot_of(self._str_header),
+            self._std_header._snapshot(),
+            _snapshot_of(self._ext_header),
+            _snapshot_of(self._payload),
+        )
+
     @property
     def verbose(self) -> bool:
         """Check the message is verbose mode or non-verbose mode.
@@ -349,7 +507,7 @@ class DltMessage:
                 - False: Non-Verbose mode
                 -  True: Verbose mode
         """
-        return False if self.ext_header is None else self.ext_header.verbose
+        return False if self._ext_header is None else self._ext_header.verbose
 
     @property
     def non_verbose_payload(self) -> NonVerbosePayload:
@@ -372,3 +530,15 @@ class DltMessage:
             NonVerbosePayload: Payload as verbose mode
         """
         return cast(VerbosePayload, self.payload)
+
+
+def _snapshot_of(part) -> Optional[tuple]:
+    """Get a snapshot of a header or the payload.
+
+    Args:
+        part: A header or the payload of DltMessage, or None
+
+    Returns:
+        Optional[tuple]: Values of all fields, or None if the part is None
+    """
+    return None if part is None else part._snapshot()
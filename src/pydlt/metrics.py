@@ -0,0 +1,595 @@
+"""Provide metrics of DLT messages in Prometheus text exposition format.
+
+Metrics are held by MetricsRegistry, which renders them as text to be scraped
+from a local HTTP endpoint or written to a file (e.g. for the textfile
+collector of node_exporter). Rates such as messages per second are calculated
+from the counters by Prometheus (e.g. rate(pydlt_messages_total[1m])).
+"""
+import http.server
+import os
+import re
+import socketserver
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+from pydlt.batch import MessageBatch
+from pydlt.header import StorageHeader, _ascii_decode
+from pydlt.loss import REPEATED_GAP
+from pydlt.scan import (
+    APPLICATION_ID_OFFSET,
+    EXTENDED_HEADER_OFFSETS,
+    HEADER_TYPE_OFFSET,
+    LENGTH_OFFSET,
+    MESSAGE_COUNTER_OFFSET,
+    MESSAGE_ECU_ID_OFFSETS,
+    SESSION_ID_OFFSETS,
+)
+
+# default port of the HTTP endpoint
+DEFAULT_METRICS_PORT = 9464
+
+# default number of messages observed before they are added to the registry
+DEFAULT_FLUSH_INTERVAL = 1024
+
+# content type of Prometheus text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_NAME_PATTERN = re.compile(r"^[a-zA-Z_:][a-zA-Z0-9_:]*$")
+_LABEL_NAME_PATTERN = re.compile(r"^[a-zA-Z_][a-zA-Z0-9_]*$")
+
+LabelValues = Tuple[str, ...]
+
+
+class Metric:
+    """A metric which has a value for each combination of label values.
+
+    Values can be updated by many threads. A lock is acquired once for each
+    update, so many values should be updated at once by inc_many or set_many
+    at a high rate. Values can also be given by a function which is called
+    when the metric is rendered, which costs nothing until then.
+    """
+
+    TYPE = "untyped"
+
+    def __init__(
+        self, name: str, documentation: str, label_names: Sequence[str] = ()
+    ) -> None:
+        """Create Metric object.
+
+        Args:
+            name (str): Name of the metric
+            documentation (str): Help text of the metric
+            label_names (Sequence[str], optional): Names of the labels.
+                                                   Defaults to ().
+
+        Raises:
+            ValueError: The name or a label name is invalid.
+        """
+        if not _NAME_PATTERN.match(name):
+            raise ValueError(f"Invalid metric name: {name}")
+        for label_name in label_names:
+            if not _LABEL_NAME_PATTERN.match(label_name):
+                raise ValueError(f"Invalid label name: {label_name}")
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._values = {}  # type: Dict[LabelValues, float]
+        self._function = None  # type: Optional[Callable[[], Mapping]]
+        self._lock = threading.Lock()
+
+    def get(self, labels: LabelValues = ()) -> float:
+        """Get the value of label values.
+
+        Args:
+            labels (LabelValues, optional): Values of the labels. Defaults to ().
+
+        Returns:
+            float: The value, or 0 if it is not set
+        """
+        return self.collect().get(tuple(labels), 0.0)
+
+    def set_function(self, function: Optional[Callable[[], Mapping]]) -> None:
+        """Set a function to get the values when the metric is rendered.
+
+        Args:
+            function (Optional[Callable[[], Mapping]]): A function which returns
+                                                        values by label values,
+                                                        or None to clear it
+        """
+        self._function = function
+
+    def collect(self) -> Dict[LabelValues, float]:
+        """Get all values.
+
+        Returns:
+            Dict[LabelValues, float]: Values by label values
+        """
+        with self._lock:
+            values = dict(self._values)
+        if self._function is not None:
+            for labels, value in self._function().items():
+                labels = (labels,) if isinstance(labels, str) else tuple(labels)
+                values[labels] = value
+        return values
+
+    def render(self) -> List[str]:
+        """Render the metric in Prometheus text exposition format.
+
+        Returns:
+            List[str]: Lines of the metric
+        """
+        lines = [
+            f"# HELP {self.name} {_escape_help(self.documentation)}",
+            f"# TYPE {self.name} {self.TYPE}",
+        ]
+        for labels, value in sorted(self.collect().items()):
+            if labels:
+                pairs = ",".join(
+                    [
+                        f'{name}="{_escape_label_value(label)}"'
+                        for name, label in zip(self.label_names, labels)
+                    ]
+                )
+                lines.append(f"{self.name}{{{pairs}}} {_format_value(value)}")
+            else:
+                lines.append(f"{self.name} {_format_value(value)}")
+        return lines
+
+    def _check_labels(self, labels: LabelValues) -> LabelValues:
+        labels = tuple(labels)
+        if len(labels) != len(self.label_names):
+            raise ValueError(
+                f"Unexpected number of label values: {len(labels)} / "
+                f"{self.name} has labels {self.label_names}"
+            )
+        return labels
+
+
+class Counter(Metric):
+    """A metric whose values only increase (e.g. number of messages)."""
+
+    TYPE = "counter"
+
+    def inc(self, amount: float = 1.0, labels: LabelValues = ()) -> None:
+        """Increase the value of label values.
+
+        Args:
+            amount (float, optional): Amount to add. Defaults to 1.0.
+            labels (LabelValues, optional): Values of the labels. Defaults to ().
+
+        Raises:
+            ValueError: The amount is negative, or the labels do not match.
+        """
+        self.inc_many({labels: amount})
+
+    def inc_many(self, amounts: Mapping[LabelValues, float]) -> None:
+        """Increase values of many label values at once.
+
+        Args:
+            amounts (Mapping[LabelValues, float]): Amounts to add by label values
+
+        Raises:
+            ValueError: An amount is negative, or the labels do not match.
+        """
+        items = []
+        for labels, amount in amounts.items():
+            if amount < 0:
+                raise ValueError(f"Counter cannot be decreased: {amount}")
+            items.append((self._check_labels(labels), amount))
+        values = self._values
+        with self._lock:
+            for labels, amount in items:
+                values[labels] = values.get(labels, 0) + amount
+
+
+class Gauge(Metric):
+    """A metric whose values can go up and down (e.g. depth of a queue)."""
+
+    TYPE = "gauge"
+
+    def set(self, value: float, labels: LabelValues = ()) -> None:
+        """Set the value of label values.
+
+        Args:
+            value (float): The value
+            labels (LabelValues, optional): Values of the labels. Defaults to ().
+
+        Raises:
+            ValueError: The labels do not match.
+        """
+        self.set_many({labels: value})
+
+    def set_many(self, values: Mapping[LabelValues, float]) -> None:
+        """Set values of many label values at once.
+
+        Args:
+            values (Mapping[LabelValues, float]): Values by label values
+
+        Raises:
+            ValueError: The labels do not match.
+        """
+        items = [
+            (self._check_labels(labels), value) for labels, value in values.items()
+        ]
+        with self._lock:
+            self._values.update(items)
+
+
+class MetricsRegistry:
+    """A registry of metrics rendered in Prometheus text exposition format.
+
+    Examples::
+        registry = MetricsRegistry()
+        errors = registry.counter("app_errors_total", "Number of errors")
+        errors.inc()
+
+        # serve the metrics at http://127.0.0.1:9464/metrics
+        server = registry.serve()
+        ...
+        server.close()
+
+        # or write them to a file
+        registry.write("path/to/metrics.prom")
+    """
+
+    def __init__(self) -> None:
+        """Create MetricsRegistry object."""
+        self._metrics = {}  # type: Dict[str, Metric]
+        self._lock = threading.Lock()
+
+    def register(self, metric: Metric) -> Metric:
+        """Register a metric.
+
+        Args:
+            metric (Metric): A metric
+
+        Raises:
+            ValueError: A metric of the same name is already registered.
+
+        Returns:
+            Metric: The registered metric
+        """
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric is already registered: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(
+        self, name: str, documentation: str, label_names: Sequence[str] = ()
+    ) -> Counter:
+        """Get a counter, which is registered if it does not exist.
+
+        Args:
+            name (str): Name of the counter (should end with "_total")
+            documentation (str): Help text of the counter
+            label_names (Sequence[str], optional): Names of the labels.
+                                                   Defaults to ().
+
+        Raises:
+            ValueError: A metric of the name has a different type or labels.
+
+        Returns:
+            Counter: The counter
+        """
+        return self._get_or_register(Counter, name, documentation, label_names)
+
+    def gauge(
+        self, name: str, documentation: str, label_names: Sequence[str] = ()
+    ) -> Gauge:
+        """Get a gauge, which is registered if it does not exist.
+
+        Args:
+            name (str): Name of the gauge
+            documentation (str): Help text of the gauge
+            label_names (Sequence[str], optional): Names of the labels.
+                                                   Defaults to ().
+
+        Raises:
+            ValueError: A metric of the name has a different type or labels.
+
+        Returns:
+            Gauge: The gauge
+        """
+        return self._get_or_register(Gauge, name, documentation, label_names)
+
+    def get(self, name: str) -> Optional[Metric]:
+        """Get a registered metric by name.
+
+        Args:
+            name (str): Name of the metric
+
+        Returns:
+            Optional[Metric]: The metric, or None if not registered
+        """
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """Render all metrics in Prometheus text exposition format.
+
+        Returns:
+            str: Text of the metrics
+        """
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        return "".join([line + "\n" for metric in metrics for line in metric.render()])
+
+    def write(self, path: Union[str, Path]) -> None:
+        """Write all metrics to a file atomically.
+
+        Args:
+            path (Union[str, Path]): A path to the file
+        """
+        path = Path(path)
+        temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        temp_path.write_text(self.render(), encoding="utf-8")
+        os.replace(str(temp_path), str(path))
+
+    def serve(
+        self, host: str = "127.0.0.1", port: int = DEFAULT_METRICS_PORT
+    ) -> "MetricsServer":
+        """Serve the metrics by HTTP on a background thread.
+
+        Args:
+            host (str, optional): Host to listen. Defaults to "127.0.0.1".
+            port (int, optional): Port to listen. Defaults to DEFAULT_METRICS_PORT.
+
+        Returns:
+            MetricsServer: The started server
+        """
+        return MetricsServer(self, host, port)
+
+    def _get_or_register(
+        self, cls: type, name: str, documentation: str, label_names: Sequence[str]
+    ) -> Metric:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, documentation, label_names)
+        if type(metric) is not cls or metric.label_names != tuple(label_names):
+            raise ValueError(
+                f"Metric {name} is already registered as {metric.TYPE} "
+                f"with labels {metric.label_names}"
+            )
+        return metric
+
+
+class MetricsServer:
+    """A tiny HTTP server which serves metrics of a registry on "/metrics"."""
+
+    def __init__(self, registry: MetricsRegistry, host: str, port: int) -> None:
+        """Create MetricsServer object and start the background thread.
+
+        Args:
+            registry (MetricsRegistry): A registry of the metrics
+            host (str): Host to listen
+            port (int): Port to listen (0 to select a free port)
+        """
+        self.registry = registry
+        self._server = _HTTPServer((host, port), _MetricsRequestHandler)
+        self._server.registry = registry
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="MetricsServer", daemon=True
+        )
+        self._thread.start()
+
+    def __enter__(self) -> "MetricsServer":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> Optional[bool]:
+        self.close()
+
+    @property
+    def address(self) -> Tuple:
+        """Get the address where the server listens.
+
+        Returns:
+            Tuple: Host and port
+        """
+        return self._server.server_address
+
+    def close(self) -> None:
+        """Stop the server."""
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+
+class _HTTPServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    daemon_threads = True
+    registry = None  # type: Optional[MetricsRegistry]
+
+
+class _MetricsRequestHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = self.server.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        # requests are not logged to stderr
+        pass
+
+
+class MessageMetrics:
+    """Metrics of DLT messages observed by a reader, a writer or a relay.
+
+    Messages are counted in local dictionaries without a lock, and added to the
+    counters of the registry every flush_interval messages. An object should be
+    used by one thread, and each thread can have its own object for the same
+    registry.
+
+    The following counters are registered:
+
+    - pydlt_messages_total{ecu_id, application_id}: Number of messages
+    - pydlt_bytes_total{ecu_id}: Size of messages with Storage Header
+    - pydlt_lost_messages_total{ecu_id}: Number of messages lost by gaps of
+      Message Counter, which is checked for each ECU ID and Session ID
+    - pydlt_decode_errors_total: Number of messages which cannot be decoded
+
+    A reader or a writer counts messages by the metrics given to ReaderStats or
+    WriterStats, and DltRelay by the metrics created for its registry.
+
+    Examples::
+        registry = MetricsRegistry()
+        metrics = MessageMetrics(registry)
+        with DltFileReader("path/to/file.dlt") as reader:
+            for batch in reader.iter_batches(10000):
+                metrics.observe_batch(batch)
+        metrics.flush()
+        print(registry.render())
+    """
+
+    def __init__(
+        self,
+        registry: MetricsRegistry,
+        flush_interval: int = DEFAULT_FLUSH_INTERVAL,
+    ) -> None:
+        """Create MessageMetrics object.
+
+        Args:
+            registry (MetricsRegistry): A registry to add the counters
+            flush_interval (int, optional): Number of messages observed before
+                                            they are added to the counters.
+                                            Defaults to DEFAULT_FLUSH_INTERVAL.
+        """
+        self.registry = registry
+        self.flush_interval = flush_interval
+        self.messages = registry.counter(
+            "pydlt_messages_total",
+            "Number of DLT messages",
+            ("ecu_id", "application_id"),
+        )
+        self.bytes = registry.counter(
+            "pydlt_bytes_total",
+            "Size of DLT messages with Storage Header in bytes",
+            ("ecu_id",),
+        )
+        self.lost = registry.counter(
+            "pydlt_lost_messages_total",
+            "Number of DLT messages lost by gaps of Message Counter",
+            ("ecu_id",),
+        )
+        self.errors = registry.counter(
+            "pydlt_decode_errors_total", "Number of DLT messages failed to decode"
+        )
+        # pending counts by raw ECU ID and Application ID
+        self._messages = {}  # type: Dict[Tuple[bytes, bytes], int]
+        self._bytes = {}  # type: Dict[bytes, int]
+        self._lost = {}  # type: Dict[bytes, int]
+        self._errors = 0
+        self._pending = 0
+        # the last Message Counter by raw ECU ID and Session ID
+        self._counters = {}  # type: Dict[Tuple[bytes, bytes], int]
+
+    def observe(self, data: bytes, offset: int = 0) -> None:
+        """Count a message.
+
+        Args:
+            data (bytes): Data bytes which contain the message with Storage Header
+            offset (int, optional): Offset of the message in the data.
+                                    Defaults to 0.
+        """
+        header_type = data[offset + HEADER_TYPE_OFFSET]
+        ecu_start = offset + MESSAGE_ECU_ID_OFFSETS[header_type]
+        ecu_id = data[ecu_start : ecu_start + 4]
+        ext_offset = EXTENDED_HEADER_OFFSETS[header_type]
+        application_id = b""
+        if ext_offset >= 0:
+            start = offset + ext_offset + APPLICATION_ID_OFFSET
+            application_id = data[start : start + 4]
+        key = (ecu_id, application_id)
+        self._messages[key] = self._messages.get(key, 0) + 1
+        length = StorageHeader.DATA_LENGTH + (
+            data[offset + LENGTH_OFFSET] << 8 | data[offset + LENGTH_OFFSET + 1]
+        )
+        self._bytes[ecu_id] = self._bytes.get(ecu_id, 0) + length
+
+        session_offset = SESSION_ID_OFFSETS[header_type]
+        session_id = b""
+        if session_offset >= 0:
+            session_id = data[offset + session_offset : offset + session_offset + 4]
+        self._count_loss(ecu_id, session_id, data[offset + MESSAGE_COUNTER_OFFSET])
+
+        self._pending += 1
+        if self._pending >= self.flush_interval:
+            self.flush()
+
+    def observe_batch(self, batch: MessageBatch) -> None:
+        """Count messages in a batch and add them to the counters.
+
+        Args:
+            batch (MessageBatch): A batch of messages
+        """
+        data = batch.data
+        for offset in batch.offsets[:-1]:
+            self.observe(data, offset)
+        self.flush()
+
+    def observe_error(self, count: int = 1) -> None:
+        """Count messages which cannot be decoded.
+
+        Args:
+            count (int, optional): Number of the messages. Defaults to 1.
+        """
+        self._errors += count
+
+    def flush(self) -> None:
+        """Add the counted messages to the counters of the registry."""
+        if self._messages:
+            self.messages.inc_many(
+                {
+                    (_ascii_decode(ecu_id), _ascii_decode(application_id)): count
+                    for (ecu_id, application_id), count in self._messages.items()
+                }
+            )
+            self.bytes.inc_many(
+                {(_ascii_decode(ecu_id),): size for ecu_id, size in self._bytes.items()}
+            )
+            self._messages = {}
+            self._bytes = {}
+        if self._lost:
+            self.lost.inc_many(
+                {(_ascii_decode(ecu_id),): lost for ecu_id, lost in self._lost.items()}
+            )
+            self._lost = {}
+        if self._errors:
+            self.errors.inc(self._errors)
+            self._errors = 0
+        self._pending = 0
+
+    def _count_loss(self, ecu_id: bytes, session_id: bytes, counter: int) -> None:
+        """Count lost messages by the gap from the previous Message Counter."""
+        key = (ecu_id, session_id)
+        previous = self._counters.get(key)
+        self._counters[key] = counter
+        if previous is None:
+            return
+        gap = (counter - previous - 1) % 256
+        if gap and gap != REPEATED_GAP:
+            self._lost[ecu_id] = self._lost.get(ecu_id, 0) + gap
+
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value != value:
+        return "NaN"
+    if value in (float("inf"), float("-inf")):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
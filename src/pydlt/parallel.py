@@ -0,0 +1,162 @@
+"""Provide decoding of DLT messages on a thread pool.
+
+Messages are framed by pydlt.scan without decoding, and batches of them are
+decoded by DltMessage.create_from_bytes on worker threads.
+Decoding scales across cores on free-threaded builds of CPython (3.13t and
+later), and it falls back to a single thread on builds with the GIL,
+where threads only add overhead to the CPU-bound decoding.
+"""
+import os
+import sys
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import BinaryIO, Iterator, List, Optional, Tuple, Union
+
+from pydlt.extract import RawPredicate
+from pydlt.message import DltMessage
+from pydlt.scan import DEFAULT_BUFFER_SIZE, iter_chunks
+
+# default number of messages decoded in a task
+DEFAULT_BATCH_SIZE = 1024
+
+
+def is_free_threaded() -> bool:
+    """Check the interpreter runs without the GIL.
+
+    Returns:
+        bool: True if the GIL is disabled (free-threaded build of CPython)
+    """
+    return not getattr(sys, "_is_gil_enabled", lambda: True)()
+
+
+def default_workers() -> int:
+    """Get the default number of threads to decode messages.
+
+    Returns:
+        int: Number of CPUs on free-threaded builds, or 1 on builds with the GIL
+    """
+    return (os.cpu_count() or 1) if is_free_threaded() else 1
+
+
+def iter_messages_parallel(
+    path: Union[str, Path],
+    encoding: Optional[str] = None,
+    workers: Optional[int] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    predicate: Optional[RawPredicate] = None,
+    buffer_size: int = DEFAULT_BUFFER_SIZE,
+) -> Iterator[DltMessage]:
+    """Read and decode DLT messages of a file on a thread pool.
+
+    Messages are yielded in the order of the file, the same as DltFileReader.
+    A truncated message at the end of the file is ignored.
+
+    Examples::
+        for message in iter_messages_parallel("path/to/file.dlt"):
+            ...
+
+    Args:
+        path (Union[str, Path]): A path to DLT file
+        encoding (Optional[str], optional): Encoding to decode non-UTF-8 strings.
+                                            Defaults to None.
+        workers (Optional[int], optional): Number of threads to decode messages.
+                                           Messages are decoded in the calling
+                                           thread if it is 1.
+                                           Defaults to None (default_workers()).
+        batch_size (int, optional): Number of messages decoded in a task.
+                                    Defaults to DEFAULT_BATCH_SIZE.
+        predicate (Optional[RawPredicate], optional): A predicate to check
+                                                      data bytes of a message.
+                                                      Messages which do not match
+                                                      are not decoded.
+                                                      Defaults to None.
+        buffer_size (int, optional): Size of data bytes to read at once.
+                                     Defaults to DEFAULT_BUFFER_SIZE.
+
+    Raises:
+        ValueError: It can be caused by invalid data format.
+
+    Yields:
+        Iterator[DltMessage]: Decoded messages
+    """
+    if workers is None:
+        workers = default_workers()
+    with open(str(path), "rb", buffering=0) as file:
+        batches = _iter_batches(file, batch_size, predicate, buffer_size)
+        if workers <= 1:
+            for data, spans in batches:
+                yield from _decode_batch(data, spans, encoding)
+            return
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # decode batches ahead of the consumer by twice the number of threads
+            pending = deque()
+            try:
+                for data, spans in batches:
+                    pending.append(
+                        executor.submit(_decode_batch, data, spans, encoding)
+                    )
+                    if len(pending) >= workers * 2:
+                        yield from pending.popleft().result()
+                while pending:
+                    yield from pending.popleft().result()
+            finally:
+                for future in pending:
+                    future.cancel()
+
+
+def _iter_batches(
+    file: BinaryIO,
+    batch_size: int,
+    predicate: Optional[RawPredicate],
+    buffer_size: int,
+) -> Iterator[Tuple[bytes, List[int]]]:
+    """Split messages of a file into batches.
+
+    Args:
+        file (BinaryIO): A file opened in binary mode
+        batch_size (int): Maximum number of messages in a batch
+        predicate (Optional[RawPredicate]): A predicate to select messages
+        buffer_size (int): Size of data bytes to read at once
+
+    Yields:
+        Iterator[Tuple[bytes, List[int]]]: Data bytes and spans of the messages
+                                           in a batch (a message spans from
+                                           spans[i * 2] to spans[i * 2 + 1])
+    """
+    for chunk in iter_chunks(file, buffer_size):
+        data = chunk.data
+        offsets = chunk.offsets
+        spans = []  # type: List[int]
+        for index in range(len(offsets) - 1):
+            offset = offsets[index]
+            if predicate is not None and not predicate(data, offset):
+                continue
+            spans.append(offset)
+            spans.append(offsets[index + 1])
+            if len(spans) >= batch_size * 2:
+                yield data, spans
+                spans = []
+        if spans:
+            yield data, spans
+
+
+def _decode_batch(
+    data: bytes, spans: List[int], encoding: Optional[str]
+) -> List[DltMessage]:
+    """Decode messages in a batch.
+
+    Args:
+        data (bytes): Data bytes which contain the messages
+        spans (List[int]): Start and end offsets of the messages
+        encoding (Optional[str]): Encoding to decode non-UTF-8 strings
+
+    Returns:
+        List[DltMessage]: Decoded messages
+    """
+    create_from_bytes = DltMessage.create_from_bytes
+    return [
+        create_from_bytes(data[spans[index] : spans[index + 1]], True, encoding)
+        for index in range(0, len(spans), 2)
+    ]
@@ -2,7 +2,7 @@
 import struct
 from abc import ABC, abstractmethod
 from enum import IntEnum
-from typing import List, Optional, Union
+from typing import List, Optional, Union, cast
 
 ###############################################################################
 # Payload of the DLT protocol
@@ -55,6 +55,14 @@ class Payload(ABC):
         """
         raise NotImplementedError
 
+    def _snapshot(self) -> tuple:
+        """Get values of all fields to detect a modification of the payload.
+
+        Returns:
+            tuple: Values of all fields
+        """
+        return (self.__class__, self.to_bytes(False))
+
 
 ###############################################################################
 # Payload: Non-Verbose Mode of the DLT protocol
@@ -150,6 +158,9 @@ class NonVerbosePayload(Payload):
         """
         return f"[{self.message_id}] {self.non_static_data.hex()}"
 
+    def _snapshot(self) -> tuple:
+        return (self.message_id, self.non_static_data, self.msb_first)
+
 
 ###############################################################################
 # Payload: Verbose Mode of the DLT protocol
@@ -402,6 +413,14 @@ class Argument(ABC):
         """
         raise NotImplementedError
 
+    def _snapshot(self) -> tuple:
+        """Get values of all fields to detect a modification of the argument.
+
+        Returns:
+            tuple: Values of all fields
+        """
+        return (self.__class__, self.to_bytes(False))
+
 
 class ArgumentNumBase(Argument):
     """It is a class for number base argument.
@@ -458,6 +477,9 @@ class ArgumentNumBase(Argument):
             raise ValueError("Endian is not known")
         return struct.pack(f"{endian}{self._struct_format()}", self.data)
 
+    def _snapshot(self) -> tuple:
+        return (self.__class__, self.data)
+
 
 class ArgumentBool(ArgumentNumBase):
     @property
@@ -711,6 +733,63 @@ class ArgumentString(ArgumentByteBase):
         self.is_utf8 = is_utf8
         self._encoding = self._encoding_format(is_utf8, encoding)
 
+    @classmethod
+    def _create_from_encoded(
+        cls,
+        data_bytes: bytes,
+        is_utf8: bool,
+        msb_first: Optional[bool] = None,
+        encoding: Optional[str] = None,
+    ) -> "ArgumentString":
+        """Create argument of Type String from encoded bytes of the string.
+
+        The bytes are decoded when data is accessed first.
+
+        Args:
+            data_bytes (bytes): Encoded bytes of the string (without null terminator)
+            is_utf8 (bool): Encoding of the string is UTF-8 if True, or ASCII.
+            msb_first (Optional[bool], optional): If set, Type Info and the length
+                                                  of the string are in big endian,
+                                                  else in little endian.
+                                                  Defaults to None.
+            encoding (Optional[str], optional): custom 8-bit encoding of the bytes.
+                                                Defaults to None.
+
+        Returns:
+            ArgumentString: New ArgumentString object
+        """
+        arg = cls("", is_utf8, msb_first, encoding)
+        arg._data = None
+        arg._data_bytes = data_bytes
+        return arg
+
+    @property
+    def data(self) -> str:
+        """Get a data payload of string.
+
+        Returns:
+            str: A data payload of string, which is decoded when it is accessed first
+                 if the argument is created from data bytes.
+        """
+        return self._decode()
+
+    @data.setter
+    def data(self, data: str) -> None:
+        self._data = data  # type: Optional[str]
+        # encoded bytes of the string, which are given by the data bytes the string
+        # is decoded from, or cached when the string is encoded first
+        self._data_bytes = None  # type: Optional[bytes]
+
+    def _decode(self) -> str:
+        """Decode the encoded bytes of the string unless it is decoded.
+
+        Returns:
+            str: The string
+        """
+        if self._data is None:
+            self._data = cast(bytes, self._data_bytes).decode(self._encoding, "replace")
+        return self._data
+
     def _to_str(self) -> str:
         return self.data
 
@@ -731,20 +810,32 @@ class ArgumentString(ArgumentByteBase):
     ) -> "Argument":
         endian = ">" if msb_first else "<"
         length = struct.unpack(f"{endian}H", data_payload[: cls.LENGTH_SIZE])[0]
-        return cls(
-            data_payload[cls.LENGTH_SIZE : cls.LENGTH_SIZE + length - 1].decode(
-                cls._encoding_format(is_utf8, encoding), "replace"
-            ),
+        return cls._create_from_encoded(
+            bytes(data_payload[cls.LENGTH_SIZE : cls.LENGTH_SIZE + length - 1]),
             is_utf8,
             msb_first,
+            encoding,
         )
 
     @property
     def data_length(self) -> int:
-        return len(self.data.encode(self._encoding, "replace")) + 1
+        return len(self._encoded()) + 1
 
     def data_to_bytes(self) -> bytes:
-        return self.data.encode(self._encoding, "replace") + b"\x00"
+        return self._encoded() + b"\x00"
+
+    def _encoded(self) -> bytes:
+        """Get encoded bytes of the string (without null terminator).
+
+        The string is encoded once and the bytes are reused until data is set.
+
+        Returns:
+            bytes: The bytes which the string is decoded from if it is not modified,
+                   else the string encoded by the encoding
+        """
+        if self._data_bytes is None:
+            self._data_bytes = self.data.encode(self._encoding, "replace")
+        return self._data_bytes
 
     @staticmethod
     def _encoding_format(is_utf8: bool, encoding: str) -> str:
@@ -752,6 +843,9 @@ class ArgumentString(ArgumentByteBase):
             encoding = "ascii"
         return "utf-8" if is_utf8 else encoding
 
+    def _snapshot(self) -> tuple:
+        return (self.__class__, self._encoded(), self.is_utf8, self._encoding)
+
 
 class ArgumentRaw(ArgumentByteBase):
     def __init__(
@@ -773,7 +867,9 @@ class ArgumentRaw(ArgumentByteBase):
     def from_data_payload(cls, data_payload: bytes, msb_first: bool) -> "Argument":
         endian = ">" if msb_first else "<"
         length = struct.unpack(f"{endian}H", data_payload[: cls.LENGTH_SIZE])[0]
-        return cls(data_payload[cls.LENGTH_SIZE : cls.LENGTH_SIZE + length], msb_first)
+        return cls(
+            bytes(data_payload[cls.LENGTH_SIZE : cls.LENGTH_SIZE + length]), msb_first
+        )
 
     @property
     def data_length(self) -> int:
@@ -782,6 +878,9 @@ class ArgumentRaw(ArgumentByteBase):
     def data_to_bytes(self) -> bytes:
         return self.data
 
+    def _snapshot(self) -> tuple:
+        return (self.__class__, self.data)
+
 
 class VerbosePayload(Payload):
     """The Payload of Verbose Mode of a DLT Message."""
@@ -811,6 +910,8 @@ class VerbosePayload(Payload):
             number_of_arguments: number of arguments within this payload data
             encoding: optional non-standard 8-bit string encoding
 
+        Strings of the arguments are decoded when they are accessed.
+
         Raises:
             ValueError: It can be caused by invalid data format.
 
@@ -819,8 +920,10 @@ class VerbosePayload(Payload):
         """
         arguments = []
         offset = 0
+        # arguments are created from views of the data without copying the rest
+        view = memoryview(data)
         for _ in range(number_of_arguments):
-            arg = Argument.create_from_bytes(data[offset:], msb_first, encoding)
+            arg = Argument.create_from_bytes(view[offset:], msb_first, encoding)
             arguments.append(arg)
             offset += arg.bytes_length
         return cls(arguments)
@@ -859,3 +962,6 @@ class VerbosePayload(Payload):
             str: Human readable string.
         """
         return " ".join([str(arg) for arg in self.arguments])
+
+    def _snapshot(self) -> tuple:
+        return tuple([arg._snapshot() for arg in self.arguments])
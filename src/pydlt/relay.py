@@ -0,0 +1,441 @@
+"""Provide asyncio server to relay DLT messages from producers to many clients.
+
+Producers send DLT messages in the wire format (without Storage Header), and
+Storage Header is added to each message when it is received. A message is
+framed once by the header, and the same data bytes are sent to all the clients
+whose filters match the message, without decoding it per client.
+"""
+import asyncio
+import struct
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+
+from pydlt.file import DltFileWriter
+from pydlt.filter import compile_filter
+from pydlt.header import StandardHeader, StorageHeader
+from pydlt.metrics import MessageMetrics, MetricsRegistry
+
+# default port to accept clients (the same as dlt-daemon)
+DEFAULT_CLIENT_PORT = 3490
+
+# default port to accept producers
+DEFAULT_PRODUCER_PORT = 3491
+
+# default maximum number of messages waiting to be sent to a client
+DEFAULT_QUEUE_SIZE = 10000
+
+# default maximum size of a recording file and number of the rotated files
+DEFAULT_RECORD_MAX_SIZE = 64 * 1024 * 1024
+DEFAULT_RECORD_BACKUPS = 5
+
+# command of a client to set the filter, followed by a filter expression
+FILTER_COMMAND = b"filter"
+
+# size of data bytes to read from a producer at once
+_READ_SIZE = 64 * 1024
+
+# maximum length of a command line of a client
+_MAX_COMMAND_LENGTH = 4096
+
+_STORAGE_HEADER_STRUCT = struct.Struct("<4sIi4s")
+
+
+class RelayClient:
+    """A client connected to DltRelay.
+
+    A client can set a filter by sending a line "filter <expression>" in UTF-8,
+    where the expression is the same as compile_filter, and clear it by
+    sending "filter". Messages are sent to the client only if they match
+    the filter. The other data from the client is ignored.
+    """
+
+    def __init__(self, address: Tuple, queue_size: int) -> None:
+        """Create RelayClient object.
+
+        Args:
+            address (Tuple): Address of the client
+            queue_size (int): Maximum number of messages waiting to be sent
+        """
+        self.address = address
+        self.expression = None  # type: Optional[str]
+        self.predicate = None
+        self.filter_error = None  # type: Optional[str]
+        self.sent = 0
+        self.dropped = 0
+        self.queue = asyncio.Queue(queue_size)  # type: asyncio.Queue
+
+    def set_filter(self, expression: Optional[str]) -> None:
+        """Set the filter of the client.
+
+        Args:
+            expression (Optional[str]): A filter expression, or None to clear it
+
+        Raises:
+            ValueError: The expression is invalid.
+        """
+        self.predicate = None if expression is None else compile_filter(expression)
+        self.expression = expression
+
+
+class DltRelay:
+    """An asyncio server to relay DLT messages from producers to many clients.
+
+    Messages are sent to clients without Storage Header by default, in the same
+    way as the client port of dlt-daemon. If the queue of a client is full
+    because the client reads slowly, messages to the client are dropped and
+    counted by RelayClient.dropped.
+
+    Examples::
+        async def main():
+            relay = DltRelay(record_path="path/to/record.dlt")
+            await relay.start()
+            # relay messages from an ECU in addition to accepted producers
+            await relay.connect("192.168.0.2", 3490)
+            await relay.close()
+    """
+
+    def __init__(
+        self,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        ecu_id: str = "",
+        client_storage_header: bool = False,
+        record_path: Optional[Union[str, Path]] = None,
+        record_max_size: int = DEFAULT_RECORD_MAX_SIZE,
+        record_backups: int = DEFAULT_RECORD_BACKUPS,
+        registry: Optional[MetricsRegistry] = None,
+    ) -> None:
+        """Create DltRelay object.
+
+        Args:
+            queue_size (int, optional): Maximum number of messages waiting to be
+                                        sent to a client.
+                                        Defaults to DEFAULT_QUEUE_SIZE.
+            ecu_id (str, optional): ECU ID in Storage Header of messages which
+                                    do not have ECU ID. Defaults to "".
+            client_storage_header (bool, optional): Messages are sent to clients
+                                                    with Storage Header if True.
+                                                    Defaults to False.
+            record_path (Optional[Union[str, Path]], optional): A path to DLT file
+                                                                to record all
+                                                                messages.
+                                                                Defaults to None.
+            record_max_size (int, optional): Maximum size of the recording file,
+                                             which is rotated when exceeded.
+                                             Defaults to DEFAULT_RECORD_MAX_SIZE.
+            record_backups (int, optional): Number of the rotated files to keep.
+                                            Defaults to DEFAULT_RECORD_BACKUPS.
+            registry (Optional[MetricsRegistry], optional): A registry to add
+                                                            metrics of messages,
+                                                            clients and queues.
+                                                            Defaults to None.
+        """
+        self.queue_size = queue_size
+        self.client_storage_header = client_storage_header
+        self.received = 0
+        self.dropped = 0
+        self._ecu_id = ecu_id.encode("ascii", "replace")
+        self._clients = []  # type: List[RelayClient]
+        self._writers = []  # type: List[asyncio.StreamWriter]
+        # tasks to send messages to the clients, which are running or cancelled
+        self._senders = set()  # type: set
+        self._servers = []  # type: List[asyncio.AbstractServer]
+        self._recorder = None  # type: Optional[_RotatingRecorder]
+        if record_path is not None:
+            self._recorder = _RotatingRecorder(
+                Path(record_path), record_max_size, record_backups
+            )
+        self._metrics = None  # type: Optional[MessageMetrics]
+        if registry is not None:
+            self._register_metrics(registry)
+
+    @property
+    def clients(self) -> List[RelayClient]:
+        """Get the connected clients.
+
+        Returns:
+            List[RelayClient]: The clients
+        """
+        return list(self._clients)
+
+    @property
+    def addresses(self) -> List[Tuple]:
+        """Get addresses of the servers to accept producers and clients.
+
+        Returns:
+            List[Tuple]: Addresses of the producer server and the client server
+        """
+        return [server.sockets[0].getsockname() for server in self._servers]
+
+    async def start(
+        self,
+        host: str = "127.0.0.1",
+        producer_port: int = DEFAULT_PRODUCER_PORT,
+        client_port: int = DEFAULT_CLIENT_PORT,
+    ) -> None:
+        """Start to accept producers and clients.
+
+        Args:
+            host (str, optional): Host to listen. Defaults to "127.0.0.1".
+            producer_port (int, optional): Port to accept producers.
+                                           Defaults to DEFAULT_PRODUCER_PORT.
+            client_port (int, optional): Port to accept clients.
+                                         Defaults to DEFAULT_CLIENT_PORT.
+        """
+        self._servers.append(
+            await asyncio.start_server(self._accept_producer, host, producer_port)
+        )
+        self._servers.append(
+            await asyncio.start_server(self._handle_client, host, client_port)
+        )
+
+    async def connect(self, host: str, port: int) -> None:
+        """Connect to a producer (e.g. dlt-daemon) and relay messages from it.
+
+        Args:
+            host (str): Host of the producer
+            port (int): Port of the producer
+
+        Raises:
+            ValueError: The producer sent invalid data.
+        """
+        reader, writer = await asyncio.open_connection(host, port)
+        await self._handle_producer(reader, writer)
+
+    async def close(self) -> None:
+        """Stop the servers, disconnect all connections and close the recording."""
+        for server in self._servers:
+            server.close()
+        for server in self._servers:
+            await server.wait_closed()
+        self._servers = []
+        for writer in self._writers:
+            writer.close()
+        senders = list(self._senders)
+        for sender in senders:
+            sender.cancel()
+        await asyncio.gather(*senders, return_exceptions=True)
+        # let handlers of the connections finish
+        await asyncio.sleep(0)
+        if self._recorder is not None:
+            self._recorder.close()
+
+    def dispatch(self, data: bytes) -> None:
+        """Add Storage Header to a message and relay it to the clients.
+
+        Args:
+            data (bytes): Data bytes of a message without Storage Header
+        """
+        now = time.time()
+        seconds = int(now)
+        ecu_id = self._ecu_id
+        if data[0] & StandardHeader.WITH_ECU_ID_MASK:
+            ecu_id = data[4:8]
+        message = (
+            _STORAGE_HEADER_STRUCT.pack(
+                StorageHeader.DLT_PATTERN,
+                seconds,
+                int((now - seconds) * 1000000),
+                ecu_id,
+            )
+            + data
+        )
+        self.received += 1
+        if self._metrics is not None:
+            self._metrics.observe(message)
+        if self._recorder is not None:
+            self._recorder.write(message)
+        sent_data = message if self.client_storage_header else data
+        for client in self._clients:
+            if client.predicate is not None and not client.predicate(message, 0):
+                continue
+            try:
+                client.queue.put_nowait(sent_data)
+            except asyncio.QueueFull:
+                client.dropped += 1
+                self.dropped += 1
+
+    async def _accept_producer(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Read messages from an accepted producer until it is disconnected.
+
+        The producer is disconnected if it sends invalid data.
+        """
+        try:
+            await self._handle_producer(reader, writer)
+        except (ConnectionError, ValueError):
+            pass
+
+    async def _handle_producer(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Read messages from a producer until it is disconnected.
+
+        Raises:
+            ValueError: The producer sent invalid data.
+        """
+        self._writers.append(writer)
+        pending = b""
+        try:
+            while True:
+                block = await reader.read(_READ_SIZE)
+                if not block:
+                    return
+                data = pending + block if pending else block
+                offset = 0
+                while len(data) - offset >= StandardHeader.DATA_MIN_LENGTH:
+                    length = struct.unpack_from(">H", data, offset + 2)[0]
+                    if length < StandardHeader.DATA_MIN_LENGTH:
+                        raise ValueError(
+                            f"Unexpected length of the message: {length} / "
+                            f"it must be {StandardHeader.DATA_MIN_LENGTH} or more"
+                        )
+                    end = offset + length
+                    if end > len(data):
+                        break
+                    self.dispatch(data[offset:end])
+                    offset = end
+                pending = data[offset:]
+                if self._metrics is not None:
+                    # messages are counted by the registry for each block
+                    self._metrics.flush()
+        except ValueError:
+            if self._metrics is not None:
+                self._metrics.observe_error()
+                self._metrics.flush()
+            raise
+        finally:
+            self._writers.remove(writer)
+            writer.close()
+
+    async def _handle_client(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Send messages to a client and read commands until it is disconnected."""
+        client = RelayClient(writer.get_extra_info("peername"), self.queue_size)
+        self._writers.append(writer)
+        self._clients.append(client)
+        sender = asyncio.ensure_future(self._send(client, writer))
+        self._senders.add(sender)
+        sender.add_done_callback(self._senders.discard)
+        pending = b""
+        try:
+            while True:
+                block = await reader.read(_MAX_COMMAND_LENGTH)
+                if not block:
+                    return
+                lines = (pending + block).split(b"\n")
+                pending = lines.pop()[-_MAX_COMMAND_LENGTH:]
+                for line in lines:
+                    self._run_command(client, line.strip())
+        except ConnectionError:
+            return
+        finally:
+            self._clients.remove(client)
+            self._writers.remove(writer)
+            sender.cancel()
+            writer.close()
+
+    async def _send(self, client: RelayClient, writer: asyncio.StreamWriter) -> None:
+        """Send messages in the queue of a client.
+
+        Args:
+            client (RelayClient): The client
+            writer (asyncio.StreamWriter): A writer of the connection to the client
+        """
+        queue = client.queue
+        try:
+            while True:
+                messages = [await queue.get()]
+                while not queue.empty():
+                    messages.append(queue.get_nowait())
+                writer.write(b"".join(messages))
+                client.sent += len(messages)
+                await writer.drain()
+        except ConnectionError:
+            writer.close()
+
+    def _register_metrics(self, registry: MetricsRegistry) -> None:
+        """Register metrics of the relay, which are read when rendered.
+
+        Args:
+            registry (MetricsRegistry): A registry
+        """
+        self._metrics = MessageMetrics(registry)
+        registry.gauge(
+            "pydlt_relay_clients", "Number of clients connected to the relay"
+        ).set_function(lambda: {(): len(self._clients)})
+        registry.gauge(
+            "pydlt_relay_queue_depth",
+            "Number of messages waiting to be sent to a client",
+            ("client",),
+        ).set_function(
+            lambda: {
+                (":".join([str(item) for item in client.address[:2]]),): (
+                    client.queue.qsize()
+                )
+                for client in self._clients
+            }
+        )
+        registry.counter(
+            "pydlt_relay_received_total", "Number of messages received by the relay"
+        ).set_function(lambda: {(): self.received})
+        registry.counter(
+            "pydlt_relay_dropped_total",
+            "Number of messages dropped because the queue of a client is full",
+        ).set_function(lambda: {(): self.dropped})
+
+    def _run_command(self, client: RelayClient, line: bytes) -> None:
+        """Run a command from a client.
+
+        Args:
+            client (RelayClient): The client
+            line (bytes): A line of the command
+        """
+        if line != FILTER_COMMAND and not line.startswith(FILTER_COMMAND + b" "):
+            return
+        expression = line[len(FILTER_COMMAND) :].decode("utf-8", "replace").strip()
+        try:
+            client.set_filter(expression if expression else None)
+            client.filter_error = None
+        except ValueError as e:
+            client.filter_error = str(e)
+
+
+class _RotatingRecorder:
+    """A writer of DLT file which is rotated by size.
+
+    When the size exceeds the maximum, "name.dlt" is renamed to "name.1.dlt",
+    "name.1.dlt" to "name.2.dlt" and so on, and the oldest one is removed.
+    """
+
+    def __init__(self, path: Path, max_size: int, backups: int) -> None:
+        self.path = path
+        self.max_size = max_size
+        self.backups = backups
+        self._writer = DltFileWriter(path, append=True)
+        self._size = path.stat().st_size
+
+    def write(self, data: bytes) -> None:
+        if self._size > 0 and self._size + len(data) > self.max_size:
+            self._rotate()
+        self._writer.write_bytes(data)
+        self._size += len(data)
+
+    def close(self) -> None:
+        self._writer.close()
+
+    def _rotate(self) -> None:
+        self._writer.close()
+        if self.backups > 0:
+            for index in range(self.backups - 1, 0, -1):
+                source = self._backup_path(index)
+                if source.exists():
+                    source.replace(self._backup_path(index + 1))
+            self.path.replace(self._backup_path(1))
+        self._writer = DltFileWriter(self.path)
+        self._size = 0
+
+    def _backup_path(self, index: int) -> Path:
+        return self.path.with_name(f"{self.path.stem}.{index}{self.path.suffix}")
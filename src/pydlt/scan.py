@@ -0,0 +1,476 @@
+"""Provide functions to scan DLT file without decoding DLT messages.
+
+The functions in the module handle data bytes of DLT messages with Storage Header,
+which is the format of DLT file.
+Each field of the headers can be read directly from the data bytes with the offset
+tables defined in the module, without creating any object of the headers.
+"""
+import struct
+from pathlib import Path
+from typing import Any, BinaryIO, Iterator, List, NamedTuple, Tuple, Union
+
+from pydlt.header import ExtendedHeader, StandardHeader, StorageHeader
+
+# default size of a buffer to read/write a file
+DEFAULT_BUFFER_SIZE = 1024 * 1024
+
+# minimum length of a message which is required to get the length of the message
+_MESSAGE_MIN_LENGTH = StorageHeader.DATA_LENGTH + StandardHeader.DATA_MIN_LENGTH
+
+# offsets of the fields in Storage Header
+STORAGE_SECONDS_OFFSET = 4
+STORAGE_MICROSECONDS_OFFSET = 8
+STORAGE_ECU_ID_OFFSET = 12
+
+# offsets of the fields in Standard Header (from the beginning of Storage Header)
+HEADER_TYPE_OFFSET = StorageHeader.DATA_LENGTH
+MESSAGE_COUNTER_OFFSET = HEADER_TYPE_OFFSET + 1
+LENGTH_OFFSET = HEADER_TYPE_OFFSET + 2
+
+
+def _optional_field_offset(header_type: int, mask: int) -> int:
+    """Get offset of an optional field in Standard Header.
+
+    Args:
+        header_type (int): Header Type of Standard Header
+        mask (int): A bit mask of the field in Header Type
+
+    Returns:
+        int: Offset of the field from the beginning of Storage Header,
+             or -1 if the field does not exist.
+    """
+    if not header_type & mask:
+        return -1
+    offset = StorageHeader.DATA_LENGTH + StandardHeader.DATA_MIN_LENGTH
+    for field_mask in (
+        StandardHeader.WITH_ECU_ID_MASK,
+        StandardHeader.WITH_SESSION_ID_MASK,
+        StandardHeader.WITH_TIMESTAMP_MASK,
+    ):
+        if field_mask == mask:
+            break
+        if header_type & field_mask:
+            offset += 4
+    return offset
+
+
+def _extended_header_offset(header_type: int) -> int:
+    """Get offset of Extended Header.
+
+    Args:
+        header_type (int): Header Type of Standard Header
+
+    Returns:
+        int: Offset of Extended Header from the beginning of Storage Header,
+             or -1 if Extended Header does not exist.
+    """
+    if not header_type & StandardHeader.USE_EXTENDED_HEADER_MASK:
+        return -1
+    offset = StorageHeader.DATA_LENGTH + StandardHeader.DATA_MIN_LENGTH
+    for field_mask in (
+        StandardHeader.WITH_ECU_ID_MASK,
+        StandardHeader.WITH_SESSION_ID_MASK,
+        StandardHeader.WITH_TIMESTAMP_MASK,
+    ):
+        if header_type & field_mask:
+            offset += 4
+    return offset
+
+
+def _payload_offset(header_type: int) -> int:
+    """Get offset of the payload.
+
+    Args:
+        header_type (int): Header Type of Standard Header
+
+    Returns:
+        int: Offset of the payload from the beginning of Storage Header
+    """
+    ext_offset = _extended_header_offset(header_type)
+    if ext_offset >= 0:
+        return ext_offset + ExtendedHeader.DATA_LENGTH
+    offset = StorageHeader.DATA_LENGTH + StandardHeader.DATA_MIN_LENGTH
+    for field_mask in (
+        StandardHeader.WITH_ECU_ID_MASK,
+        StandardHeader.WITH_SESSION_ID_MASK,
+        StandardHeader.WITH_TIMESTAMP_MASK,
+    ):
+        if header_type & field_mask:
+            offset += 4
+    return offset
+
+
+# offset tables indexed by Header Type of Standard Header
+# An offset is from the beginning of Storage Header, or -1 if the field does not exist.
+ECU_ID_OFFSETS = tuple(
+    _optional_field_offset(htyp, StandardHeader.WITH_ECU_ID_MASK) for htyp in range(256)
+)
+SESSION_ID_OFFSETS = tuple(
+    _optional_field_offset(htyp, StandardHeader.WITH_SESSION_ID_MASK)
+    for htyp in range(256)
+)
+TIMESTAMP_OFFSETS = tuple(
+    _optional_field_offset(htyp, StandardHeader.WITH_TIMESTAMP_MASK)
+    for htyp in range(256)
+)
+EXTENDED_HEADER_OFFSETS = tuple(_extended_header_offset(htyp) for htyp in range(256))
+PAYLOAD_OFFSETS = tuple(_payload_offset(htyp) for htyp in range(256))
+
+# offset table of ECU ID which is shown as ECU ID of a message:
+# ECU ID in Standard Header if exists, or ECU ID in Storage Header.
+MESSAGE_ECU_ID_OFFSETS = tuple(
+    STORAGE_ECU_ID_OFFSET if offset < 0 else offset for offset in ECU_ID_OFFSETS
+)
+
+# offsets of the fields in Extended Header (from the beginning of Extended Header)
+MESSAGE_INFO_OFFSET = 0
+NUMBER_OF_ARGUMENTS_OFFSET = 1
+APPLICATION_ID_OFFSET = 2
+CONTEXT_ID_OFFSET = 6
+
+
+def is_verbose(data: bytes, offset: int = 0) -> bool:
+    """Check a message in data bytes is verbose mode without decoding it.
+
+    Args:
+        data (bytes): Data bytes which contain the message
+        offset (int, optional): Offset of the message (Storage Header) in the data.
+                                Defaults to 0.
+
+    Returns:
+        bool: True if the message has Extended Header of verbose mode
+    """
+    ext_offset = EXTENDED_HEADER_OFFSETS[data[offset + HEADER_TYPE_OFFSET]]
+    return ext_offset >= 0 and bool(
+        data[offset + ext_offset + MESSAGE_INFO_OFFSET] & ExtendedHeader.VERBOSE_MASK
+    )
+
+
+class Chunk(NamedTuple):
+    """A chunk of data bytes which contains DLT messages.
+
+    The message i is data[offsets[i] : offsets[i + 1]].
+    The last item of offsets is the end of the last message.
+    """
+
+    position: int  # position of the data in the file
+    data: bytes  # data bytes of the chunk
+    offsets: List[int]  # offsets of the messages in the data
+
+
+def iter_chunks(
+    stream: BinaryIO, buffer_size: int = DEFAULT_BUFFER_SIZE, position: int = 0
+) -> Iterator[Chunk]:
+    """Read chunks of data bytes which contain complete DLT messages from stream.
+
+    Incomplete message at the end of stream is ignored.
+
+    Args:
+        stream (BinaryIO): A stream to read data bytes of DLT file
+        buffer_size (int, optional): Size of data bytes to read at once.
+                                     Defaults to DEFAULT_BUFFER_SIZE.
+        position (int, optional): Position of the stream at the beginning.
+                                  Defaults to 0.
+
+    Raises:
+        ValueError: DLT-Pattern of Storage Header is not found in the data.
+
+    Yields:
+        Iterator[Chunk]: Chunks of the messages
+    """
+    unpack_length = struct.Struct(">H").unpack_from
+    dlt_pattern = StorageHeader.DLT_PATTERN
+    pending = b""
+    while True:
+        block = stream.read(buffer_size)
+        if not block:
+            return
+        data = pending + block if pending else block
+        data_length = len(data)
+        offsets = []
+        offset = 0
+        while offset + _MESSAGE_MIN_LENGTH <= data_length:
+            if not data.startswith(dlt_pattern, offset):
+                raise ValueError(
+                    f"DLT-Pattern is not found at position {position + offset} / "
+                    f"Beginning of Storage Header must be {dlt_pattern}"
+                )
+            length = unpack_length(data, offset + LENGTH_OFFSET)[0]
+            if length < StandardHeader.DATA_MIN_LENGTH:
+                raise ValueError(
+                    f"Unexpected length of the message: {length} at position "
+                    f"{position + offset} / "
+                    f"it must be {StandardHeader.DATA_MIN_LENGTH} or more"
+                )
+            end = offset + StorageHeader.DATA_LENGTH + length
+            if end > data_length:
+                break
+            offsets.append(offset)
+            offset = end
+        if offsets:
+            offsets.append(offset)
+            yield Chunk(position, data, offsets)
+        pending = data[offset:]
+        position += offset
+
+
+def encode_id(id: str) -> bytes:
+    """Encode ID (e.g. ECU ID, Application ID) to 4 bytes data in a header.
+
+    Args:
+        id (str): ID of 4 characters or less
+
+    Returns:
+        bytes: Data bytes of the ID padded with NUL
+    """
+    return id.encode("ascii", "replace")[:4].ljust(4, b"\x00")
+
+
+def _import_numpy() -> Any:
+    """Import NumPy which is an optional dependency of the library.
+
+    Raises:
+        ImportError: NumPy is not installed.
+
+    Returns:
+        Any: numpy module
+    """
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError(
+            "NumPy is required for the function; install it by "
+            '"pip install numpy" or "pip install pydlt[numpy]"'
+        )
+    return numpy
+
+
+class HeaderTable:
+    """Columns of header fields of DLT messages in DLT file.
+
+    Each attribute is a NumPy array whose item i is a field of the message i.
+
+    Attributes:
+        position: Position of the message in the file (int64)
+        length: Length of the message including Storage Header (int64)
+        seconds: Seconds in Storage Header (int64)
+        microseconds: Microseconds in Storage Header (int64)
+        header_type: Header Type in Standard Header (uint8)
+        message_counter: Message Counter in Standard Header (uint8)
+        ecu_id: ECU ID in Standard Header if exists, or ECU ID in Storage Header
+                (S4; trailing NUL characters are removed when it is read)
+        session_id: Session ID in Standard Header, or -1 if not exists (int64)
+        timestamp: Timestamp in Standard Header, or -1 if not exists (int64)
+        message_info: Message Info in Extended Header, or 0 if not exists (uint8)
+        number_of_arguments: Number of arguments in Extended Header,
+                             or 0 if not exists (uint8)
+        application_id: Application ID in Extended Header,
+                        or empty if not exists (S4)
+        context_id: Context ID in Extended Header, or empty if not exists (S4)
+    """
+
+    COLUMNS = (
+        "position",
+        "length",
+        "seconds",
+        "microseconds",
+        "header_type",
+        "message_counter",
+        "ecu_id",
+        "session_id",
+        "timestamp",
+        "message_info",
+        "number_of_arguments",
+        "application_id",
+        "context_id",
+    )
+
+    def __init__(self, **columns: Any) -> None:
+        """Create HeaderTable object.
+
+        In most cases, the constructor do not have to be called directly.
+        scan_headers() can be used instead of it.
+
+        Args:
+            columns (Any): NumPy arrays of all columns in COLUMNS
+        """
+        for name in self.COLUMNS:
+            setattr(self, name, columns[name])
+
+    def __len__(self) -> int:
+        return len(self.position)
+
+    @property
+    def time(self) -> Any:
+        """Get time in Storage Header as seconds since epoch (float64).
+
+        Returns:
+            Any: NumPy array of the time
+        """
+        return self.seconds + self.microseconds * 1e-6
+
+    @property
+    def with_extended_header(self) -> Any:
+        """Get whether the message has Extended Header (bool).
+
+        Returns:
+            Any: NumPy array of the flags
+        """
+        return (self.header_type & StandardHeader.USE_EXTENDED_HEADER_MASK) != 0
+
+    @property
+    def message_type(self) -> Any:
+        """Get Message Type in Extended Header, or 0 if not exists (uint8).
+
+        Returns:
+            Any: NumPy array of Message Type
+        """
+        return (self.message_info & 0b00001110) >> 1
+
+    @property
+    def message_type_info(self) -> Any:
+        """Get Message Type Info in Extended Header, or 0 if not exists (uint8).
+
+        Returns:
+            Any: NumPy array of Message Type Info
+        """
+        return self.message_info >> 4
+
+    @property
+    def verbose(self) -> Any:
+        """Get whether the message is verbose mode (bool).
+
+        Returns:
+            Any: NumPy array of the flags
+        """
+        return (self.message_info & 0b00000001) != 0
+
+    @classmethod
+    def concatenate(cls, tables: List["HeaderTable"]) -> "HeaderTable":
+        """Concatenate tables into a table.
+
+        Args:
+            tables (List[HeaderTable]): Tables to concatenate
+
+        Returns:
+            HeaderTable: New HeaderTable object
+        """
+        np = _import_numpy()
+        if not tables:
+            return cls._create_empty()
+        return cls(
+            **{
+                name: np.concatenate([getattr(table, name) for table in tables])
+                for name in cls.COLUMNS
+            }
+        )
+
+    @classmethod
+    def _create_empty(cls) -> "HeaderTable":
+        np = _import_numpy()
+        columns = {name: np.zeros(0, dtype="int64") for name in cls.COLUMNS}
+        for name in (
+            "header_type",
+            "message_counter",
+            "message_info",
+            "number_of_arguments",
+        ):
+            columns[name] = np.zeros(0, dtype="uint8")
+        for name in ("ecu_id", "application_id", "context_id"):
+            columns[name] = np.zeros(0, dtype="S4")
+        return cls(**columns)
+
+    @classmethod
+    def create_from_chunk(cls, chunk: Chunk) -> "HeaderTable":
+        """Create HeaderTable object from a chunk of DLT messages.
+
+        Args:
+            chunk (Chunk): A chunk of DLT messages
+
+        Returns:
+            HeaderTable: New HeaderTable object
+        """
+        np = _import_numpy()
+        data = np.frombuffer(chunk.data, dtype="uint8")
+        offsets = np.asarray(chunk.offsets, dtype="int64")
+        starts = offsets[:-1]
+
+        def gather(field_offsets: Any, size: int) -> Any:
+            # bytes of a field of each message as 2-dimensional array
+            # (indexes are clipped not to exceed the data of a broken message)
+            indexes = np.minimum(
+                field_offsets[:, None] + np.arange(size), len(data) - 1
+            )
+            return data[indexes]
+
+        def table(values: Tuple[int, ...]) -> Any:
+            return np.asarray(values, dtype="int64")
+
+        header_type = data[starts + HEADER_TYPE_OFFSET]
+        session_id_offsets = table(SESSION_ID_OFFSETS)[header_type]
+        timestamp_offsets = table(TIMESTAMP_OFFSETS)[header_type]
+        ext_offsets = table(EXTENDED_HEADER_OFFSETS)[header_type]
+        with_session_id = session_id_offsets >= 0
+        with_timestamp = timestamp_offsets >= 0
+        with_ext = ext_offsets >= 0
+        # offsets of not existing fields are replaced with a valid offset
+        session_id = gather(starts + np.maximum(session_id_offsets, 0), 4)
+        timestamp = gather(starts + np.maximum(timestamp_offsets, 0), 4)
+        ext_starts = starts + np.where(with_ext, ext_offsets, 0)
+        ext = gather(ext_starts, ExtendedHeader.DATA_LENGTH)
+        ext[~with_ext] = 0
+        storage_time = gather(starts + STORAGE_SECONDS_OFFSET, 8)
+        ecu_id = gather(starts + table(MESSAGE_ECU_ID_OFFSETS)[header_type], 4)
+
+        return cls(
+            position=starts + chunk.position,
+            length=offsets[1:] - starts,
+            seconds=storage_time[:, :4].copy().view("<u4")[:, 0].astype("int64"),
+            microseconds=storage_time[:, 4:].copy().view("<i4")[:, 0].astype("int64"),
+            header_type=header_type,
+            message_counter=data[starts + MESSAGE_COUNTER_OFFSET],
+            ecu_id=ecu_id.view("S4")[:, 0],
+            session_id=np.where(
+                with_session_id, session_id.view(">u4")[:, 0].astype("int64"), -1
+            ),
+            timestamp=np.where(
+                with_timestamp, timestamp.view(">u4")[:, 0].astype("int64"), -1
+            ),
+            message_info=ext[:, MESSAGE_INFO_OFFSET],
+            number_of_arguments=ext[:, NUMBER_OF_ARGUMENTS_OFFSET],
+            application_id=ext[:, APPLICATION_ID_OFFSET : APPLICATION_ID_OFFSET + 4]
+            .copy()
+            .view("S4")[:, 0],
+            context_id=ext[:, CONTEXT_ID_OFFSET : CONTEXT_ID_OFFSET + 4]
+            .copy()
+            .view("S4")[:, 0],
+        )
+
+
+def scan_headers(
+    path: Union[str, Path], buffer_size: int = DEFAULT_BUFFER_SIZE
+) -> HeaderTable:
+    """Scan headers of all DLT messages in DLT file without decoding the messages.
+
+    NumPy is required for the function.
+
+    Args:
+        path (Union[str, Path]): A path to DLT file
+        buffer_size (int, optional): Size of data bytes to read at once.
+                                     Defaults to DEFAULT_BUFFER_SIZE.
+
+    Raises:
+        ImportError: NumPy is not installed.
+        ValueError: It can be caused by invalid data format.
+
+    Returns:
+        HeaderTable: Columns of header fields of the messages
+    """
+    _import_numpy()
+    with open(str(path), "rb", buffering=0) as stream:
+        return HeaderTable.concatenate(
+            [
+                HeaderTable.create_from_chunk(chunk)
+                for chunk in iter_chunks(stream, buffer_size)
+            ]
+        )
@@ -0,0 +1,184 @@
+"""Provide function to sort DLT messages in DLT file with bounded memory."""
+import heapq
+import struct
+import tempfile
+from operator import itemgetter
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Iterator, List, Tuple, Union
+
+from pydlt.scan import (
+    DEFAULT_BUFFER_SIZE,
+    HEADER_TYPE_OFFSET,
+    MESSAGE_COUNTER_OFFSET,
+    STORAGE_SECONDS_OFFSET,
+    TIMESTAMP_OFFSETS,
+    iter_chunks,
+)
+
+# a function to get a sort key from the message at the offset in the data bytes
+SortKey = Callable[[bytes, int], Any]
+
+# default upper limit of memory to hold messages
+DEFAULT_MEMORY_LIMIT = 64 * 1024 * 1024
+
+# estimated memory size to hold a sort entry of a message except data bytes
+_ENTRY_SIZE = 200
+
+# minimum size of buffers to read/write files
+_MIN_BUFFER_SIZE = 64 * 1024
+
+_unpack_storage_time = struct.Struct("<Ii").unpack_from
+_unpack_timestamp = struct.Struct(">I").unpack_from
+
+
+def default_sort_key(data: bytes, offset: int) -> Tuple[int, int, int, int]:
+    """Get sort key by time of a message.
+
+    The key is (seconds, microseconds) in Storage Header, Timestamp and
+    Message Counter in Standard Header. Timestamp is -1 if it does not exist.
+
+    Args:
+        data (bytes): Data bytes which contain the message
+        offset (int): Offset of the message (from the beginning of Storage Header)
+
+    Returns:
+        Tuple[int, int, int, int]: Sort key
+    """
+    seconds, microseconds = _unpack_storage_time(data, offset + STORAGE_SECONDS_OFFSET)
+    timestamp_offset = TIMESTAMP_OFFSETS[data[offset + HEADER_TYPE_OFFSET]]
+    timestamp = (
+        -1
+        if timestamp_offset < 0
+        else _unpack_timestamp(data, offset + timestamp_offset)[0]
+    )
+    return (seconds, microseconds, timestamp, data[offset + MESSAGE_COUNTER_OFFSET])
+
+
+def sort_file(
+    src_path: Union[str, Path],
+    dst_path: Union[str, Path],
+    key: SortKey = default_sort_key,
+    memory_limit: int = DEFAULT_MEMORY_LIMIT,
+    temp_dir: Union[str, Path, None] = None,
+    buffer_size: int = DEFAULT_BUFFER_SIZE,
+) -> int:
+    """Sort DLT messages in a file and write them to another file.
+
+    Messages are sorted by the key in runs which fit in memory_limit.
+    Each run is sorted by sorting keys and offsets of the messages and written to
+    a temporary file as data bytes of the messages, then all runs are merged.
+    The messages are not decoded and data bytes of them are copied as is.
+    The sort is stable; messages with an equal key keep the order in the file.
+
+    Args:
+        src_path (Union[str, Path]): A path to DLT file to read
+        dst_path (Union[str, Path]): A path to DLT file to write
+        key (SortKey, optional): A function to get sort key from data bytes and
+                                 offset of a message. Defaults to default_sort_key.
+        memory_limit (int, optional): Approximate upper limit of memory in bytes
+                                      to hold messages.
+                                      Defaults to DEFAULT_MEMORY_LIMIT.
+        temp_dir (Union[str, Path, None], optional): A directory to create
+                                                     temporary files.
+                                                     Defaults to None (system's).
+        buffer_size (int, optional): Size of buffers to read/write files.
+                                     Defaults to DEFAULT_BUFFER_SIZE.
+
+    Raises:
+        ValueError: It can be caused by invalid data format.
+
+    Returns:
+        int: Number of the sorted messages
+    """
+    count = 0
+    buffer_size = min(buffer_size, max(memory_limit, _MIN_BUFFER_SIZE))
+    with tempfile.TemporaryDirectory(
+        dir=None if temp_dir is None else str(temp_dir)
+    ) as run_dir:
+        run_paths = []
+        # sort entries of messages: (key, data, start, end)
+        entries = []  # type: List[Tuple[Any, bytes, int, int]]
+        memory_size = 0
+        with open(str(src_path), "rb", buffering=0) as src:
+            for chunk in iter_chunks(src, buffer_size):
+                data = chunk.data
+                offsets = chunk.offsets
+                for index in range(len(offsets) - 1):
+                    offset = offsets[index]
+                    entries.append(
+                        (key(data, offset), data, offset, offsets[index + 1])
+                    )
+                count += len(offsets) - 1
+                memory_size += len(data) + _ENTRY_SIZE * (len(offsets) - 1)
+                if memory_size >= memory_limit:
+                    run_path = Path(run_dir) / f"{len(run_paths)}.dlt"
+                    with open(str(run_path), "wb", buffering=buffer_size) as run:
+                        _write_sorted_entries(run, entries)
+                    run_paths.append(run_path)
+                    entries = []
+                    memory_size = 0
+
+        with open(str(dst_path), "wb", buffering=buffer_size) as dst:
+            if not run_paths:
+                _write_sorted_entries(dst, entries)
+                return count
+            if entries:
+                run_path = Path(run_dir) / f"{len(run_paths)}.dlt"
+                with open(str(run_path), "wb", buffering=buffer_size) as run:
+                    _write_sorted_entries(run, entries)
+                run_paths.append(run_path)
+                entries = []
+            run_buffer_size = max(
+                memory_limit // (len(run_paths) + 1), _MIN_BUFFER_SIZE
+            )
+            runs = [open(str(path), "rb", buffering=0) for path in run_paths]
+            try:
+                for _, message in heapq.merge(
+                    *[_iter_run(run, key, run_buffer_size) for run in runs],
+                    key=itemgetter(0),
+                ):
+                    dst.write(message)
+            finally:
+                for run in runs:
+                    run.close()
+    return count
+
+
+def _write_sorted_entries(
+    stream: BinaryIO, entries: List[Tuple[Any, bytes, int, int]]
+) -> None:
+    """Sort entries of messages by the key and write the messages to stream.
+
+    Args:
+        stream (BinaryIO): A stream to write the messages
+        entries (List[Tuple[Any, bytes, int, int]]): Entries of the messages
+    """
+    entries.sort(key=itemgetter(0))
+    views = {}
+    for _, data, start, end in entries:
+        view = views.get(id(data))
+        if view is None:
+            view = views[id(data)] = memoryview(data)
+        stream.write(view[start:end])
+
+
+def _iter_run(
+    stream: BinaryIO, key: SortKey, buffer_size: int
+) -> Iterator[Tuple[Any, memoryview]]:
+    """Read messages in a sorted run.
+
+    Args:
+        stream (BinaryIO): A stream of the run
+        key (SortKey): A function to get sort key
+        buffer_size (int): Size of data bytes to read at once
+
+    Yields:
+        Iterator[Tuple[Any, memoryview]]: Sort keys and data bytes of the messages
+    """
+    for chunk in iter_chunks(stream, buffer_size):
+        data = chunk.data
+        view = memoryview(data)
+        offsets = chunk.offsets
+        for index in range(len(offsets) - 1):
+            offset = offsets[index]
+            yield key(data, offset), view[offset : offsets[index + 1]]
@@ -0,0 +1,373 @@
+"""Provide export of DLT messages to SQLite database and query of them.
+
+The database holds header fields and decoded arguments of messages with
+positions of them in DLT files, and the messages are read from the files again
+by the positions when they are queried.
+"""
+import sqlite3
+from pathlib import Path
+from typing import (
+    Any,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+    cast,
+)
+
+from pydlt.file import DltFileReader
+from pydlt.header import MessageType, StorageHeader
+from pydlt.message import DltMessage
+from pydlt.payload import Argument, NonVerbosePayload, VerbosePayload
+
+# default number of messages inserted in a transaction
+DEFAULT_BATCH_SIZE = 10000
+
+_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS files (
+        id INTEGER PRIMARY KEY,
+        path TEXT NOT NULL UNIQUE
+    )""",
+    """CREATE TABLE IF NOT EXISTS messages (
+        id INTEGER PRIMARY KEY,
+        file_id INTEGER NOT NULL REFERENCES files (id),
+        position INTEGER NOT NULL,
+        length INTEGER NOT NULL,
+        time INTEGER,
+        timestamp INTEGER,
+        message_counter INTEGER NOT NULL,
+        ecu_id TEXT,
+        session_id INTEGER,
+        application_id TEXT,
+        context_id TEXT,
+        message_type INTEGER,
+        message_type_info INTEGER,
+        level INTEGER,
+        verbose INTEGER NOT NULL,
+        number_of_arguments INTEGER,
+        message_id INTEGER,
+        payload TEXT
+    )""",
+    """CREATE TABLE IF NOT EXISTS arguments (
+        message INTEGER NOT NULL REFERENCES messages (id),
+        number INTEGER NOT NULL,
+        type TEXT NOT NULL,
+        value
+    )""",
+)
+
+_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS messages_time ON messages (time)",
+    "CREATE INDEX IF NOT EXISTS messages_ecu_id ON messages (ecu_id)",
+    "CREATE INDEX IF NOT EXISTS messages_application_id ON messages (application_id)",
+    "CREATE INDEX IF NOT EXISTS messages_context_id ON messages (context_id)",
+    "CREATE INDEX IF NOT EXISTS messages_level ON messages (level)",
+    "CREATE INDEX IF NOT EXISTS arguments_message ON arguments (message)",
+)
+
+_INSERT_MESSAGE = "INSERT INTO messages VALUES ({})".format(", ".join(["?"] * 18))
+_INSERT_ARGUMENT = "INSERT INTO arguments VALUES (?, ?, ?, ?)"
+
+# maximum integer which can be stored as INTEGER of SQLite
+_SQLITE_INT_MAX = 2**63 - 1
+
+
+def export_sqlite(
+    reader: DltFileReader,
+    db_path: Union[str, Path],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> int:
+    """Export messages read by a reader to SQLite database.
+
+    The following tables are created in the database if they do not exist:
+    - files: paths of exported DLT files
+    - messages: header fields of messages, positions and lengths of them
+                in the files and string of the payload (time in Storage Header
+                is stored as integer microseconds since epoch)
+    - arguments: decoded arguments of verbose messages
+    Messages which are exported from the same file before are replaced.
+    Indexes on time, ECU ID, Application ID, Context ID and log level of messages
+    are created after all messages are inserted.
+
+    Examples::
+        with DltFileReader("path/to/file.dlt") as reader:
+            export_sqlite(reader, "path/to/file.db")
+
+        for message in query_sqlite("path/to/file.db", application_ids=["App"]):
+            ...
+
+    Args:
+        reader (DltFileReader): A reader to read messages from the current position
+        db_path (Union[str, Path]): A path to SQLite database
+        batch_size (int, optional): Number of messages inserted in a transaction.
+                                    Defaults to DEFAULT_BATCH_SIZE.
+
+    Raises:
+        ValueError: It can be caused by invalid data format.
+
+    Returns:
+        int: Number of the exported messages
+    """
+    count = 0
+    connection = sqlite3.connect(str(db_path))
+    try:
+        with connection:
+            for statement in _SCHEMA:
+                connection.execute(statement)
+            file_id = _replace_file(connection, reader.path)
+            message_key = connection.execute(
+                "SELECT COALESCE(MAX(id), 0) FROM messages"
+            ).fetchone()[0]
+
+        message_rows = []  # type: List[Tuple[Any, ...]]
+        argument_rows = []  # type: List[Tuple[Any, ...]]
+        while True:
+            message = reader.read_message()
+            if message is None:
+                break
+            position = cast(int, reader.last_position)
+            message_key += 1
+            message_rows.append(_message_row(message, message_key, file_id, position))
+            if isinstance(message.payload, VerbosePayload):
+                for number, arg in enumerate(message.payload.arguments):
+                    argument_rows.append(
+                        (message_key, number, _argument_type(arg), _sqlite_value(arg))
+                    )
+            if len(message_rows) >= batch_size:
+                _insert_rows(connection, message_rows, argument_rows)
+                count += len(message_rows)
+                message_rows = []
+                argument_rows = []
+        _insert_rows(connection, message_rows, argument_rows)
+        count += len(message_rows)
+
+        with connection:
+            for statement in _INDEXES:
+                connection.execute(statement)
+    finally:
+        connection.close()
+    return count
+
+
+def query_sqlite(
+    db_path: Union[str, Path],
+    application_ids: Optional[Iterable[str]] = None,
+    context_ids: Optional[Iterable[str]] = None,
+    ecu_ids: Optional[Iterable[str]] = None,
+    level: Optional[int] = None,
+    time_from: Optional[float] = None,
+    time_to: Optional[float] = None,
+    where: Optional[str] = None,
+    parameters: Sequence[Any] = (),
+    encoding: Optional[str] = None,
+) -> Iterator[DltMessage]:
+    """Query messages exported by export_sqlite.
+
+    Messages which satisfy all the given conditions are read from the DLT files
+    by the positions in the database, in the order of the export.
+    The conditions are the same as make_raw_predicate.
+
+    Args:
+        db_path (Union[str, Path]): A path to SQLite database
+        application_ids (Optional[Iterable[str]]): Application IDs to match
+        context_ids (Optional[Iterable[str]]): Context IDs to match
+        ecu_ids (Optional[Iterable[str]]): ECU IDs to match
+        level (Optional[int]): Log messages whose log level is this value or
+            more severe match. Messages other than log messages do not match.
+        time_from (Optional[float]): Messages whose time in Storage Header
+            is this value (seconds since epoch) or later match.
+        time_to (Optional[float]): Messages whose time in Storage Header
+            is earlier than this value (seconds since epoch) match.
+        where (Optional[str]): An additional SQL condition on the columns of
+            messages table (e.g. "payload LIKE ?")
+        parameters (Sequence[Any]): Parameters of the placeholders in where
+        encoding (Optional[str]): Encoding to decode the messages
+
+    Raises:
+        ValueError: It can be caused by invalid data format.
+
+    Yields:
+        Iterator[DltMessage]: The matched messages
+    """
+    conditions = []  # type: List[str]
+    values = []  # type: List[Any]
+    for column, ids in (
+        ("application_id", application_ids),
+        ("context_id", context_ids),
+        ("ecu_id", ecu_ids),
+    ):
+        if ids is not None:
+            ids = list(ids)
+            conditions.append(f"{column} IN ({', '.join(['?'] * len(ids))})")
+            values += ids
+    if level is not None:
+        conditions.append("level BETWEEN 1 AND ?")
+        values.append(int(level))
+    # time is compared in microseconds like make_raw_predicate
+    if time_from is not None:
+        conditions.append("time >= ?")
+        values.append(round(time_from * 1000000))
+    if time_to is not None:
+        conditions.append("time < ?")
+        values.append(round(time_to * 1000000))
+    if where is not None:
+        conditions.append(f"({where})")
+        values += list(parameters)
+    sql = (
+        "SELECT files.path, messages.position, messages.length FROM messages "
+        "JOIN files ON files.id = messages.file_id"
+    )
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    sql += " ORDER BY messages.id"
+
+    # files opened to read messages by the paths
+    files = {}
+    connection = sqlite3.connect(str(db_path))
+    try:
+        for path, position, length in connection.execute(sql, values):
+            file = files.get(path)
+            if file is None:
+                file = files[path] = open(path, "rb")
+            file.seek(position)
+            yield DltMessage.create_from_bytes(file.read(length), True, encoding)
+    finally:
+        connection.close()
+        for file in files.values():
+            file.close()
+
+
+def _replace_file(connection: sqlite3.Connection, path: Path) -> int:
+    """Register a DLT file and delete messages exported from it before.
+
+    Args:
+        connection (sqlite3.Connection): A connection to the database
+        path (Path): A path to the DLT file
+
+    Returns:
+        int: ID of the file
+    """
+    path_str = str(path.resolve())
+    row = connection.execute("SELECT id FROM files WHERE path = ?", (path_str,))
+    found = row.fetchone()
+    if found is None:
+        return connection.execute(
+            "INSERT INTO files (path) VALUES (?)", (path_str,)
+        ).lastrowid
+    file_id = found[0]
+    connection.execute(
+        "DELETE FROM arguments WHERE message IN "
+        "(SELECT id FROM messages WHERE file_id = ?)",
+        (file_id,),
+    )
+    connection.execute("DELETE FROM messages WHERE file_id = ?", (file_id,))
+    return file_id
+
+
+def _insert_rows(
+    connection: sqlite3.Connection,
+    message_rows: List[Tuple[Any, ...]],
+    argument_rows: List[Tuple[Any, ...]],
+) -> None:
+    """Insert rows of messages and arguments in a transaction.
+
+    Args:
+        connection (sqlite3.Connection): A connection to the database
+        message_rows (List[Tuple[Any, ...]]): Rows of messages table
+        argument_rows (List[Tuple[Any, ...]]): Rows of arguments table
+    """
+    with connection:
+        connection.executemany(_INSERT_MESSAGE, message_rows)
+        connection.executemany(_INSERT_ARGUMENT, argument_rows)
+
+
+def _message_row(
+    message: DltMessage, message_key: int, file_id: int, position: int
+) -> Tuple[Any, ...]:
+    """Get a row of messages table of a message.
+
+    Args:
+        message (DltMessage): A message
+        message_key (int): ID of the row
+        file_id (int): ID of the file of the message
+        position (int): Position of the message in the file
+
+    Returns:
+        Tuple[Any, ...]: A row of messages table
+    """
+    str_header = message.str_header
+    std_header = message.std_header
+    ext_header = message.ext_header
+    time = None
+    length = std_header.length
+    if str_header is not None:
+        time = str_header.seconds * 1000000 + str_header.microseconds
+        length += StorageHeader.DATA_LENGTH
+    ecu_id = std_header.ecu_id
+    if ecu_id is None and str_header is not None:
+        ecu_id = str_header.ecu_id
+    application_id = context_id = message_type = message_type_info = None
+    level = number_of_arguments = None
+    verbose = False
+    if ext_header is not None:
+        application_id = ext_header.application_id
+        context_id = ext_header.context_id
+        message_type = int(ext_header.message_type)
+        message_type_info = int(ext_header.message_type_info)
+        if ext_header.message_type == MessageType.DLT_TYPE_LOG:
+            level = message_type_info
+        verbose = ext_header.verbose
+        number_of_arguments = ext_header.number_of_arguments
+    message_id = None
+    if isinstance(message.payload, NonVerbosePayload):
+        message_id = message.payload.message_id
+    return (
+        message_key,
+        file_id,
+        position,
+        length,
+        time,
+        std_header.timestamp,
+        std_header.message_counter,
+        ecu_id,
+        std_header.session_id,
+        application_id,
+        context_id,
+        message_type,
+        message_type_info,
+        level,
+        verbose,
+        number_of_arguments,
+        message_id,
+        None if message.payload is None else str(message.payload),
+    )
+
+
+def _argument_type(arg: Argument) -> str:
+    """Get a name of type of an argument (e.g. "string", "uint32").
+
+    Args:
+        arg (Argument): An argument
+
+    Returns:
+        str: Name of the type
+    """
+    return type(arg).__name__[len("Argument") :].lower()
+
+
+def _sqlite_value(arg: Argument) -> Any:
+    """Get a value of an argument to store to SQLite.
+
+    Args:
+        arg (Argument): An argument
+
+    Returns:
+        Any: The value, or string of it if it is too large for INTEGER of SQLite
+    """
+    value = arg.data  # type: ignore
+    if isinstance(value, int) and value > _SQLITE_INT_MAX:
+        return str(value)
+    return value
@@ -0,0 +1,439 @@
+"""Provide aggregate statistics of DLT file computed from the headers only.
+
+Messages are read in chunks and each chunk is aggregated by NumPy without
+decoding the messages, so a summary costs a single sequential read of the file.
+"""
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from pydlt.header import (
+    MessageLogInfo,
+    MessageType,
+    StandardHeader,
+    _ascii_decode,
+)
+from pydlt.scan import (
+    DEFAULT_BUFFER_SIZE,
+    PAYLOAD_OFFSETS,
+    Chunk,
+    HeaderTable,
+    _import_numpy,
+    iter_chunks,
+)
+
+# default number of message IDs in the top list
+DEFAULT_TOP = 10
+
+# length of Message ID at the beginning of non-verbose payload
+_MESSAGE_ID_LENGTH = 4
+
+
+class Volume(NamedTuple):
+    """Number of messages and bytes of a group of messages."""
+
+    messages: int  # number of messages
+    bytes: int  # length of the messages including Storage Header
+
+
+class FileSummary:
+    """Aggregate statistics of messages in DLT file.
+
+    Groups of messages without Extended Header have None as Application ID
+    and Context ID.
+
+    Attributes:
+        total: Volume of all messages
+        start_time: Minimum time in Storage Header, or None if no message
+        end_time: Maximum time in Storage Header, or None if no message
+        by_ecu: Volumes by ECU ID
+        by_application: Volumes by Application ID
+        by_context: Volumes by pairs of Application ID and Context ID
+        by_level: Volumes of log messages by log level
+        rate: Number of messages by whole seconds in Storage Header
+        payload_sizes: Number of messages by ranges of payload length
+                       (0, and powers of 2 as the lower bound of a range)
+        verbose: Number of verbose messages
+        non_verbose: Number of non-verbose messages
+        message_ids: Volumes of non-verbose messages by Message ID
+    """
+
+    def __init__(self) -> None:
+        """Create empty FileSummary object.
+
+        In most cases, the constructor do not have to be called directly.
+        summarize_file() can be used instead of it.
+        """
+        self.total = Volume(0, 0)
+        self.start_time = None  # type: Optional[float]
+        self.end_time = None  # type: Optional[float]
+        self.by_ecu = {}  # type: Dict[str, Volume]
+        self.by_application = {}  # type: Dict[Optional[str], Volume]
+        self.by_context = {}  # type: Dict[tuple, Volume]
+        self.by_level = {}  # type: Dict[int, Volume]
+        self.rate = {}  # type: Dict[int, int]
+        self.payload_sizes = {}  # type: Dict[int, int]
+        self.verbose = 0
+        self.non_verbose = 0
+        self.message_ids = {}  # type: Dict[int, Volume]
+
+    def __repr__(self):
+        return (
+            f"FileSummary(messages={self.total.messages}, bytes={self.total.bytes}, "
+            f"start_time={self.start_time}, end_time={self.end_time})"
+        )
+
+    @property
+    def verbose_ratio(self) -> float:
+        """Get ratio of verbose messages to all messages.
+
+        Returns:
+            float: Ratio from 0.0 to 1.0 (0.0 if no message)
+        """
+        if self.total.messages == 0:
+            return 0.0
+        return self.verbose / self.total.messages
+
+    @property
+    def peak_rate(self) -> int:
+        """Get maximum number of messages in a second.
+
+        Returns:
+            int: Number of messages (0 if no message)
+        """
+        return max(self.rate.values(), default=0)
+
+    def top_message_ids(self, count: int = DEFAULT_TOP) -> List[Tuple[int, Volume]]:
+        """Get the most frequent Message IDs of non-verbose messages.
+
+        Args:
+            count (int, optional): Maximum number of Message IDs.
+                                   Defaults to DEFAULT_TOP.
+
+        Returns:
+            List[Tuple[int, Volume]]: Message IDs and the volumes in descending
+                                      order of the number of messages
+        """
+        return sorted(
+            self.message_ids.items(), key=lambda item: (-item[1].messages, item[0])
+        )[:count]
+
+    def to_dict(self, top: int = DEFAULT_TOP) -> Dict[str, Any]:
+        """Convert the summary to a dict which can be serialized to JSON.
+
+        Args:
+            top (int, optional): Maximum number of Message IDs.
+                                 Defaults to DEFAULT_TOP.
+
+        Returns:
+            Dict[str, Any]: The summary
+        """
+
+        def volumes(groups: Dict[Any, Volume]) -> List[Dict[str, Any]]:
+            return [
+                {"key": key, "messages": volume.messages, "bytes": volume.bytes}
+                for key, volume in sorted(
+                    groups.items(), key=lambda item: -item[1].messages
+                )
+            ]
+
+        return {
+            "messages": self.total.messages,
+            "bytes": self.total.bytes,
+            "start_time": self.start_time,
+            "end_time": self.end_time,
+            "verbose": self.verbose,
+            "non_verbose": self.non_verbose,
+            "peak_rate": self.peak_rate,
+            "ecu": volumes(self.by_ecu),
+            "apid": volumes(self.by_application),
+            "ctid": volumes(self.by_context),
+            "level": volumes(
+                {_level_name(level): volume for level, volume in self.by_level.items()}
+            ),
+            "rate": [[second, count] for second, count in sorted(self.rate.items())],
+            "payload_sizes": [
+                [size, count] for size, count in sorted(self.payload_sizes.items())
+            ],
+            "message_ids": volumes(dict(self.top_message_ids(top))),
+        }
+
+    def to_text(self, top: int = DEFAULT_TOP) -> str:
+        """Format the summary as a human readable report.
+
+        Args:
+            top (int, optional): Maximum number of Message IDs.
+                                 Defaults to DEFAULT_TOP.
+
+        Returns:
+            str: Lines of the report
+        """
+        total = self.total
+        lines = [
+            f"messages: {total.messages}",
+            f"bytes: {total.bytes}",
+            f"time: {_format_time(self.start_time)} - {_format_time(self.end_time)}",
+            f"peak rate: {self.peak_rate} messages/s",
+            f"verbose: {self.verbose} ({self.verbose_ratio:.1%}), "
+            f"non-verbose: {self.non_verbose}",
+        ]
+
+        def section(title: str, groups: Sequence[Tuple[Any, Volume]]) -> None:
+            lines.append(f"{title}:")
+            for key, volume in groups:
+                share = volume.bytes / total.bytes if total.bytes else 0.0
+                lines.append(
+                    f"  {key}: {volume.messages} messages, "
+                    f"{volume.bytes} bytes ({share:.1%})"
+                )
+
+        def ordered(groups: Dict[Any, Volume]) -> List[Tuple[Any, Volume]]:
+            return sorted(groups.items(), key=lambda item: -item[1].messages)
+
+        section("ECU ID", ordered(self.by_ecu))
+        section("Application ID", ordered(self.by_application))
+        section(
+            "Context ID",
+            [
+                (f"{apid}:{ctid}", volume)
+                for (apid, ctid), volume in ordered(self.by_context)
+            ],
+        )
+        section(
+            "log level",
+            [
+                (_level_name(level), volume)
+                for level, volume in sorted(self.by_level.items())
+            ],
+        )
+        lines.append("payload length:")
+        for size, count in sorted(self.payload_sizes.items()):
+            lines.append(f"  {size}-: {count}")
+        section(
+            "Message ID",
+            [
+                (f"0x{message_id:08x}", volume)
+                for message_id, volume in self.top_message_ids(top)
+            ],
+        )
+        return "\n".join(lines)
+
+    def add_chunk(self, chunk: Chunk) -> None:
+        """Add messages in a chunk to the summary.
+
+        Args:
+            chunk (Chunk): A chunk of DLT messages
+        """
+        np = _import_numpy()
+        if len(chunk.offsets) < 2:
+            return
+        headers = HeaderTable.create_from_chunk(chunk)
+        lengths = headers.length
+        self.total = _add(self.total, len(headers), int(lengths.sum()))
+        times = headers.time
+        start_time = float(times.min())
+        end_time = float(times.max())
+        if self.start_time is None or start_time < self.start_time:
+            self.start_time = start_time
+        if self.end_time is None or end_time > self.end_time:
+            self.end_time = end_time
+
+        _aggregate(self.by_ecu, _id_keys(headers.ecu_id), lengths, _decode_id)
+        with_ext = headers.with_extended_header
+        if not with_ext.all():
+            without_ext = ~with_ext
+            volume = (int(without_ext.sum()), int(lengths[without_ext].sum()))
+            self.by_application[None] = _add(self.by_application.get(None), *volume)
+            self.by_context[(None, None)] = _add(
+                self.by_context.get((None, None)), *volume
+            )
+        ext_lengths = lengths[with_ext]
+        application_ids = _id_keys(headers.application_id[with_ext])
+        context_ids = _id_keys(headers.context_id[with_ext])
+        _aggregate(self.by_application, application_ids, ext_lengths, _decode_id)
+        # a pair of the IDs is a 64-bit key
+        _aggregate(
+            self.by_context,
+            (application_ids.astype("uint64") << 32) | context_ids,
+            ext_lengths,
+            lambda key: (_decode_id(key >> 32), _decode_id(key & 0xFFFFFFFF)),
+        )
+        is_log = with_ext & (headers.message_type == MessageType.DLT_TYPE_LOG)
+        _aggregate(
+            self.by_level, headers.message_type_info[is_log], lengths[is_log], int
+        )
+
+        seconds, counts = np.unique(headers.seconds, return_counts=True)
+        for second, count in zip(seconds.tolist(), counts.tolist()):
+            self.rate[second] = self.rate.get(second, 0) + count
+
+        starts = np.asarray(chunk.offsets[:-1], dtype="int64")
+        payload_starts = np.asarray(PAYLOAD_OFFSETS, dtype="int64")[headers.header_type]
+        payload_lengths = np.maximum(lengths - payload_starts, 0)
+        # index 0 for empty payload, or k + 1 for length from 2 ** k to 2 ** (k + 1)
+        ranges = np.zeros(len(headers), dtype="int64")
+        not_empty = payload_lengths > 0
+        ranges[not_empty] = np.floor(np.log2(payload_lengths[not_empty])) + 1
+        for index, count in enumerate(np.bincount(ranges).tolist()):
+            if count:
+                size = 0 if index == 0 else 1 << (index - 1)
+                self.payload_sizes[size] = self.payload_sizes.get(size, 0) + count
+
+        verbose = headers.verbose
+        verbose_count = int(verbose.sum())
+        self.verbose += verbose_count
+        self.non_verbose += len(headers) - verbose_count
+        with_id = ~verbose & (payload_lengths >= _MESSAGE_ID_LENGTH)
+        if with_id.any():
+            data = np.frombuffer(chunk.data, dtype="uint8")
+            id_starts = (starts + payload_starts)[with_id]
+            id_bytes = data[id_starts[:, None] + np.arange(_MESSAGE_ID_LENGTH)]
+            msb_first = (
+                headers.header_type[with_id] & StandardHeader.MSB_FIRST_MASK
+            ) != 0
+            message_ids = np.where(
+                msb_first, id_bytes.view(">u4")[:, 0], id_bytes.view("<u4")[:, 0]
+            )
+            _aggregate(self.message_ids, message_ids, lengths[with_id], int)
+
+
+def summarize_file(
+    path: Union[str, Path], buffer_size: int = DEFAULT_BUFFER_SIZE
+) -> FileSummary:
+    """Compute aggregate statistics of DLT file without decoding the messages.
+
+    NumPy is required for the function.
+
+    Examples::
+        summary = summarize_file("path/to/file.dlt")
+        print(summary.by_application, summary.verbose_ratio)
+        for message_id, volume in summary.top_message_ids(5):
+            print(message_id, volume.messages)
+
+    Args:
+        path (Union[str, Path]): A path to DLT file
+        buffer_size (int, optional): Size of data bytes to read at once.
+                                     Defaults to DEFAULT_BUFFER_SIZE.
+
+    Raises:
+        ImportError: NumPy is not installed.
+        ValueError: It can be caused by invalid data format.
+
+    Returns:
+        FileSummary: Statistics of the messages
+    """
+    _import_numpy()
+    summary = FileSummary()
+    with open(str(path), "rb", buffering=0) as stream:
+        for chunk in iter_chunks(stream, buffer_size):
+            summary.add_chunk(chunk)
+    return summary
+
+
+def _add(volume: Optional[Volume], messages: int, length: int) -> Volume:
+    """Add messages to a volume.
+
+    Args:
+        volume (Optional[Volume]): A volume, or None for an empty volume
+        messages (int): Number of messages to add
+        length (int): Bytes of the messages to add
+
+    Returns:
+        Volume: New volume
+    """
+    if volume is None:
+        return Volume(messages, length)
+    return Volume(volume.messages + messages, volume.bytes + length)
+
+
+def _aggregate(
+    target: Dict[Any, Volume],
+    keys: Any,
+    lengths: Any,
+    convert: Callable[[int], Any],
+) -> None:
+    """Add volumes of groups of messages to a dict.
+
+    Args:
+        target (Dict[Any, Volume]): A dict of volumes by the group keys
+        keys (Any): NumPy array of integer keys of the messages
+        lengths (Any): NumPy array of the lengths of the messages
+        convert (Callable[[int], Any]): A function to convert an integer key
+                                        to a key of the dict
+    """
+    np = _import_numpy()
+    if len(keys) == 0:
+        return
+    uniques, groups = np.unique(keys, return_inverse=True)
+    groups = groups.reshape(-1)
+    counts = np.bincount(groups, minlength=len(uniques)).tolist()
+    volumes = np.bincount(groups, weights=lengths, minlength=len(uniques)).tolist()
+    for key, count, length in zip(uniques.tolist(), counts, volumes):
+        key = convert(key)
+        target[key] = _add(target.get(key), count, int(length))
+
+
+def _id_keys(ids: Any) -> Any:
+    """Convert IDs to integer keys which are faster to sort than strings.
+
+    Args:
+        ids (Any): NumPy array of IDs (S4)
+
+    Returns:
+        Any: NumPy array of the keys (uint32)
+    """
+    np = _import_numpy()
+    return np.ascontiguousarray(ids, dtype="S4").view("<u4")
+
+
+def _decode_id(key: int) -> str:
+    """Decode an integer key given by _id_keys() to ID.
+
+    Args:
+        key (int): A key of ID
+
+    Returns:
+        str: ID
+    """
+    return _ascii_decode(key.to_bytes(4, "little"))
+
+
+def _format_time(seconds: Optional[float]) -> str:
+    """Format time in Storage Header as date and time in UTC.
+
+    Args:
+        seconds (Optional[float]): Seconds since epoch, or None
+
+    Returns:
+        str: Date and time (e.g. "2022/10/09 02:01:47.000000"), or empty
+    """
+    if seconds is None:
+        return ""
+    return datetime.fromtimestamp(seconds, timezone.utc).strftime(
+        "%Y/%m/%d %H:%M:%S.%f"
+    )
+
+
+def _level_name(level: int) -> str:
+    """Get name of a log level.
+
+    Args:
+        level (int): Log level
+
+    Returns:
+        str: Name of the level (e.g. "warn"), or the number if it is not defined
+    """
+    try:
+        return MessageLogInfo(level).name[len("DLT_LOG_") :].lower()
+    except ValueError:
+        return str(level)
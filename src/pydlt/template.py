@@ -0,0 +1,367 @@
+"""Provide pre-compiled templates to create verbose DLT messages at a high rate.
+
+Headers and type info of the arguments of a template are converted to bytes
+when the template is created, and a message is packed from the values of the
+arguments, Message Counter and Timestamp by a single call of struct.Struct.pack.
+
+The struct of a template with strings or raw data depends on their lengths, so
+it is compiled for each combination of the lengths and cached. Messages whose
+lengths vary widely pay the compilation until their combinations are cached.
+"""
+import struct
+import time
+from typing import Any, List, Optional, Sequence, Tuple, Type, Union
+
+from pydlt.header import (
+    ExtendedHeader,
+    MessageLogInfo,
+    MessageType,
+    MessageTypeInfo,
+    StandardHeader,
+    StorageHeader,
+    _ascii_encode,
+)
+from pydlt.message import DltMessage
+from pydlt.payload import Argument, ArgumentNumBase, ArgumentRaw, ArgumentString
+from pydlt.timesync import TICK_SECONDS
+
+# maximum value of Timestamp, which wraps around
+_TIMESTAMP_MASK = 0xFFFFFFFF
+
+# maximum number of compiled structs of a template, which are cleared when exceeded
+_MAX_STRUCTS = 1024
+
+
+class MessageTemplate:
+    """A template of verbose DLT messages which differ only in the values.
+
+    Examples::
+        template = MessageTemplate(
+            "App",
+            "Ctx",
+            MessageType.DLT_TYPE_LOG,
+            MessageLogInfo.DLT_LOG_INFO,
+            [ArgumentString, ArgumentUInt32],
+            ecu_id="Ecu",
+        )
+        with open("path/to/file.dlt", "wb") as file:
+            for index in range(1000000):
+                file.write(template.pack(["count", index]))
+    """
+
+    def __init__(
+        self,
+        application_id: str,
+        context_id: str,
+        message_type: MessageType = MessageType.DLT_TYPE_LOG,
+        message_type_info: MessageTypeInfo = MessageLogInfo.DLT_LOG_INFO,
+        arg_types: Sequence[Type[Argument]] = (),
+        ecu_id: Optional[str] = None,
+        session_id: Optional[int] = None,
+        with_timestamp: bool = True,
+        with_storage_header: bool = True,
+        version_number: int = 1,
+        msb_first: bool = False,
+        is_utf8: bool = False,
+        encoding: Optional[str] = None,
+    ) -> None:
+        """Create MessageTemplate object.
+
+        Args:
+            application_id (str): Application ID
+            context_id (str): Context ID
+            message_type (MessageType, optional): Message Type.
+                                                  Defaults to DLT_TYPE_LOG.
+            message_type_info (MessageTypeInfo, optional): Message Type Info.
+                                                           Defaults to DLT_LOG_INFO.
+            arg_types (Sequence[Type[Argument]], optional): Classes of the arguments
+                                                            (ArgumentString,
+                                                            ArgumentRaw or
+                                                            subclasses of
+                                                            ArgumentNumBase).
+                                                            Defaults to ().
+            ecu_id (Optional[str], optional): ECU ID in Standard Header and Storage
+                                              Header. Defaults to None.
+            session_id (Optional[int], optional): Session ID. Defaults to None.
+            with_timestamp (bool, optional): Messages have Timestamp if True.
+                                             Defaults to True.
+            with_storage_header (bool, optional): Messages have Storage Header
+                                                  if True. Defaults to True.
+            version_number (int, optional): Version Number. Defaults to 1.
+            msb_first (bool, optional): The payload is in big endian if True.
+                                        Defaults to False.
+            is_utf8 (bool, optional): Strings are coded in UTF-8 if True, or ASCII.
+                                      Defaults to False (ASCII).
+            encoding (Optional[str], optional): custom 8-bit encoding of strings.
+                                                Has no effect if is_utf8 is True.
+                                                Defaults to None.
+
+        Raises:
+            ValueError: An argument class is not supported.
+        """
+        self.with_timestamp = with_timestamp
+        self.with_storage_header = with_storage_header
+        self.msb_first = msb_first
+        self._encoding = ArgumentString._encoding_format(is_utf8, encoding)
+        self._message_counter = 0
+
+        ext_header = ExtendedHeader(
+            True,
+            message_type,
+            message_type_info,
+            len(arg_types),
+            application_id,
+            context_id,
+        )
+        std_header = StandardHeader(
+            True,
+            msb_first,
+            version_number,
+            0,
+            0,
+            ecu_id,
+            session_id,
+            0 if with_timestamp else None,
+        )
+        std_bytes = std_header.to_bytes()
+        # Header Type, and bytes between Length and Timestamp (ECU ID and Session ID)
+        self._header_type = std_header.header_type
+        middle_end = len(std_bytes) - 4 if with_timestamp else len(std_bytes)
+        self._std_middle = std_bytes[StandardHeader.DATA_MIN_LENGTH : middle_end]
+        self._ext_bytes = ext_header.to_bytes()
+        self._storage_ecu_id = _ascii_encode("" if ecu_id is None else ecu_id)
+
+        # struct format of the message, in which "{}" are replaced with lengths of
+        # the variable length arguments, and the length of the other fields
+        order = ">" if msb_first else "<"
+        fmt = order
+        if with_storage_header:
+            # Storage Header is always in little endian
+            fmt += "4sIi4s" if not msb_first else "4s4s4s4s"
+        # Length and Timestamp of Standard Header are always in big endian
+        fmt += "BBH" if msb_first else "BB2s"
+        fmt += f"{len(self._std_middle)}s"
+        if with_timestamp:
+            fmt += "I" if msb_first else "4s"
+        fmt += f"{ExtendedHeader.DATA_LENGTH}s"
+        self._fixed_length = std_header.bytes_length + ExtendedHeader.DATA_LENGTH
+        # kinds of the arguments: None for numbers, str for strings, bytes for raw
+        self._kinds = []  # type: List[Optional[type]]
+        self._type_infos = []  # type: List[int]
+        for arg_type in arg_types:
+            if issubclass(arg_type, ArgumentNumBase):
+                arg = arg_type(0)  # type: Argument
+                fmt += "I" + arg_type._struct_format()
+                self._fixed_length += arg.bytes_length
+                self._kinds.append(None)
+            elif issubclass(arg_type, ArgumentString):
+                arg = ArgumentString("", is_utf8)
+                # the null terminator is padded by struct
+                fmt += "IH{}s"
+                self._fixed_length += arg._TYPE_INFO_LENGTH + arg.LENGTH_SIZE
+                self._kinds.append(str)
+            elif issubclass(arg_type, ArgumentRaw):
+                arg = ArgumentRaw(b"")
+                fmt += "IH{}s"
+                self._fixed_length += arg._TYPE_INFO_LENGTH + arg.LENGTH_SIZE
+                self._kinds.append(bytes)
+            else:
+                raise ValueError(f"Unsupported argument class: {arg_type}")
+            self._type_infos.append(arg._type_info)
+        self._format = fmt
+        self._variable = any([kind is not None for kind in self._kinds])
+        # the format is compiled once if all arguments are fixed length,
+        # or once for each combination of the lengths of the variable length ones
+        self._struct = None if self._variable else struct.Struct(fmt)
+        self._structs = {}  # type: dict
+
+    @property
+    def number_of_arguments(self) -> int:
+        """Get the number of arguments of the messages.
+
+        Returns:
+            int: Number of arguments
+        """
+        return len(self._kinds)
+
+    @property
+    def fixed_length(self) -> int:
+        """Get length of the messages except the strings and the raw data.
+
+        Returns:
+            int: Length without Storage Header (the same as Length in Standard
+                 Header of a message whose strings and raw data are empty)
+        """
+        return self._fixed_length
+
+    def pack(
+        self,
+        values: Sequence[Any],
+        message_counter: Optional[int] = None,
+        timestamp: Optional[int] = None,
+        seconds: Optional[float] = None,
+    ) -> bytes:
+        """Create data bytes of a message from the values of the arguments.
+
+        Args:
+            values (Sequence[Any]): Values of the arguments (str or bytes for
+                                    strings, bytes for raw data)
+            message_counter (Optional[int], optional): Message Counter.
+                                                       Defaults to None (incremented
+                                                       from 0 for each message).
+            timestamp (Optional[int], optional): Timestamp.
+                                                 Defaults to None (monotonic clock).
+            seconds (Optional[float], optional): Time in Storage Header.
+                                                 Defaults to None (current time).
+
+        Raises:
+            ValueError: The number of values does not match the template.
+
+        Returns:
+            bytes: Data bytes of the message
+        """
+        compiled, fields, _ = self._fields(values, message_counter, timestamp, seconds)
+        return compiled.pack(*fields)
+
+    def pack_into(
+        self,
+        buffer: Union[bytearray, memoryview],
+        offset: int,
+        values: Sequence[Any],
+        message_counter: Optional[int] = None,
+        timestamp: Optional[int] = None,
+        seconds: Optional[float] = None,
+    ) -> int:
+        """Write data bytes of a message to a buffer.
+
+        Args:
+            buffer (Union[bytearray, memoryview]): A writable buffer
+            offset (int): Offset in the buffer to write the message
+            values (Sequence[Any]): Values of the arguments
+            message_counter (Optional[int], optional): Message Counter.
+                                                       Defaults to None.
+            timestamp (Optional[int], optional): Timestamp. Defaults to None.
+            seconds (Optional[float], optional): Time in Storage Header.
+                                                 Defaults to None.
+
+        Raises:
+            ValueError: The number of values does not match the template.
+            struct.error: The buffer is too small.
+
+        Returns:
+            int: Length of the written message
+        """
+        compiled, fields, length = self._fields(
+            values, message_counter, timestamp, seconds
+        )
+        compiled.pack_into(buffer, offset, *fields)
+        return length
+
+    def create_message(
+        self,
+        values: Sequence[Any],
+        message_counter: Optional[int] = None,
+        timestamp: Optional[int] = None,
+        seconds: Optional[float] = None,
+    ) -> DltMessage:
+        """Create DltMessage object from the values of the arguments.
+
+        Args:
+            values (Sequence[Any]): Values of the arguments
+            message_counter (Optional[int], optional): Message Counter.
+                                                       Defaults to None.
+            timestamp (Optional[int], optional): Timestamp. Defaults to None.
+            seconds (Optional[float], optional): Time in Storage Header.
+                                                 Defaults to None.
+
+        Returns:
+            DltMessage: New DltMessage object
+        """
+        return DltMessage.create_from_bytes(
+            self.pack(values, message_counter, timestamp, seconds),
+            self.with_storage_header,
+            self._encoding,
+        )
+
+    def _fields(
+        self,
+        values: Sequence[Any],
+        message_counter: Optional[int],
+        timestamp: Optional[int],
+        seconds: Optional[float],
+    ) -> Tuple[struct.Struct, List[Any], int]:
+        """Get the compiled struct and the fields of a message.
+
+        Returns:
+            Tuple[struct.Struct, List[Any], int]: The compiled struct, the fields
+                                                  and length of the message
+        """
+        if len(values) != len(self._kinds):
+            raise ValueError(
+                f"Unexpected number of values: {len(values)} / "
+                f"the template has {len(self._kinds)} arguments"
+            )
+        msb_first = self.msb_first
+        fields = []  # type: List[Any]
+        length = self._fixed_length
+        if self.with_storage_header:
+            if seconds is None:
+                seconds = time.time()
+            whole_seconds = int(seconds)
+            microseconds = int((seconds - whole_seconds) * 1000000)
+            if msb_first:
+                fields += [
+                    StorageHeader.DLT_PATTERN,
+                    whole_seconds.to_bytes(4, "little"),
+                    microseconds.to_bytes(4, "little", signed=True),
+                    self._storage_ecu_id,
+                ]
+            else:
+                fields += [
+                    StorageHeader.DLT_PATTERN,
+                    whole_seconds,
+                    microseconds,
+                    self._storage_ecu_id,
+                ]
+
+        # payload is packed first to get the length of the message
+        payload = []  # type: List[Any]
+        lengths = []  # type: List[int]
+        for kind, type_info, value in zip(self._kinds, self._type_infos, values):
+            if kind is None:
+                payload += [type_info, value]
+                continue
+            if kind is str and isinstance(value, str):
+                value = value.encode(self._encoding, "replace")
+            # null terminator of strings
+            data_length = len(value) + 1 if kind is str else len(value)
+            payload += [type_info, data_length, value]
+            lengths.append(data_length)
+            length += data_length
+
+        if message_counter is None:
+            message_counter = self._message_counter
+            self._message_counter = (message_counter + 1) & 0xFF
+        fields += [
+            self._header_type,
+            message_counter,
+            length if msb_first else length.to_bytes(2, "big"),
+            self._std_middle,
+        ]
+        if self.with_timestamp:
+            if timestamp is None:
+                timestamp = int(time.monotonic() / TICK_SECONDS) & _TIMESTAMP_MASK
+            fields.append(timestamp if msb_first else timestamp.to_bytes(4, "big"))
+        fields.append(self._ext_bytes)
+        fields += payload
+        if self.with_storage_header:
+            length += StorageHeader.DATA_LENGTH
+        if self._struct is not None:
+            return self._struct, fields, length
+        key = tuple(lengths)
+        compiled = self._structs.get(key)
+        if compiled is None:
+            if len(self._structs) >= _MAX_STRUCTS:
+                self._structs.clear()
+            compiled = self._structs[key] = struct.Struct(self._format.format(*key))
+        return compiled, fields, length
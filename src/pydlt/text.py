@@ -0,0 +1,445 @@
+"""Provide export of DLT messages to text in the format of DltMessage.__str__.
+
+Header fields are converted to text by caches instead of formatting each of
+them for each message: date and time by a distinct second in Storage Header,
+and IDs, types and number of arguments by a distinct Extended Header.
+
+Other layouts can be given by a format template such as
+"{time} {ecu} {apid}:{ctid} [{level}] {payload}", which is compiled once into
+a Python function computing only the fields used in the template.
+
+Fields of the template (strings, empty if the message does not have it):
+    time: time in Storage Header (e.g. "2022/10/09 02:01:47.000000")
+    timestamp: Timestamp in Standard Header in seconds (e.g. "12.3456")
+    counter: Message Counter
+    ecu: ECU ID in Standard Header, or one in Storage Header
+    apid, ctid: Application ID and Context ID
+    session: Session ID
+    type: message type (log, app_trace, nw_trace or control)
+    subtype: Message Type Info (e.g. log level, trace info)
+    level: log level of log messages (fatal, error, warn, info, debug or verbose)
+    mode: verbose or non-verbose
+    args: number of arguments
+    payload: string of the payload
+"""
+import functools
+import string
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Iterable, Optional, TextIO, Tuple, Union
+
+from pydlt.file import DltFileReader
+from pydlt.header import ExtendedHeader, MessageType, StorageHeader
+from pydlt.message import (
+    _MESSAGE_BUS_INFO_STR,
+    _MESSAGE_CONTROL_INFO_STR,
+    _MESSAGE_LOG_INFO_STR,
+    _MESSAGE_TRACE_INFO_STR,
+    _MESSAGE_TYPE_STR,
+    DltMessage,
+)
+
+# default size of the buffer of the output file
+DEFAULT_BUFFER_SIZE = 1024 * 1024
+
+# default number of messages read and written at once by export_text
+DEFAULT_BATCH_SIZE = 10000
+
+# maximum number of entries of a cache, which is cleared when exceeded
+_MAX_CACHE_SIZE = 65536
+
+# Python code of the fields of a format template, where the header variables are
+# defined only if they are used
+_FIELD_CODES = {
+    "time": "_storage_time(str_header)",
+    "timestamp": "_timestamp(std_header.timestamp)",
+    "counter": "str(std_header.message_counter)",
+    "ecu": (
+        "std_header.ecu_id if std_header.ecu_id is not None "
+        'else str_header.ecu_id if str_header is not None else ""'
+    ),
+    "apid": 'ext_header.application_id if ext_header is not None else ""',
+    "ctid": 'ext_header.context_id if ext_header is not None else ""',
+    "session": (
+        'str(std_header.session_id) if std_header.session_id is not None else ""'
+    ),
+    "type": (
+        '_MESSAGE_TYPE_STR.get(ext_header.message_type, "unknown") '
+        'if ext_header is not None else ""'
+    ),
+    "subtype": "_subtype(ext_header)",
+    "level": (
+        "_MESSAGE_LOG_INFO_STR.get(ext_header.message_type_info, "
+        '"unknown") if ext_header is not None and ext_header.message_type == '
+        f'{MessageType.DLT_TYPE_LOG} else ""'
+    ),
+    "mode": (
+        '"verbose" if ext_header is not None and ext_header.verbose '
+        'else "non-verbose"'
+    ),
+    "args": 'str(ext_header.number_of_arguments) if ext_header is not None else ""',
+    "payload": 'str(message.payload) if message.payload is not None else ""',
+}
+
+# header variables used by the code of each field
+_FIELD_HEADERS = {
+    "time": ("str_header",),
+    "timestamp": ("std_header",),
+    "counter": ("std_header",),
+    "ecu": ("std_header", "str_header"),
+    "session": ("std_header",),
+    "payload": (),
+}
+
+# text of Message Type Info by Message Type
+_MESSAGE_TYPE_INFO_STR = {
+    MessageType.DLT_TYPE_LOG: _MESSAGE_LOG_INFO_STR,
+    MessageType.DLT_TYPE_APP_TRACE: _MESSAGE_TRACE_INFO_STR,
+    MessageType.DLT_TYPE_NW_TRACE: _MESSAGE_BUS_INFO_STR,
+    MessageType.DLT_TYPE_CONTROL: _MESSAGE_CONTROL_INFO_STR,
+}
+
+
+def compile_format(template: str) -> Callable[[DltMessage], str]:
+    """Compile a format template into a function which converts a message to text.
+
+    The template is a format string of str.format with the fields in the module
+    docstring, e.g. "{time} {apid:<4} {payload}". Only the fields used in the
+    template are computed for each message.
+
+    Examples::
+        format_message = compile_format("{time} {apid}:{ctid} [{level}] {payload}")
+        for message in DltFileReader("path/to/file.dlt"):
+            print(format_message(message))
+
+    Args:
+        template (str): A format template
+
+    Raises:
+        ValueError: The template is invalid or it has an unknown field.
+
+    Returns:
+        Callable[[DltMessage], str]: A function which gets a message
+                                     and returns the text
+    """
+    fields = []
+    try:
+        parsed = list(string.Formatter().parse(template))
+    except ValueError as e:
+        raise ValueError(f"Invalid format template: {template} / {e}") from None
+    for _, field, format_spec, _ in parsed:
+        if field is None:
+            continue
+        if field not in _FIELD_CODES:
+            raise ValueError(
+                f"Unknown field: {{{field}}} in {template} / "
+                f"it must be in {tuple(_FIELD_CODES)}"
+            )
+        if format_spec is not None and "{" in format_spec:
+            raise ValueError(f"Nested field is not supported: {template}")
+        if field not in fields:
+            fields.append(field)
+
+    headers = []
+    for field in fields:
+        for header in _FIELD_HEADERS.get(field, ("ext_header",)):
+            if header not in headers:
+                headers.append(header)
+    lines = ["def format_message(message):"]
+    for header in sorted(headers):
+        lines.append(f"    {header} = message.{header}")
+    arguments = ", ".join([f"{field}=({_FIELD_CODES[field]})" for field in fields])
+    lines.append(f"    return _format({arguments})")
+    source = "\n".join(lines) + "\n"
+
+    namespace = {
+        "_format": template.format,
+        "_storage_time": _storage_time,
+        "_timestamp": _timestamp,
+        "_subtype": _subtype,
+        "_MESSAGE_TYPE_STR": _MESSAGE_TYPE_STR,
+        "_MESSAGE_LOG_INFO_STR": _MESSAGE_LOG_INFO_STR,
+    }
+    exec(compile(source, "<pydlt format>", "exec"), namespace)
+    format_message = namespace["format_message"]
+    format_message.__doc__ = f"Format: {template}\n\n{source}"
+    return format_message
+
+
+class TextExporter:
+    """An exporter of DLT messages to text, which is the same as str(message).
+
+    Each message is written as a line. If a format template is given,
+    messages are converted by the function compiled by compile_format.
+
+    Examples::
+        with DltFileReader("path/to/file.dlt") as reader:
+            with TextExporter("path/to/file.txt") as exporter:
+                for batch in reader.iter_batches(10000):
+                    exporter.write_messages(batch)
+    """
+
+    def __init__(
+        self,
+        output: Union[str, Path, TextIO],
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+        encoding: str = "utf-8",
+        template: Optional[str] = None,
+    ) -> None:
+        """Create TextExporter object.
+
+        Args:
+            output (Union[str, Path, TextIO]): A path to the text file to write,
+                                               or a text stream which is not
+                                               closed by the exporter
+            buffer_size (int, optional): Size of the buffer of the file.
+                                         Defaults to DEFAULT_BUFFER_SIZE.
+            encoding (str, optional): Encoding of the file. Defaults to "utf-8".
+            template (Optional[str], optional): A format template.
+                                                Defaults to None (str(message)).
+
+        Raises:
+            ValueError: The template is invalid.
+        """
+        if template is not None:
+            # the method is replaced by the compiled function
+            self.format_message = compile_format(template)  # type: ignore
+        if isinstance(output, (str, Path)):
+            self._file = open(
+                str(output),
+                "w",
+                buffering=buffer_size,
+                encoding=encoding,
+                errors="replace",
+                newline="",
+            )  # type: TextIO
+            self._owns_file = True
+        else:
+            self._file = output
+            self._owns_file = False
+        # number of the written messages
+        self.count = 0
+        # the last second and its text, and texts by the other seconds
+        self._last_seconds = -1
+        self._last_time = ""
+        self._times = {}
+        # texts before and after Session ID by fields of Extended Header
+        self._ext_texts = {}
+
+    def __enter__(self) -> "TextExporter":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> Optional[bool]:
+        self.close()
+
+    def close(self) -> None:
+        """Flush the written text, and close the file opened by the exporter."""
+        if self._owns_file:
+            self._file.close()
+        else:
+            self._file.flush()
+
+    def format_message(self, message: DltMessage) -> str:
+        """Convert a message to text.
+
+        Args:
+            message (DltMessage): A message
+
+        Returns:
+            str: The same text as str(message), or text of the format template
+        """
+        str_header = message.str_header
+        std_header = message.std_header
+        ext_header = message.ext_header
+        text = ""
+        if str_header is not None:
+            seconds = str_header.seconds
+            if seconds == self._last_seconds:
+                prefix = self._last_time
+            else:
+                prefix = self._time_text(seconds)
+            microseconds = str_header.microseconds
+            if 0 <= microseconds < 1000000:
+                text = f"{prefix}{microseconds:06d} "
+            else:
+                text = f"{prefix}{str(microseconds).zfill(6)} "
+        timestamp = std_header.timestamp
+        if timestamp is not None:
+            text += f"{timestamp // 10000}.{timestamp % 10000:04d} "
+        text += str(std_header.message_counter)
+        if std_header.ecu_id is not None:
+            text += " " + std_header.ecu_id
+        elif str_header is not None:
+            text += " " + str_header.ecu_id
+        if ext_header is None:
+            if std_header.session_id is not None:
+                text += f" {std_header.session_id}"
+            text += " non-verbose"
+        else:
+            key = (
+                ext_header.application_id,
+                ext_header.context_id,
+                ext_header.message_type,
+                ext_header.message_type_info,
+                ext_header.verbose,
+                ext_header.number_of_arguments,
+            )
+            ext_texts = self._ext_texts.get(key)
+            if ext_texts is None:
+                ext_texts = self._ext_header_texts(key, ext_header)
+            if std_header.session_id is not None:
+                text += f"{ext_texts[0]} {std_header.session_id}{ext_texts[1]}"
+            else:
+                text += ext_texts[0] + ext_texts[1]
+        if message.payload is not None:
+            text += " " + str(message.payload)
+        return text
+
+    def format_messages(self, messages: Iterable[DltMessage]) -> str:
+        """Convert messages to lines of text.
+
+        Args:
+            messages (Iterable[DltMessage]): Messages (e.g. MessageBatch)
+
+        Returns:
+            str: Lines of the messages, each of which ends with a newline
+        """
+        format_message = self.format_message
+        return "".join([format_message(message) + "\n" for message in messages])
+
+    def write_message(self, message: DltMessage) -> None:
+        """Write a message as a line.
+
+        Args:
+            message (DltMessage): A message
+        """
+        self._file.write(self.format_message(message) + "\n")
+        self.count += 1
+
+    def write_messages(self, messages: Iterable[DltMessage]) -> int:
+        """Write messages as lines at once.
+
+        Args:
+            messages (Iterable[DltMessage]): Messages (e.g. MessageBatch)
+
+        Returns:
+            int: Number of the written messages
+        """
+        format_message = self.format_message
+        lines = [format_message(message) for message in messages]
+        if lines:
+            lines.append("")
+            self._file.write("\n".join(lines))
+            self.count += len(lines) - 1
+        return max(len(lines) - 1, 0)
+
+    def _time_text(self, seconds: int) -> str:
+        """Get text of date and time of a second, which is cached.
+
+        Args:
+            seconds (int): Seconds since epoch in Storage Header
+
+        Returns:
+            str: Date and time followed by "."
+        """
+        text = self._times.get(seconds)
+        if text is None:
+            if len(self._times) >= _MAX_CACHE_SIZE:
+                self._times.clear()
+            text = self._times[seconds] = (
+                datetime.fromtimestamp(seconds, timezone.utc).strftime(
+                    "%Y/%m/%d %H:%M:%S"
+                )
+                + "."
+            )
+        self._last_seconds = seconds
+        self._last_time = text
+        return text
+
+    def _ext_header_texts(
+        self, key: tuple, ext_header: ExtendedHeader
+    ) -> Tuple[str, str]:
+        """Get texts of fields of Extended Header, which are cached.
+
+        Args:
+            key (tuple): Fields of the Extended Header
+            ext_header (ExtendedHeader): The Extended Header
+
+        Returns:
+            Tuple[str, str]: Texts before and after Session ID
+        """
+        if len(self._ext_texts) >= _MAX_CACHE_SIZE:
+            self._ext_texts.clear()
+        before = f" {ext_header.application_id} {ext_header.context_id}"
+        message_type = ext_header.message_type
+        after = " " + _MESSAGE_TYPE_STR.get(message_type, "unknown")
+        type_info_str = _MESSAGE_TYPE_INFO_STR.get(message_type)
+        if type_info_str is not None:
+            after += " " + type_info_str.get(ext_header.message_type_info, "unknown")
+        after += " verbose" if ext_header.verbose else " non-verbose"
+        after += f" {ext_header.number_of_arguments}"
+        texts = self._ext_texts[key] = (before, after)
+        return texts
+
+
+def export_text(
+    reader: DltFileReader,
+    path: Union[str, Path],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    encoding: str = "utf-8",
+    template: Optional[str] = None,
+) -> int:
+    """Export messages read by a reader to a text file.
+
+    Examples::
+        with DltFileReader("path/to/file.dlt") as reader:
+            export_text(reader, "path/to/file.txt")
+
+        with DltFileReader("path/to/file.dlt") as reader:
+            export_text(reader, "path/to/file.csv", template="{time},{apid},{payload}")
+
+    Args:
+        reader (DltFileReader): A reader to read messages from the current position
+        path (Union[str, Path]): A path to the text file to write
+        batch_size (int, optional): Number of messages read and written at once.
+                                    Defaults to DEFAULT_BATCH_SIZE.
+        encoding (str, optional): Encoding of the file. Defaults to "utf-8".
+        template (Optional[str], optional): A format template.
+                                            Defaults to None (str(message)).
+
+    Raises:
+        ValueError: It can be caused by invalid data format or template.
+
+    Returns:
+        int: Number of the exported messages
+    """
+    with TextExporter(path, encoding=encoding, template=template) as exporter:
+        for batch in reader.iter_batches(batch_size):
+            exporter.write_messages(batch)
+    return exporter.count
+
+
+@functools.lru_cache(maxsize=4096)
+def _date_time(seconds: int) -> str:
+    return datetime.fromtimestamp(seconds, timezone.utc).strftime("%Y/%m/%d %H:%M:%S")
+
+
+def _storage_time(str_header: Optional[StorageHeader]) -> str:
+    if str_header is None:
+        return ""
+    return f"{_date_time(str_header.seconds)}.{str(str_header.microseconds).zfill(6)}"
+
+
+def _timestamp(timestamp: Optional[int]) -> str:
+    if timestamp is None:
+        return ""
+    return f"{timestamp // 10000}.{timestamp % 10000:04d}"
+
+
+def _subtype(ext_header: Optional[ExtendedHeader]) -> str:
+    if ext_header is None:
+        return ""
+    type_info_str = _MESSAGE_TYPE_INFO_STR.get(ext_header.message_type)
+    if type_info_str is None:
+        return ""
+    return type_info_str.get(ext_header.message_type_info, "unknown")
@@ -0,0 +1,669 @@
+"""Provide full-text index of string arguments of DLT messages in DLT files.
+
+The index is SQLite database which maps tokens of the strings of verbose
+messages and Message IDs of non-verbose messages to positions of the messages
+in DLT files. The positions of a token are stored in blocks of compressed
+differences, and a grown file is indexed from the end of the last indexed
+message. A search decodes the blocks of the rarest token of a text, and only
+the blocks of the other tokens which can contain its positions.
+"""
+import hashlib
+import re
+import sqlite3
+import sys
+import zlib
+from array import array
+from bisect import bisect_left
+from itertools import accumulate
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Union
+
+from pydlt.file import DltFileReader
+from pydlt.header import StandardHeader
+from pydlt.message import DltMessage
+from pydlt.payload import ArgumentString, VerbosePayload
+from pydlt.scan import (
+    DEFAULT_BUFFER_SIZE,
+    EXTENDED_HEADER_OFFSETS,
+    HEADER_TYPE_OFFSET,
+    NUMBER_OF_ARGUMENTS_OFFSET,
+    PAYLOAD_OFFSETS,
+    is_verbose,
+    iter_chunks,
+)
+
+# default number of postings held in memory before they are written
+DEFAULT_FLUSH_SIZE = 1000000
+
+# maximum length of a token; longer words (e.g. hex dumps) are not indexed
+MAX_TOKEN_LENGTH = 64
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+# size of the beginning of a file to detect that the file is replaced
+_HEAD_SIZE = 4096
+
+# positions are searched one by one in a block of a token if they are fewer than
+# the positions in the block divided by the ratio, or the block is scanned
+_PROBE_RATIO = 16
+
+_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS files (
+        id INTEGER PRIMARY KEY,
+        path TEXT NOT NULL UNIQUE,
+        size INTEGER NOT NULL,
+        messages INTEGER NOT NULL,
+        head_hash TEXT NOT NULL,
+        head_size INTEGER NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS postings (
+        token TEXT NOT NULL,
+        file_id INTEGER NOT NULL REFERENCES files (id),
+        start INTEGER NOT NULL,
+        count INTEGER NOT NULL,
+        positions BLOB NOT NULL,
+        PRIMARY KEY (token, file_id, start)
+    ) WITHOUT ROWID""",
+)
+_TABLES = ("files", "postings")
+
+
+class IndexHit(NamedTuple):
+    """A message found in the index."""
+
+    path: str  # absolute path to DLT file
+    position: int  # position of the message in the file
+
+
+def tokenize(text: str) -> List[str]:
+    """Split a text into tokens of the index.
+
+    Tokens are words of letters, digits and underscores in lower case.
+
+    Args:
+        text (str): A text
+
+    Returns:
+        List[str]: The tokens
+    """
+    return [
+        token
+        for token in _TOKEN_PATTERN.findall(text.lower())
+        if len(token) <= MAX_TOKEN_LENGTH
+    ]
+
+
+class TextIndex:
+    """An inverted index of strings in DLT files stored in SQLite database.
+
+    A message is found by a text if it has all tokens of the text in its string
+    arguments. Non-verbose messages are found by the Message IDs.
+    The index can hold many files (e.g. the files of a session), and indexes
+    of other files can be merged into it.
+
+    Examples::
+        with TextIndex("path/to/session.index") as index:
+            # only messages appended after the last update are indexed
+            index.update("path/to/file.dlt")
+            for message in index.read_messages(index.search("connection timeout")):
+                print(message)
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        flush_size: int = DEFAULT_FLUSH_SIZE,
+        read_only: bool = False,
+    ) -> None:
+        """Open TextIndex object, which creates the database if not exists.
+
+        Args:
+            path (Union[str, Path]): A path to the database
+            flush_size (int, optional): Number of postings held in memory before
+                                        they are written by update().
+                                        Defaults to DEFAULT_FLUSH_SIZE.
+            read_only (bool, optional): If set, the database is opened to search
+                                        without creating nor modifying it.
+                                        Defaults to False.
+
+        Raises:
+            ValueError: The file is not a database of an index, or the database
+                        does not exist in read-only mode.
+        """
+        self.path = Path(path)
+        self.flush_size = flush_size
+        try:
+            # the database is not created if it does not exist in read-only mode
+            self._connection = sqlite3.connect(
+                _database_uri(self.path, read_only), uri=True
+            )
+        except sqlite3.Error as e:
+            raise ValueError(f"Invalid index: {self.path} / {e}") from e
+        try:
+            if not read_only:
+                with self._connection:
+                    for statement in _SCHEMA:
+                        self._connection.execute(statement)
+            _check_tables(self._connection, "main", self.path)
+        except sqlite3.Error as e:
+            self._connection.close()
+            raise ValueError(f"Invalid index: {self.path} / {e}") from e
+        except ValueError:
+            self._connection.close()
+            raise
+
+    def __enter__(self) -> "TextIndex":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> Optional[bool]:
+        self.close()
+        return None
+
+    def close(self) -> None:
+        """Close the database."""
+        self._connection.close()
+
+    @property
+    def paths(self) -> List[str]:
+        """Get paths to the indexed DLT files.
+
+        Returns:
+            List[str]: Absolute paths in order of addition
+        """
+        return [
+            row[0]
+            for row in self._connection.execute("SELECT path FROM files ORDER BY id")
+        ]
+
+    def update(
+        self,
+        dlt_path: Union[str, Path],
+        encoding: Optional[str] = None,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+    ) -> int:
+        """Index messages of DLT file which are not indexed yet.
+
+        Messages appended to the file after the last update are indexed.
+        The file is indexed again from the beginning if it is replaced or
+        truncated, which is detected by the beginning and the size of the file.
+
+        Args:
+            dlt_path (Union[str, Path]): A path to DLT file
+            encoding (Optional[str], optional): Encoding of non-UTF-8 strings.
+                                                Defaults to None (ASCII).
+            buffer_size (int, optional): Size of data bytes to read at once.
+                                         Defaults to DEFAULT_BUFFER_SIZE.
+
+        Raises:
+            ValueError: It can be caused by invalid data format.
+
+        Returns:
+            int: Number of the newly indexed messages
+        """
+        path_str = str(Path(dlt_path).resolve())
+        connection = self._connection
+        with open(path_str, "rb", buffering=0) as stream:
+            head = stream.read(_HEAD_SIZE)
+            size = stream.seek(0, 2)
+            row = connection.execute(
+                "SELECT id, size, messages, head_hash, head_size FROM files "
+                "WHERE path = ?",
+                (path_str,),
+            ).fetchone()
+            if row is not None:
+                file_id, indexed_size, messages, head_hash, head_size = row
+                if size < indexed_size or _hash(head[:head_size]) != head_hash:
+                    with connection:
+                        _delete_postings(connection, file_id)
+                    indexed_size = messages = 0
+            else:
+                with connection:
+                    file_id = connection.execute(
+                        "INSERT INTO files (path, size, messages, head_hash, "
+                        "head_size) VALUES (?, 0, 0, ?, 0)",
+                        (path_str, _hash(b"")),
+                    ).lastrowid
+                indexed_size = messages = 0
+
+            count = 0
+            end = indexed_size  # the end of the last indexed message
+            postings = {}  # type: Dict[str, List[int]]
+            pending = 0
+            stream.seek(indexed_size)
+            for chunk in iter_chunks(stream, buffer_size, indexed_size):
+                data = chunk.data
+                offsets = chunk.offsets
+                for index in range(len(offsets) - 1):
+                    position = chunk.position + offsets[index]
+                    tokens = _message_tokens(
+                        data, offsets[index], offsets[index + 1], encoding
+                    )
+                    for token in tokens:
+                        positions = postings.get(token)
+                        if positions is None:
+                            postings[token] = [position]
+                        else:
+                            positions.append(position)
+                    pending += len(tokens)
+                count += len(offsets) - 1
+                end = chunk.position + offsets[-1]
+                if pending >= self.flush_size:
+                    self._write(file_id, postings, end, messages + count, head)
+                    postings = {}
+                    pending = 0
+            self._write(file_id, postings, end, messages + count, head)
+        return count
+
+    def remove(self, dlt_path: Union[str, Path]) -> None:
+        """Remove DLT file from the index.
+
+        Args:
+            dlt_path (Union[str, Path]): A path to DLT file
+        """
+        path_str = str(Path(dlt_path).resolve())
+        with self._connection:
+            row = self._connection.execute(
+                "SELECT id FROM files WHERE path = ?", (path_str,)
+            ).fetchone()
+            if row is not None:
+                _delete_postings(self._connection, row[0])
+                self._connection.execute("DELETE FROM files WHERE id = ?", row)
+
+    def merge(self, other_path: Union[str, Path]) -> None:
+        """Merge another index into the index.
+
+        Files in the other index replace the same files in the index.
+
+        Args:
+            other_path (Union[str, Path]): A path to the database of the other index
+
+        Raises:
+            ValueError: The other file does not exist or is not a database of
+                        an index.
+        """
+        connection = self._connection
+        try:
+            # the other database is not created if it does not exist
+            connection.execute(
+                "ATTACH DATABASE ? AS other", (_database_uri(Path(other_path), True),)
+            )
+        except sqlite3.Error as e:
+            raise ValueError(f"Invalid index: {other_path} / {e}") from e
+        try:
+            _check_tables(connection, "other", Path(other_path))
+            with connection:
+                for other_id, path_str in connection.execute(
+                    "SELECT id, path FROM other.files ORDER BY id"
+                ).fetchall():
+                    row = connection.execute(
+                        "SELECT id FROM files WHERE path = ?", (path_str,)
+                    ).fetchone()
+                    if row is not None:
+                        _delete_postings(connection, row[0])
+                        connection.execute("DELETE FROM files WHERE id = ?", row)
+                    file_id = connection.execute(
+                        "INSERT INTO files (path, size, messages, head_hash, "
+                        "head_size) SELECT path, size, messages, head_hash, "
+                        "head_size FROM other.files WHERE id = ?",
+                        (other_id,),
+                    ).lastrowid
+                    connection.execute(
+                        "INSERT INTO postings SELECT token, ?, start, count, "
+                        "positions FROM other.postings WHERE file_id = ?",
+                        (file_id, other_id),
+                    )
+        except sqlite3.Error as e:
+            raise ValueError(f"Failed to merge index: {other_path} / {e}") from e
+        finally:
+            connection.execute("DETACH DATABASE other")
+
+    def search(self, text: str) -> List[IndexHit]:
+        """Find messages which have all tokens of a text in the strings.
+
+        Args:
+            text (str): A text to search (e.g. "connection timeout")
+
+        Returns:
+            List[IndexHit]: The found messages in order of the files and
+                            the positions (empty if the text has no token)
+        """
+        return self._search(set(tokenize(text)))
+
+    def search_message_id(self, message_id: int) -> List[IndexHit]:
+        """Find non-verbose messages by Message ID.
+
+        Args:
+            message_id (int): Message ID
+
+        Returns:
+            List[IndexHit]: The found messages in order of the files and
+                            the positions
+        """
+        return self._search({_message_id_token(message_id)})
+
+    def read_messages(
+        self, hits: Iterable[IndexHit], encoding: Optional[str] = None
+    ) -> Iterator[DltMessage]:
+        """Read found messages from DLT files.
+
+        Args:
+            hits (Iterable[IndexHit]): Messages found by search()
+            encoding (Optional[str], optional): Encoding of non-UTF-8 strings.
+                                                Defaults to None.
+
+        Raises:
+            ValueError: It can be caused by invalid data format.
+
+        Yields:
+            Iterator[DltMessage]: The messages
+        """
+        readers = {}  # type: Dict[str, DltFileReader]
+        try:
+            for hit in hits:
+                reader = readers.get(hit.path)
+                if reader is None:
+                    reader = readers[hit.path] = DltFileReader(hit.path, encoding)
+                reader.seek(hit.position)
+                message = reader.read_message()
+                if message is not None:
+                    yield message
+        finally:
+            for reader in readers.values():
+                reader.close()
+
+    def _search(self, tokens: Set[str]) -> List[IndexHit]:
+        """Find messages which have all tokens.
+
+        Args:
+            tokens (Set[str]): Tokens
+
+        Returns:
+            List[IndexHit]: The found messages
+        """
+        if not tokens:
+            return []
+        connection = self._connection
+        counts = dict(
+            connection.execute(
+                "SELECT token, SUM(count) FROM postings WHERE token IN "
+                f"({', '.join(['?'] * len(tokens))}) GROUP BY token",
+                list(tokens),
+            )
+        )
+        if len(counts) < len(tokens):
+            return []
+        # positions of the rarest token are decoded, and they are probed in
+        # the blocks of the other tokens which can contain them
+        rarest, *others = sorted(tokens, key=counts.__getitem__)
+        found = {}  # type: Dict[int, List[int]]
+        for file_id, data in connection.execute(
+            "SELECT file_id, positions FROM postings WHERE token = ? "
+            "ORDER BY file_id, start",
+            (rarest,),
+        ):
+            found.setdefault(file_id, []).extend(_decode_positions(data))
+        for token in others:
+            probed = {}  # type: Dict[int, List[int]]
+            for file_id, positions in found.items():
+                common = _probe(connection, token, file_id, positions)
+                if common:
+                    probed[file_id] = common
+            found = probed
+            if not found:
+                return []
+        paths = dict(connection.execute("SELECT id, path FROM files"))
+        return [
+            IndexHit(paths[file_id], position)
+            for file_id in sorted(found)
+            for position in found[file_id]
+        ]
+
+    def _write(
+        self,
+        file_id: int,
+        postings: Dict[str, List[int]],
+        size: int,
+        messages: int,
+        head: bytes,
+    ) -> None:
+        """Write postings and the indexed size of a file in a transaction.
+
+        Args:
+            file_id (int): ID of the file
+            postings (Dict[str, List[int]]): Positions of messages by the tokens
+            size (int): Size of the indexed part of the file
+            messages (int): Number of the indexed messages
+            head (bytes): The beginning of the file
+        """
+        head = head[:size]
+        with self._connection:
+            self._connection.executemany(
+                "INSERT INTO postings VALUES (?, ?, ?, ?, ?)",
+                [
+                    (
+                        token,
+                        file_id,
+                        positions[0],
+                        len(positions),
+                        _encode_positions(positions),
+                    )
+                    for token, positions in postings.items()
+                ],
+            )
+            self._connection.execute(
+                "UPDATE files SET size = ?, messages = ?, head_hash = ?, "
+                "head_size = ? WHERE id = ?",
+                (size, messages, _hash(head), len(head), file_id),
+            )
+
+
+def _message_tokens(
+    data: bytes, offset: int, end: int, encoding: Optional[str]
+) -> Set[str]:
+    """Get tokens of a message in data bytes.
+
+    Args:
+        data (bytes): Data bytes which contain the message
+        offset (int): Offset of the message (Storage Header) in the data
+        end (int): End of the message in the data
+        encoding (Optional[str]): Encoding of non-UTF-8 strings
+
+    Raises:
+        ValueError: It can be caused by invalid data format.
+
+    Returns:
+        Set[str]: Tokens of the strings of a verbose message,
+                  or the token of Message ID of a non-verbose message
+    """
+    htyp = data[offset + HEADER_TYPE_OFFSET]
+    msb_first = bool(htyp & StandardHeader.MSB_FIRST_MASK)
+    payload_offset = offset + PAYLOAD_OFFSETS[htyp]
+    if is_verbose(data, offset):
+        ext_offset = EXTENDED_HEADER_OFFSETS[htyp]
+        payload = VerbosePayload.create_from_bytes(
+            memoryview(data)[payload_offset:end],
+            msb_first,
+            data[offset + ext_offset + NUMBER_OF_ARGUMENTS_OFFSET],
+            encoding,
+        )
+        tokens = set()  # type: Set[str]
+        for arg in payload.arguments:
+            if isinstance(arg, ArgumentString):
+                tokens.update(tokenize(arg.data))
+        return tokens
+    if end - payload_offset < 4:
+        return set()
+    message_id = int.from_bytes(
+        data[payload_offset : payload_offset + 4], "big" if msb_first else "little"
+    )
+    return {_message_id_token(message_id)}
+
+
+def _message_id_token(message_id: int) -> str:
+    """Get token of Message ID, which is not a token of strings.
+
+    Args:
+        message_id (int): Message ID
+
+    Returns:
+        str: The token (e.g. "#1234")
+    """
+    return f"#{message_id}"
+
+
+def _encode_positions(positions: List[int]) -> bytes:
+    """Compress ascending positions of messages.
+
+    Args:
+        positions (List[int]): The positions
+
+    Returns:
+        bytes: Compressed differences of the positions
+    """
+    deltas = array("Q", [positions[0]])
+    deltas.extend([after - before for before, after in zip(positions, positions[1:])])
+    if sys.byteorder == "big":
+        deltas.byteswap()
+    return zlib.compress(deltas.tobytes())
+
+
+def _decode_positions(data: bytes) -> List[int]:
+    """Decompress positions of messages compressed by _encode_positions().
+
+    Args:
+        data (bytes): Compressed differences of the positions
+
+    Returns:
+        List[int]: The positions
+    """
+    deltas = array("Q")
+    deltas.frombytes(zlib.decompress(data))
+    if sys.byteorder == "big":
+        deltas.byteswap()
+    return list(accumulate(deltas))
+
+
+def _probe(
+    connection: sqlite3.Connection, token: str, file_id: int, positions: List[int]
+) -> List[int]:
+    """Get positions which are also positions of a token in a file.
+
+    Blocks of a token in a file do not overlap, since a file is indexed in order
+    of the positions, so only the blocks whose start can contain the positions
+    are read.
+
+    Args:
+        connection (sqlite3.Connection): A connection to the database
+        token (str): A token
+        file_id (int): ID of the file
+        positions (List[int]): Ascending positions to probe
+
+    Returns:
+        List[int]: The positions of the token in ascending order
+    """
+    starts = [
+        row[0]
+        for row in connection.execute(
+            "SELECT start FROM postings WHERE token = ? AND file_id = ? "
+            "ORDER BY start",
+            (token, file_id),
+        )
+    ]
+    found = []  # type: List[int]
+    first = 0
+    for index, start in enumerate(starts):
+        # positions between the start of the block and the start of the next one
+        first = bisect_left(positions, start, first)
+        last = (
+            bisect_left(positions, starts[index + 1], first)
+            if index + 1 < len(starts)
+            else len(positions)
+        )
+        if first == last:
+            continue
+        block_positions = _decode_positions(
+            connection.execute(
+                "SELECT positions FROM postings WHERE token = ? AND file_id = ? "
+                "AND start = ?",
+                (token, file_id, start),
+            ).fetchone()[0]
+        )
+        if (last - first) * _PROBE_RATIO < len(block_positions):
+            # a few positions are searched in the block
+            for position in positions[first:last]:
+                hit = bisect_left(block_positions, position)
+                if hit < len(block_positions) and block_positions[hit] == position:
+                    found.append(position)
+        else:
+            probed = set(positions[first:last])
+            found.extend(
+                [position for position in block_positions if position in probed]
+            )
+        first = last
+    return found
+
+
+def _database_uri(path: Path, read_only: bool) -> str:
+    """Get URI of a database for sqlite3.connect() and ATTACH DATABASE.
+
+    Args:
+        path (Path): A path to the database
+        read_only (bool): The database is opened in read-only mode if True,
+                          or created if it does not exist
+
+    Returns:
+        str: The URI
+    """
+    return f"{path.absolute().as_uri()}?mode={'ro' if read_only else 'rwc'}"
+
+
+def _check_tables(connection: sqlite3.Connection, schema: str, path: Path) -> None:
+    """Check a database has the tables of an index.
+
+    Args:
+        connection (sqlite3.Connection): A connection to the database
+        schema (str): Schema name of the database ("main" or an attached one)
+        path (Path): A path to the database
+
+    Raises:
+        ValueError: A table is not found.
+        sqlite3.Error: The file is not a database.
+    """
+    tables = {
+        row[0]
+        for row in connection.execute(
+            f"SELECT name FROM {schema}.sqlite_master WHERE type = 'table'"
+        )
+    }
+    for table in _TABLES:
+        if table not in tables:
+            raise ValueError(
+                f"Invalid index: {path} / table {table} is not found in the database"
+            )
+
+
+def _delete_postings(connection: sqlite3.Connection, file_id: int) -> None:
+    """Delete postings of a file.
+
+    Args:
+        connection (sqlite3.Connection): A connection to the database
+        file_id (int): ID of the file
+    """
+    connection.execute("DELETE FROM postings WHERE file_id = ?", (file_id,))
+    connection.execute(
+        "UPDATE files SET size = 0, messages = 0, head_hash = ?, head_size = 0 "
+        "WHERE id = ?",
+        (_hash(b""), file_id),
+    )
+
+
+def _hash(data: bytes) -> str:
+    """Get hash of data bytes to compare the beginning of a file.
+
+    Args:
+        data (bytes): Data bytes
+
+    Returns:
+        str: SHA-1 hash
+    """
+    return hashlib.sha1(data).hexdigest()
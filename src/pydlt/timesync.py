@@ -0,0 +1,479 @@
+"""Provide correlation of ECU timestamp with wall-clock time in Storage Header.
+
+Timestamp in Standard Header is ticks of 0.1 milliseconds from the start of ECU,
+and time in Storage Header is wall-clock time of the logger when the message is
+received, which contains delay of transmission and buffering.
+TimeCorrelator fits a linear mapping from the ticks to the wall-clock time for each
+segment of messages, and gives corrected absolute time of messages by the mapping.
+"""
+import struct
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Tuple, Union
+
+from pydlt.message import DltMessage
+from pydlt.scan import (
+    DEFAULT_BUFFER_SIZE,
+    STORAGE_SECONDS_OFFSET,
+    HeaderTable,
+    _import_numpy,
+    iter_chunks,
+)
+
+# seconds of a tick of Timestamp in Standard Header
+TICK_SECONDS = 0.0001
+
+# key of a segment: (ECU ID, Session ID, boot number, window number)
+SegmentKey = Tuple[bytes, int, int, int]
+
+
+class ClockSegment(NamedTuple):
+    """A linear mapping from ticks to wall-clock time of a segment of messages.
+
+    Wall-clock time of a timestamp is wall_time + rate * (timestamp - tick).
+    """
+
+    ecu_id: str  # ECU ID of the messages
+    session_id: int  # Session ID of the messages, or -1 if not exists
+    boot: int  # number of the boot (incremented when the ticks are reset)
+    window: int  # number of the window in the boot
+    samples: int  # number of the messages used to fit the mapping
+    tick: float  # mean of the ticks of the messages
+    wall_time: float  # wall-clock time at the mean of the ticks
+    rate: float  # seconds per tick
+
+    def to_wall_time(self, tick: int) -> float:
+        """Convert ticks to wall-clock time.
+
+        Args:
+            tick (int): Timestamp in Standard Header
+
+        Returns:
+            float: Wall-clock time as seconds since epoch
+        """
+        return self.wall_time + self.rate * (tick - self.tick)
+
+
+class TimeCorrelator:
+    """A class to correlate ECU timestamp with wall-clock time in Storage Header.
+
+    Messages are split into segments by ECU ID, Session ID, boot of the ECU and
+    window of ticks, and a linear mapping is fitted for each segment by
+    least squares. A boot is changed when the ticks jump backwards (reset).
+    NumPy is required for the class.
+
+    Examples::
+        correlator = TimeCorrelator().fit(scan_headers("in.dlt"))
+
+        # rewrite Storage Header with the corrected time
+        correlator.rewrite("in.dlt", "out.dlt")
+
+        # annotate messages with the corrected time
+        with DltFileReader("in.dlt") as reader:
+            for message, time in correlator.annotate(reader):
+                ...
+    """
+
+    def __init__(
+        self,
+        window: float = 60.0,
+        reset_threshold: float = 1.0,
+        min_delay_fit: bool = True,
+        max_drift: float = 0.01,
+    ) -> None:
+        """Create TimeCorrelator object.
+
+        Args:
+            window (float, optional): Seconds of ticks of a window.
+                                      Each window has its own mapping, so the mapping
+                                      is piecewise linear in a boot.
+                                      Defaults to 60.0.
+            reset_threshold (float, optional): Seconds which ticks jump backwards
+                                               to be regarded as a reset.
+                                               Defaults to 1.0.
+            min_delay_fit (bool, optional): If set, the rate is fitted again with
+                                            messages below the first fit, which have
+                                            less delay of transmission, and the
+                                            mapping is shifted to the message with
+                                            the least delay. Defaults to True.
+            max_drift (float, optional): Maximum ratio of drift of the ECU clock.
+                                         If a fitted rate exceeds it, the nominal
+                                         rate is used instead. Defaults to 0.01.
+        """
+        self.window_ticks = max(int(window / TICK_SECONDS), 1)
+        self.reset_ticks = int(reset_threshold / TICK_SECONDS)
+        self.min_delay_fit = min_delay_fit
+        self.max_drift = max_drift
+        self.segments = {}  # type: Dict[SegmentKey, ClockSegment]
+
+    def fit(self, headers: HeaderTable) -> "TimeCorrelator":
+        """Fit mappings of all segments of messages.
+
+        Args:
+            headers (HeaderTable): Header fields of messages given by scan_headers()
+
+        Raises:
+            ImportError: NumPy is not installed.
+
+        Returns:
+            TimeCorrelator: The object itself
+        """
+        np = _import_numpy()
+        self.segments = {}
+        keys, valid, ecu_ids = self._segment_keys(headers, {})
+        if not valid.any():
+            return self
+        ticks = headers.timestamp[valid].astype("float64")
+        wall_times = headers.time[valid]
+        uniques, groups = np.unique(keys[valid], axis=0, return_inverse=True)
+        groups = groups.reshape(-1)
+
+        weights = np.ones(len(ticks))
+        rates = self._fit_rates(np, groups, len(uniques), ticks, wall_times, weights)
+        tick_means, wall_means, counts = self._means(
+            np, groups, len(uniques), ticks, wall_times, weights
+        )
+        if self.min_delay_fit:
+            # use messages received earlier than the first fit
+            residuals = wall_times - (
+                wall_means[groups] + rates[groups] * (ticks - tick_means[groups])
+            )
+            weights = (residuals <= 0).astype("float64")
+            rates = self._fit_rates(
+                np, groups, len(uniques), ticks, wall_times, weights
+            )
+            tick_means, wall_means, counts = self._means(
+                np, groups, len(uniques), ticks, wall_times, weights
+            )
+            # shift the mapping to the message with the least delay
+            residuals = wall_times - (
+                wall_means[groups] + rates[groups] * (ticks - tick_means[groups])
+            )
+            min_residuals = np.full(len(uniques), np.inf)
+            np.minimum.at(min_residuals, groups, residuals)
+            wall_means = wall_means + min_residuals
+
+        for index, key in enumerate(uniques.tolist()):
+            ecu_id = bytes(ecu_ids[key[0]])
+            segment_key = (ecu_id, key[1], key[2], key[3])
+            self.segments[segment_key] = ClockSegment(
+                ecu_id.decode("ascii", "replace"),
+                key[1],
+                key[2],
+                key[3],
+                int(counts[index]),
+                float(tick_means[index]),
+                float(wall_means[index]),
+                float(rates[index]),
+            )
+        return self
+
+    def corrected_times(self, headers: HeaderTable) -> Any:
+        """Get corrected time of messages.
+
+        Time in Storage Header is used for messages without Timestamp or
+        in a segment which is not fitted.
+
+        Args:
+            headers (HeaderTable): Header fields of messages in the order of a file
+
+        Raises:
+            ImportError: NumPy is not installed.
+
+        Returns:
+            Any: NumPy array of the corrected time as seconds since epoch
+        """
+        return self._corrected_times(headers, {})
+
+    def rewrite(
+        self,
+        src_path: Union[str, Path],
+        dst_path: Union[str, Path],
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+    ) -> int:
+        """Copy messages from a file to another file with corrected time.
+
+        Time in Storage Header of each message is replaced with the corrected time.
+        Other data bytes of the messages are copied as is.
+
+        Args:
+            src_path (Union[str, Path]): A path to DLT file to read
+            dst_path (Union[str, Path]): A path to DLT file to write
+            buffer_size (int, optional): Size of buffers to read/write files.
+                                         Defaults to DEFAULT_BUFFER_SIZE.
+
+        Raises:
+            ImportError: NumPy is not installed.
+            ValueError: It can be caused by invalid data format.
+
+        Returns:
+            int: Number of the messages
+        """
+        np = _import_numpy()
+        pack_time = struct.Struct("<Ii").pack_into
+        count = 0
+        state = {}  # type: Dict[Tuple[bytes, int], List[int]]
+        with open(str(src_path), "rb", buffering=0) as src, open(
+            str(dst_path), "wb", buffering=buffer_size
+        ) as dst:
+            for chunk in iter_chunks(src, buffer_size):
+                headers = HeaderTable.create_from_chunk(chunk)
+                times = self._corrected_times(headers, state)
+                microseconds = np.round(times * 1000000).astype("int64")
+                data = bytearray(chunk.data)
+                for offset, us in zip(chunk.offsets, microseconds.tolist()):
+                    seconds, us = divmod(us, 1000000)
+                    pack_time(data, offset + STORAGE_SECONDS_OFFSET, seconds, us)
+                dst.write(memoryview(data)[chunk.offsets[0] : chunk.offsets[-1]])
+                count += len(headers)
+        return count
+
+    def annotate(
+        self, messages: Iterable[DltMessage]
+    ) -> Iterator[Tuple[DltMessage, float]]:
+        """Annotate messages with corrected time in a streaming pass.
+
+        Args:
+            messages (Iterable[DltMessage]): Messages in the order of a file
+
+        Yields:
+            Iterator[Tuple[DltMessage, float]]: Messages and corrected time of them
+                                                as seconds since epoch
+        """
+        state = {}  # type: Dict[Tuple[bytes, int], List[int]]
+        for message in messages:
+            str_header = message.str_header
+            std_header = message.std_header
+            time = (
+                0.0
+                if str_header is None
+                else str_header.seconds + str_header.microseconds * 1e-6
+            )
+            if std_header.timestamp is None:
+                yield message, time
+                continue
+            if std_header.ecu_id is not None:
+                ecu_id = std_header.ecu_id
+            elif str_header is not None:
+                ecu_id = str_header.ecu_id
+            else:
+                ecu_id = ""
+            ecu_key = ecu_id.encode("ascii", "replace")
+            session_id = -1 if std_header.session_id is None else std_header.session_id
+            boot, window = self._next_segment(
+                state, (ecu_key, session_id), std_header.timestamp
+            )
+            segment = self.segments.get((ecu_key, session_id, boot, window))
+            if segment is not None:
+                time = segment.to_wall_time(std_header.timestamp)
+            yield message, time
+
+    def _corrected_times(
+        self, headers: HeaderTable, state: Dict[Tuple[bytes, int], List[int]]
+    ) -> Any:
+        """Get corrected time of messages and update the state of the groups.
+
+        Args:
+            headers (HeaderTable): Header fields of messages in the order of a file
+            state (Dict[Tuple[bytes, int], List[int]]): State of each group
+
+        Returns:
+            Any: NumPy array of the corrected time as seconds since epoch
+        """
+        np = _import_numpy()
+        times = headers.time
+        keys, valid, ecu_ids = self._segment_keys(headers, state)
+        if not valid.any():
+            return times
+        uniques, groups = np.unique(keys[valid], axis=0, return_inverse=True)
+        groups = groups.reshape(-1)
+        # parameters of the mapping of each segment (NaN if not fitted)
+        parameters = np.full((len(uniques), 3), np.nan)
+        for index, key in enumerate(uniques.tolist()):
+            segment = self.segments.get(
+                (bytes(ecu_ids[key[0]]), key[1], key[2], key[3])
+            )
+            if segment is not None:
+                parameters[index] = (segment.tick, segment.wall_time, segment.rate)
+        tick_means, wall_means, rates = parameters[groups].T
+        corrected = wall_means + rates * (headers.timestamp[valid] - tick_means)
+        times[valid] = np.where(np.isnan(corrected), times[valid], corrected)
+        return times
+
+    def _segment_keys(
+        self, headers: HeaderTable, state: Dict[Tuple[bytes, int], List[int]]
+    ) -> Tuple[Any, Any, Any]:
+        """Get segment keys of messages.
+
+        Args:
+            headers (HeaderTable): Header fields of messages in the order of a file
+            state (Dict[Tuple[bytes, int], List[int]]): State of each group of ECU ID
+                                                        and Session ID, which is
+                                                        updated by the messages
+
+        Returns:
+            Tuple[Any, Any, Any]: NumPy arrays of the keys (ECU number, Session ID,
+                                  boot number, window number), flags whether
+                                  the message has Timestamp and ECU IDs of
+                                  the ECU numbers
+        """
+        np = _import_numpy()
+        keys = np.zeros((len(headers), 4), dtype="int64")
+        valid = headers.timestamp >= 0
+        ecu_ids, ecu_numbers = np.unique(headers.ecu_id, return_inverse=True)
+        if not valid.any():
+            return keys, valid, ecu_ids
+        keys[:, 0] = ecu_numbers.reshape(-1)
+        keys[:, 1] = headers.session_id
+        # group the messages once by a stable sort to keep the order in each group
+        indexes = np.nonzero(valid)[0]
+        groups, numbers = np.unique(keys[indexes, :2], axis=0, return_inverse=True)
+        numbers = numbers.reshape(-1)
+        order = np.argsort(numbers, kind="stable")
+        bounds = np.searchsorted(numbers[order], np.arange(len(groups) + 1))
+        for (ecu_number, session_id), start, end in zip(
+            groups.tolist(), bounds[:-1].tolist(), bounds[1:].tolist()
+        ):
+            group_indexes = indexes[order[start:end]]
+            keys[group_indexes, 2:] = self._boots_and_windows(
+                np,
+                state,
+                (bytes(ecu_ids[ecu_number]), session_id),
+                headers.timestamp[group_indexes],
+            )
+        return keys, valid, ecu_ids
+
+    def _boots_and_windows(
+        self,
+        np: Any,
+        state: Dict[Tuple[bytes, int], List[int]],
+        group: Tuple[bytes, int],
+        ticks: Any,
+    ) -> Any:
+        """Get boot numbers and window numbers of messages in a group.
+
+        Args:
+            np (Any): numpy module
+            state (Dict[Tuple[bytes, int], List[int]]): State of each group
+            group (Tuple[bytes, int]): ECU ID and Session ID of the group
+            ticks (Any): NumPy array of Timestamp of the messages
+
+        Returns:
+            Any: NumPy array of (boot number, window number) of each message
+        """
+        # state of a group: [last tick, boot number, first tick of the boot]
+        last_tick, boot, boot_tick = state.get(group, [int(ticks[0]), 0, int(ticks[0])])
+        previous = np.concatenate(([last_tick], ticks[:-1]))
+        resets = ticks < previous - self.reset_ticks
+        boots = boot + np.cumsum(resets)
+        # first tick of the boot of each message
+        reset_indexes = np.maximum.accumulate(
+            np.where(resets, np.arange(len(ticks)), -1)
+        )
+        boot_ticks = np.where(
+            reset_indexes >= 0, ticks[np.maximum(reset_indexes, 0)], boot_tick
+        )
+        windows = (ticks - boot_ticks) // self.window_ticks
+        state[group] = [int(ticks[-1]), int(boots[-1]), int(boot_ticks[-1])]
+        return np.stack((boots, windows), axis=1)
+
+    def _next_segment(
+        self,
+        state: Dict[Tuple[bytes, int], List[int]],
+        group: Tuple[bytes, int],
+        tick: int,
+    ) -> Tuple[int, int]:
+        """Get boot number and window number of a message and update the state.
+
+        Args:
+            state (Dict[Tuple[bytes, int], List[int]]): State of each group
+            group (Tuple[bytes, int]): ECU ID and Session ID of the group
+            tick (int): Timestamp of the message
+
+        Returns:
+            Tuple[int, int]: Boot number and window number
+        """
+        group_state = state.get(group)
+        if group_state is None:
+            group_state = state[group] = [tick, 0, tick]
+        elif tick < group_state[0] - self.reset_ticks:
+            group_state[1] += 1
+            group_state[2] = tick
+        group_state[0] = tick
+        return group_state[1], (tick - group_state[2]) // self.window_ticks
+
+    def _fit_rates(
+        self,
+        np: Any,
+        groups: Any,
+        group_number: int,
+        ticks: Any,
+        wall_times: Any,
+        weights: Any,
+    ) -> Any:
+        """Fit rates (seconds per tick) of segments by weighted least squares.
+
+        Args:
+            np (Any): numpy module
+            groups (Any): Segment number of each sample
+            group_number (int): Number of segments
+            ticks (Any): Ticks of the samples
+            wall_times (Any): Wall-clock time of the samples
+            weights (Any): Weights (0 or 1) of the samples
+
+        Returns:
+            Any: Rates of the segments
+        """
+        tick_means, wall_means, _ = self._means(
+            np, groups, group_number, ticks, wall_times, weights
+        )
+        dx = ticks - tick_means[groups]
+        dy = wall_times - wall_means[groups]
+        sxx = np.bincount(groups, weights=weights * dx * dx, minlength=group_number)
+        sxy = np.bincount(groups, weights=weights * dx * dy, minlength=group_number)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rates = sxy / sxx
+        drift = np.abs(rates / TICK_SECONDS - 1.0)
+        return np.where(
+            np.isfinite(rates) & (drift <= self.max_drift), rates, TICK_SECONDS
+        )
+
+    @staticmethod
+    def _means(
+        np: Any,
+        groups: Any,
+        group_number: int,
+        ticks: Any,
+        wall_times: Any,
+        weights: Any,
+    ) -> Tuple[Any, Any, Any]:
+        """Get weighted means of ticks and wall-clock time of segments.
+
+        A segment without weighted samples uses all samples.
+
+        Returns:
+            Tuple[Any, Any, Any]: Means of ticks, means of wall-clock time and
+                                  number of the samples used for the means
+        """
+        counts = np.bincount(groups, weights=weights, minlength=group_number)
+        all_samples = counts == 0
+        if all_samples.any():
+            weights = np.where(all_samples[groups], 1.0, weights)
+            counts = np.bincount(groups, weights=weights, minlength=group_number)
+        # subtract the first sample of all to keep precision of float64
+        tick_base = ticks[0]
+        wall_base = wall_times[0]
+        tick_means = tick_base + (
+            np.bincount(
+                groups, weights=weights * (ticks - tick_base), minlength=group_number
+            )
+            / counts
+        )
+        wall_means = wall_base + (
+            np.bincount(
+                groups,
+                weights=weights * (wall_times - wall_base),
+                minlength=group_number,
+            )
+            / counts
+        )
+        return tick_means, wall_means, counts
@@ -0,0 +1,44 @@
+from pydlt import (
+    ArgumentString,
+    DltMessage,
+    MessageLogInfo,
+    MessageTraceInfo,
+    MessageType,
+    StorageHeader,
+)
+
+
+def make_messages():
+    # message index: (apid, ctid, level, ecu)
+    params = [
+        ("App1", "Ctx1", MessageLogInfo.DLT_LOG_ERROR, "Ecu1"),
+        ("App2", "Ctx2", MessageLogInfo.DLT_LOG_WARN, "Ecu1"),
+        ("App1", "Ctx2", MessageLogInfo.DLT_LOG_INFO, "Ecu1"),
+        ("App3", "Ctx3", MessageLogInfo.DLT_LOG_INFO, "Ecu2"),
+    ]
+    messages = [
+        DltMessage.create_verbose_message(
+            [ArgumentString(f"message {index}")],
+            MessageType.DLT_TYPE_LOG,
+            level,
+            apid,
+            ctid,
+            ecu_id=ecu,
+            message_counter=index,
+            str_header=StorageHeader(index + 1, 0, "Ecu"),
+        )
+        for index, (apid, ctid, level, ecu) in enumerate(params)
+    ]
+    # non-log message with ECU ID only in Storage Header
+    messages.append(
+        DltMessage.create_verbose_message(
+            [ArgumentString("message 4")],
+            MessageType.DLT_TYPE_APP_TRACE,
+            MessageTraceInfo.DLT_TRACE_VARIABLE,
+            "App1",
+            "Ctx1",
+            message_counter=4,
+            str_header=StorageHeader(5, 0, "Ecu2"),
+        )
+    )
+    return messages
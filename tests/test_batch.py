@@ -0,0 +1,195 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+from pydlt import (
+    ArgumentString,
+    ArgumentUInt32,
+    DltFileReader,
+    DltMessage,
+    MessageBatch,
+    MessageLogInfo,
+    MessageType,
+    StorageHeader,
+    compile_filter,
+)
+
+CURRENT_DIR_PATH = Path(__file__).parent.absolute()
+TEST_RESULTS_DIR_PATH = CURRENT_DIR_PATH / "results"
+TEST_RESULTS_DIR_PATH.mkdir(exist_ok=True)
+
+
+def test_batch_columns():
+    messages = _make_messages(10)
+    data = b"".join([msg.to_bytes() for msg in messages])
+    offsets = [0]
+    for msg in messages:
+        offsets.append(offsets[-1] + len(msg.to_bytes()))
+    batch = MessageBatch(data, offsets)
+
+    assert len(batch) == 10
+    assert batch.positions == offsets[:-1]
+    assert batch.time == [msg.str_header.seconds + 0.5 for msg in messages]
+    assert batch.timestamp == [msg.std_header.timestamp for msg in messages]
+    assert batch.message_counter == [msg.std_header.message_counter for msg in messages]
+    assert batch.ecu_id == ["Ecu", "Std"] * 5
+    assert batch.application_id == ["App", None] * 5
+    assert batch.context_id == ["Ctx", None] * 5
+    assert batch.level == [MessageLogInfo.DLT_LOG_WARN, None] * 5
+    assert batch.message_bytes(1) == messages[1].to_bytes()
+    assert batch.message_bytes(-1) == messages[-1].to_bytes()
+
+
+def test_batch_decode_lazily():
+    messages = _make_messages(4)
+    offsets = [0]
+    for msg in messages:
+        offsets.append(offsets[-1] + len(msg.to_bytes()))
+    data = b"".join([msg.to_bytes() for msg in messages])
+    # the message 3 is broken, which is not decoded until it is accessed
+    broken = data[: offsets[3]] + b"\x00" * (offsets[4] - offsets[3])
+    batch = MessageBatch(broken, offsets)
+
+    assert batch[0] == messages[0]
+    assert batch[0] is batch[0]
+    assert batch[-2] == messages[2]
+    assert batch.message_counter == [0, 1, 2, 0]
+    with pytest.raises(ValueError):
+        batch[3]
+    with pytest.raises(IndexError):
+        batch[4]
+
+
+@pytest.mark.parametrize("size", [1, 7, 100, 1000])
+def test_file_iter_batches(size):
+    path = TEST_RESULTS_DIR_PATH / Path(f"{sys._getframe().f_code.co_name}.dlt")
+    messages = _make_messages(100)
+    # the truncated message at the end is not read
+    path.write_bytes(b"".join([msg.to_bytes() for msg in messages]) + b"DLT\x01")
+
+    with DltFileReader(path, encoding="latin-1") as reader:
+        batches = list(reader.iter_batches(size))
+        assert reader.read_batch(size) is None
+        assert reader.read_message() is None
+
+    assert [len(batch) for batch in batches[:-1]] == [size] * (len(batches) - 1)
+    assert [msg for batch in batches for msg in batch] == messages
+    positions = [position for batch in batches for position in batch.positions]
+    assert positions[1] == len(messages[0].to_bytes())
+    assert batches[0].encoding == "latin-1"
+
+
+def test_file_read_batch_and_message():
+    path = TEST_RESULTS_DIR_PATH / Path(f"{sys._getframe().f_code.co_name}.dlt")
+    messages = _make_messages(10)
+    path.write_bytes(b"".join([msg.to_bytes() for msg in messages]))
+
+    with DltFileReader(path) as reader:
+        assert reader.read_message() == messages[0]
+        batch = reader.read_batch(3)
+        assert list(batch) == messages[1:4]
+        assert reader.tell() == sum([len(msg.to_bytes()) for msg in messages[:4]])
+        assert reader.read_message() == messages[4]
+        assert list(reader.read_batch(100)) == messages[5:]
+
+
+def test_file_read_batch_large_message(monkeypatch):
+    path = TEST_RESULTS_DIR_PATH / Path(f"{sys._getframe().f_code.co_name}.dlt")
+    messages = _make_messages(5, "x" * 1000)
+    path.write_bytes(b"".join([msg.to_bytes() for msg in messages]))
+    # messages are larger than data bytes read at once
+    monkeypatch.setattr("pydlt.file._BATCH_READ_SIZE", 100)
+
+    with DltFileReader(path) as reader:
+        assert list(reader.read_batch(10)) == messages
+
+
+def test_file_read_batch_predicate():
+    path = TEST_RESULTS_DIR_PATH / Path(f"{sys._getframe().f_code.co_name}.dlt")
+    messages = _make_messages(20)
+    path.write_bytes(b"".join([msg.to_bytes() for msg in messages]))
+
+    predicate = compile_filter("type == log and counter >= 10")
+    with DltFileReader(path, predicate=predicate) as reader:
+        batches = list(reader.iter_batches(3))
+    assert [len(batch) for batch in batches] == [3, 2]
+    assert [msg for batch in batches for msg in batch] == messages[10::2]
+    assert batches[0].positions[0] == sum(
+        [len(msg.to_bytes()) for msg in messages[:10]]
+    )
+
+
+def test_file_read_batch_invalid_length():
+    path = TEST_RESULTS_DIR_PATH / Path(f"{sys._getframe().f_code.co_name}.dlt")
+    data = bytearray(_make_messages(1)[0].to_bytes())
+    # length in Standard Header
+    data[18:20] = b"\x00\x02"
+    path.write_bytes(bytes(data))
+
+    with DltFileReader(path) as reader:
+        with pytest.raises(ValueError):
+            reader.read_batch(10)
+
+
+def test_file_read_batch_invalid_pattern():
+    path = TEST_RESULTS_DIR_PATH / Path(f"{sys._getframe().f_code.co_name}.dlt")
+    messages = _make_messages(2)
+    data = messages[0].to_bytes()
+    # garbage in place of DLT-Pattern of the second message
+    path.write_bytes(data + b"XXXX" + messages[1].to_bytes()[4:])
+
+    with DltFileReader(path) as reader:
+        with pytest.raises(ValueError, match=f"not found at position {len(data)}"):
+            reader.read_batch(10)
+
+
+def test_batch_to_header_table():
+    pytest.importorskip("numpy")
+    path = TEST_RESULTS_DIR_PATH / Path(f"{sys._getframe().f_code.co_name}.dlt")
+    messages = _make_messages(10)
+    path.write_bytes(b"".join([msg.to_bytes() for msg in messages]))
+
+    with DltFileReader(path) as reader:
+        reader.read_message()
+        batch = reader.read_batch(5)
+    table = batch.to_header_table()
+    assert table.position.tolist() == batch.positions
+    assert table.message_counter.tolist() == batch.message_counter
+    assert table.timestamp.tolist() == batch.timestamp
+
+
+def _make_messages(count, text="message"):
+    # log messages and non-verbose messages without Extended Header alternately
+    messages = []
+    for index in range(count):
+        str_header = StorageHeader(1000 + index, 500000, "Ecu")
+        if index % 2 == 0:
+            messages.append(
+                DltMessage.create_verbose_message(
+                    [ArgumentString(f"{text} {index}"), ArgumentUInt32(index)],
+                    MessageType.DLT_TYPE_LOG,
+                    MessageLogInfo.DLT_LOG_WARN,
+                    "App",
+                    "Ctx",
+                    timestamp=index,
+                    message_counter=index,
+                    str_header=str_header,
+                )
+            )
+        else:
+            messages.append(
+                DltMessage.create_non_verbose_message(
+                    index,
+                    b"\x01\x02",
+                    timestamp=index,
+                    ecu_id="Std",
+                    message_counter=index,
+                    str_header=str_header,
+                )
+            )
+    return messages
+
+
+if __name__ == "__main__":
+    pytest.main(sys.argv)
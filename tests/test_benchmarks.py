@@ -0,0 +1,188 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+from benchmarks.__main__ import main, prepare_corpus
+from benchmarks.corpus import MIXES, CorpusConfig, generate_corpus, generate_messages
+from benchmarks.regression import (
+    compare,
+    create_record,
+    load_record,
+    machine_fingerprint,
+    mann_whitney_u,
+    save_record,
+)
+from benchmarks.suite import BENCHMARKS, Corpus, Measurement, measure
+from pydlt import DltFileReader, DltMessage
+
+CURRENT_DIR_PATH = Path(__file__).parent.absolute()
+TEST_RESULTS_DIR_PATH = CURRENT_DIR_PATH / "results"
+TEST_RESULTS_DIR_PATH.mkdir(exist_ok=True)
+
+
+@pytest.mark.parametrize("mix", sorted(MIXES))
+def test_generate_messages(mix):
+    config = MIXES[mix]._replace(variants=50)
+    messages = generate_messages(config, 1)
+
+    assert len(messages) == 50
+    assert generate_messages(config, 1) == messages
+    assert generate_messages(config, 2) != messages
+    for data in messages:
+        msg = DltMessage.create_from_bytes(data, True)
+        assert msg.to_bytes() == data
+        if config.verbose_ratio == 1.0:
+            assert msg.ext_header is not None and msg.ext_header.verbose
+        elif config.verbose_ratio == 0.0:
+            assert msg.ext_header is None
+
+
+def test_generate_corpus():
+    path = TEST_RESULTS_DIR_PATH / Path(f"{sys._getframe().f_code.co_name}.dlt")
+    config = CorpusConfig(variants=20)
+    count = generate_corpus(path, 10000, config, 3)
+    data = path.read_bytes()
+
+    assert len(data) >= 10000
+    generate_corpus(path, 10000, config, 3)
+    assert path.read_bytes() == data
+    with DltFileReader(path) as reader:
+        messages = list(reader)
+    assert len(messages) == count
+    assert [msg.std_header.message_counter for msg in messages[:3]] == [0, 1, 2]
+    assert messages[1].str_header.microseconds == 1000
+
+
+def test_benchmarks_measure():
+    path = TEST_RESULTS_DIR_PATH / Path(f"{sys._getframe().f_code.co_name}.dlt")
+    count = generate_corpus(path, 5000, CorpusConfig(variants=20))
+    corpus = Corpus(path)
+
+    for benchmark in BENCHMARKS:
+        result = measure(benchmark, corpus, 2)
+        assert result.messages == count
+        assert result.size == corpus.size
+        assert len(result.times) == 2
+        assert result.messages_per_second > 0
+        assert result.iqr >= 0
+
+    # messages are encoded by "encode" apart from the messages written by "write"
+    assert corpus.messages_without_raw is not corpus.messages
+    assert [msg.to_bytes() for msg in corpus.messages] == corpus.message_bytes
+    assert path.with_suffix(".out").read_bytes() == path.read_bytes()
+
+
+def test_measurement_statistics():
+    result = Measurement("decode", 100, 1000, [4.0, 1.0, 3.0, 2.0, 5.0])
+
+    assert result.median == 3.0
+    assert result.iqr == 2.0
+    assert result.messages_per_second == pytest.approx(100 / 3.0)
+
+
+def test_regression_record():
+    results_dir = TEST_RESULTS_DIR_PATH / sys._getframe().f_code.co_name
+    corpus = {"mix": "default", "size": 1000, "seed": 0}
+    machine = dict(machine_fingerprint(), id="machine")
+    measurements = [Measurement("read", 10, 1000, [1.0, 1.1, 0.9], 1 << 20)]
+    path = save_record(results_dir, create_record("abc123", corpus, measurements))
+    assert path.parent.name == machine_fingerprint()["id"]
+    save_record(results_dir, create_record("abc123", corpus, measurements, machine))
+    # results of other benchmarks are added to the saved record
+    measurements = [Measurement("str", 10, 1000, [2.0], None)]
+    save_record(results_dir, create_record("abc123", corpus, measurements, machine))
+    save_record(results_dir, create_record("abd456", corpus, measurements, machine))
+
+    record = load_record(results_dir, "abc", machine)
+    assert record["commit"] == "abc123"
+    assert record["results"]["read"]["median"] == 1.0
+    assert record["results"]["read"]["peak_rss"] == 1 << 20
+    assert record["results"]["str"]["times"] == [2.0]
+    with pytest.raises(ValueError):
+        load_record(results_dir, "ab", machine)
+    with pytest.raises(ValueError):
+        load_record(results_dir, "xyz", machine)
+
+
+def test_regression_compare():
+    corpus = {"mix": "default", "size": 1000, "seed": 0}
+    baseline = create_record(
+        "base",
+        corpus,
+        [
+            Measurement("read", 10, 1000, [1.0, 1.0, 1.1, 0.9, 1.0]),
+            Measurement("decode", 10, 1000, [0.8, 1.0, 1.2, 1.1, 0.9]),
+            Measurement("str", 10, 1000, [1.0]),
+        ],
+    )
+    current = create_record(
+        "new",
+        corpus,
+        [
+            Measurement("read", 10, 1000, [1.2, 1.2, 1.3, 1.2, 1.25]),
+            # slower, but not significantly
+            Measurement("decode", 10, 1000, [1.0, 1.2, 1.4, 0.9, 1.1]),
+            Measurement("write", 10, 1000, [1.0]),
+        ],
+    )
+    comparisons = compare(baseline, current, 0.05)
+    assert [c.name for c in comparisons] == ["read", "decode"]
+    assert comparisons[0].change == pytest.approx(0.2)
+    assert comparisons[0].p_value == pytest.approx(1 / 252)
+    assert comparisons[0].regressed
+    assert comparisons[1].change == pytest.approx(0.1)
+    assert comparisons[1].p_value > 0.05
+    assert not comparisons[1].regressed
+    assert not compare(baseline, current, 0.5)[0].regressed
+    assert not compare(baseline, current, 0.05, 0.001)[0].regressed
+
+    other = create_record("new", dict(corpus, seed=1), [])
+    with pytest.raises(ValueError):
+        compare(baseline, other)
+
+
+def test_mann_whitney_u():
+    # the times of the new run are larger than all the baseline in 1 of 20 splits
+    assert mann_whitney_u([1.0, 1.1, 1.2], [1.3, 1.4, 1.5]) == pytest.approx(0.05)
+    assert mann_whitney_u([1.3, 1.4, 1.5], [1.0, 1.1, 1.2]) == pytest.approx(1.0)
+    # 2 splits of 6 have the rank sum of the tied times or more
+    assert mann_whitney_u([1.0, 1.0], [1.0, 2.0]) == pytest.approx(0.5)
+    assert mann_whitney_u([1.0] * 5, [1.0] * 5) == pytest.approx(1.0)
+    # approximated by the normal distribution for many times
+    baseline = [1.0 + index * 0.01 for index in range(30)]
+    assert mann_whitney_u(baseline, [t + 0.2 for t in baseline]) < 0.001
+    assert mann_whitney_u(baseline, baseline) == pytest.approx(0.5, abs=0.05)
+    assert mann_whitney_u([1.0] * 30, [1.0] * 30) == 1.0
+
+
+def test_benchmarks_main(capsys):
+    corpus_dir = TEST_RESULTS_DIR_PATH / sys._getframe().f_code.co_name
+    argv = ["--size", "4K", "--mix", "strings", "--repeat", "1"]
+    argv += ["--corpus-dir", str(corpus_dir), "decode", "str"]
+
+    assert main(argv) == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert [line.split()[0] for line in lines[2:]] == ["decode", "str"]
+    assert prepare_corpus(corpus_dir, 4096, "strings", 0).path.exists()
+    with pytest.raises(SystemExit):
+        main(["--corpus-dir", str(corpus_dir), "decode", "unknown"])
+
+
+def test_benchmarks_main_baseline(capsys, tmp_path):
+    test_dir = TEST_RESULTS_DIR_PATH / sys._getframe().f_code.co_name
+    argv = ["--size", "4K", "--repeat", "1", "--corpus-dir", str(test_dir)]
+    # results are saved by the current commit, which changes at every commit
+    argv += ["--results-dir", str(tmp_path), "decode"]
+    assert main(argv + ["--baseline", "0000000"]) == 2
+
+    assert main(argv + ["--save"]) == 0
+    saved = capsys.readouterr().out.splitlines()[-1]
+    commit = Path(saved.split(": ", 1)[1]).stem
+    # a regression is not detected by any large threshold
+    assert main(argv + ["--baseline", commit, "--threshold", "100"]) == 0
+    assert "baseline: " + commit in capsys.readouterr().out
+
+
+if __name__ == "__main__":
+    pytest.main(sys.argv)
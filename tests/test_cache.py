@@ -0,0 +1,165 @@
+import os
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+from pydlt import (
+    ArgumentFloat64,
+    ArgumentRaw,
+    ArgumentSInt32,
+    ArgumentString,
+    DltFileReader,
+    DltMessage,
+    MessageLogInfo,
+    MessageType,
+    ParseCache,
+    StorageHeader,
+)
+
+CURRENT_DIR_PATH = Path(__file__).parent.absolute()
+TEST_RESULTS_DIR_PATH = CURRENT_DIR_PATH / "results"
+TEST_RESULTS_DIR_PATH.mkdir(exist_ok=True)
+
+
+def test_parse_cache():
+    name = sys._getframe().f_code.co_name
+    path = TEST_RESULTS_DIR_PATH / Path(f"{name}.dlt")
+    cache_dir = _make_cache_dir(name)
+    messages = _make_messages()
+    path.write_bytes(b"".join([msg.to_bytes() for msg in messages]))
+    cache = ParseCache(cache_dir)
+
+    with DltFileReader(path, cache=cache) as reader:
+        assert reader.read_messages() == messages
+    assert len(list(cache_dir.iterdir())) == 1
+
+    with DltFileReader(path, cache=cache) as reader:
+        assert reader._cached_snapshots is not None
+        cached_messages = reader.read_messages()
+    assert cached_messages == messages
+    assert [str(msg) for msg in cached_messages] == [str(msg) for msg in messages]
+    assert [msg.to_bytes() for msg in cached_messages] == [
+        msg.to_bytes() for msg in messages
+    ]
+
+    # modified messages are converted to bytes again
+    cached_messages[0].verbose_payload.arguments[0].data = "modified"
+    assert b"modified" in cached_messages[0].to_bytes()
+
+
+def test_parse_cache_key():
+    name = sys._getframe().f_code.co_name
+    path = TEST_RESULTS_DIR_PATH / Path(f"{name}.dlt")
+    cache = ParseCache(_make_cache_dir(name))
+    path.write_bytes(b"".join([msg.to_bytes() for msg in _make_messages()]))
+    key = cache.key(path)
+
+    assert cache.key(path) == key
+    assert cache.key(path, "latin-1") != key
+    stat = path.stat()
+    os.utime(str(path), ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000))
+    assert cache.key(path) != key
+
+
+def test_parse_cache_modified_file():
+    name = sys._getframe().f_code.co_name
+    path = TEST_RESULTS_DIR_PATH / Path(f"{name}.dlt")
+    cache = ParseCache(_make_cache_dir(name))
+    messages = _make_messages()
+    path.write_bytes(b"".join([msg.to_bytes() for msg in messages]))
+    with DltFileReader(path, cache=cache) as reader:
+        reader.read_messages()
+
+    path.write_bytes(b"".join([msg.to_bytes() for msg in messages[:2]]))
+    with DltFileReader(path, cache=cache) as reader:
+        assert reader.read_messages() == messages[:2]
+
+
+def test_parse_cache_partial_read():
+    name = sys._getframe().f_code.co_name
+    path = TEST_RESULTS_DIR_PATH / Path(f"{name}.dlt")
+    cache_dir = _make_cache_dir(name)
+    path.write_bytes(b"".join([msg.to_bytes() for msg in _make_messages()]))
+
+    # nothing is stored until all messages are read
+    with DltFileReader(path, cache=ParseCache(cache_dir)) as reader:
+        reader.read_message()
+    assert list(cache_dir.iterdir()) == []
+
+
+def test_parse_cache_broken_entry():
+    name = sys._getframe().f_code.co_name
+    path = TEST_RESULTS_DIR_PATH / Path(f"{name}.dlt")
+    cache_dir = _make_cache_dir(name)
+    cache = ParseCache(cache_dir)
+    messages = _make_messages()
+    path.write_bytes(b"".join([msg.to_bytes() for msg in messages]))
+    with DltFileReader(path, cache=cache) as reader:
+        reader.read_messages()
+
+    for entry in cache_dir.iterdir():
+        entry.write_bytes(b"broken")
+    with DltFileReader(path, cache=cache) as reader:
+        assert reader._cached_snapshots is None
+        assert reader.read_messages() == messages
+
+
+def test_parse_cache_eviction():
+    name = sys._getframe().f_code.co_name
+    cache_dir = _make_cache_dir(name)
+    cache = ParseCache(cache_dir)
+    snapshots = [(b"\x00" * 100,)]
+    cache.store("a", snapshots)
+    # the cache can hold 3 entries
+    cache.max_size = cache._entry_path("a").stat().st_size * 3
+    for index, key in enumerate(["a", "b", "c"]):
+        cache.store(key, snapshots)
+        os.utime(str(cache._entry_path(key)), (index, index))
+    # "a" is used recently
+    assert cache.load("a") == snapshots
+
+    cache.store("d", snapshots)
+    assert sorted(path.stem for path in cache_dir.iterdir()) == ["a", "c", "d"]
+
+    cache.clear()
+    assert list(cache_dir.iterdir()) == []
+
+
+def _make_cache_dir(name):
+    cache_dir = TEST_RESULTS_DIR_PATH / Path(f"{name}_cache")
+    shutil.rmtree(str(cache_dir), ignore_errors=True)
+    return cache_dir
+
+
+def _make_messages():
+    return [
+        DltMessage.create_verbose_message(
+            [
+                ArgumentString("hello"),
+                ArgumentString("ユニコード", is_utf8=True),
+                ArgumentSInt32(-index),
+                ArgumentFloat64(0.5),
+                ArgumentRaw(b"\x01\x02"),
+            ],
+            MessageType.DLT_TYPE_LOG,
+            MessageLogInfo.DLT_LOG_INFO,
+            "App",
+            "Ctx",
+            timestamp=index,
+            ecu_id="Ecu",
+            message_counter=index,
+            msb_first=index % 2 == 1,
+            str_header=StorageHeader(index, 0, "Ecu"),
+        )
+        for index in range(3)
+    ] + [
+        DltMessage.create_non_verbose_message(
+            1, b"\x01\x02", session_id=1, str_header=StorageHeader(3, 0, "Ecu")
+        )
+    ]
+
+
+if __name__ == "__main__":
+    pytest.main(sys.argv)
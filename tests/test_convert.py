@@ -0,0 +1,234 @@
+import csv
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+from pydlt import (
+    ArgumentBool,
+    ArgumentFloat64,
+    ArgumentRaw,
+    ArgumentSInt32,
+    ArgumentString,
+    DltFileReader,
+    DltFileWriter,
+    DltMessage,
+    MessageLogInfo,
+    MessageType,
+    StorageHeader,
+)
+from pydlt.cli import main
+from pydlt.convert import CSV_COLUMNS, convert_file
+
+CURRENT_DIR_PATH = Path(__file__).parent.absolute()
+TEST_RESULTS_DIR_PATH = CURRENT_DIR_PATH / "results"
+TEST_RESULTS_DIR_PATH.mkdir(exist_ok=True)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_convert_text(workers):
+    name = f"{sys._getframe().f_code.co_name}_{workers}"
+    path = _write_messages(TEST_RESULTS_DIR_PATH / f"{name}.dlt", 100)
+    output = path.with_suffix(".txt")
+
+    # chunks are small to be converted by many tasks
+    assert convert_file(path, output, workers=workers, chunk_size=500) == 100
+    with DltFileReader(path) as reader:
+        expected = "".join([str(msg) + "\n" for msg in reader])
+    assert output.read_text(encoding="utf-8") == expected
+
+
+@pytest.mark.parametrize("chunk_size", [50, 97, 300])
+def test_convert_ranges_with_pattern_in_payload(chunk_size):
+    name = f"{sys._getframe().f_code.co_name}_{chunk_size}"
+    path = TEST_RESULTS_DIR_PATH / f"{name}.dlt"
+    # messages in a payload which look like a chain of valid messages
+    fake = (StorageHeader.DLT_PATTERN + bytes(12) + b"\x21\x00\x00\x04") * 3
+    messages = [
+        DltMessage.create_verbose_message(
+            [ArgumentString(f"message {index}"), ArgumentRaw(fake * (index % 5))],
+            MessageType.DLT_TYPE_LOG,
+            MessageLogInfo.DLT_LOG_INFO,
+            "App",
+            "Ctx",
+            message_counter=index,
+            str_header=StorageHeader(index, 0, "Ecu"),
+        )
+        for index in range(20)
+    ]
+    # incomplete message at the end of the file is ignored
+    data = b"".join([msg.to_bytes() for msg in messages])
+    path.write_bytes(data + messages[1].to_bytes()[:-1])
+    output = path.with_suffix(".txt")
+
+    expected = "".join([str(msg) + "\n" for msg in messages])
+    for workers in (1, 2):
+        assert convert_file(path, output, workers=workers, chunk_size=chunk_size) == 20
+        assert output.read_text(encoding="utf-8") == expected
+
+
+def test_convert_invalid_data():
+    path = _write_messages(
+        TEST_RESULTS_DIR_PATH / f"{sys._getframe().f_code.co_name}.dlt", 20
+    )
+    data = path.read_bytes()
+    path.write_bytes(data[:1000] + b"garbage" + data[1000:])
+    output = path.with_suffix(".txt")
+
+    for workers in (1, 2):
+        with pytest.raises(ValueError):
+            convert_file(path, output, workers=workers, chunk_size=200)
+
+
+def test_convert_text_template_and_filter():
+    path = TEST_RESULTS_DIR_PATH / f"{sys._getframe().f_code.co_name}.dlt"
+    _write_messages(path, 20)
+    output = path.with_suffix(".txt")
+
+    count = convert_file(
+        path,
+        output,
+        template="{counter} {apid}",
+        expression="counter >= 15",
+        workers=2,
+        chunk_size=300,
+    )
+    assert count == 5
+    # non-verbose messages have no Application ID
+    assert output.read_text(encoding="utf-8").splitlines() == [
+        "15 ",
+        "16 App",
+        "17 App",
+        "18 App",
+        "19 ",
+    ]
+
+
+def test_convert_jsonl():
+    path = TEST_RESULTS_DIR_PATH / f"{sys._getframe().f_code.co_name}.dlt"
+    _write_messages(path, 4)
+    output = path.with_suffix(".jsonl")
+
+    assert convert_file(path, output, "jsonl", workers=1) == 4
+    records = [json.loads(line) for line in output.read_text("utf-8").splitlines()]
+    assert records[0] == {
+        "time": 1600000000.5,
+        "timestamp": 0,
+        "counter": 0,
+        "ecu": "Ecu",
+        "session": None,
+        "apid": "App",
+        "ctid": "Ctx",
+        "type": "log",
+        "subtype": "warn",
+        "mode": "verbose",
+        "args": ["message 0 ä", -1, 0.5, True, "0102", None],
+    }
+    assert records[3] == {
+        "time": 1600000001.5,
+        "timestamp": 3,
+        "counter": 3,
+        "ecu": "Std",
+        "session": 1,
+        "mode": "non-verbose",
+        "message_id": 3,
+        "data": "0102",
+    }
+
+
+def test_convert_csv():
+    path = TEST_RESULTS_DIR_PATH / f"{sys._getframe().f_code.co_name}.dlt"
+    _write_messages(path, 4)
+    output = path.with_suffix(".csv")
+
+    assert convert_file(path, output, "csv", workers=2, chunk_size=200) == 4
+    with open(output, encoding="utf-8", newline="") as file:
+        rows = list(csv.reader(file))
+    assert tuple(rows[0]) == CSV_COLUMNS
+    assert len(rows) == 5
+    assert rows[1][:11] == [
+        "2020/09/13 12:26:40.500000",
+        "0.0000",
+        "0",
+        "Ecu",
+        "",
+        "App",
+        "Ctx",
+        "log",
+        "warn",
+        "verbose",
+        "6",
+    ]
+    assert rows[1][11].startswith("message 0 ä -1 0.5 True 0102")
+    assert rows[4][3:11] == ["Std", "1", "", "", "", "", "non-verbose", ""]
+
+
+def test_convert_invalid_arguments():
+    path = _write_messages(
+        TEST_RESULTS_DIR_PATH / f"{sys._getframe().f_code.co_name}.dlt", 1
+    )
+    output = path.with_suffix(".txt")
+    with pytest.raises(ValueError):
+        convert_file(path, output, "xml")
+    with pytest.raises(ValueError):
+        convert_file(path, output, template="{unknown}")
+    with pytest.raises(ValueError):
+        convert_file(path, output, expression="apid ==")
+
+
+def test_convert_cli(capsys):
+    path = TEST_RESULTS_DIR_PATH / f"{sys._getframe().f_code.co_name}.dlt"
+    _write_messages(path, 10)
+    output = path.with_suffix(".jsonl")
+
+    argv = ["convert", str(path), "--to", "jsonl", "-j", "2", "-o", str(output)]
+    assert main(argv + ["--filter", "counter < 4"]) == 0
+    assert "4 messages are converted" in capsys.readouterr().err
+    assert len(output.read_text(encoding="utf-8").splitlines()) == 4
+    assert main(["convert", str(path), "--format", "{unknown}"]) == 1
+
+
+def _write_messages(path, count):
+    messages = []
+    for index in range(count):
+        str_header = StorageHeader(1600000000 + index // 2, 500000, "Ecu")
+        if index % 4 == 3:
+            messages.append(
+                DltMessage.create_non_verbose_message(
+                    index,
+                    b"\x01\x02",
+                    timestamp=index,
+                    session_id=1,
+                    ecu_id="Std",
+                    message_counter=index,
+                    str_header=str_header,
+                )
+            )
+            continue
+        messages.append(
+            DltMessage.create_verbose_message(
+                [
+                    ArgumentString(f"message {index} ä", is_utf8=True),
+                    ArgumentSInt32(-1),
+                    ArgumentFloat64(0.5),
+                    ArgumentBool(True),
+                    ArgumentRaw(b"\x01\x02"),
+                    ArgumentFloat64(float("nan")),
+                ],
+                MessageType.DLT_TYPE_LOG,
+                MessageLogInfo.DLT_LOG_WARN,
+                "App",
+                "Ctx",
+                timestamp=index,
+                message_counter=index,
+                str_header=str_header,
+            )
+        )
+    with DltFileWriter(path) as writer:
+        writer.write_messages(messages)
+    return path
+
+
+if __name__ == "__main__":
+    pytest.main(sys.argv)
@@ -0,0 +1,82 @@
+import io
+import sys
+from pathlib import Path
+
+import pytest
+
+from pydlt import (
+    DltFileReader,
+    MessageLogInfo,
+    extract_messages,
+    make_raw_predicate,
+)
+from pydlt.cli import main
+from pydlt.scan import iter_chunks
+from tests import make_messages
+
+CURRENT_DIR_PATH = Path(__file__).parent.absolute()
+TEST_RESULTS_DIR_PATH = CURRENT_DIR_PATH / "results"
+TEST_RESULTS_DIR_PATH.mkdir(exist_ok=True)
+
+
+def test_iter_chunks():
+    messages = make_messages()
+    data = b"".join([msg.to_bytes() for msg in messages])
+
+    for buffer_size in (1, 20, 100, len(data)):
+        spans = []
+        for chunk in iter_chunks(io.BytesIO(data + b"\x44\x4c"), buffer_size):
+            for index in range(len(chunk.offsets) - 1):
+                start = chunk.position + chunk.offsets[index]
+                length = chunk.offsets[index + 1] - chunk.offsets[index]
+                spans.append((start, length))
+        lengths = [len(msg.to_bytes()) for msg in messages]
+        assert [length for _, length in spans] == lengths
+        assert [start for start, _ in spans] == [sum(lengths[:i]) for i in range(5)]
+
+
+def test_iter_chunks_invalid_pattern():
+    with pytest.raises(ValueError):
+        list(iter_chunks(io.BytesIO(b"\x00" * 32)))
+
+
+@pytest.mark.parametrize(
+    "conditions, expected_indexes",
+    [
+        ({}, [0, 1, 2, 3, 4]),
+        ({"application_ids": ["App1"]}, [0, 2, 4]),
+        ({"application_ids": ["App1", "App2"], "context_ids": ["Ctx2"]}, [1, 2]),
+        ({"ecu_ids": ["Ecu2"]}, [3, 4]),
+        ({"level": MessageLogInfo.DLT_LOG_WARN}, [0, 1]),
+        ({"time_from": 1.5}, [1, 2, 3, 4]),
+        ({"time_from": 1.5, "time_to": 3.5}, [1, 2]),
+    ],
+)
+def test_extract_messages(conditions, expected_indexes):
+    src_path = TEST_RESULTS_DIR_PATH / Path(f"{sys._getframe().f_code.co_name}.dlt")
+    dst_path = TEST_RESULTS_DIR_PATH / Path(f"{sys._getframe().f_code.co_name}_out.dlt")
+    messages = make_messages()
+    src_path.write_bytes(b"".join([msg.to_bytes() for msg in messages]))
+
+    count = extract_messages(src_path, dst_path, make_raw_predicate(**conditions))
+    assert count == len(expected_indexes)
+    assert dst_path.read_bytes() == b"".join(
+        [messages[i].to_bytes() for i in expected_indexes]
+    )
+
+
+def test_extract_cli():
+    src_path = TEST_RESULTS_DIR_PATH / Path(f"{sys._getframe().f_code.co_name}.dlt")
+    dst_path = TEST_RESULTS_DIR_PATH / Path(f"{sys._getframe().f_code.co_name}_out.dlt")
+    src_path.write_bytes(b"".join([msg.to_bytes() for msg in make_messages()]))
+
+    argv = ["extract", str(src_path), str(dst_path), "--apid", "App1"]
+    argv += ["--level", "warn", "--from", "1970/01/01 00:00:00.5"]
+    assert main(argv) == 0
+    with DltFileReader(dst_path) as reader:
+        messages = reader.read_messages()
+    assert [str(msg.payload) for msg in messages] == ["message 0"]
+
+
+if __name__ == "__main__":
+    pytest.main(sys.argv)
@@ -147,6 +147,43 @@ def test_file_encoding():
         assert str(msg.payload) == "100°C äöü"
 
 
+def test_file_write_decoded_message():
+    path = TEST_RESULTS_DIR_PATH / Path(f"{sys._getframe().f_code.co_name}.dlt")
+    # ASCII string argument with latin-1 characters
+    msg1 = DltMessage.create_verbose_message(
+        [ArgumentString("100°C äöü", encoding="latin-1")],
+        MessageType.DLT_TYPE_LOG,
+        MessageLogInfo.DLT_LOG_INFO,
+        "App",
+        "Ctx",
+        str_header=StorageHeader(0, 0, "Ecu"),
+    )
+    data = msg1.to_bytes()
+
+    # the message is written as is even if the encoding is not given
+    with DltFileWriter(path) as writer:
+        writer.write_message(DltMessage.create_from_bytes(data, True))
+    assert path.read_bytes() == data
+
+
+def test_file_tell_and_seek():
+    path = TEST_RESULTS_DIR_PATH / Path(f"{sys._getframe().f_code.co_name}.dlt")
+    with DltFileWriter(path) as writer:
+        writer.write_messages([_make_dlt_message(), _make_dlt_message()])
+
+    with DltFileReader(path) as reader:
+        assert reader.path == path
+        assert reader.tell() == 0
+        message = reader.read_message()
+        position = reader.tell()
+        assert position == len(message.to_bytes())
+        assert reader.read_message() is not None
+        assert reader.read_message() is None
+        reader.seek(position)
+        assert reader.read_message() == message
+        assert reader.read_message() is None
+
+
 def _make_dlt_message():
     std_header = DltMessage._create_standard_header(
         0, None, None, None, None, 0, 1, False
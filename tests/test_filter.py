@@ -0,0 +1,144 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+from pydlt import (
+    DltFileReader,
+    DltMessage,
+    StorageHeader,
+    compile_filter,
+    extract_messages,
+)
+from pydlt.cli import main
+from tests import make_messages
+
+CURRENT_DIR_PATH = Path(__file__).parent.absolute()
+TEST_RESULTS_DIR_PATH = CURRENT_DIR_PATH / "results"
+TEST_RESULTS_DIR_PATH.mkdir(exist_ok=True)
+
+
+@pytest.mark.parametrize(
+    "expression, expected_indexes",
+    [
+        ('apid == "App1"', [0, 2, 4]),
+        ("apid == 'App1'", [0, 2, 4]),
+        ('apid != "App1"', [1, 3]),
+        ('apid in ("App1", "App2") and ctid == "Ctx2"', [1, 2]),
+        ('apid not in ("App1", "App2")', [3]),
+        ('not apid in ("App1", "App2")', [3, 5]),
+        ('ecu == "Ecu2"', [3, 4, 5]),
+        ("level <= warn", [0, 1]),
+        ("level == 4", [2, 3]),
+        ("type == app_trace", [4]),
+        ("verbose == true", [0, 1, 2, 3, 4]),
+        ("verbose == false", []),
+        ("time >= 1.5", [1, 2, 3, 4, 5]),
+        ('time >= 1.5 and time < "1970/01/01 00:00:03.5"', [1, 2]),
+        ("timestamp > 100", [5]),
+        ("session == 7", [5]),
+        ("counter >= 3", [3, 4, 5]),
+        ('level <= error or ecu == "Ecu2" and not type == log', [0, 4, 5]),
+        ('(level <= error or ecu == "Ecu2") and not type == log', [4, 5]),
+        ('APID == "App1" AND Level <= Warn', [0]),
+    ],
+)
+def test_compile_filter(expression, expected_indexes):
+    predicate = compile_filter(expression)
+    assert [
+        index
+        for index, msg in enumerate(_make_messages())
+        if predicate(msg.to_bytes(), 0)
+    ] == expected_indexes
+
+
+@pytest.mark.parametrize(
+    "expression",
+    [
+        "",
+        "apid",
+        'apid == "App1" and',
+        'foo == "App1"',
+        "apid == App1",
+        "apid === 1",
+        'apid in ("App1"',
+        "level <= loud",
+        "counter == 1.5",
+        'time >= "yesterday"',
+        "counter == 1 counter",
+        "counter == $",
+    ],
+)
+def test_compile_filter_invalid(expression):
+    with pytest.raises(ValueError):
+        compile_filter(expression)
+
+
+def test_compile_filter_with_offset():
+    messages = _make_messages()
+    data = b"".join([msg.to_bytes() for msg in messages])
+    predicate = compile_filter('apid == "App1" and level <= info')
+    offset = len(messages[0].to_bytes()) + len(messages[1].to_bytes())
+    assert predicate(data, offset) is True
+    assert predicate(data, 0) is True
+    assert predicate(data, len(messages[0].to_bytes())) is False
+
+
+def test_file_reader_predicate():
+    path = TEST_RESULTS_DIR_PATH / Path(f"{sys._getframe().f_code.co_name}.dlt")
+    messages = _make_messages()
+    path.write_bytes(b"".join([msg.to_bytes() for msg in messages]))
+
+    predicate = compile_filter('ecu == "Ecu2"')
+    with DltFileReader(path, predicate=predicate) as reader:
+        assert reader.last_position is None
+        assert reader.read_message() == messages[3]
+        # the position of the read message, not of the first skipped message
+        assert reader.last_position == sum(len(m.to_bytes()) for m in messages[:3])
+        assert reader.read_messages() == messages[4:]
+
+
+def test_extract_messages_with_filter():
+    src_path = TEST_RESULTS_DIR_PATH / Path(f"{sys._getframe().f_code.co_name}.dlt")
+    dst_path = TEST_RESULTS_DIR_PATH / Path(f"{sys._getframe().f_code.co_name}_out.dlt")
+    messages = _make_messages()
+    src_path.write_bytes(b"".join([msg.to_bytes() for msg in messages]))
+
+    count = extract_messages(src_path, dst_path, compile_filter("level >= info"))
+    assert count == 2
+    assert dst_path.read_bytes() == messages[2].to_bytes() + messages[3].to_bytes()
+
+
+def test_extract_cli_with_filter():
+    src_path = TEST_RESULTS_DIR_PATH / Path(f"{sys._getframe().f_code.co_name}.dlt")
+    dst_path = TEST_RESULTS_DIR_PATH / Path(f"{sys._getframe().f_code.co_name}_out.dlt")
+    messages = _make_messages()
+    src_path.write_bytes(b"".join([msg.to_bytes() for msg in messages]))
+
+    argv = ["extract", str(src_path), str(dst_path), "--apid", "App1"]
+    argv += ["--filter", 'ctid == "Ctx2" or type == app_trace']
+    assert main(argv) == 0
+    assert dst_path.read_bytes() == messages[2].to_bytes() + messages[4].to_bytes()
+
+    argv = ["extract", str(src_path), str(dst_path), "--filter", "apid =="]
+    assert main(argv) == 1
+
+
+def _make_messages():
+    messages = make_messages()
+    # message without Extended Header
+    messages.append(
+        DltMessage.create_non_verbose_message(
+            1,
+            b"",
+            timestamp=1000,
+            session_id=7,
+            message_counter=5,
+            str_header=StorageHeader(6, 0, "Ecu2"),
+        )
+    )
+    return messages
+
+
+if __name__ == "__main__":
+    pytest.main(sys.argv)
@@ -0,0 +1,170 @@
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+from pydlt import (
+    ArgumentString,
+    ArgumentUInt32,
+    DltFileReader,
+    DltMessage,
+    MessageLogInfo,
+    MessageType,
+    StorageHeader,
+    grep_file,
+)
+from pydlt.cli import main
+
+CURRENT_DIR_PATH = Path(__file__).parent.absolute()
+TEST_RESULTS_DIR_PATH = CURRENT_DIR_PATH / "results"
+TEST_RESULTS_DIR_PATH.mkdir(exist_ok=True)
+
+
+@pytest.mark.parametrize("buffer_size", [64, 1000, 1024 * 1024])
+@pytest.mark.parametrize(
+    "pattern,before,after",
+    [
+        (r"error \d+", 0, 0),
+        (r"error 1\d", 2, 1),
+        (r"^warn", 1, 3),
+        (r"\bwarn 1\d$", 0, 0),
+        (r"warn[^$]1\d|[$^]", 0, 0),  # characters in classes are not anchors
+        (r"(?<=error )1", 1, 0),  # a pattern with lookbehind is not searched in chunks
+        (r"ä", 0, 2),
+        (r"nothing", 1, 1),
+    ],
+)
+def test_grep_file(buffer_size, pattern, before, after):
+    path = TEST_RESULTS_DIR_PATH / f"{sys._getframe().f_code.co_name}.dlt"
+    messages = _make_messages(50)
+    path.write_bytes(b"".join([msg.to_bytes() for msg in messages]))
+
+    matches = list(grep_file(path, pattern, before=before, after=after))
+    expected = _grep(messages, re.compile(pattern), before, after)
+    assert [(match.index, match.matched) for match in matches] == expected
+    assert [match.message for match in matches] == [
+        messages[index] for index, _ in expected
+    ]
+    with DltFileReader(path) as reader:
+        for match in matches:
+            reader.seek(match.position)
+            assert reader.read_message() == match.message
+
+
+def test_grep_file_fixed_string_and_case():
+    path = TEST_RESULTS_DIR_PATH / f"{sys._getframe().f_code.co_name}.dlt"
+    messages = _make_messages(20)
+    path.write_bytes(b"".join([msg.to_bytes() for msg in messages]))
+
+    def indexes(pattern, **kwargs):
+        return [match.index for match in grep_file(path, pattern, **kwargs)]
+
+    assert indexes("ERROR 1", fixed_string=True) == []
+    assert indexes("ERROR 1", ignore_case=True, fixed_string=True) == [12, 16]
+    assert indexes("error 1", ignore_case=True) == [12, 16]
+    # regular expressions are not interpreted
+    assert indexes("error.1", fixed_string=True) == []
+    # the header fields and the number arguments are not searched
+    assert indexes("App", fixed_string=True) == []
+    assert indexes("\x0c", fixed_string=True) == []
+
+
+def test_grep_file_encoding():
+    path = TEST_RESULTS_DIR_PATH / f"{sys._getframe().f_code.co_name}.dlt"
+    message = DltMessage.create_verbose_message(
+        [ArgumentString("température", encoding="latin-1")],
+        MessageType.DLT_TYPE_LOG,
+        MessageLogInfo.DLT_LOG_INFO,
+        "App",
+        "Ctx",
+        str_header=StorageHeader(0, 0, "Ecu"),
+    )
+    path.write_bytes(message.to_bytes())
+
+    assert list(grep_file(path, "é")) == []
+    assert [m.message for m in grep_file(path, "é", encoding="latin-1")] == [message]
+    assert [m.message for m in grep_file(path, "rat", encoding="latin-1")] == [message]
+
+
+def test_grep_file_invalid_arguments():
+    path = TEST_RESULTS_DIR_PATH / f"{sys._getframe().f_code.co_name}.dlt"
+    path.write_bytes(b"")
+    with pytest.raises(ValueError):
+        list(grep_file(path, "(error"))
+    with pytest.raises(ValueError):
+        list(grep_file(path, "error", before=-1))
+
+
+def test_grep_cli(capsys):
+    path = TEST_RESULTS_DIR_PATH / f"{sys._getframe().f_code.co_name}.dlt"
+    messages = _make_messages(20)
+    path.write_bytes(b"".join([msg.to_bytes() for msg in messages]))
+
+    assert main(["grep", "error 1[26]", str(path), "-B", "1"]) == 0
+    assert capsys.readouterr().out.splitlines() == [
+        str(messages[11]),
+        str(messages[12]),
+        "--",
+        str(messages[15]),
+        str(messages[16]),
+    ]
+    assert main(["grep", "-c", "-i", "WARN", str(path)]) == 0
+    assert capsys.readouterr().out == "7\n"
+    assert main(["grep", "nothing", str(path)]) == 1
+    # errors are told from no match
+    assert main(["grep", "(", str(path)]) == 2
+    assert main(["grep", "error", str(path.with_suffix(".missing"))]) == 2
+    assert capsys.readouterr().out == ""
+
+
+def _grep(messages, regex, before, after):
+    # reference implementation which decodes all messages
+    matched = [
+        index
+        for index, msg in enumerate(messages)
+        if any(
+            isinstance(arg, ArgumentString) and regex.search(arg.data)
+            for arg in getattr(msg.payload, "arguments", [])
+        )
+    ]
+    indexes = set()
+    for index in matched:
+        indexes.update(
+            range(max(index - before, 0), min(index + after + 1, len(messages)))
+        )
+    return [(index, index in matched) for index in sorted(indexes)]
+
+
+def _make_messages(count):
+    # log messages with strings, and non-verbose messages every 3 messages
+    messages = []
+    for index in range(count):
+        str_header = StorageHeader(index, 0, "Ecu")
+        if index % 3 == 2:
+            messages.append(
+                DltMessage.create_non_verbose_message(
+                    index, b"error 1", ecu_id="Ecu", str_header=str_header
+                )
+            )
+            continue
+        text = ["error", "warn", "info ä", "warn"][index % 4]
+        messages.append(
+            DltMessage.create_verbose_message(
+                [
+                    ArgumentString(f"{text} {index}", is_utf8=True),
+                    ArgumentUInt32(index),
+                ],
+                MessageType.DLT_TYPE_LOG,
+                MessageLogInfo.DLT_LOG_WARN,
+                "App",
+                "Ctx",
+                message_counter=index % 256,
+                str_header=str_header,
+            )
+        )
+    return messages
+
+
+if __name__ == "__main__":
+    pytest.main(sys.argv)
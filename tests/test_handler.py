@@ -0,0 +1,181 @@
+import logging
+import socket
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+from pydlt import (
+    DltFileReader,
+    DltFileWriter,
+    DltLoggingHandler,
+    DltMessage,
+    MessageLogInfo,
+)
+from pydlt.handler import log_info_from_level
+
+CURRENT_DIR_PATH = Path(__file__).parent.absolute()
+TEST_RESULTS_DIR_PATH = CURRENT_DIR_PATH / "results"
+TEST_RESULTS_DIR_PATH.mkdir(exist_ok=True)
+
+
+def test_log_info_from_level():
+    assert log_info_from_level(logging.CRITICAL) == MessageLogInfo.DLT_LOG_FATAL
+    assert log_info_from_level(logging.ERROR) == MessageLogInfo.DLT_LOG_ERROR
+    assert log_info_from_level(logging.WARNING + 5) == MessageLogInfo.DLT_LOG_WARN
+    assert log_info_from_level(logging.INFO) == MessageLogInfo.DLT_LOG_INFO
+    assert log_info_from_level(logging.DEBUG) == MessageLogInfo.DLT_LOG_DEBUG
+    assert log_info_from_level(5) == MessageLogInfo.DLT_LOG_VERBOSE
+
+
+def test_handler_file():
+    path = TEST_RESULTS_DIR_PATH / Path(f"{sys._getframe().f_code.co_name}.dlt")
+    logger = logging.getLogger("test_handler.file.db")
+    logger.setLevel(logging.DEBUG)
+    main_logger = logging.getLogger("test_handler_main")
+    with DltFileWriter(path) as writer:
+        handler = DltLoggingHandler(
+            writer, "PyAp", ecu_id="Ecu", context_ids={"test_handler_main": "Main"}
+        )
+        handler.setFormatter(logging.Formatter("%(levelname)s %(message)s"))
+        logger.addHandler(handler)
+        main_logger.addHandler(handler)
+        try:
+            logger.debug("debug %d", 1)
+            logger.error("äöü")
+            main_logger.warning("main")
+        finally:
+            logger.removeHandler(handler)
+            main_logger.removeHandler(handler)
+            handler.close()
+
+    with DltFileReader(path) as reader:
+        messages = reader.read_messages()
+    assert [str(msg.payload) for msg in messages] == [
+        "DEBUG debug 1",
+        "ERROR äöü",
+        "WARNING main",
+    ]
+    assert [msg.ext_header.context_id for msg in messages] == ["db", "db", "Main"]
+    assert [msg.ext_header.message_log_info for msg in messages] == [
+        MessageLogInfo.DLT_LOG_DEBUG,
+        MessageLogInfo.DLT_LOG_ERROR,
+        MessageLogInfo.DLT_LOG_WARN,
+    ]
+    assert all([msg.ext_header.application_id == "PyAp" for msg in messages])
+    assert [msg.std_header.message_counter for msg in messages] == [0, 1, 2]
+    assert messages[0].std_header.ecu_id == "Ecu"
+    assert messages[0].str_header.seconds > 0
+
+
+def test_handler_socket():
+    server, client = socket.socketpair()
+    logger = logging.getLogger("test_handler.socket")
+    logger.setLevel(logging.INFO)
+    handler = DltLoggingHandler(client, "PyAp")
+    logger.addHandler(handler)
+    try:
+        for index in range(100):
+            logger.info("message %d", index)
+        handler.flush()
+    finally:
+        logger.removeHandler(handler)
+        handler.close()
+        client.close()
+
+    data = b""
+    while True:
+        received = server.recv(65536)
+        if not received:
+            break
+        data += received
+    server.close()
+    messages = []
+    offset = 0
+    while offset < len(data):
+        message = DltMessage.create_from_bytes(data[offset:], False)
+        messages.append(message)
+        offset += message.std_header.length
+    assert [str(msg.payload) for msg in messages] == [
+        f"message {index}" for index in range(100)
+    ]
+    assert all([msg.str_header is None for msg in messages])
+    assert messages[0].ext_header.context_id == "sock"
+
+
+def test_handler_drop():
+    path = TEST_RESULTS_DIR_PATH / Path(f"{sys._getframe().f_code.co_name}.dlt")
+    blocked = threading.Event()
+    with DltFileWriter(path) as writer:
+        write_bytes = writer.write_bytes
+
+        def blocking_write_bytes(data):
+            blocked.wait()
+            write_bytes(data)
+
+        writer.write_bytes = blocking_write_bytes
+        handler = DltLoggingHandler(writer, "PyAp", queue_size=5, batch_size=1)
+        logger = logging.getLogger("test_handler.drop")
+        logger.addHandler(handler)
+        try:
+            for index in range(20):
+                logger.warning("message %d", index)
+        finally:
+            logger.removeHandler(handler)
+            blocked.set()
+            handler.close()
+
+    with DltFileReader(path) as reader:
+        messages = reader.read_messages()
+    # a record is taken by the thread and 5 records are in the queue
+    assert len(messages) + handler.dropped == 20
+    assert 5 <= len(messages) <= 6
+
+
+def test_handler_truncate():
+    path = TEST_RESULTS_DIR_PATH / Path(f"{sys._getframe().f_code.co_name}.dlt")
+    with DltFileWriter(path) as writer:
+        handler = DltLoggingHandler(writer, "PyAp")
+        logger = logging.getLogger("test_handler.truncate")
+        logger.addHandler(handler)
+        try:
+            logger.warning("x" * 100000)
+        finally:
+            logger.removeHandler(handler)
+            handler.close()
+
+    with DltFileReader(path) as reader:
+        messages = reader.read_messages()
+    assert len(messages) == 1
+    assert messages[0].std_header.length == 0xFFFF
+
+
+@pytest.mark.parametrize("prefix", ["", "x"])
+def test_handler_truncate_non_ascii(prefix):
+    path = TEST_RESULTS_DIR_PATH / Path(
+        f"{sys._getframe().f_code.co_name}_{len(prefix)}.dlt"
+    )
+    text = prefix + "ä" * 50000
+    with DltFileWriter(path) as writer:
+        handler = DltLoggingHandler(writer, "PyAp")
+        logger = logging.getLogger("test_handler.truncate_non_ascii")
+        logger.addHandler(handler)
+        try:
+            logger.warning(text)
+        finally:
+            logger.removeHandler(handler)
+            handler.close()
+
+    with DltFileReader(path) as reader:
+        messages = reader.read_messages()
+    assert len(messages) == 1
+    # the last 2-byte character is dropped if it does not fit
+    assert messages[0].std_header.length in (0xFFFE, 0xFFFF)
+    data = messages[0].payload.arguments[0].data
+    assert "\ufffd" not in data
+    assert text.startswith(data)
+
+
+if __name__ == "__main__":
+    pytest.main(sys.argv)
@@ -0,0 +1,163 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+from pydlt import (
+    ArgumentString,
+    ArgumentUInt32,
+    DltFileReader,
+    DltFileWriter,
+    DltMessage,
+    MessageLogInfo,
+    MessageType,
+    ParseCache,
+    ReaderStats,
+    StorageHeader,
+    WriterStats,
+    compile_filter,
+)
+from pydlt.instrument import create_message_with_stats
+
+CURRENT_DIR_PATH = Path(__file__).parent.absolute()
+TEST_RESULTS_DIR_PATH = CURRENT_DIR_PATH / "results"
+TEST_RESULTS_DIR_PATH.mkdir(exist_ok=True)
+
+
+def test_create_message_with_stats():
+    stats = ReaderStats()
+    for msg in _make_messages(4):
+        data = msg.to_bytes()
+        created = create_message_with_stats(data, True, None, stats)
+        assert created == DltMessage.create_from_bytes(data, True)
+        assert created.to_bytes() is data
+    assert stats.storage_header_time > 0
+    assert stats.standard_header_time > 0
+    assert stats.extended_header_time > 0
+    assert stats.payload_time > 0
+    assert stats.string_time > 0
+    assert stats.decode_time == pytest.approx(
+        stats.storage_header_time
+        + stats.standard_header_time
+        + stats.extended_header_time
+        + stats.payload_time
+        + stats.string_time
+    )
+
+
+def test_reader_stats():
+    path = TEST_RESULTS_DIR_PATH / Path(f"{sys._getframe().f_code.co_name}.dlt")
+    messages = _make_messages(10)
+    data = b"".join([msg.to_bytes() for msg in messages])
+    # the truncated message at the end is skipped
+    path.write_bytes(data + b"DLT\x01")
+    reports = []
+
+    stats = ReaderStats(lambda s: reports.append(s.messages), interval=4)
+    with DltFileReader(path, stats=stats) as reader:
+        assert reader.stats is stats
+        assert reader.read_messages() == messages
+    assert stats.messages == 10
+    assert stats.bytes_read == len(data) + 4
+    assert stats.skipped_messages == 0
+    assert stats.skipped_bytes == 4
+    assert stats.errors == 0
+    assert stats.io_time > 0
+    assert reports == [4, 8, 10]
+    assert stats.as_dict()["messages"] == 10
+    assert "messages=10" in repr(stats)
+
+    stats.reset()
+    assert stats.messages == 0 and stats.io_time == 0.0
+
+
+def test_reader_stats_predicate_and_errors():
+    path = TEST_RESULTS_DIR_PATH / Path(f"{sys._getframe().f_code.co_name}.dlt")
+    messages = _make_messages(10)
+    broken = bytearray(messages[5].to_bytes())
+    # Type Info of the first argument is not supported
+    offset = len(broken) - len(messages[5].payload.to_bytes(False))
+    broken[offset : offset + 4] = b"\x00\x00\x00\x00"
+    path.write_bytes(b"".join([msg.to_bytes() for msg in messages]) + broken)
+
+    stats = ReaderStats()
+    predicate = compile_filter("counter >= 5")
+    with DltFileReader(path, predicate=predicate, stats=stats) as reader:
+        assert [reader.read_message() for _ in range(5)] == messages[5:]
+        with pytest.raises(ValueError):
+            reader.read_message()
+    assert stats.messages == 5
+    assert stats.skipped_messages == 5
+    assert stats.skipped_bytes == sum([len(msg.to_bytes()) for msg in messages[:5]])
+    assert stats.errors == 1
+    assert stats.filter_time > 0
+
+
+def test_reader_stats_batch():
+    path = TEST_RESULTS_DIR_PATH / Path(f"{sys._getframe().f_code.co_name}.dlt")
+    messages = _make_messages(10)
+    path.write_bytes(b"".join([msg.to_bytes() for msg in messages]))
+
+    stats = ReaderStats()
+    predicate = compile_filter("counter < 3 or counter > 7")
+    with DltFileReader(path, predicate=predicate, stats=stats) as reader:
+        batches = list(reader.iter_batches(2))
+    assert [msg for batch in batches for msg in batch] == messages[:3] + messages[8:]
+    assert stats.messages == 5
+    assert stats.skipped_messages == 5
+    assert stats.skipped_bytes == sum([len(msg.to_bytes()) for msg in messages[3:8]])
+    assert stats.bytes_read == path.stat().st_size
+
+
+def test_reader_stats_cache(tmp_path):
+    path = TEST_RESULTS_DIR_PATH / Path(f"{sys._getframe().f_code.co_name}.dlt")
+    messages = _make_messages(10)
+    path.write_bytes(b"".join([msg.to_bytes() for msg in messages]))
+    cache = ParseCache(tmp_path)
+
+    with DltFileReader(path, cache=cache, stats=ReaderStats()) as reader:
+        assert reader.read_messages() == messages
+    stats = ReaderStats()
+    with DltFileReader(path, cache=cache, stats=stats) as reader:
+        assert reader.read_messages() == messages
+    assert stats.messages == 10
+    assert stats.bytes_read == path.stat().st_size
+    assert stats.cache_time > 0
+    assert stats.decode_time == 0
+
+
+def test_writer_stats():
+    path = TEST_RESULTS_DIR_PATH / Path(f"{sys._getframe().f_code.co_name}.dlt")
+    messages = _make_messages(6)
+    reports = []
+
+    stats = WriterStats(lambda s: reports.append(s.messages), interval=5)
+    with DltFileWriter(path, stats=stats) as writer:
+        assert writer.stats is stats
+        writer.write_messages(messages)
+        writer.write_bytes(messages[0].to_bytes())
+    assert stats.messages == 6
+    assert stats.bytes_written == path.stat().st_size
+    assert stats.encode_time > 0
+    assert stats.io_time > 0
+    assert reports == [5, 6]
+
+
+def _make_messages(count):
+    return [
+        DltMessage.create_verbose_message(
+            [ArgumentString(f"message {index}", is_utf8=True), ArgumentUInt32(index)],
+            MessageType.DLT_TYPE_LOG,
+            MessageLogInfo.DLT_LOG_INFO,
+            "App",
+            "Ctx",
+            timestamp=index,
+            message_counter=index,
+            str_header=StorageHeader(1000 + index, 0, "Ecu"),
+        )
+        for index in range(count)
+    ]
+
+
+if __name__ == "__main__":
+    pytest.main(sys.argv)
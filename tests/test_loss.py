@@ -0,0 +1,76 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+from pydlt import (
+    DltMessage,
+    StorageHeader,
+    detect_message_loss,
+    scan_headers,
+)
+
+pytest.importorskip("numpy")
+
+CURRENT_DIR_PATH = Path(__file__).parent.absolute()
+TEST_RESULTS_DIR_PATH = CURRENT_DIR_PATH / "results"
+TEST_RESULTS_DIR_PATH.mkdir(exist_ok=True)
+
+
+def test_detect_message_loss():
+    path = TEST_RESULTS_DIR_PATH / Path(f"{sys._getframe().f_code.co_name}.dlt")
+    # (time, ECU ID, Session ID, Message Counter)
+    params = [
+        (0, "Ecu1", 1, 254),
+        (1, "Ecu2", 1, 10),
+        (2, "Ecu1", 1, 255),
+        (3, "Ecu1", 2, 0),
+        (4, "Ecu1", 1, 2),  # 0 and 1 are lost over wraparound
+        (5, "Ecu2", 1, 11),
+        (6, "Ecu2", 1, 11),  # repeated counter is not a loss
+        (7, "Ecu1", 2, 5),  # 1 to 4 are lost
+        (8, "Ecu1", 1, 3),
+    ]
+    path.write_bytes(
+        b"".join(
+            [
+                DltMessage.create_non_verbose_message(
+                    0,
+                    b"",
+                    ecu_id=ecu,
+                    session_id=session,
+                    message_counter=counter,
+                    str_header=StorageHeader(time, 0, "Ecu"),
+                ).to_bytes()
+                for time, ecu, session, counter in params
+            ]
+        )
+    )
+
+    report = detect_message_loss(scan_headers(path))
+    assert report.total_received == 9
+    assert report.total_lost == 6
+    assert report.received == {("Ecu1", 1): 4, ("Ecu1", 2): 2, ("Ecu2", 1): 3}
+    assert report.lost == {("Ecu1", 1): 2, ("Ecu1", 2): 4, ("Ecu2", 1): 0}
+    assert [(w.group, w.lost) for w in report.windows] == [
+        (("Ecu1", 1), 2),
+        (("Ecu1", 2), 4),
+    ]
+    window = report.windows[0]
+    assert (window.counter_before, window.counter_after) == (255, 2)
+    assert (window.time_before, window.time_after) == (2.0, 4.0)
+
+    report = detect_message_loss(scan_headers(path), group_by=["ecu_id"])
+    assert report.lost == {("Ecu1",): 1 + 2 + 253, ("Ecu2",): 0}
+
+
+def test_detect_message_loss_invalid_group():
+    path = TEST_RESULTS_DIR_PATH / Path(f"{sys._getframe().f_code.co_name}.dlt")
+    path.write_bytes(b"")
+
+    with pytest.raises(ValueError):
+        detect_message_loss(scan_headers(path), group_by=["unknown"])
+
+
+if __name__ == "__main__":
+    pytest.main(sys.argv)
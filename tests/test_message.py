@@ -25,7 +25,9 @@ from pydlt import (
     MessageLogInfo,
     MessageType,
     StorageHeader,
+    VerbosePayload,
 )
+from pydlt.payload import TypeInfo
 
 CURRENT_DIR_PATH = Path(__file__).parent.absolute()
 TEST_RESULTS_DIR_PATH = CURRENT_DIR_PATH / "results"
@@ -513,6 +515,117 @@ def test_message_verbose_payload_raw():
     )
 
 
+def test_message_raw_bytes_passthrough():
+    dlt_message1 = _make_verbose_payload_message(
+        [ArgumentBool(True), ArgumentString("abc"), ArgumentUInt8(1)]
+    )
+    dlt_bytes = bytearray(dlt_message1.to_bytes())
+    # set non-canonical value (0x02) to the bool argument
+    assert dlt_bytes[34] == 0x01
+    dlt_bytes[34] = 0x02
+    dlt_bytes = bytes(dlt_bytes)
+
+    dlt_message2 = DltMessage.create_from_bytes(dlt_bytes, True)
+    assert cast(ArgumentBool, dlt_message2.verbose_payload.arguments[0]).data is True
+    assert str(dlt_message2)
+    assert dlt_message2.to_bytes() is dlt_bytes
+
+    dlt_message2.payload = VerbosePayload(
+        [ArgumentBool(True), ArgumentString("abc"), ArgumentUInt8(1)]
+    )
+    assert dlt_message2.to_bytes() == dlt_message1.to_bytes()
+
+
+def test_message_raw_bytes_invalidation():
+    dlt_message1 = _make_verbose_payload_message([ArgumentString("abc")])
+    dlt_bytes = dlt_message1.to_bytes() + b"trailing data"
+
+    dlt_message2 = DltMessage.create_from_bytes(dlt_bytes, True)
+    assert dlt_message2.to_bytes() == dlt_message1.to_bytes()
+
+    std_header = dlt_message2.std_header
+    assert dlt_message2.to_bytes() == dlt_message1.to_bytes()
+    std_header.message_counter = 1
+    assert dlt_message2.to_bytes()[17] == 1
+    dlt_message2.std_header.message_counter = 0
+    assert dlt_message2.to_bytes() == dlt_message1.to_bytes()
+
+    dlt_message2.str_header.seconds = 1
+    assert StorageHeader.create_from_bytes(dlt_message2.to_bytes()).seconds == 1
+    dlt_message2.str_header.seconds = 0
+
+    dlt_message2.ext_header.application_id = "Bpp"
+    dlt_message3 = DltMessage.create_from_bytes(dlt_message2.to_bytes(), True)
+    assert dlt_message3.ext_header.application_id == "Bpp"
+    dlt_message2.ext_header.application_id = "App"
+
+    cast(ArgumentString, dlt_message2.verbose_payload.arguments[0]).data = "abd"
+    assert dlt_message2.to_bytes() != dlt_message1.to_bytes()
+    cast(ArgumentString, dlt_message2.verbose_payload.arguments[0]).data = "abc"
+
+    dlt_message2.verbose_payload.arguments.append(ArgumentUInt8(1))
+    assert dlt_message2.to_bytes() != dlt_message1.to_bytes()
+
+
+def test_message_verbose_payload_string_lazy():
+    dlt_message1 = _make_verbose_payload_message(
+        [ArgumentString("tag"), ArgumentString("äöü", is_utf8=True), ArgumentUInt8(1)]
+    )
+    dlt_message2 = DltMessage.create_from_bytes(dlt_message1.to_bytes(), True)
+    args = dlt_message2.verbose_payload.arguments
+    # strings are not decoded until they are accessed
+    assert [arg.__dict__.get("_data") for arg in args[:2]] == [None, None]
+    assert dlt_message2.verbose_payload.bytes_length == (
+        dlt_message1.verbose_payload.bytes_length
+    )
+    assert args[0].data == "tag"
+    assert args[1].__dict__.get("_data") is None
+    assert dlt_message2.to_bytes() == dlt_message1.to_bytes()
+    assert str(dlt_message2.verbose_payload) == "tag äöü 1"
+
+
+def test_message_verbose_payload_string_encoded_once(monkeypatch):
+    arg = ArgumentString("äöü", is_utf8=True)
+    dlt_message1 = _make_verbose_payload_message([arg])
+    encoded = arg._encoded()
+    assert arg._encoded() is encoded
+    assert dlt_message1.to_bytes().endswith(encoded + b"\x00")
+
+    # strings decoded from data bytes are not encoded again
+    dlt_message2 = DltMessage.create_from_bytes(dlt_message1.to_bytes(), True)
+    arg2 = cast(ArgumentString, dlt_message2.verbose_payload.arguments[0])
+    assert arg2.data == "äöü"
+    with monkeypatch.context() as context:
+        context.setattr(ArgumentString, "data", property(lambda self: 1 / 0))
+        assert arg2.bytes_length == 4 + 2 + 6 + 1
+        assert dlt_message2.verbose_payload.to_bytes(False) == (
+            dlt_message1.verbose_payload.to_bytes(False)
+        )
+
+    # the encoded bytes are invalidated when data is set
+    arg.data = "abc"
+    assert arg.data_length == 4
+    assert arg.data_to_bytes() == b"abc\x00"
+
+
+def test_message_verbose_payload_string_invalid_bytes():
+    # invalid UTF-8 sequence in a string followed by another argument
+    dlt_message1 = _make_verbose_payload_message(
+        [ArgumentRaw(b"\xff\xfe\x00"), ArgumentUInt8(7)]
+    )
+    data = bytearray(dlt_message1.to_bytes())
+    type_info = len(data) - dlt_message1.verbose_payload.bytes_length
+    data[type_info : type_info + 4] = struct.pack(
+        "<I", TypeInfo.TYPE_STRING | TypeInfo.STRING_CODING_UTF8
+    )
+    dlt_message2 = DltMessage.create_from_bytes(bytes(data), True)
+    args = dlt_message2.verbose_payload.arguments
+    assert args[0].data == "\ufffd\ufffd"
+    assert args[1].data == 7
+    # the bytes are written as they are read
+    assert dlt_message2.verbose_payload.to_bytes() == bytes(data[type_info:])
+
+
 def _make_verbose_payload_message(
     args: List[Argument], msbf: bool = False
 ) -> DltMessage:
@@ -0,0 +1,255 @@
+import asyncio
+import logging
+import sys
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+import pytest
+
+from pydlt import (
+    ArgumentString,
+    DltFileReader,
+    DltFileWriter,
+    DltLoggingHandler,
+    DltMessage,
+    DltRelay,
+    MessageLogInfo,
+    MessageMetrics,
+    MessageType,
+    MetricsRegistry,
+    ReaderStats,
+    StorageHeader,
+    WriterStats,
+)
+
+CURRENT_DIR_PATH = Path(__file__).parent.absolute()
+TEST_RESULTS_DIR_PATH = CURRENT_DIR_PATH / "results"
+TEST_RESULTS_DIR_PATH.mkdir(exist_ok=True)
+
+
+def test_registry_render():
+    registry = MetricsRegistry()
+    counter = registry.counter("app_events_total", "Number of\nevents", ("kind",))
+    counter.inc(labels=("a",))
+    counter.inc_many({("a",): 2, ('b"\\',): 0.5})
+    gauge = registry.gauge("app_depth", "Depth of the queue")
+    gauge.set(3)
+    registry.gauge("app_sizes", "Sizes", ("name",)).set_function(
+        lambda: {"x": 1.25, ("y",): float("inf")}
+    )
+
+    assert registry.counter("app_events_total", "", ("kind",)) is counter
+    assert counter.get(("a",)) == 3
+    assert registry.render() == (
+        "# HELP app_depth Depth of the queue\n"
+        "# TYPE app_depth gauge\n"
+        "app_depth 3\n"
+        "# HELP app_events_total Number of\\nevents\n"
+        "# TYPE app_events_total counter\n"
+        'app_events_total{kind="a"} 3\n'
+        'app_events_total{kind="b\\"\\\\"} 0.5\n'
+        "# HELP app_sizes Sizes\n"
+        "# TYPE app_sizes gauge\n"
+        'app_sizes{name="x"} 1.25\n'
+        'app_sizes{name="y"} +Inf\n'
+    )
+
+
+def test_registry_invalid_metrics():
+    registry = MetricsRegistry()
+    counter = registry.counter("app_total", "Total", ("kind",))
+    with pytest.raises(ValueError):
+        registry.gauge("app_total", "Total", ("kind",))
+    with pytest.raises(ValueError):
+        registry.counter("app_total", "Total")
+    with pytest.raises(ValueError):
+        registry.counter("app-total", "Total")
+    with pytest.raises(ValueError):
+        registry.counter("app_count", "Count", ("0kind",))
+    with pytest.raises(ValueError):
+        counter.inc(-1, ("a",))
+    with pytest.raises(ValueError):
+        counter.inc(1, ("a", "b"))
+
+
+def test_registry_write_and_serve():
+    path = TEST_RESULTS_DIR_PATH / Path(f"{sys._getframe().f_code.co_name}.prom")
+    registry = MetricsRegistry()
+    registry.counter("app_total", "Total").inc(5)
+
+    registry.write(path)
+    assert path.read_text(encoding="utf-8") == registry.render()
+    assert list(path.parent.glob(f".{path.name}.*")) == []
+
+    with registry.serve(port=0) as server:
+        host, port = server.address[:2]
+        with urllib.request.urlopen(f"http://{host}:{port}/metrics") as response:
+            assert response.headers["Content-Type"].startswith("text/plain")
+            assert response.read().decode("utf-8") == registry.render()
+        with pytest.raises(urllib.error.HTTPError):
+            urllib.request.urlopen(f"http://{host}:{port}/other")
+
+
+def test_message_metrics():
+    registry = MetricsRegistry()
+    metrics = MessageMetrics(registry, flush_interval=4)
+    # counters 0, 1, 4, 5 of "Ecu" (2 messages are lost) and 0, 1, 1 of "Ecu2"
+    messages = [_make_message(counter, "Ecu") for counter in (0, 1, 4, 5)]
+    messages += [_make_message(counter, "Ecu2", None) for counter in (0, 1, 1)]
+    data = b"".join([msg.to_bytes() for msg in messages])
+
+    offset = 0
+    for msg in messages:
+        metrics.observe(data, offset)
+        offset += len(msg.to_bytes())
+        if msg is messages[3]:
+            # messages are added at the flush interval
+            assert metrics.messages.get(("Ecu", "App")) == 4
+    assert metrics.messages.get(("Ecu2", "")) == 0
+    metrics.observe_error(2)
+    metrics.flush()
+
+    assert metrics.messages.get(("Ecu", "App")) == 4
+    assert metrics.messages.get(("Ecu2", "")) == 3
+    assert metrics.bytes.get(("Ecu",)) == sum(
+        [len(msg.to_bytes()) for msg in messages[:4]]
+    )
+    assert metrics.lost.get(("Ecu",)) == 2
+    assert metrics.lost.get(("Ecu2",)) == 0
+    assert metrics.errors.get() == 2
+    # another object shares the counters of the registry
+    MessageMetrics(registry).observe(messages[0].to_bytes())
+    assert "pydlt_lost_messages_total" in registry.render()
+
+
+def test_message_metrics_batch():
+    path = TEST_RESULTS_DIR_PATH / Path(f"{sys._getframe().f_code.co_name}.dlt")
+    with DltFileWriter(path) as writer:
+        writer.write_messages([_make_message(counter, "Ecu") for counter in (0, 3)])
+
+    registry = MetricsRegistry()
+    metrics = MessageMetrics(registry)
+    with DltFileReader(path) as reader:
+        for batch in reader.iter_batches(10):
+            metrics.observe_batch(batch)
+    assert metrics.messages.get(("Ecu", "App")) == 2
+    assert metrics.bytes.get(("Ecu",)) == path.stat().st_size
+    assert metrics.lost.get(("Ecu",)) == 2
+
+
+def test_reader_and_writer_stats_metrics():
+    path = TEST_RESULTS_DIR_PATH / Path(f"{sys._getframe().f_code.co_name}.dlt")
+    registry = MetricsRegistry()
+    messages = [_make_message(counter, "Ecu") for counter in (0, 1, 3)]
+    stats = WriterStats(metrics=MessageMetrics(registry, flush_interval=100))
+    with DltFileWriter(path, stats=stats) as writer:
+        writer.write_messages(messages)
+    # the metrics are flushed when the writer is closed
+    assert stats.metrics.messages.get(("Ecu", "App")) == 3
+    assert stats.metrics.lost.get(("Ecu",)) == 1
+
+    # the last message cannot be decoded by unsupported Type Info
+    broken = bytearray(messages[0].to_bytes())
+    offset = len(broken) - len(messages[0].payload.to_bytes(False))
+    broken[offset : offset + 4] = b"\x00\x00\x00\x00"
+    with open(path, "ab") as file:
+        file.write(broken)
+    registry = MetricsRegistry()
+    stats = ReaderStats(metrics=MessageMetrics(registry))
+    with DltFileReader(path, stats=stats) as reader:
+        assert [reader.read_message() for _ in range(3)] == messages
+        with pytest.raises(ValueError):
+            reader.read_message()
+    text = registry.render()
+    assert 'pydlt_messages_total{ecu_id="Ecu",application_id="App"} 3' in text
+    assert 'pydlt_lost_messages_total{ecu_id="Ecu"} 1' in text
+    assert "pydlt_decode_errors_total 1" in text
+
+    # messages in batches are counted as well
+    registry = MetricsRegistry()
+    stats = ReaderStats(metrics=MessageMetrics(registry))
+    with DltFileReader(path, stats=stats) as reader:
+        reader.read_batch(3)
+    assert 'pydlt_messages_total{ecu_id="Ecu",application_id="App"} 3' in (
+        registry.render()
+    )
+
+
+def test_relay_metrics():
+    registry = MetricsRegistry()
+    relay = DltRelay(registry=registry)
+    for counter in (0, 1, 3):
+        relay.dispatch(_make_message(counter, "Ecu").to_bytes()[16:])
+    relay._metrics.flush()
+
+    text = registry.render()
+    assert 'pydlt_messages_total{ecu_id="Ecu",application_id="App"} 3' in text
+    assert 'pydlt_lost_messages_total{ecu_id="Ecu"} 1' in text
+    assert "pydlt_relay_received_total 3" in text
+    assert "pydlt_relay_dropped_total 0" in text
+    assert "pydlt_relay_clients 0" in text
+
+
+def test_relay_metrics_decode_errors():
+    registry = MetricsRegistry()
+    relay = DltRelay(registry=registry)
+
+    async def run():
+        await relay.start(producer_port=0, client_port=0)
+        producer_address, _ = relay.addresses
+        reader, writer = await asyncio.open_connection(*producer_address[:2])
+        # Length of Standard Header is invalid
+        writer.write(b"\x35\x00\x00\x02")
+        await reader.read()
+        writer.close()
+        await relay.close()
+
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(asyncio.wait_for(run(), 10))
+    finally:
+        loop.close()
+    assert "pydlt_decode_errors_total 1" in registry.render()
+
+
+def test_handler_metrics():
+    path = TEST_RESULTS_DIR_PATH / Path(f"{sys._getframe().f_code.co_name}.dlt")
+    registry = MetricsRegistry()
+    logger = logging.getLogger(f"pydlt.test.{sys._getframe().f_code.co_name}")
+    logger.propagate = False
+    with DltFileWriter(path) as writer:
+        handler = DltLoggingHandler(writer, "App", registry=registry)
+        logger.addHandler(handler)
+        logger.warning("message")
+        handler.close()
+        logger.removeHandler(handler)
+
+    text = registry.render()
+    assert "pydlt_handler_queue_depth 0" in text
+    assert "pydlt_handler_dropped_total 0" in text
+
+
+def _make_message(counter, ecu_id, application_id="App"):
+    if application_id is None:
+        return DltMessage.create_non_verbose_message(
+            1,
+            b"\x01",
+            ecu_id=ecu_id,
+            message_counter=counter,
+            str_header=StorageHeader(0, 0, ecu_id),
+        )
+    return DltMessage.create_verbose_message(
+        [ArgumentString("message")],
+        MessageType.DLT_TYPE_LOG,
+        MessageLogInfo.DLT_LOG_INFO,
+        application_id,
+        "Ctx",
+        ecu_id=ecu_id,
+        message_counter=counter,
+        str_header=StorageHeader(0, 0, ecu_id),
+    )
+
+
+if __name__ == "__main__":
+    pytest.main(sys.argv)
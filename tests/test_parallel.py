@@ -0,0 +1,138 @@
+import sys
+import threading
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+from pydlt import (
+    ArgumentString,
+    ArgumentUInt32,
+    DltFileReader,
+    DltMessage,
+    MessageLogInfo,
+    MessageType,
+    StorageHeader,
+    compile_filter,
+    iter_messages_parallel,
+)
+from pydlt.parallel import default_workers, is_free_threaded
+
+CURRENT_DIR_PATH = Path(__file__).parent.absolute()
+TEST_RESULTS_DIR_PATH = CURRENT_DIR_PATH / "results"
+TEST_RESULTS_DIR_PATH.mkdir(exist_ok=True)
+
+
+@pytest.mark.parametrize(
+    "workers, batch_size, buffer_size",
+    [(1, 1024, 1024 * 1024), (4, 7, 1000), (4, 1024, 1024 * 1024), (None, 16, 500)],
+)
+def test_iter_messages_parallel(workers, batch_size, buffer_size):
+    path = TEST_RESULTS_DIR_PATH / Path(f"{sys._getframe().f_code.co_name}.dlt")
+    messages = _make_messages(300)
+    path.write_bytes(b"".join([msg.to_bytes() for msg in messages]) + b"DLT\x01")
+
+    assert (
+        list(
+            iter_messages_parallel(
+                path, workers=workers, batch_size=batch_size, buffer_size=buffer_size
+            )
+        )
+        == messages
+    )
+
+
+def test_iter_messages_parallel_predicate():
+    path = TEST_RESULTS_DIR_PATH / Path(f"{sys._getframe().f_code.co_name}.dlt")
+    messages = _make_messages(100)
+    path.write_bytes(b"".join([msg.to_bytes() for msg in messages]))
+
+    predicate = compile_filter("counter < 10")
+    assert list(
+        iter_messages_parallel(path, workers=2, batch_size=3, predicate=predicate)
+    ) == [msg for msg in messages if msg.std_header.message_counter < 10]
+
+
+def test_iter_messages_parallel_error():
+    path = TEST_RESULTS_DIR_PATH / Path(f"{sys._getframe().f_code.co_name}.dlt")
+    data = bytearray(b"".join([msg.to_bytes() for msg in _make_messages(10)]))
+    # unsupported type info of the last argument of the last message
+    data[-8:-4] = b"\xff\xff\xff\xff"
+    path.write_bytes(bytes(data))
+
+    messages = iter_messages_parallel(path, workers=2, batch_size=2)
+    with pytest.raises(ValueError):
+        list(messages)
+
+
+def test_default_workers():
+    with mock.patch.object(sys, "_is_gil_enabled", lambda: True, create=True):
+        assert is_free_threaded() is False
+        assert default_workers() == 1
+    with mock.patch.object(sys, "_is_gil_enabled", lambda: False, create=True):
+        assert is_free_threaded() is True
+        assert default_workers() >= 1
+
+
+def test_decode_shared_data_in_threads():
+    # data bytes and decoded messages can be shared between threads
+    messages = _make_messages(200)
+    data = b"".join([msg.to_bytes() for msg in messages])
+    lengths = [len(msg.to_bytes()) for msg in messages]
+    results = {}
+
+    def decode(thread_index):
+        decoded = []
+        offset = 0
+        for length in lengths:
+            decoded.append(
+                DltMessage.create_from_bytes(data[offset : offset + length], True)
+            )
+            offset += length
+        results[thread_index] = [str(msg) for msg in decoded]
+
+    threads = [threading.Thread(target=decode, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    expected = [str(msg) for msg in messages]
+    assert all(result == expected for result in results.values())
+
+
+def test_file_reader_per_thread():
+    path = TEST_RESULTS_DIR_PATH / Path(f"{sys._getframe().f_code.co_name}.dlt")
+    messages = _make_messages(100)
+    path.write_bytes(b"".join([msg.to_bytes() for msg in messages]))
+    results = {}
+
+    def read(thread_index):
+        with DltFileReader(path) as reader:
+            results[thread_index] = reader.read_messages()
+
+    threads = [threading.Thread(target=read, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert all(result == messages for result in results.values())
+
+
+def _make_messages(count):
+    return [
+        DltMessage.create_verbose_message(
+            [ArgumentString(f"message {index}"), ArgumentUInt32(index)],
+            MessageType.DLT_TYPE_LOG,
+            MessageLogInfo.DLT_LOG_INFO,
+            "App",
+            "Ctx",
+            timestamp=index,
+            message_counter=index % 256,
+            str_header=StorageHeader(index, 0, "Ecu"),
+        )
+        for index in range(count)
+    ]
+
+
+if __name__ == "__main__":
+    pytest.main(sys.argv)
@@ -0,0 +1,231 @@
+import asyncio
+import socket
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+from pydlt import (
+    ArgumentString,
+    DltFileReader,
+    DltMessage,
+    DltRelay,
+    MessageLogInfo,
+    MessageType,
+)
+from pydlt.cli import main
+
+CURRENT_DIR_PATH = Path(__file__).parent.absolute()
+TEST_RESULTS_DIR_PATH = CURRENT_DIR_PATH / "results"
+TEST_RESULTS_DIR_PATH.mkdir(exist_ok=True)
+
+
+def test_relay_fan_out():
+    path = TEST_RESULTS_DIR_PATH / Path(f"{sys._getframe().f_code.co_name}.dlt")
+    if path.exists():
+        path.unlink()
+    messages = _make_messages(20)
+    data = b"".join([msg.to_bytes() for msg in messages])
+
+    async def run():
+        relay = DltRelay(record_path=path)
+        await relay.start(producer_port=0, client_port=0)
+        producer_address, client_address = relay.addresses
+        reader1, writer1 = await asyncio.open_connection(*client_address[:2])
+        reader2, writer2 = await asyncio.open_connection(*client_address[:2])
+        writer2.write(b'filter apid == "App1"\n')
+        await _wait_until(
+            lambda: [client.expression for client in relay.clients]
+            == [None, 'apid == "App1"']
+        )
+
+        _, producer = await asyncio.open_connection(*producer_address[:2])
+        # messages are split at any position
+        producer.write(data[:50])
+        await producer.drain()
+        await asyncio.sleep(0.01)
+        producer.write(data[50:])
+        await producer.drain()
+
+        received1 = await reader1.readexactly(len(data))
+        expected2 = b"".join([msg.to_bytes() for msg in messages[::2]])
+        received2 = await reader2.readexactly(len(expected2))
+        producer.close()
+        writer1.close()
+        writer2.close()
+        await _wait_until(lambda: not relay.clients)
+        await relay.close()
+        return relay, received1, received2
+
+    relay, received1, received2 = _run(run())
+    assert received1 == data
+    assert received2 == b"".join([msg.to_bytes() for msg in messages[::2]])
+    assert relay.received == 20
+    assert relay.dropped == 0
+
+    # Storage Header is added to the recorded messages
+    with DltFileReader(path) as reader:
+        recorded = reader.read_messages()
+    assert [msg.payload for msg in recorded] == [msg.payload for msg in messages]
+    assert [msg.str_header.ecu_id for msg in recorded] == ["Ecu", ""] * 10
+    assert all([msg.str_header.seconds > 0 for msg in recorded])
+
+
+def test_relay_drop_and_invalid_filter():
+    messages = _make_messages(10)
+    relay = DltRelay(queue_size=1, client_storage_header=True)
+
+    async def run():
+        await relay.start(producer_port=0, client_port=0)
+        producer_address, client_address = relay.addresses
+        reader, writer = await asyncio.open_connection(*client_address[:2])
+        writer.write(b'filter apid ==\nfilter ctid == "Ctx"\n')
+        await _wait_until(lambda: relay.clients and relay.clients[0].expression)
+        client = relay.clients[0]
+        # all messages are relayed at once by dispatch()
+        for msg in messages:
+            relay.dispatch(msg.to_bytes())
+        received = await reader.readexactly(len(messages[0].to_bytes()) + 16)
+        writer.close()
+        await relay.close()
+        return client, received
+
+    client, received = _run(run())
+    assert client.filter_error is None
+    assert client.sent == 1
+    assert client.dropped == 9
+    assert relay.dropped == 9
+    message = DltMessage.create_from_bytes(received, True)
+    assert message.payload == messages[0].payload
+    assert message.str_header.ecu_id == "Ecu"
+
+
+def test_relay_close_with_clients():
+    relay = DltRelay()
+
+    async def run():
+        await relay.start(producer_port=0, client_port=0)
+        _, client_address = relay.addresses
+        connections = [
+            await asyncio.open_connection(*client_address[:2]) for _ in range(3)
+        ]
+        await _wait_until(lambda: len(relay.clients) == 3)
+        await relay.close()
+        # tasks to send messages to the clients are finished
+        senders = [
+            task
+            for task in asyncio.all_tasks()
+            if "DltRelay._send" in repr(task) and not task.done()
+        ]
+        # the clients are disconnected
+        return senders, [await reader.read() for reader, _ in connections]
+
+    assert _run(run()) == ([], [b"", b"", b""])
+
+
+def test_relay_invalid_producer():
+    relay = DltRelay()
+
+    async def run():
+        await relay.start(producer_port=0, client_port=0)
+        producer_address, _ = relay.addresses
+        reader, writer = await asyncio.open_connection(*producer_address[:2])
+        writer.write(b"\x35\x00\x00\x02")
+        # the producer is disconnected
+        data = await reader.read()
+        writer.close()
+        await relay.close()
+        return data
+
+    assert _run(run()) == b""
+    assert relay.received == 0
+
+
+def test_relay_record_rotation():
+    path = TEST_RESULTS_DIR_PATH / Path(f"{sys._getframe().f_code.co_name}.dlt")
+    for index in range(4):
+        rotated = path.with_name(f"{path.stem}.{index}{path.suffix}")
+        for file_path in (path, rotated):
+            if file_path.exists():
+                file_path.unlink()
+    messages = _make_messages(10)
+    length = len(messages[0].to_bytes()) + 16
+    relay = DltRelay(record_path=path, record_max_size=length * 3, record_backups=2)
+    for msg in messages:
+        relay.dispatch(msg.to_bytes())
+    _run(relay.close())
+
+    # the 10 messages are recorded as 4 files (3, 3, 3, 1) and the oldest is removed
+    files = [path.with_name(f"{path.stem}.{index}{path.suffix}") for index in (2, 1)]
+    with DltFileReader(files[0]) as reader:
+        assert [msg.std_header.message_counter for msg in reader] == [3, 4, 5]
+    with DltFileReader(files[1]) as reader:
+        assert [msg.std_header.message_counter for msg in reader] == [6, 7, 8]
+    with DltFileReader(path) as reader:
+        assert [msg.std_header.message_counter for msg in reader] == [9]
+    assert not path.with_name(f"{path.stem}.3{path.suffix}").exists()
+
+
+def test_relay_cli():
+    # the relay stops when the connection to the producer is closed
+    messages = _make_messages(3)
+    path = TEST_RESULTS_DIR_PATH / Path(f"{sys._getframe().f_code.co_name}.dlt")
+    if path.exists():
+        path.unlink()
+
+    server = socket.socket()
+    server.bind(("127.0.0.1", 0))
+    server.listen(1)
+    server.settimeout(10)
+
+    def produce():
+        connection, _ = server.accept()
+        connection.sendall(b"".join([msg.to_bytes() for msg in messages]))
+        connection.close()
+
+    thread = threading.Thread(target=produce)
+    thread.start()
+    port = server.getsockname()[1]
+    try:
+        argv = ["relay", "--producer-port", "0", "--client-port", "0"]
+        argv += ["--connect", f"127.0.0.1:{port}", "--record", str(path)]
+        argv += ["--metrics-port", "0"]
+        assert main(argv) == 0
+    finally:
+        thread.join()
+        server.close()
+    with DltFileReader(path) as reader:
+        assert [msg.payload for msg in reader] == [msg.payload for msg in messages]
+
+
+def _run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(asyncio.wait_for(coroutine, 10))
+    finally:
+        loop.close()
+
+
+async def _wait_until(condition):
+    while not condition():
+        await asyncio.sleep(0.01)
+
+
+def _make_messages(count):
+    return [
+        DltMessage.create_verbose_message(
+            [ArgumentString(f"message {index}")],
+            MessageType.DLT_TYPE_LOG,
+            MessageLogInfo.DLT_LOG_INFO,
+            f"App{index % 2 + 1}",
+            "Ctx",
+            ecu_id="Ecu" if index % 2 == 0 else None,
+            message_counter=index,
+        )
+        for index in range(count)
+    ]
+
+
+if __name__ == "__main__":
+    pytest.main(sys.argv)
@@ -0,0 +1,79 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+from pydlt import (
+    ArgumentUInt8,
+    DltMessage,
+    MessageLogInfo,
+    MessageType,
+    StorageHeader,
+    scan_headers,
+)
+
+np = pytest.importorskip("numpy")
+
+CURRENT_DIR_PATH = Path(__file__).parent.absolute()
+TEST_RESULTS_DIR_PATH = CURRENT_DIR_PATH / "results"
+TEST_RESULTS_DIR_PATH.mkdir(exist_ok=True)
+
+
+def test_scan_headers():
+    path = TEST_RESULTS_DIR_PATH / Path(f"{sys._getframe().f_code.co_name}.dlt")
+    messages = [
+        DltMessage.create_verbose_message(
+            [ArgumentUInt8(1)],
+            MessageType.DLT_TYPE_LOG,
+            MessageLogInfo.DLT_LOG_WARN,
+            "App",
+            "Ctx1",
+            timestamp=12345,
+            session_id=42,
+            ecu_id="Ecu1",
+            message_counter=7,
+            msb_first=True,
+            str_header=StorageHeader(100, 200, "Ecu"),
+        ),
+        DltMessage.create_non_verbose_message(
+            1,
+            b"\x01\x02",
+            timestamp=23456,
+            message_counter=8,
+            str_header=StorageHeader(101, 999999, "Ecu2"),
+        ),
+    ]
+    data = b"".join([msg.to_bytes() for msg in messages])
+    path.write_bytes(data)
+
+    headers = scan_headers(path)
+    assert len(headers) == 2
+    assert headers.position.tolist() == [0, len(messages[0].to_bytes())]
+    assert headers.length.tolist() == [len(msg.to_bytes()) for msg in messages]
+    assert headers.seconds.tolist() == [100, 101]
+    assert headers.microseconds.tolist() == [200, 999999]
+    assert headers.time.tolist() == [100.0002, 101.999999]
+    assert headers.message_counter.tolist() == [7, 8]
+    assert headers.ecu_id.tolist() == [b"Ecu1", b"Ecu2"]
+    assert headers.session_id.tolist() == [42, -1]
+    assert headers.timestamp.tolist() == [12345, 23456]
+    assert headers.with_extended_header.tolist() == [True, False]
+    assert headers.verbose.tolist() == [True, False]
+    assert headers.message_type.tolist() == [MessageType.DLT_TYPE_LOG, 0]
+    assert headers.message_type_info.tolist() == [MessageLogInfo.DLT_LOG_WARN, 0]
+    assert headers.number_of_arguments.tolist() == [1, 0]
+    assert headers.application_id.tolist() == [b"App", b""]
+    assert headers.context_id.tolist() == [b"Ctx1", b""]
+
+
+def test_scan_headers_empty():
+    path = TEST_RESULTS_DIR_PATH / Path(f"{sys._getframe().f_code.co_name}.dlt")
+    path.write_bytes(b"")
+
+    headers = scan_headers(path)
+    assert len(headers) == 0
+    assert headers.time.tolist() == []
+
+
+if __name__ == "__main__":
+    pytest.main(sys.argv)
@@ -0,0 +1,90 @@
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+from pydlt import (
+    ArgumentUInt32,
+    DltFileReader,
+    DltMessage,
+    MessageLogInfo,
+    MessageType,
+    StorageHeader,
+    sort_file,
+)
+from pydlt.cli import main
+
+CURRENT_DIR_PATH = Path(__file__).parent.absolute()
+TEST_RESULTS_DIR_PATH = CURRENT_DIR_PATH / "results"
+TEST_RESULTS_DIR_PATH.mkdir(exist_ok=True)
+
+
+@pytest.mark.parametrize("memory_limit", [1024 * 1024, 4096, 1])
+def test_sort_file(memory_limit):
+    src_path = TEST_RESULTS_DIR_PATH / Path(f"{sys._getframe().f_code.co_name}.dlt")
+    dst_path = TEST_RESULTS_DIR_PATH / Path(f"{sys._getframe().f_code.co_name}_out.dlt")
+    messages = _make_messages(500)
+    src_path.write_bytes(b"".join([msg.to_bytes() for msg in messages]))
+
+    count = sort_file(src_path, dst_path, memory_limit=memory_limit)
+    assert count == len(messages)
+    with DltFileReader(dst_path) as reader:
+        sorted_messages = reader.read_messages()
+    assert sorted_messages == sorted(messages, key=_sort_key)
+
+
+def test_sort_file_key():
+    src_path = TEST_RESULTS_DIR_PATH / Path(f"{sys._getframe().f_code.co_name}.dlt")
+    dst_path = TEST_RESULTS_DIR_PATH / Path(f"{sys._getframe().f_code.co_name}_out.dlt")
+    messages = _make_messages(100)
+    src_path.write_bytes(b"".join([msg.to_bytes() for msg in messages]))
+
+    # sort by message counter only
+    sort_file(src_path, dst_path, key=lambda data, offset: data[offset + 17])
+    with DltFileReader(dst_path) as reader:
+        counters = [msg.std_header.message_counter for msg in reader]
+    assert counters == sorted([msg.std_header.message_counter for msg in messages])
+
+
+def test_sort_cli():
+    src_path = TEST_RESULTS_DIR_PATH / Path(f"{sys._getframe().f_code.co_name}.dlt")
+    dst_path = TEST_RESULTS_DIR_PATH / Path(f"{sys._getframe().f_code.co_name}_out.dlt")
+    messages = _make_messages(100)
+    src_path.write_bytes(b"".join([msg.to_bytes() for msg in messages]))
+
+    assert main(["sort", str(src_path), str(dst_path), "--memory-limit", "4K"]) == 0
+    with DltFileReader(dst_path) as reader:
+        assert reader.read_messages() == sorted(messages, key=_sort_key)
+
+
+def _sort_key(msg: DltMessage):
+    timestamp = msg.std_header.timestamp
+    return (
+        msg.str_header.seconds,
+        msg.str_header.microseconds,
+        -1 if timestamp is None else timestamp,
+        msg.std_header.message_counter,
+    )
+
+
+def _make_messages(number: int):
+    rand = random.Random(0)
+    return [
+        DltMessage.create_verbose_message(
+            [ArgumentUInt32(index)],
+            MessageType.DLT_TYPE_LOG,
+            MessageLogInfo.DLT_LOG_INFO,
+            "App",
+            "Ctx",
+            # some messages have the same time to check stable sort
+            timestamp=rand.choice([None, rand.randrange(100)]),
+            message_counter=index % 256,
+            str_header=StorageHeader(rand.randrange(10), rand.randrange(10), "Ecu"),
+        )
+        for index in range(number)
+    ]
+
+
+if __name__ == "__main__":
+    pytest.main(sys.argv)
@@ -0,0 +1,164 @@
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+from pydlt import (
+    ArgumentRaw,
+    ArgumentString,
+    ArgumentUInt64,
+    DltFileReader,
+    DltMessage,
+    MessageLogInfo,
+    MessageTraceInfo,
+    MessageType,
+    ReaderStats,
+    StorageHeader,
+    compile_filter,
+    export_sqlite,
+    query_sqlite,
+)
+from tests import make_messages
+
+CURRENT_DIR_PATH = Path(__file__).parent.absolute()
+TEST_RESULTS_DIR_PATH = CURRENT_DIR_PATH / "results"
+TEST_RESULTS_DIR_PATH.mkdir(exist_ok=True)
+
+
+def test_export_sqlite():
+    path = TEST_RESULTS_DIR_PATH / Path(f"{sys._getframe().f_code.co_name}.dlt")
+    db_path = TEST_RESULTS_DIR_PATH / Path(f"{sys._getframe().f_code.co_name}.db")
+    if db_path.exists():
+        db_path.unlink()
+    messages = _make_messages()
+    path.write_bytes(b"".join([msg.to_bytes() for msg in messages]))
+
+    with DltFileReader(path) as reader:
+        assert export_sqlite(reader, db_path, batch_size=2) == len(messages)
+
+    connection = sqlite3.connect(str(db_path))
+    try:
+        rows = connection.execute(
+            "SELECT position, length, time, ecu_id, application_id, level, payload "
+            "FROM messages ORDER BY id"
+        ).fetchall()
+        assert rows[1] == (
+            len(messages[0].to_bytes()),
+            len(messages[1].to_bytes()),
+            2000000,
+            "Ecu1",
+            "App2",
+            MessageLogInfo.DLT_LOG_WARN,
+            "message 1",
+        )
+        assert [row[5] for row in rows] == [2, 3, 4, 4, None, None]
+        assert connection.execute(
+            "SELECT number, type, value FROM arguments WHERE message = 6"
+        ).fetchall() == [(0, "raw", b"\x01\x02"), (1, "uint64", str(2**64 - 1))]
+        indexes = {
+            row[0]
+            for row in connection.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index'"
+            )
+        }
+        assert "messages_time" in indexes
+        assert "messages_level" in indexes
+    finally:
+        connection.close()
+
+    # export again replaces the messages
+    with DltFileReader(path) as reader:
+        export_sqlite(reader, db_path)
+    assert list(query_sqlite(db_path)) == messages
+
+
+@pytest.mark.parametrize(
+    "conditions, expected_indexes",
+    [
+        ({}, [0, 1, 2, 3, 4, 5]),
+        ({"application_ids": ["App1"]}, [0, 2, 4, 5]),
+        ({"application_ids": ["App1", "App2"], "context_ids": ["Ctx2"]}, [1, 2]),
+        ({"ecu_ids": ["Ecu2"]}, [3, 4, 5]),
+        ({"level": MessageLogInfo.DLT_LOG_WARN}, [0, 1]),
+        ({"time_from": 1.5, "time_to": 3.5}, [1, 2]),
+        ({"where": "payload LIKE ?", "parameters": ["%4"]}, [4]),
+        (
+            {
+                "where": "EXISTS (SELECT * FROM arguments "
+                "WHERE message = messages.id AND type = ?)",
+                "parameters": ["raw"],
+            },
+            [5],
+        ),
+    ],
+)
+def test_query_sqlite(conditions, expected_indexes):
+    path = TEST_RESULTS_DIR_PATH / Path(f"{sys._getframe().f_code.co_name}.dlt")
+    db_path = TEST_RESULTS_DIR_PATH / Path(f"{sys._getframe().f_code.co_name}.db")
+    messages = _make_messages()
+    path.write_bytes(b"".join([msg.to_bytes() for msg in messages]))
+    with DltFileReader(path) as reader:
+        export_sqlite(reader, db_path)
+
+    assert list(query_sqlite(db_path, **conditions)) == [
+        messages[i] for i in expected_indexes
+    ]
+
+
+@pytest.mark.parametrize("with_stats", [False, True])
+def test_export_sqlite_with_predicate(with_stats):
+    name = f"{sys._getframe().f_code.co_name}_{with_stats}"
+    path = TEST_RESULTS_DIR_PATH / Path(f"{name}.dlt")
+    db_path = TEST_RESULTS_DIR_PATH / Path(f"{name}.db")
+    messages = _make_messages()
+    path.write_bytes(b"".join([msg.to_bytes() for msg in messages]))
+
+    predicate = compile_filter('apid == "App1"')
+    stats = ReaderStats() if with_stats else None
+    with DltFileReader(path, predicate=predicate, stats=stats) as reader:
+        assert export_sqlite(reader, db_path) == 4
+    assert list(query_sqlite(db_path)) == [messages[i] for i in (0, 2, 4, 5)]
+
+
+def test_query_sqlite_time_boundary():
+    path = TEST_RESULTS_DIR_PATH / Path(f"{sys._getframe().f_code.co_name}.dlt")
+    db_path = TEST_RESULTS_DIR_PATH / Path(f"{sys._getframe().f_code.co_name}.db")
+    # 0.000091 is not equal to 91 * 1e-6 in floating point
+    messages = [
+        DltMessage.create_verbose_message(
+            [ArgumentString(f"message {microseconds}")],
+            MessageType.DLT_TYPE_LOG,
+            MessageLogInfo.DLT_LOG_INFO,
+            "App",
+            "Ctx",
+            str_header=StorageHeader(0, microseconds, "Ecu"),
+        )
+        for microseconds in (90, 91, 92)
+    ]
+    path.write_bytes(b"".join([msg.to_bytes() for msg in messages]))
+    with DltFileReader(path) as reader:
+        export_sqlite(reader, db_path)
+
+    assert list(query_sqlite(db_path, time_from=0.000091)) == messages[1:]
+    assert list(query_sqlite(db_path, time_to=0.000091)) == messages[:1]
+
+
+def _make_messages():
+    messages = make_messages()
+    messages.append(
+        DltMessage.create_verbose_message(
+            [ArgumentRaw(b"\x01\x02"), ArgumentUInt64(2**64 - 1)],
+            MessageType.DLT_TYPE_APP_TRACE,
+            MessageTraceInfo.DLT_TRACE_VARIABLE,
+            "App1",
+            "Ctx1",
+            message_counter=5,
+            str_header=StorageHeader(6, 0, "Ecu2"),
+        )
+    )
+    return messages
+
+
+if __name__ == "__main__":
+    pytest.main(sys.argv)
@@ -0,0 +1,143 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+from pydlt import (
+    ArgumentString,
+    DltMessage,
+    MessageLogInfo,
+    MessageType,
+    StorageHeader,
+    Volume,
+    summarize_file,
+)
+from pydlt.cli import main
+
+pytest.importorskip("numpy")
+
+CURRENT_DIR_PATH = Path(__file__).parent.absolute()
+TEST_RESULTS_DIR_PATH = CURRENT_DIR_PATH / "results"
+TEST_RESULTS_DIR_PATH.mkdir(exist_ok=True)
+
+
+@pytest.mark.parametrize("buffer_size", [100, 1024 * 1024])
+def test_summarize_file(buffer_size):
+    path = TEST_RESULTS_DIR_PATH / f"{sys._getframe().f_code.co_name}.dlt"
+    messages = _make_messages()
+    path.write_bytes(b"".join([msg.to_bytes() for msg in messages]))
+    lengths = [len(msg.to_bytes()) for msg in messages]
+
+    summary = summarize_file(path, buffer_size)
+    assert summary.total == Volume(6, sum(lengths))
+    assert (summary.start_time, summary.end_time) == (10.5, 12.5)
+    assert summary.by_ecu == {
+        "Ecu": Volume(3, sum(lengths[:3])),
+        "Std": Volume(3, sum(lengths[3:])),
+    }
+    assert summary.by_application == {
+        "App": Volume(2, lengths[0] + lengths[1]),
+        "Sys": Volume(1, lengths[2]),
+        None: Volume(3, sum(lengths[3:])),
+    }
+    assert summary.by_context == {
+        ("App", "Ctx1"): Volume(1, lengths[0]),
+        ("App", "Ctx2"): Volume(1, lengths[1]),
+        ("Sys", "Ctx1"): Volume(1, lengths[2]),
+        (None, None): Volume(3, sum(lengths[3:])),
+    }
+    assert summary.by_level == {
+        MessageLogInfo.DLT_LOG_WARN: Volume(2, lengths[0] + lengths[2]),
+        MessageLogInfo.DLT_LOG_INFO: Volume(1, lengths[1]),
+    }
+    assert summary.rate == {10: 3, 11: 2, 12: 1}
+    assert summary.peak_rate == 3
+    # payload lengths: 14, 14, 19, 6, 4 and 4
+    assert summary.payload_sizes == {4: 3, 8: 2, 16: 1}
+    assert (summary.verbose, summary.non_verbose) == (3, 3)
+    assert summary.verbose_ratio == 0.5
+    assert summary.message_ids == {
+        0x100: Volume(2, lengths[3] + lengths[4]),
+        0x200: Volume(1, lengths[5]),
+    }
+    assert summary.top_message_ids(1) == [(0x100, Volume(2, lengths[3] + lengths[4]))]
+
+
+def test_summarize_empty_file():
+    path = TEST_RESULTS_DIR_PATH / f"{sys._getframe().f_code.co_name}.dlt"
+    path.write_bytes(b"")
+
+    summary = summarize_file(path)
+    assert summary.total == Volume(0, 0)
+    assert summary.start_time is None
+    assert summary.verbose_ratio == 0.0
+    assert summary.peak_rate == 0
+
+
+def test_stats_cli(capsys):
+    path = TEST_RESULTS_DIR_PATH / f"{sys._getframe().f_code.co_name}.dlt"
+    path.write_bytes(b"".join([msg.to_bytes() for msg in _make_messages()]))
+
+    assert main(["stats", str(path), "--json"]) == 0
+    result = json.loads(capsys.readouterr().out)
+    assert result["messages"] == 6
+    assert result["level"][0]["key"] == "warn"
+    assert [item["key"] for item in result["message_ids"]] == [0x100, 0x200]
+    assert main(["stats", str(path)]) == 0
+    text = capsys.readouterr().out
+    assert "messages: 6" in text
+    assert "App:Ctx1: 1 messages" in text
+    assert "0x00000100: 2 messages" in text
+
+
+def test_stats_cli_without_numpy(capsys, monkeypatch):
+    path = TEST_RESULTS_DIR_PATH / f"{sys._getframe().f_code.co_name}.dlt"
+    path.write_bytes(b"".join([msg.to_bytes() for msg in _make_messages()]))
+    # NumPy cannot be imported
+    monkeypatch.setitem(sys.modules, "numpy", None)
+
+    assert main(["stats", str(path)]) == 1
+    assert 'pydlt: error: NumPy is required for the function; install it by "pip' in (
+        capsys.readouterr().err
+    )
+
+
+def _make_messages():
+    messages = []
+    for index, (apid, ctid, level, text) in enumerate(
+        [
+            ("App", "Ctx1", MessageLogInfo.DLT_LOG_WARN, "message"),
+            ("App", "Ctx2", MessageLogInfo.DLT_LOG_INFO, "message"),
+            ("Sys", "Ctx1", MessageLogInfo.DLT_LOG_WARN, "long message"),
+        ]
+    ):
+        messages.append(
+            DltMessage.create_verbose_message(
+                [ArgumentString(text)],
+                MessageType.DLT_TYPE_LOG,
+                level,
+                apid,
+                ctid,
+                str_header=StorageHeader(10, 500000, "Ecu"),
+            )
+        )
+    for seconds, message_id, data, msb_first in [
+        (11, 0x100, b"\x01\x02", True),
+        (11, 0x100, b"", False),
+        (12, 0x200, b"", False),
+    ]:
+        messages.append(
+            DltMessage.create_non_verbose_message(
+                message_id,
+                data,
+                ecu_id="Std",
+                msb_first=msb_first,
+                str_header=StorageHeader(seconds, 500000, "Ecu"),
+            )
+        )
+    return messages
+
+
+if __name__ == "__main__":
+    pytest.main(sys.argv)
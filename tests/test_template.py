@@ -0,0 +1,123 @@
+import struct
+import sys
+from pathlib import Path
+
+import pytest
+
+from pydlt import (
+    ArgumentBool,
+    ArgumentFloat64,
+    ArgumentRaw,
+    ArgumentSInt16,
+    ArgumentString,
+    ArgumentUInt32,
+    DltFileReader,
+    DltMessage,
+    MessageLogInfo,
+    MessageTemplate,
+    MessageType,
+    StorageHeader,
+)
+
+CURRENT_DIR_PATH = Path(__file__).parent.absolute()
+TEST_RESULTS_DIR_PATH = CURRENT_DIR_PATH / "results"
+TEST_RESULTS_DIR_PATH.mkdir(exist_ok=True)
+
+
+@pytest.mark.parametrize("msb_first", [False, True])
+@pytest.mark.parametrize("with_storage_header", [False, True])
+def test_template_fixed_length(msb_first, with_storage_header):
+    template = MessageTemplate(
+        "App",
+        "Ctx",
+        MessageType.DLT_TYPE_LOG,
+        MessageLogInfo.DLT_LOG_WARN,
+        [ArgumentBool, ArgumentSInt16, ArgumentUInt32, ArgumentFloat64],
+        ecu_id="Ecu",
+        session_id=1234,
+        with_storage_header=with_storage_header,
+        msb_first=msb_first,
+    )
+    values = [True, -2, 3, 0.5]
+    expected = DltMessage.create_verbose_message(
+        [ArgumentBool(True), ArgumentSInt16(-2), ArgumentUInt32(3)]
+        + [ArgumentFloat64(0.5)],
+        MessageType.DLT_TYPE_LOG,
+        MessageLogInfo.DLT_LOG_WARN,
+        "App",
+        "Ctx",
+        timestamp=123456,
+        session_id=1234,
+        ecu_id="Ecu",
+        message_counter=7,
+        msb_first=msb_first,
+        str_header=StorageHeader(1000, 250000, "Ecu") if with_storage_header else None,
+    )
+    assert template.number_of_arguments == 4
+    assert template.pack(values, 7, 123456, 1000.25) == expected.to_bytes()
+
+
+@pytest.mark.parametrize("msb_first", [False, True])
+def test_template_variable_length(msb_first):
+    template = MessageTemplate(
+        "App",
+        "Ctx",
+        MessageType.DLT_TYPE_APP_TRACE,
+        1,
+        [ArgumentString, ArgumentRaw, ArgumentString],
+        with_timestamp=False,
+        msb_first=msb_first,
+        is_utf8=True,
+    )
+    expected = DltMessage.create_verbose_message(
+        [
+            ArgumentString("tag", is_utf8=True),
+            ArgumentRaw(b"\x01\x02"),
+            ArgumentString("äöü", is_utf8=True),
+        ],
+        MessageType.DLT_TYPE_APP_TRACE,
+        1,
+        "App",
+        "Ctx",
+        message_counter=255,
+        msb_first=msb_first,
+        str_header=StorageHeader(5, 0, ""),
+    )
+    data = template.pack(["tag", b"\x01\x02", "äöü".encode()], 255, seconds=5)
+    assert data == expected.to_bytes()
+    message = template.create_message(["tag", b"\x01\x02", "äöü"], 255, seconds=5)
+    assert message == expected
+
+
+def test_template_pack_into():
+    path = TEST_RESULTS_DIR_PATH / Path(f"{sys._getframe().f_code.co_name}.dlt")
+    template = MessageTemplate("App", "Ctx", arg_types=[ArgumentString, ArgumentUInt32])
+    buffer = bytearray(4096)
+    offset = 0
+    for index in range(10):
+        offset += template.pack_into(buffer, offset, [f"message {index}", index])
+    path.write_bytes(buffer[:offset])
+
+    with DltFileReader(path) as reader:
+        messages = reader.read_messages()
+    assert [str(msg.payload) for msg in messages] == [
+        f"message {index} {index}" for index in range(10)
+    ]
+    # Message Counter is incremented for each message
+    assert [msg.std_header.message_counter for msg in messages] == list(range(10))
+    assert all([msg.std_header.timestamp is not None for msg in messages])
+    assert messages[0].ext_header.message_log_info == MessageLogInfo.DLT_LOG_INFO
+
+
+def test_template_errors():
+    with pytest.raises(ValueError):
+        MessageTemplate("App", "Ctx", arg_types=[int])
+    template = MessageTemplate("App", "Ctx", arg_types=[ArgumentUInt32])
+    with pytest.raises(ValueError):
+        template.pack([1, 2])
+    with pytest.raises(struct.error):
+        template.pack_into(bytearray(10), 0, [1])
+
+
+if __name__ == "__main__":
+    pytest.main(sys.argv)
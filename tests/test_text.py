@@ -0,0 +1,197 @@
+import io
+import sys
+from pathlib import Path
+
+import pytest
+
+from pydlt import (
+    ArgumentFloat32,
+    ArgumentRaw,
+    ArgumentString,
+    ArgumentUInt32,
+    DltFileReader,
+    DltFileWriter,
+    DltMessage,
+    ExtendedHeader,
+    MessageBusInfo,
+    MessageControlInfo,
+    MessageLogInfo,
+    MessageTraceInfo,
+    MessageType,
+    StorageHeader,
+    TextExporter,
+    export_text,
+)
+from pydlt.text import compile_format
+
+CURRENT_DIR_PATH = Path(__file__).parent.absolute()
+TEST_RESULTS_DIR_PATH = CURRENT_DIR_PATH / "results"
+TEST_RESULTS_DIR_PATH.mkdir(exist_ok=True)
+
+
+def test_text_exporter_format_message():
+    exporter = TextExporter(io.StringIO())
+    for msg in _make_messages():
+        assert exporter.format_message(msg) == str(msg)
+    # texts are created from the caches
+    for msg in _make_messages():
+        assert exporter.format_message(msg) == str(msg)
+
+
+def test_text_exporter_unknown_types():
+    exporter = TextExporter(io.StringIO())
+    for message_type, message_type_info in [(1, 0), (0, 9), (5, 1), (3, 7)]:
+        msg = DltMessage.create_verbose_message(
+            [ArgumentUInt32(1)],
+            message_type,
+            message_type_info,
+            "App",
+            "Ctx",
+            session_id=3,
+            str_header=StorageHeader(0, -5, "Ecu"),
+        )
+        assert exporter.format_message(msg) == str(msg)
+
+
+def test_text_exporter_stream():
+    messages = _make_messages()
+    stream = io.StringIO()
+
+    with TextExporter(stream) as exporter:
+        exporter.write_message(messages[0])
+        assert exporter.write_messages(messages[1:]) == len(messages) - 1
+        assert exporter.write_messages([]) == 0
+    assert not stream.closed
+    assert exporter.count == len(messages)
+    assert stream.getvalue() == "".join([str(msg) + "\n" for msg in messages])
+    assert exporter.format_messages(messages) == stream.getvalue()
+
+
+def test_export_text():
+    path = TEST_RESULTS_DIR_PATH / Path(f"{sys._getframe().f_code.co_name}.dlt")
+    text_path = path.with_suffix(".txt")
+    messages = [msg for msg in _make_messages() if msg.str_header is not None]
+    with DltFileWriter(path) as writer:
+        writer.write_messages(messages * 3)
+
+    with DltFileReader(path) as reader:
+        assert export_text(reader, text_path, batch_size=4) == len(messages) * 3
+    with DltFileReader(path) as reader:
+        expected = "".join([str(msg) + "\n" for msg in reader])
+    assert text_path.read_bytes() == expected.encode("utf-8")
+
+
+def test_compile_format():
+    messages = _make_messages()
+    format_message = compile_format(
+        "{time}|{timestamp}|{counter}|{ecu}|{apid}|{ctid}|{session}|{type}|"
+        "{subtype}|{level}|{mode}|{args}|{payload}"
+    )
+    fields = [format_message(msg).split("|") for msg in messages]
+    assert fields[0] == [
+        "2020/09/13 12:26:40.000000",
+        "12345.6789",
+        "0",
+        "Ecu",
+        "App",
+        "Ctx",
+        "",
+        "log",
+        "warn",
+        "warn",
+        "verbose",
+        "3",
+        str(messages[0].payload),
+    ]
+    assert fields[1][3:10] == ["Ecu1", "App", "Ctx", "1", "app_trace", "state", ""]
+    assert fields[4][4:] == ["", "", "1", "", "", "", "non-verbose", "", "[10] 0102"]
+    assert fields[5][:2] == ["", ""]
+    assert fields[5][3] == ""
+
+    # fields are joined by the format of str.format
+    format_message = compile_format("{apid:>5}:{ctid!r} {{{counter}}} {apid}")
+    assert format_message(messages[0]) == "  App:'Ctx' {0} App"
+    # unused fields are not computed
+    assert "payload" not in compile_format("{apid}").__doc__
+
+
+@pytest.mark.parametrize(
+    "template", ["{unknown}", "{0}", "{apid.x}", "{apid:{counter}}", "{apid", "}"]
+)
+def test_compile_format_invalid(template):
+    with pytest.raises(ValueError):
+        compile_format(template)
+
+
+def test_export_text_template():
+    path = TEST_RESULTS_DIR_PATH / Path(f"{sys._getframe().f_code.co_name}.dlt")
+    text_path = path.with_suffix(".txt")
+    messages = [msg for msg in _make_messages() if msg.str_header is not None]
+    with DltFileWriter(path) as writer:
+        writer.write_messages(messages)
+
+    template = "{time} {ecu} {apid}:{ctid} [{level}] {payload}"
+    with DltFileReader(path) as reader:
+        export_text(reader, text_path, template=template)
+    format_message = compile_format(template)
+    assert text_path.read_text(encoding="utf-8").splitlines() == [
+        format_message(msg) for msg in messages
+    ]
+
+
+def _make_messages():
+    messages = []
+    for index, (message_type, message_type_info) in enumerate(
+        [
+            (MessageType.DLT_TYPE_LOG, MessageLogInfo.DLT_LOG_WARN),
+            (MessageType.DLT_TYPE_APP_TRACE, MessageTraceInfo.DLT_TRACE_STATE),
+            (MessageType.DLT_TYPE_NW_TRACE, MessageBusInfo.DLT_NW_TRACE_CAN),
+            (MessageType.DLT_TYPE_CONTROL, MessageControlInfo.DLT_CONTROL_TIME),
+        ]
+    ):
+        messages.append(
+            DltMessage.create_verbose_message(
+                [
+                    ArgumentString(f"message {index} äö", is_utf8=True),
+                    ArgumentFloat32(0.5),
+                    ArgumentRaw(b"\x01\x02"),
+                ],
+                message_type,
+                message_type_info,
+                "App",
+                "Ctx",
+                timestamp=123456789 + index,
+                session_id=index if index % 2 else None,
+                ecu_id="Ecu1" if index % 2 else None,
+                message_counter=index,
+                str_header=StorageHeader(1600000000 + index // 2, 5 * index, "Ecu"),
+            )
+        )
+    messages.append(
+        DltMessage.create_non_verbose_message(
+            10,
+            b"\x01\x02",
+            timestamp=5,
+            session_id=1,
+            str_header=StorageHeader(1600000000, 999999, "Ecu"),
+        )
+    )
+    messages.append(
+        DltMessage.create_non_verbose_message(
+            11,
+            b"",
+            ext_header=ExtendedHeader(
+                False,
+                MessageType.DLT_TYPE_LOG,
+                MessageLogInfo.DLT_LOG_INFO,
+                0,
+                "App",
+                "Ctx",
+            ),
+        )
+    )
+    return messages
+
+
+if __name__ == "__main__":
+    pytest.main(sys.argv)
@@ -0,0 +1,261 @@
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+from pydlt import (
+    ArgumentString,
+    ArgumentUInt32,
+    DltMessage,
+    IndexHit,
+    MessageLogInfo,
+    MessageType,
+    StorageHeader,
+    TextIndex,
+)
+from pydlt.cli import main
+from pydlt.textindex import tokenize
+
+CURRENT_DIR_PATH = Path(__file__).parent.absolute()
+TEST_RESULTS_DIR_PATH = CURRENT_DIR_PATH / "results"
+TEST_RESULTS_DIR_PATH.mkdir(exist_ok=True)
+
+
+def test_tokenize():
+    assert tokenize("Connection TIMEOUT after 30ms: état_2, x-y") == [
+        "connection",
+        "timeout",
+        "after",
+        "30ms",
+        "état_2",
+        "x",
+        "y",
+    ]
+    # long words are not tokens
+    assert tokenize("a" * 65 + " b") == ["b"]
+
+
+@pytest.mark.parametrize("flush_size", [1, 1000000])
+def test_text_index_search(flush_size):
+    name = f"{sys._getframe().f_code.co_name}_{flush_size}"
+    path = TEST_RESULTS_DIR_PATH / f"{name}.dlt"
+    index_path = _remove(TEST_RESULTS_DIR_PATH / f"{name}.index")
+    messages = _make_messages(0, 60)
+    positions = _write_messages(path, messages)
+
+    with TextIndex(index_path, flush_size) as index:
+        assert index.update(path, buffer_size=200) == 60
+        assert index.paths == [str(path.resolve())]
+        for query in ["timeout", "Sensor 3", "retry ok", "sensor", "missing", ""]:
+            assert index.search(query) == _find(query, [(path, messages)])
+        hits = index.search_message_id(0x1234)
+        assert [hit.position for hit in hits] == positions[4::5]
+        assert list(index.read_messages(hits)) == messages[4::5]
+        # nothing is indexed again
+        assert index.update(path) == 0
+
+
+def test_text_index_search_rare_and_common_tokens():
+    path = TEST_RESULTS_DIR_PATH / f"{sys._getframe().f_code.co_name}.dlt"
+    index_path = _remove(path.with_suffix(".index"))
+    messages = [
+        DltMessage.create_verbose_message(
+            [ArgumentString("common rare" if number % 50 == 7 else "common")],
+            MessageType.DLT_TYPE_LOG,
+            MessageLogInfo.DLT_LOG_INFO,
+            "App",
+            "Ctx",
+            str_header=StorageHeader(number, 0, "Ecu"),
+        )
+        for number in range(200)
+    ]
+    _write_messages(path, messages)
+
+    # blocks of the common token are searched by a few positions of the rare one
+    with TextIndex(index_path, flush_size=120) as index:
+        index.update(path, buffer_size=1000)
+        for query in ["common", "rare", "rare common", "common rare missing"]:
+            assert index.search(query) == _find(query, [(path, messages)])
+
+
+def test_text_index_append_and_replace():
+    path = TEST_RESULTS_DIR_PATH / f"{sys._getframe().f_code.co_name}.dlt"
+    index_path = _remove(path.with_suffix(".index"))
+    messages = _make_messages(0, 20)
+    data = b"".join([msg.to_bytes() for msg in messages])
+    # the last message is incomplete
+    path.write_bytes(data[:-10])
+
+    with TextIndex(index_path) as index:
+        assert index.update(path) == 19
+        assert index.search("sensor") == _find("sensor", [(path, messages[:19])])
+        messages += _make_messages(20, 40)
+        _write_messages(path, messages)
+        assert index.update(path) == 21
+        assert list(index.read_messages(index.search("sensor 36"))) == [messages[36]]
+        assert index.search("sensor") == _find("sensor", [(path, messages)])
+
+        # a replaced file is indexed again
+        messages = _make_messages(100, 110)
+        _write_messages(path, messages)
+        assert index.update(path) == 10
+        assert index.search("sensor 36") == []
+        assert index.search("sensor") == _find("sensor", [(path, messages)])
+
+
+def test_text_index_merge_and_remove():
+    paths = []
+    index_paths = []
+    files = []
+    for number in range(3):
+        paths.append(TEST_RESULTS_DIR_PATH / f"test_text_index_merge_{number}.dlt")
+        index_paths.append(_remove(paths[-1].with_suffix(".index")))
+        files.append((paths[-1], _make_messages(number * 10, number * 10 + 10)))
+        _write_messages(*files[-1])
+        with TextIndex(index_paths[-1]) as index:
+            index.update(paths[-1])
+
+    with TextIndex(index_paths[0]) as index:
+        index.merge(index_paths[1])
+        index.merge(index_paths[2])
+        # files in the other index replace the same files
+        index.merge(index_paths[1])
+        files = [files[0], files[2], files[1]]
+        assert index.paths == [str(path.resolve()) for path, _ in files]
+        hits = index.search("timeout")
+        assert hits == _find("timeout", files)
+        assert list(index.read_messages(hits)) == [
+            msg
+            for _, messages in files
+            for msg in messages
+            if "timeout" in _tokens(msg)
+        ]
+        assert len(index.search_message_id(0x1234)) == 6
+
+        index.remove(paths[2])
+        assert index.paths == [str(paths[i].resolve()) for i in (0, 1)]
+        assert index.search("timeout") == _find("timeout", [files[0], files[2]])
+
+
+def test_text_index_cli(capsys):
+    path = TEST_RESULTS_DIR_PATH / f"{sys._getframe().f_code.co_name}.dlt"
+    index_path = _remove(path.with_suffix(".index"))
+    messages = _make_messages(0, 10)
+    _write_messages(path, messages)
+
+    assert main(["index", str(index_path), str(path)]) == 0
+    assert "10 messages are indexed" in capsys.readouterr().err
+    assert main(["search", str(index_path), "Retry OK"]) == 0
+    assert capsys.readouterr().out.splitlines() == [
+        str(msg) for msg in messages if {"retry", "ok"} <= _tokens(msg)
+    ]
+    assert main(["search", str(index_path), "--message-id", "0x1234"]) == 0
+    assert capsys.readouterr().out.splitlines() == [str(messages[4]), str(messages[9])]
+    assert main(["search", str(index_path), "missing"]) == 1
+
+
+def test_text_index_invalid_files(capsys):
+    path = TEST_RESULTS_DIR_PATH / f"{sys._getframe().f_code.co_name}.dlt"
+    index_path = _remove(path.with_suffix(".index"))
+    missing_path = _remove(path.with_suffix(".missing"))
+    empty_path = _remove(path.with_suffix(".empty"))
+    messages = _make_messages(0, 10)
+    _write_messages(path, messages)
+    sqlite3.connect(str(empty_path)).close()
+
+    with pytest.raises(ValueError):
+        TextIndex(path)
+    for invalid_path in (path, missing_path, empty_path):
+        with pytest.raises(ValueError):
+            TextIndex(invalid_path, read_only=True)
+    assert not missing_path.exists()
+
+    with TextIndex(index_path) as index:
+        index.update(path)
+        for invalid_path in (path, missing_path, empty_path):
+            with pytest.raises(ValueError):
+                index.merge(invalid_path)
+        assert not missing_path.exists()
+        # the index is not changed by the failed merges
+        assert index.search("timeout") == _find("timeout", [(path, messages)])
+
+    assert main(["search", str(path), "timeout"]) == 1
+    assert "pydlt: error: Invalid index" in capsys.readouterr().err
+    assert main(["search", str(missing_path), "timeout"]) == 1
+    assert "pydlt: error: Invalid index" in capsys.readouterr().err
+    assert not missing_path.exists()
+    assert main(["index", str(index_path), "--merge", str(missing_path)]) == 1
+    assert "pydlt: error: Invalid index" in capsys.readouterr().err
+    assert not missing_path.exists()
+
+
+def _remove(path):
+    if path.exists():
+        path.unlink()
+    return path
+
+
+def _find(text, files):
+    tokens = set(tokenize(text))
+    hits = []
+    for path, messages in files:
+        position = 0
+        for msg in messages:
+            if tokens and tokens <= _tokens(msg):
+                hits.append(IndexHit(str(path.resolve()), position))
+            position += len(msg.to_bytes())
+    return hits
+
+
+def _tokens(message):
+    tokens = set()
+    for arg in getattr(message.payload, "arguments", []):
+        if isinstance(arg, ArgumentString):
+            tokens.update(tokenize(arg.data))
+    return tokens
+
+
+def _write_messages(path, messages):
+    positions = []
+    data = b""
+    for msg in messages:
+        positions.append(len(data))
+        data += msg.to_bytes()
+    path.write_bytes(data)
+    return positions
+
+
+def _make_messages(start, end):
+    messages = []
+    for number in range(start, end):
+        str_header = StorageHeader(number, 0, "Ecu")
+        if number % 5 == 4:
+            messages.append(
+                DltMessage.create_non_verbose_message(
+                    0x1234, b"timeout", msb_first=number % 2 == 0, str_header=str_header
+                )
+            )
+            continue
+        texts = [
+            ["Sensor", f"sensor {number}"],
+            ["connection timeout", "state"],
+            ["retry", "OK"],
+            ["retry ok ä"],
+        ][number % 4 if number % 10 != 1 else 1]
+        messages.append(
+            DltMessage.create_verbose_message(
+                [ArgumentString(text, is_utf8=True) for text in texts]
+                + [ArgumentUInt32(number)],
+                MessageType.DLT_TYPE_LOG,
+                MessageLogInfo.DLT_LOG_INFO,
+                "App",
+                "Ctx",
+                str_header=str_header,
+            )
+        )
+    return messages
+
+
+if __name__ == "__main__":
+    pytest.main(sys.argv)
@@ -0,0 +1,125 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+from pydlt import (
+    DltFileReader,
+    DltMessage,
+    StorageHeader,
+    TimeCorrelator,
+    scan_headers,
+)
+
+np = pytest.importorskip("numpy")
+
+CURRENT_DIR_PATH = Path(__file__).parent.absolute()
+TEST_RESULTS_DIR_PATH = CURRENT_DIR_PATH / "results"
+TEST_RESULTS_DIR_PATH.mkdir(exist_ok=True)
+
+# seconds per tick of the ECU clock, which is 100 ppm fast
+RATE = 0.0001 * (1 + 1e-4)
+
+
+def test_time_correlator_fit():
+    path = TEST_RESULTS_DIR_PATH / Path(f"{sys._getframe().f_code.co_name}.dlt")
+    true_times = _write_messages(path)
+
+    correlator = TimeCorrelator().fit(scan_headers(path))
+    assert sorted(correlator.segments) == [
+        (b"Ecu1", 1, 0, 0),
+        (b"Ecu1", 1, 0, 1),
+        (b"Ecu1", 1, 1, 0),
+        (b"Ecu1", 1, 1, 1),
+    ]
+    segment = correlator.segments[(b"Ecu1", 1, 0, 0)]
+    assert (segment.ecu_id, segment.session_id) == ("Ecu1", 1)
+    assert segment.rate == pytest.approx(RATE, rel=3e-5)
+
+    corrected = correlator.corrected_times(scan_headers(path))
+    assert np.abs(corrected - true_times).max() < 0.001
+    # the delays are not removed without the correlation
+    assert np.abs(scan_headers(path).time - true_times).max() > 0.005
+
+
+def test_time_correlator_without_min_delay_fit():
+    path = TEST_RESULTS_DIR_PATH / Path(f"{sys._getframe().f_code.co_name}.dlt")
+    true_times = _write_messages(path)
+
+    correlator = TimeCorrelator(min_delay_fit=False).fit(scan_headers(path))
+    corrected = correlator.corrected_times(scan_headers(path))
+    # the mean delay remains
+    assert np.mean(corrected - true_times) == pytest.approx(0.005, abs=0.001)
+
+
+def test_time_correlator_rewrite():
+    src_path = TEST_RESULTS_DIR_PATH / Path(f"{sys._getframe().f_code.co_name}.dlt")
+    dst_path = TEST_RESULTS_DIR_PATH / Path(f"{sys._getframe().f_code.co_name}_out.dlt")
+    _write_messages(src_path)
+    correlator = TimeCorrelator().fit(scan_headers(src_path))
+    expected = correlator.corrected_times(scan_headers(src_path))
+
+    for buffer_size in (100, 1024 * 1024):
+        count = correlator.rewrite(src_path, dst_path, buffer_size)
+        assert count == len(expected)
+        assert scan_headers(dst_path).time == pytest.approx(expected, abs=1e-6)
+        with DltFileReader(src_path) as src, DltFileReader(dst_path) as dst:
+            for src_msg, dst_msg in zip(src, dst):
+                assert src_msg.std_header == dst_msg.std_header
+                assert src_msg.payload == dst_msg.payload
+
+
+def test_time_correlator_annotate():
+    path = TEST_RESULTS_DIR_PATH / Path(f"{sys._getframe().f_code.co_name}.dlt")
+    _write_messages(path)
+    correlator = TimeCorrelator().fit(scan_headers(path))
+    expected = correlator.corrected_times(scan_headers(path))
+
+    with DltFileReader(path) as reader:
+        times = [time for _, time in correlator.annotate(reader)]
+    assert times == pytest.approx(expected.tolist(), abs=1e-9)
+
+
+def test_time_correlator_without_timestamp():
+    path = TEST_RESULTS_DIR_PATH / Path(f"{sys._getframe().f_code.co_name}.dlt")
+    msg = DltMessage.create_non_verbose_message(
+        0, b"", str_header=StorageHeader(10, 500000, "Ecu1")
+    )
+    path.write_bytes(msg.to_bytes())
+
+    correlator = TimeCorrelator().fit(scan_headers(path))
+    assert correlator.segments == {}
+    assert correlator.corrected_times(scan_headers(path)).tolist() == [10.5]
+
+
+def _write_messages(path):
+    # two boots of 100 seconds, a message every 0.5 seconds
+    true_times = []
+    messages = []
+    for boot, wall_start in enumerate((1000.0, 1200.0)):
+        for index in range(200):
+            tick = 10000 * boot + index * 5000
+            true_time = wall_start + (tick - 10000 * boot) * RATE
+            # delay of 0 to 10 milliseconds
+            delay = (index * 7 % 11) * 0.001
+            microseconds = int(round((true_time + delay) * 1000000))
+            messages.append(
+                DltMessage.create_non_verbose_message(
+                    0,
+                    b"",
+                    timestamp=tick,
+                    session_id=1,
+                    ecu_id="Ecu1",
+                    message_counter=index % 256,
+                    str_header=StorageHeader(
+                        microseconds // 1000000, microseconds % 1000000, "Ecu"
+                    ),
+                ).to_bytes()
+            )
+            true_times.append(true_time)
+    path.write_bytes(b"".join(messages))
+    return np.array(true_times)
+
+
+if __name__ == "__main__":
+    pytest.main(sys.argv)